@@ -2,6 +2,7 @@
 from binance.spot import Spot
 from dotenv import load_dotenv
 from datetime import datetime, timezone
+from scripts.price_store import PriceStore
 
 load_dotenv(os.getenv('ENV_FILE','.env'))
 c = Spot(base_url=os.getenv('BINANCE_BASE_URL','https://testnet.binance.vision'),
@@ -18,4 +19,8 @@ cols = ["openTime","open","high","low","close","volume","closeTime","qav","trade
 with open(out,"w",newline="") as f:
     w = csv.writer(f); w.writerow(cols)
     for r in rows: w.writerow(r)
+# 1m closes also go into the local price store (shared with the PnL reports)
+if interval == '1m' and rows:
+    PriceStore(base_url=os.getenv('BINANCE_BASE_URL','https://testnet.binance.vision')).add_klines(
+        sym, rows, covered=[(int(rows[0][0]), int(rows[-1][0]))])
 print({"exported": out, "rows": len(rows)})
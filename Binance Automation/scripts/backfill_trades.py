@@ -1,12 +1,14 @@
-﻿import os, time, hmac, hashlib, argparse, math, json, re
+﻿import os, time, hmac, hashlib, argparse, math, json, re, threading
 import urllib.parse as up
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 import requests
 from openpyxl import Workbook, load_workbook
 from scripts.env_loader import load_env
+from scripts.rate_budget import WeightBudget
 
 HEADERS = [
     "DateUTC","DateLocal","Env","Symbol","Side","OrderType","OrderId","ClientOrderId",
@@ -16,6 +18,14 @@ HEADERS = [
 
 TIME_OFFSET_MS = 0
 
+# REQUEST_WEIGHT per endpoint (spot API); spent from BUDGET before each call when set
+WEIGHTS = {
+    "/api/v3/time": 1, "/api/v3/exchangeInfo": 20, "/api/v3/account": 20,
+    "/api/v3/myTrades": 20, "/api/v3/order": 4, "/api/v3/allOrders": 20,
+}
+BUDGET: WeightBudget | None = None
+_tls = threading.local()
+
 def _env(k, d=""):
     v = os.getenv(k)
     return v if v not in (None, "") else d
@@ -52,17 +62,38 @@ def _sign(params: dict, secret: str) -> str:
     sig = hmac.new(secret.encode(), qs.encode(), hashlib.sha256).hexdigest()
     return f"{qs}&signature={sig}"
 
+def _session() -> requests.Session:
+    # one keep-alive session per worker thread
+    s = getattr(_tls, "session", None)
+    if s is None:
+        s = _tls.session = requests.Session()
+    return s
+
 def _req(method: str, path: str, params: dict, signed: bool = False):
-    if signed:
-        params = dict(params or {})
-        params.setdefault("timestamp", _ts())
-        params.setdefault("recvWindow", 15000)
-        url = f"{_base()}{path}?{_sign(params, _sec())}"
-        headers = {"X-MBX-APIKEY": _key()}
-    else:
-        url = f"{_base()}{path}"
-        headers = {}
-    r = requests.request(method, url, headers=headers, timeout=30)
+    for attempt in range(4):
+        if BUDGET:
+            BUDGET.acquire(5 if path == "/api/v3/myTrades" and "orderId" in (params or {}) else WEIGHTS.get(path, 1))
+        if signed:
+            p = dict(params or {})
+            p.setdefault("timestamp", _ts())
+            p.setdefault("recvWindow", 15000)
+            url = f"{_base()}{path}?{_sign(p, _sec())}"
+            headers = {"X-MBX-APIKEY": _key()}
+        else:
+            url = f"{_base()}{path}"
+            headers = {}
+        r = _session().request(method, url, headers=headers, timeout=30)
+        if BUDGET:
+            BUDGET.observe(r.headers)
+        if r.status_code not in (418, 429) or attempt == 3:
+            break
+        # rate limited: back off for Retry-After (all threads when budgeted)
+        wait_s = float(r.headers.get("Retry-After") or 1)
+        print(f"[rate] {r.status_code} on {path}, backing off {wait_s:.0f}s")
+        if BUDGET:
+            BUDGET.pause(wait_s)
+        else:
+            time.sleep(wait_s)
     if r.status_code >= 400:
         # Try to surface Binance error payload for fast triage
         try:
@@ -173,13 +204,13 @@ def _probe_symbol(symbol: str) -> bool:
             print(f"[probe] {symbol}: unexpected error, skipping → {msg}")
             return False
 
-def _mytrades_window(symbol: str, start_ms: int, end_ms: int) -> list[dict]:
-    params = {
-        "symbol": symbol,
-        "startTime": start_ms,
-        "endTime": end_ms,
-        "limit": 1000
-    }
+def _mytrades_page(symbol: str, start_ms: int, end_ms: int, from_id: int | None = None) -> list[dict]:
+    """Up to 1000 trades in [start_ms, end_ms], or from trade id from_id on (Binance takes fromId
+    without a time window)."""
+    if from_id is None:
+        params = {"symbol": symbol, "startTime": start_ms, "endTime": end_ms, "limit": 1000}
+    else:
+        params = {"symbol": symbol, "fromId": int(from_id), "limit": 1000}
     try:
         r = _req("GET", "/api/v3/myTrades", params=params, signed=True)
         return r.json()
@@ -193,14 +224,37 @@ def _mytrades_window(symbol: str, start_ms: int, end_ms: int) -> list[dict]:
         elif "-1121" in msg or "Invalid symbol" in msg:
             print(f"[myTrades] {symbol}: invalid symbol, skipping window.")
             return []
-        else:
+        elif from_id is None:
             # Some symbols simply return 400 when no trades with start/endTime; fall back to no window
             try:
                 r3 = _req("GET", "/api/v3/myTrades", params={"symbol": symbol, "limit": 1000}, signed=True)
                 return r3.json()
             except Exception:
                 print(f"[myTrades] {symbol}: {msg}")
-                return []
+                raise
+        else:
+            print(f"[myTrades] {symbol}: {msg}")
+            raise
+
+def _mytrades_window(symbol: str, start_ms: int, end_ms: int) -> list[dict]:
+    """All trades in [start_ms, end_ms]: the first page by time, the rest by fromId (last id + 1),
+    so a page boundary inside a burst of same-millisecond fills neither repeats nor skips trades."""
+    page = _mytrades_page(symbol, start_ms, end_ms)
+    out = list(page)
+    while len(page) == 1000:
+        page = _mytrades_page(symbol, start_ms, end_ms, from_id=int(page[-1]["id"]) + 1)
+        out.extend(t for t in page if int(t["time"]) <= end_ms)
+        if page and int(page[-1]["time"]) > end_ms:
+            break
+    return out
+
+def _order_trades(symbol: str, order_id: int) -> list[dict]:
+    """Every fill of one order (myTrades by orderId, weight 5)."""
+    try:
+        return _req("GET", "/api/v3/myTrades", params={"symbol": symbol, "orderId": int(order_id)}, signed=True).json()
+    except requests.HTTPError as e:
+        print(f"[myTrades] {symbol} order {order_id}: {e}")
+        return []
 
 def _hydrate_order(symbol: str, order_id: int) -> dict | None:
     params = {"symbol": symbol, "orderId": int(order_id)}
@@ -211,13 +265,55 @@ def _hydrate_order(symbol: str, order_id: int) -> dict | None:
         print(f"[order] {symbol} {order_id}: {e}")
         return None
 
-def _append_or_update_order(ws, env_name: str, symbol: str, agg: dict, details: dict | None):
+def _hydrate_orders(symbol: str, order_ids) -> dict[int, dict]:
+    """Order details for a set of ids: allOrders pages (1000 orders per call) when that is
+    cheaper in weight than one /order call per id; per-id lookups for whatever it misses."""
+    ids = sorted(set(int(i) for i in order_ids))
+    out: dict[int, dict] = {}
+    batched = len(ids) * WEIGHTS["/api/v3/order"] > WEIGHTS["/api/v3/allOrders"]
+    pending = ids if batched else []
+    while pending:
+        try:
+            page = _req("GET", "/api/v3/allOrders",
+                        params={"symbol": symbol, "orderId": pending[0], "limit": 1000}, signed=True).json()
+        except requests.HTTPError as e:
+            print(f"[allOrders] {symbol}: {e}")
+            break
+        for o in page:
+            out[int(o["orderId"])] = o
+        if len(page) < 1000:
+            break
+        last = int(page[-1]["orderId"])
+        pending = [i for i in pending if i > last]
+    for i in ids:
+        if i not in out:
+            d = _hydrate_order(symbol, i)
+            if d:
+                out[i] = d
+    return {i: out[i] for i in ids if i in out}
+
+def _complete_symbol(symbol: str, order_ids, resume_ids, hydrate: bool):
+    """Runs once a symbol's windows are in: full fills for orders that may have started before
+    them (resume_ids), plus batched order details."""
+    extra = [t for oid in sorted(resume_ids) for t in _order_trades(symbol, oid)]
+    details = _hydrate_orders(symbol, order_ids) if hydrate else {}
+    return extra, details
+
+def _order_rows(ws) -> dict[str, int]:
+    """OrderId -> sheet row, for _append_or_update_order(index=...)."""
+    order_idx = HEADERS.index("OrderId")
+    return {str(row[order_idx].value): row[0].row for row in ws.iter_rows(min_row=2)}
+
+def _append_or_update_order(ws, env_name: str, symbol: str, agg: dict, details: dict | None, index: dict | None = None):
     order_idx = HEADERS.index("OrderId") + 1
     found_row = None
-    for row in ws.iter_rows(min_row=2):
-        if str(row[order_idx-1].value) == str(agg["orderId"]):
-            found_row = row[0].row
-            break
+    if index is not None:
+        found_row = index.get(str(agg["orderId"]))
+    else:
+        for row in ws.iter_rows(min_row=2):
+            if str(row[order_idx-1].value) == str(agg["orderId"]):
+                found_row = row[0].row
+                break
 
     now_utc = datetime.now(timezone.utc).isoformat()
     now_local = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -247,6 +343,8 @@ def _append_or_update_order(ws, env_name: str, symbol: str, agg: dict, details:
             ws.cell(row=found_row, column=ci, value=v)
     else:
         ws.append(row_values)
+        if index is not None:
+            index[str(agg["orderId"])] = ws.max_row
 
 def _aggregate_order(trades: list[dict]) -> dict:
     qty = 0.0
@@ -287,7 +385,58 @@ def _aggregate_order(trades: list[dict]) -> dict:
         "isBuyer": is_buyer,
     }
 
-def backfill(days: int, quote: str, symbols: list[str], scan_exchange: bool, hydrate_orders: bool, xlsx="logs/trades.xlsx", step_days=7):
+DAY_MS = 86_400_000
+
+def _load_checkpoint(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def _save_checkpoint(path: Path, data: dict):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+def _merge_ranges(ranges) -> list[list[int]]:
+    out: list[list[int]] = []
+    for a, b in sorted(tuple(r) for r in ranges):
+        if out and a <= out[-1][1]:
+            out[-1][1] = max(out[-1][1], b)
+        else:
+            out.append([a, b])
+    return out
+
+def _windows(start_ms: int, end_ms: int, step_ms: int, done) -> list[tuple[int, int]]:
+    """[a, b) windows on a fixed grid (multiples of step_ms) covering [start_ms, end_ms) minus `done`."""
+    gaps, cur = [], start_ms
+    for a, b in _merge_ranges(done):
+        if b <= cur or a >= end_ms:
+            continue
+        if a > cur:
+            gaps.append((cur, a))
+        cur = max(cur, b)
+    if cur < end_ms:
+        gaps.append((cur, end_ms))
+    out = []
+    for a, b in gaps:
+        while a < b:
+            e = min((a // step_ms + 1) * step_ms, b)
+            out.append((a, e))
+            a = e
+    return out
+
+def backfill(days: int, quote: str, symbols: list[str], scan_exchange: bool, hydrate_orders: bool, xlsx="logs/trades.xlsx",
+             step_days=7, workers=8, weight_per_min=4800, use_checkpoint=True, budget: WeightBudget | None = None):
+    """
+    Windows of every symbol are fetched in parallel on a thread pool, all requests drawing on
+    one request-weight budget. When a symbol's windows are in, its fills are grouped per
+    orderId (across windows), the orders hydrated in batches, the rows written and the
+    workbook saved; only then are the windows recorded in logs/backfill_checkpoint.json, so
+    a rerun fetches just the windows that are new (or failed).
+    """
+    global BUDGET
+    BUDGET = budget or WeightBudget(weight_per_min, 60.0)
     env_name = _env("ENV_FILE", ".env.mainnet")
     _ensure_workbook(Path(xlsx))
     _sync_time()  # once up-front
@@ -298,38 +447,92 @@ def backfill(days: int, quote: str, symbols: list[str], scan_exchange: bool, hyd
         print("No symbols discovered. Pass --symbols or enable --scan-exchange.")
         return
 
-    # Pre-filter by probe to avoid noisy 400s
-    probed = [s for s in candidates if _probe_symbol(s)]
-    if not probed:
-        print("No probeable symbols. Check API permissions (Spot & Margin Trading) and IP whitelist.")
-        return
-
-    start_dt = datetime.now(timezone.utc) - timedelta(days=days)
-    end_dt = datetime.now(timezone.utc)
+    ckpt_path = Path(xlsx).with_name("backfill_checkpoint.json")
+    ckpt = _load_checkpoint(ckpt_path) if use_checkpoint else {}
+    scope = ckpt.setdefault(_base(), {})
+    end_ms = _ts()
+    start_ms = end_ms - days * DAY_MS
 
     wb = load_workbook(xlsx)
     ws = wb["Trades"]
-
-    for sym in probed:
-        print(f"[backfill] {sym} ...")
-        s = start_dt
-        while s < end_dt:
-            e = min(s + timedelta(days=step_days), end_dt)
-            trades = _mytrades_window(sym, int(s.timestamp()*1000), int(e.timestamp()*1000))
-            if trades:
-                buckets = defaultdict(list)
-                for t in trades:
-                    buckets[int(t["orderId"])].append(t)
-                for order_id, ts in buckets.items():
-                    agg = _aggregate_order(ts)
-                    details = _hydrate_order(sym, order_id) if hydrate_orders else None
-                    _append_or_update_order(ws, env_name, sym, agg, details)
-            time.sleep(0.12)  # be nice to rate limits
-            s = e
-
-        _safe_save(wb, Path(xlsx))
-
-    print(f"[done] Backfill complete → {xlsx}")
+    index = _order_rows(ws)
+
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Pre-filter by probe to avoid noisy 400s
+        probed = [s for s, ok in zip(candidates, pool.map(_probe_symbol, candidates)) if ok]
+        if not probed:
+            print("No probeable symbols. Check API permissions (Spot & Margin Trading) and IP whitelist.")
+            return
+
+        plan = {sym: _windows(start_ms, end_ms, step_days * DAY_MS, scope.get(sym, [])) for sym in probed}
+        total = sum(len(w) for w in plan.values())
+        print(f"[backfill] {len(probed)} symbols, {total} windows to fetch")
+
+        jobs = {}
+        for sym, wins in plan.items():
+            for a, b in wins:
+                jobs[pool.submit(_mytrades_window, sym, a, b - 1)] = ("window", sym, (a, b))
+        left = {sym: len(w) for sym, w in plan.items() if w}
+        trades = defaultdict(dict)     # symbol -> trade id -> trade (windows may overlap)
+        fetched = defaultdict(list)    # symbol -> windows fetched OK
+        n_windows = 0
+
+        def finish(sym: str, extra: list, details: dict):
+            for t in extra:
+                trades[sym][int(t["id"])] = t
+            buckets = defaultdict(list)
+            for t in sorted(trades.pop(sym, {}).values(), key=lambda t: int(t["id"])):
+                buckets[int(t["orderId"])].append(t)
+            for order_id, ts in buckets.items():
+                _append_or_update_order(ws, env_name, sym, _aggregate_order(ts), details.get(order_id), index)
+            if buckets:
+                _safe_save(wb, Path(xlsx))
+            scope[sym] = _merge_ranges(scope.get(sym, []) + fetched.pop(sym, []))
+            _save_checkpoint(ckpt_path, ckpt)
+            rate = n_windows / max(time.time() - t0, 1e-9)
+            print(f"[backfill] {sym}: {len(buckets)} orders | {n_windows}/{total} windows, {rate:.1f}/s, "
+                  f"weight {BUDGET.spent}")
+
+        pending = set(jobs)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                kind, sym, win = jobs.pop(f)
+                if kind == "orders":
+                    try:
+                        extra, details = f.result()
+                    except Exception as e:
+                        print(f"[order] {sym}: hydration failed → {e}")
+                        extra, details = [], {}
+                    finish(sym, extra, details)
+                    continue
+                n_windows += 1
+                try:
+                    for t in f.result():
+                        trades[sym][int(t["id"])] = t
+                    fetched[sym].append(win)
+                except Exception as e:
+                    print(f"[backfill] {sym} window {win}: {e} (not checkpointed)")
+                left[sym] -= 1
+                if left[sym]:
+                    continue
+                first = {}
+                for t in trades[sym].values():
+                    oid = int(t["orderId"])
+                    first[oid] = min(first.get(oid, t["time"]), t["time"])
+                # orders opening within a day after an already-checkpointed range may have earlier fills
+                edges = [b for a, b in scope.get(sym, [])]
+                resume = [oid for oid, t in first.items() if any(e <= t < e + DAY_MS for e in edges)]
+                if (hydrate_orders and first) or resume:
+                    h = pool.submit(_complete_symbol, sym, list(first), resume, hydrate_orders)
+                    jobs[h] = ("orders", sym, None)
+                    pending.add(h)
+                else:
+                    finish(sym, [], {})
+
+    print(f"[done] Backfill complete → {xlsx} ({n_windows} windows in {time.time() - t0:.1f}s, "
+          f"weight {BUDGET.spent}, throttled {BUDGET.waited:.1f}s)")
 
 def main():
     load_env()
@@ -339,6 +542,9 @@ def main():
     ap.add_argument("--symbols", default="", help="Comma-separated list like BTCUSDT,ETHUSDT,BNBUSDT.")
     ap.add_argument("--scan-exchange", action="store_true", help="Scan ALL TRADING pairs with the given quote (comprehensive, slower).")
     ap.add_argument("--no-hydrate-orders", action="store_true", help="Skip order detail hydration to reduce requests.")
+    ap.add_argument("--workers", type=int, default=8, help="Windows fetched in parallel (default 8).")
+    ap.add_argument("--weight-per-min", type=int, default=4800, help="Request-weight budget per minute (default 4800, 80%% of Binance's 6000).")
+    ap.add_argument("--refetch", action="store_true", help="Ignore logs/backfill_checkpoint.json and fetch every window again.")
     args = ap.parse_args()
 
     syms = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
@@ -349,7 +555,10 @@ def main():
         scan_exchange=args.scan_exchange,
         hydrate_orders=(not args.no_hydrate_orders),
         xlsx="logs/trades.xlsx",
-        step_days=7
+        step_days=7,
+        workers=args.workers,
+        weight_per_min=args.weight_per_min,
+        use_checkpoint=(not args.refetch),
     )
 
 if __name__ == "__main__":
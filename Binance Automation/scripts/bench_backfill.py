@@ -0,0 +1,279 @@
+# Trade backfill against a local fake exchange: sequential loop vs the concurrent scheduler.
+#
+#   python -m scripts.bench_backfill [--symbols 8] [--days 180] [--orders 60] [--latency-ms 40]
+#                                    [--limit 1000] [--interval 2]
+#
+# The fake exchange (ThreadingHTTPServer on 127.0.0.1) serves time, exchangeInfo, account,
+# myTrades, order and allOrders from a seeded fill history, sleeps --latency-ms per request
+# and counts REQUEST_WEIGHT in fixed windows of --interval seconds, answering 429 above
+# --limit (a scaled-down version of Binance's 6000/min, so the run stays short). The
+# scheduler gets 80% of that limit. Rows are checked against the fills' ground truth, then
+# a rerun after new fills must fetch only the new tail windows.
+import os, sys, json, time, random, argparse, tempfile, threading
+from pathlib import Path
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from openpyxl import load_workbook
+
+import scripts.backfill_trades as bt
+from scripts.rate_budget import WeightBudget, USED_WEIGHT_HEADER
+
+DAY_MS = 86_400_000
+
+
+class FakeExchange:
+    def __init__(self, symbols, days, orders, latency_ms, limit, interval, seed=3):
+        self.latency, self.limit, self.interval = latency_ms / 1000, limit, interval
+        self.rng = random.Random(seed)
+        self.trades = defaultdict(list)    # symbol -> fills, ascending id/time
+        self.orders = defaultdict(dict)    # symbol -> orderId -> order
+        self.next_trade, self.next_order = 1, 1
+        self.lock = threading.Lock()
+        self.used = defaultdict(int)       # window -> weight
+        self.calls = defaultdict(int)      # path -> count
+        self.rejected = 0
+        now = int(time.time() * 1000)
+        for sym in symbols:
+            for t in sorted(self.rng.randrange(now - days * DAY_MS + 3_600_000, now - DAY_MS) for _ in range(orders)):
+                self.add_order(sym, t)
+        # trade ids grow with time, as on the exchange (fromId paging relies on it)
+        for n, t in enumerate(sorted((t for fills in self.trades.values() for t in fills), key=lambda t: t["time"]), 1):
+            t["id"] = n
+
+    def add_order(self, sym, t0, max_gap_ms=3 * 3_600_000):
+        oid = self.next_order
+        self.next_order += 1
+        side_buy = self.rng.random() < 0.5
+        price = round(self.rng.uniform(1, 100), 4)
+        fills = self.rng.choice([1, 1, 2, 3, 5])
+        qty = 0.0
+        t = t0
+        for _ in range(fills):
+            q = round(self.rng.uniform(0.1, 5), 4)
+            qty += q
+            self.trades[sym].append({
+                "symbol": sym, "id": self.next_trade, "orderId": oid, "price": str(round(price * self.rng.uniform(0.999, 1.001), 4)),
+                "qty": str(q), "commission": str(round(q * 1e-3, 8)), "commissionAsset": self.rng.choice(["BNB", sym[:-4]]),
+                "time": t, "isBuyer": side_buy, "isMaker": self.rng.random() < 0.5,
+            })
+            self.next_trade += 1
+            t += self.rng.randrange(1, max_gap_ms)  # fills may straddle a window edge
+        self.trades[sym].sort(key=lambda x: x["time"])
+        self.orders[sym][oid] = {
+            "symbol": sym, "orderId": oid, "clientOrderId": f"cli{oid}", "price": str(price), "origQty": str(round(qty, 4)),
+            "status": "FILLED", "type": self.rng.choice(["LIMIT", "MARKET"]), "timeInForce": "GTC", "stopPrice": "0.0",
+            "side": "BUY" if side_buy else "SELL", "time": t0,
+        }
+
+    # ---------- HTTP ----------
+    def handle(self, path, q):
+        if path == "/api/v3/time":
+            return {"serverTime": int(time.time() * 1000)}
+        if path == "/api/v3/exchangeInfo":
+            return {"symbols": [{"symbol": s, "status": "TRADING"} for s in self.trades]}
+        if path == "/api/v3/account":
+            return {"balances": [{"asset": s[:-4], "free": "1", "locked": "0"} for s in self.trades]}
+        sym = q["symbol"]
+        if sym not in self.trades:
+            return 400, {"code": -1121, "msg": "Invalid symbol."}
+        limit = int(q.get("limit", 500))
+        if path == "/api/v3/myTrades":
+            rows = self.trades[sym]
+            if "orderId" in q:
+                return [t for t in rows if t["orderId"] == int(q["orderId"])]
+            if "fromId" in q:
+                return sorted((t for t in rows if t["id"] >= int(q["fromId"])), key=lambda t: t["id"])[:limit]
+            if "startTime" in q:
+                a, b = int(q["startTime"]), int(q.get("endTime", 2**62))
+                return [t for t in rows if a <= t["time"] <= b][:limit]
+            return rows[-limit:]
+        if path == "/api/v3/order":
+            o = self.orders[sym].get(int(q["orderId"]))
+            return o if o else (400, {"code": -2013, "msg": "Order does not exist."})
+        if path == "/api/v3/allOrders":
+            start = int(q.get("orderId", 0))
+            return [o for oid, o in sorted(self.orders[sym].items()) if oid >= start][:limit]
+        return 404, {"msg": "not found"}
+
+    def serve(self):
+        ex = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *a):
+                pass
+
+            def do_GET(self):
+                u = urlparse(self.path)
+                q = {k: v[0] for k, v in parse_qs(u.query).items()}
+                win = int(time.time() // ex.interval)
+                with ex.lock:
+                    ex.calls[u.path + ("?orderId" if "orderId" in q else "")] += 1
+                    ex.used[win] += 5 if "orderId" in q and u.path == "/api/v3/myTrades" else bt.WEIGHTS.get(u.path, 1)
+                    used = ex.used[win]
+                time.sleep(ex.latency)
+                if used > ex.limit:
+                    ex.rejected += 1
+                    body, code = {"code": -1003, "msg": "Too many requests"}, 429
+                    extra = {"Retry-After": str(int(ex.interval - time.time() % ex.interval) + 1)}
+                else:
+                    res = ex.handle(u.path, q)
+                    code, body = res if isinstance(res, tuple) else (200, res)
+                    extra = {}
+                data = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header(USED_WEIGHT_HEADER, str(used))
+                for k, v in extra.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def reset_stats(self):
+        with self.lock:
+            self.used.clear(); self.calls.clear(); self.rejected = 0
+
+
+# The backfill loop as it was before the scheduler (reference implementation)
+def legacy_backfill(days, symbols, xlsx, step_days=7):
+    bt._ensure_workbook(Path(xlsx))
+    bt._sync_time()
+    probed = [s for s in symbols if bt._probe_symbol(s)]
+    start_dt = datetime.now(timezone.utc) - timedelta(days=days)
+    end_dt = datetime.now(timezone.utc)
+    wb = load_workbook(xlsx)
+    ws = wb["Trades"]
+    windows = 0
+    for sym in probed:
+        s = start_dt
+        while s < end_dt:
+            e = min(s + timedelta(days=step_days), end_dt)
+            trades = bt._mytrades_page(sym, int(s.timestamp()*1000), int(e.timestamp()*1000))
+            windows += 1
+            if trades:
+                buckets = defaultdict(list)
+                for t in trades:
+                    buckets[int(t["orderId"])].append(t)
+                for order_id, ts in buckets.items():
+                    agg = bt._aggregate_order(ts)
+                    details = bt._hydrate_order(sym, order_id)
+                    bt._append_or_update_order(ws, "bench", sym, agg, details)
+            time.sleep(0.12)  # be nice to rate limits
+            s = e
+        bt._safe_save(wb, Path(xlsx))
+    return windows
+
+
+ROW_FIELDS = [h for h in bt.HEADERS if h not in ("DateUTC", "DateLocal", "Env")]
+
+
+def expected_rows(ex: FakeExchange) -> dict:
+    out = {}
+    for sym, fills in ex.trades.items():
+        by_order = defaultdict(list)
+        for t in fills:
+            by_order[t["orderId"]].append(t)
+        for oid, ts in by_order.items():
+            agg, o = bt._aggregate_order(sorted(ts, key=lambda t: t["id"])), ex.orders[sym][oid]
+            out[str(oid)] = {
+                "Symbol": sym, "Side": "BUY" if agg["isBuyer"] else "SELL", "OrderType": o["type"], "OrderId": str(oid),
+                "ClientOrderId": o["clientOrderId"], "OrigQty": o["origQty"], "FilledQty": agg["qty"],
+                "AvgFillPrice": agg["avgPrice"], "Fee": agg["feeTotal"], "FeeAsset": agg["feeAsset"], "Status": o["status"],
+                "Price": o["price"], "StopPrice": o["stopPrice"], "TimeInForce": o["timeInForce"], "IsMaker": agg["role"],
+            }
+    return out
+
+
+def sheet_rows(xlsx) -> dict:
+    ws = load_workbook(xlsx)["Trades"]
+    H = {h: i for i, h in enumerate(bt.HEADERS)}
+    return {str(r[H["OrderId"]]): {f: r[H[f]] for f in ROW_FIELDS} for r in ws.iter_rows(min_row=2, values_only=True)}
+
+
+def mismatches(ex, xlsx) -> int:
+    want, got = expected_rows(ex), sheet_rows(xlsx)
+    return sum(got.get(k) != v for k, v in want.items()) + len(set(got) - set(want))
+
+
+def stats(ex, secs, windows, label):
+    max_w = max(ex.used.values(), default=0)
+    calls = sum(ex.calls.values())
+    print(f"{label:<22} {windows:>8} {secs:>8.1f}s {windows / secs:>10.1f} {calls:>9} {max_w:>8} {ex.rejected:>5}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--symbols", type=int, default=8)
+    ap.add_argument("--days", type=int, default=180)
+    ap.add_argument("--orders", type=int, default=60, help="orders per symbol")
+    ap.add_argument("--latency-ms", type=float, default=40)
+    ap.add_argument("--limit", type=int, default=1000, help="exchange weight limit per interval")
+    ap.add_argument("--interval", type=float, default=2.0, help="weight window in seconds (Binance: 60)")
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--skip-legacy", action="store_true")
+    args = ap.parse_args()
+
+    symbols = [f"C{i:02d}USDT" for i in range(args.symbols)]
+    ex = FakeExchange(symbols, args.days, args.orders, args.latency_ms, args.limit, args.interval)
+    os.environ.update({"BINANCE_BASE_URL": ex.serve(), "BINANCE_API_KEY": "k", "BINANCE_API_SECRET": "s"})
+    budget = lambda: WeightBudget(int(args.limit * 0.8), args.interval)
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{args.symbols} symbols x {args.days} days, {args.orders} orders/symbol, {args.latency_ms:.0f} ms/request, "
+              f"limit {args.limit} weight per {args.interval:g}s")
+        print(f"{'':<22} {'windows':>8} {'wall':>9} {'windows/s':>10} {'requests':>9} {'max wt':>8} {'429s':>5}")
+        if not args.skip_legacy:
+            ex.reset_stats()
+            xlsx = Path(tmp, "legacy.xlsx")
+            t0 = time.time()
+            n = legacy_backfill(args.days, symbols, xlsx)
+            stats(ex, time.time() - t0, n, "sequential (before)")
+            legacy_bad = mismatches(ex, xlsx)
+
+        xlsx = Path(tmp, "logs", "trades.xlsx")
+        ex.reset_stats()
+        t0 = time.time()
+        bt.backfill(args.days, "USDT", symbols, False, True, xlsx=str(xlsx), workers=args.workers, budget=budget())
+        secs = time.time() - t0
+        cold = ex.calls["/api/v3/myTrades"] - args.symbols  # minus probes
+        stats(ex, secs, cold, "concurrent, cold")
+        bad = mismatches(ex, xlsx)
+        ok &= bad == 0 and ex.rejected == 0 and max(ex.used.values()) <= args.limit
+
+        # new fills land (one order filling across the checkpoint edge), then a rerun fetches
+        # only the tail windows
+        now = int(time.time() * 1000)
+        for sym in symbols[:3]:
+            ex.add_order(sym, now - 400, max_gap_ms=100)
+        with ex.lock:
+            fill = dict(ex.trades[symbols[0]][-1], id=ex.next_trade, time=now + 300, qty="1.5")
+            ex.next_trade += 1
+            ex.trades[symbols[0]].append(fill)
+        time.sleep(1)
+        ex.reset_stats()
+        t0 = time.time()
+        bt.backfill(args.days, "USDT", symbols, False, True, xlsx=str(xlsx), workers=args.workers, budget=budget())
+        rerun = ex.calls["/api/v3/myTrades"] - args.symbols
+        stats(ex, time.time() - t0, rerun, "concurrent, rerun")
+        rerun_bad = mismatches(ex, xlsx)
+        ok &= rerun_bad == 0 and rerun <= args.symbols
+
+    if not args.skip_legacy:
+        print(f"\nsequential rows wrong: {legacy_bad} (orders straddling a window keep only the last window's fills)")
+    print(f"concurrent rows wrong: {bad} cold, {rerun_bad} after rerun")
+    print("RESULT:", "PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# Per-fill latency of the Excel trade logger: workbook scan per fill vs the sidecar index.
+#
+#   python -m scripts.bench_excel_logger [--fills 100000] [--fixed-fills 10000] [--sizes 1000,10000] [--samples 3]
+#
+# 1. Unbuffered log_order_fill on books that already hold N rows, before (read-only scan for
+#    the OrderId, full load + save per fill) and after (index lookup, load + save per fill).
+# 2. --fills buffered fills into a fresh book with the shipped flush policy: per-fill latency
+#    including the automatic flushes (amortised mean after each tenth of the run, percentiles), and
+#    the same for --fixed-fills with a fixed FLUSH_EVERY batch (FLUSH_GROWTH = 0) to compare.
+# 3. Checks: every fill lands once, re-logging existing ids adds nothing, a row written by
+#    another script is seen, and a deleted workbook is regenerated from the index.
+import sys, time, random, argparse, tempfile
+from pathlib import Path
+from statistics import mean, median
+
+from openpyxl import Workbook, load_workbook
+
+import scripts.excel_logger as xl
+
+
+def make_resp(i: int, rng: random.Random) -> dict:
+    qty = round(rng.uniform(0.001, 2), 6)
+    return {
+        "symbol": rng.choice(["BTCUSDT", "ETHUSDT", "BNBUSDT"]), "orderId": 10_000_000 + i, "clientOrderId": f"bench{i}",
+        "side": rng.choice(["BUY", "SELL"]), "type": "MARKET", "status": "FILLED", "origQty": str(qty),
+        "executedQty": str(qty), "price": "0", "timeInForce": "GTC",
+        "fills": [{"price": str(round(rng.uniform(90, 110), 2)), "qty": str(qty),
+                   "commission": str(round(qty * 1e-3, 8)), "commissionAsset": "BNB"}],
+    }
+
+
+def make_book(path: Path, rows: int):
+    rng = random.Random(rows)
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Trades"
+    ws.append(xl.HEADERS)
+    for i in range(rows):
+        r = make_resp(i, rng)
+        ws.append(["2025-01-01T00:00:00+00:00", "2025-01-01 00:00:00", ".env", r["symbol"], r["side"], "MARKET",
+                   str(r["orderId"]), r["clientOrderId"], 1.0, 1.0, 100.0, 0.001, "BNB", "FILLED", 0.0, "", "GTC", ""])
+    wb.save(path)
+
+
+# log_order_fill as it was before the index (reference implementation, row building elided)
+def legacy_log(resp: dict, xlsx: Path):
+    xl._ensure_workbook(xlsx)
+    wb = load_workbook(xlsx, read_only=True, data_only=True)
+    idx = xl.HEADERS.index("OrderId")
+    for row in wb["Trades"].iter_rows(min_row=2, values_only=True):
+        if row[idx] is not None and str(row[idx]) == str(resp["orderId"]):
+            return
+    wb = load_workbook(xlsx)
+    wb["Trades"].append(["", "", "", resp["symbol"], resp["side"], resp["type"], str(resp["orderId"])])
+    wb.save(xlsx)
+
+
+def timed(fn, *a) -> float:
+    start = time.perf_counter()
+    fn(*a)
+    return time.perf_counter() - start
+
+
+def pct(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(len(xs) * p))]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fills", type=int, default=100_000)
+    ap.add_argument("--fixed-fills", type=int, default=10_000)
+    ap.add_argument("--sizes", default="1000,10000")
+    ap.add_argument("--samples", type=int, default=3)
+    args = ap.parse_args()
+    rng = random.Random(1)
+    ok = True
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        print(f"{'book rows':>9} | {'scan + load/save':>16} | {'index + load/save':>17}")
+        for n in map(int, args.sizes.split(",")):
+            old, new = tmp / f"old{n}.xlsx", tmp / f"new{n}.xlsx"
+            make_book(old, n)
+            make_book(new, n)
+            xl.log_order_fill(make_resp(n, rng), xlsx=str(new))  # first call imports the book into the index
+            before = [timed(legacy_log, make_resp(n + 1 + k, rng), old) for k in range(args.samples)]
+            after = [timed(xl.log_order_fill, make_resp(n + 1 + k, rng), None, str(new)) for k in range(args.samples)]
+            print(f"{n:>9} | {median(before) * 1000:>13.0f} ms | {median(after) * 1000:>14.0f} ms")
+
+        # buffered, automatic flushes included in the per-fill latency
+        growth = xl.FLUSH_GROWTH
+        for label, fills, xl.FLUSH_GROWTH in (("fixed batch", args.fixed_fills, 0.0), ("shipped", args.fills, growth)):
+            book = tmp / label.replace(" ", "_") / "trades.xlsx"
+            flushes = []
+            real_flush = xl.flush
+            xl.flush = lambda x="logs/trades.xlsx": flushes.append(timed(real_flush, x)) or 0
+            lat = [timed(xl.log_order_fill, make_resp(i, rng), None, str(book), True) for i in range(fills)]
+            xl.flush = real_flush
+            final_s = timed(xl.flush, str(book))
+            tenth = max(1, fills // 10)
+            so_far = " ".join(f"{mean(lat[:k]) * 1e6:.0f}" for k in range(tenth, fills + 1, tenth))
+            print(f"\nbuffered, {fills} fills, FLUSH_EVERY {xl.FLUSH_EVERY}, FLUSH_GROWTH {xl.FLUSH_GROWTH:g} ({label}): "
+                  f"amortised {sum(lat) / fills * 1e6:.0f} us/fill incl. {len(flushes)} flushes "
+                  f"({sum(flushes):.1f}s, longest {max(flushes, default=0):.1f}s); p50 {pct(lat, .5) * 1e6:.0f} us, "
+                  f"p99 {pct(lat, .99) * 1e6:.0f} us; final flush {final_s:.1f}s")
+            print(f"  amortised us/fill after each tenth of the run: {so_far}")
+        xl.FLUSH_GROWTH = growth
+
+        ids = [str(r[6]) for r in load_workbook(book, read_only=True)["Trades"].iter_rows(min_row=2, values_only=True)]
+        rows_ok = len(ids) == args.fills == len(set(ids))
+        for i in range(0, args.fills, max(1, args.fills // 1000)):
+            xl.log_order_fill(make_resp(i, rng), xlsx=str(book), buffered=True)
+        dupes_ok = xl.flush(str(book)) == 0
+
+        # another script appends a row; then the workbook disappears and is regenerated
+        wb = load_workbook(book)
+        wb["Trades"].append(["", "", "", "ETHUSDT", "BUY", "LIMIT", "999"])
+        wb.save(book)
+        seen_ok = xl._order_id_exists(book, "999")
+        book.unlink()
+        regen_s = timed(xl._order_id_exists, book, "1")
+        regen_ok = book.exists() and sum(1 for _ in load_workbook(book, read_only=True)["Trades"].iter_rows(min_row=2)) == args.fills + 1
+
+        print(f"every fill once: {rows_ok}; re-logged ids skipped: {dupes_ok}; external row seen: {seen_ok}; "
+              f"regenerated after delete: {regen_ok} ({regen_s:.1f}s)")
+        ok = rows_ok and dupes_ok and seen_ok and regen_ok
+        xl._atexit_books.clear()
+
+    print("RESULT:", "PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# Fee-aware PnL report against a kline fixture: HTTP-per-conversion vs the local price store.
+#
+#   python -m scripts.bench_price_store [--trades 2000] [--days 30] [--latency-ms 20]
+#
+# No Binance access: requests.get / Session.get are replaced by a fake API serving a seeded
+# 1m kline fixture (honours symbol/startTime/endTime/limit, sleeps --latency-ms per call).
+# Checks that closed/open/daily results match the previous _kl_close (one klines request
+# per minute bucket), then reports report wall time (cold store, warm rerun) and lookups/s.
+import sys, time, random, argparse, tempfile
+from pathlib import Path
+from datetime import datetime, timezone
+
+import numpy as np
+import requests
+from openpyxl import Workbook
+
+import scripts.pnl_feeaware_to_excel as pnl
+from scripts.price_store import PriceStore, MINUTE_MS
+
+START_MS = int(datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+FEE_ASSETS = {"BNB": 600.0, "ETH": 3300.0}
+
+
+def make_fixture(days: int, seed: int = 5):
+    """{SYMBOL: (open_time[], close[])} — seeded random walk, one candle per minute."""
+    rng = np.random.default_rng(seed)
+    t = START_MS + np.arange(days * 1440, dtype=np.int64) * MINUTE_MS
+    out = {}
+    for asset, p0 in FEE_ASSETS.items():
+        close = np.round(p0 * np.exp(np.cumsum(rng.normal(0, 0.0008, len(t)))), 2)
+        out[f"{asset}USDT"] = (t, close)
+    return out
+
+
+class FakeBinance:
+    def __init__(self, fixture, latency_ms: float):
+        self.fixture, self.latency = fixture, latency_ms / 1000
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None, **_):
+        self.calls += 1
+        time.sleep(self.latency)
+        sym = params["symbol"]
+        t, c = self.fixture[sym]
+        if url.endswith("/ticker/price"):
+            return _Resp({"symbol": sym, "price": str(c[-1])})
+        i = int(np.searchsorted(t, params["startTime"]))
+        j = min(int(np.searchsorted(t, params["endTime"], side="right")), i + int(params.get("limit", 500)))
+        return _Resp([[int(t[k]), "0", "0", "0", str(c[k]), "0", int(t[k]) + MINUTE_MS - 1] for k in range(i, j)])
+
+
+class _Resp:
+    def __init__(self, data): self.data = data
+    def raise_for_status(self): pass
+    def json(self): return self.data
+
+
+def make_ledger(path: Path, n: int, days: int, seed: int = 9):
+    rng = random.Random(seed)
+    wb = Workbook()
+    ws = wb.active
+    ws.title = pnl.TRADES_SHEET
+    ws.append(["DateUTC", "DateLocal", "Env", "Symbol", "Side", "OrderType", "OrderId", "ClientOrderId",
+               "OrigQty", "FilledQty", "AvgFillPrice", "Fee", "FeeAsset", "Status"])
+    # seconds 1..59: the candle containing ts, which is also what the minute-bucket cache returned
+    stamps = sorted(START_MS + rng.randrange(days * 1440 - 2) * MINUTE_MS + rng.randrange(1, 60) * 1000
+                    for _ in range(n))
+    for i, ts in enumerate(stamps):
+        sym = rng.choice(["BTCUSDT", "SOLUSDT", "XRPUSDT"])
+        side = "BUY" if rng.random() < 0.55 else "SELL"
+        qty = round(rng.uniform(0.01, 2.0), 4)
+        fee_asset = rng.choice(["BNB", "BNB", "BNB", "ETH", "USDT", ""])
+        fee = round(rng.uniform(1e-5, 1e-3), 8) if fee_asset else ""
+        dt = datetime.fromtimestamp(ts / 1000, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        ws.append([dt, dt, "fixture", sym, side, "MARKET", i, f"c{i}", qty, qty,
+                   round(rng.uniform(90, 110), 4), fee, fee_asset, "FILLED"])
+    wb.save(path)
+
+
+# _kl_close as it was before the price store: one klines request per conversion
+def legacy_kl_close(symbol: str, ts_ms: int):
+    try:
+        params = {"symbol": symbol, "interval": "1m", "startTime": ts_ms-60_000, "endTime": ts_ms+60_000, "limit": 1}
+        r = requests.get(f"{pnl.BASE}/api/v3/klines", params=params, timeout=10)
+        r.raise_for_status()
+        arr = r.json()
+        if arr:
+            return float(arr[0][4])
+    except: pass
+    return None
+
+
+def legacy_convert(asset: str, amt: float, ts_ms: int) -> float:
+    if not asset or amt == 0: return 0.0
+    if asset.upper() in ("USDT", "FDUSD", "BUSD"):
+        return amt
+    sym = f"{asset.upper()}USDT"
+    key = (sym, ts_ms//60_000)  # minute-bucket cache
+    if key not in legacy_cache:
+        legacy_cache[key] = legacy_kl_close(sym, ts_ms) or 0.0
+    px = legacy_cache[key]
+    return round(amt * px, 8) if px else 0.0
+
+legacy_cache = {}
+
+
+def run_report(book: Path, out: Path):
+    """load_ledger -> compute_feeaware_fifo -> write_sheets, as main() does; returns results and seconds."""
+    start = time.perf_counter()
+    rows, wb, _ = pnl.load_ledger(str(book))
+    result = pnl.compute_feeaware_fifo(rows)
+    pnl.write_sheets(wb, out, *result)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trades", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    fixture = make_fixture(args.days)
+    api = FakeBinance(fixture, args.latency_ms)
+    requests.get = api.get
+    requests.Session.get = lambda self, url, **kw: api.get(url, **kw)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        book = tmp / "trades.xlsx"
+        make_ledger(book, args.trades, args.days)
+
+        # previous behaviour
+        convert, prefetch = pnl.convert_fee_to_usdt, pnl.prefetch_fee_prices
+        pnl.convert_fee_to_usdt, pnl.prefetch_fee_prices = legacy_convert, lambda rows: None
+        api.calls = 0
+        legacy, legacy_s = run_report(book, tmp / "legacy.xlsx")
+        legacy_calls = api.calls
+        pnl.convert_fee_to_usdt, pnl.prefetch_fee_prices = convert, prefetch
+
+        # price store: cold (empty directory), then a warm rerun in a fresh "process"
+        runs = []
+        for label in ("store, cold", "store, warm"):
+            pnl._store = PriceStore(root=str(tmp / "klines"), base_url=pnl.BASE)
+            pnl._price_cache.clear()
+            api.calls = 0
+            result, secs = run_report(book, tmp / "store.xlsx")
+            runs.append((label, result, secs, api.calls))
+
+        parity = all(r[1] == legacy for r in runs)
+        print(f"\nledger: {args.trades} trades over {args.days} days, {args.latency_ms:.0f} ms per request")
+        print(f"parity (closed, open, daily vs per-request _kl_close): {'PASS' if parity else 'FAIL'}")
+        print(f"{'':<22} {'requests':>9} {'report wall':>12}")
+        print(f"{'HTTP per conversion':<22} {legacy_calls:>9} {legacy_s:>11.2f}s")
+        for label, _, secs, calls in runs:
+            print(f"{label:<22} {calls:>9} {secs:>11.2f}s")
+
+        store = pnl._store
+        store.fill_range("BNBUSDT", START_MS, START_MS + args.days * 86_400_000 - MINUTE_MS)
+        rng = np.random.default_rng(1)
+        qs = rng.integers(START_MS, START_MS + args.days * 86_400_000, 200_000).tolist()
+        start = time.perf_counter()
+        for ts in qs:
+            store.close_at("BNBUSDT", ts)
+        lps = len(qs) / (time.perf_counter() - start)
+        c = fixture["BNBUSDT"][1]
+        # first candle opening at or after ts-60s (the klines startTime semantics)
+        exact = all(store.close_at("BNBUSDT", ts) == c[-(-(ts - 60_000 - START_MS) // MINUTE_MS)]
+                    for ts in qs[:20_000] if ts >= START_MS + 60_000)
+        print(f"close_at: {lps:,.0f} lookups/s over {len(store.columns('BNBUSDT')[0])} stored candles, "
+              f"{'exact' if exact else 'MISMATCH'} vs fixture")
+
+    ok = parity and exact and runs[-1][3] == 0
+    print("RESULT:", "PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
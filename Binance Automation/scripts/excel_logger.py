@@ -1,6 +1,6 @@
 ﻿from __future__ import annotations
 
-import os
+import os, json, atexit, sqlite3
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import Any, Dict
@@ -29,29 +29,146 @@ def _ensure_workbook(xlsx_path: Path) -> None:
             ws.freeze_panes = "A2"
             wb.save(xlsx_path)
 
+# ---------- sidecar index ----------
+# <book>.index.sqlite mirrors the Trades sheet (one row per sheet row, plus buffered rows not
+# yet written). OrderId lookups hit the index instead of scanning the workbook. The xlsx
+# stat (mtime, size) seen after our last save is kept; when another script has written the
+# workbook since, the index re-reads the Trades sheet once. If the workbook goes missing it
+# is regenerated from the index.
+# Buffered rows are written once there are FLUSH_EVERY of them and at least FLUSH_GROWTH times
+# the rows already in the book: a flush loads and re-saves the whole workbook, so batches grow
+# with the book and the amortised cost per fill stays flat instead of growing with history.
+FLUSH_EVERY = 500
+FLUSH_GROWTH = 0.25
+
+_conns: Dict[str, sqlite3.Connection] = {}
+_book_rows: Dict[str, int] = {}   # rows in the workbook per index, counted lazily
+_atexit_books: set = set()
+
+def _index_path(xlsx_path: Path) -> Path:
+    return xlsx_path.with_name(xlsx_path.stem + ".index.sqlite")
+
+def _stamp(xlsx_path: Path) -> str:
+    st = xlsx_path.stat()
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+def _index(xlsx_path: Path) -> sqlite3.Connection:
+    key = str(xlsx_path.resolve())
+    conn = _conns.get(key)
+    if conn is None:
+        xlsx_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(_index_path(xlsx_path))
+        conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS rows (seq INTEGER PRIMARY KEY, order_id TEXT, row TEXT NOT NULL,
+                                             pending INTEGER NOT NULL DEFAULT 0);
+            CREATE INDEX IF NOT EXISTS rows_order ON rows(order_id);
+            CREATE INDEX IF NOT EXISTS rows_pending ON rows(pending) WHERE pending=1;
+            CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT);
+        """)
+        _conns[key] = conn
+    return conn
+
+def _set_stamp(conn: sqlite3.Connection, xlsx_path: Path):
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('stamp', ?)", (_stamp(xlsx_path),))
+    _book_rows.pop(str(xlsx_path.resolve()), None)
+
+def _written_rows(xlsx_path: Path, conn: sqlite3.Connection) -> int:
+    key = str(xlsx_path.resolve())
+    if key not in _book_rows:
+        _book_rows[key] = conn.execute("SELECT COUNT(*) FROM rows WHERE pending=0").fetchone()[0]
+    return _book_rows[key]
+
+def _sync_index(xlsx_path: Path) -> sqlite3.Connection:
+    """Index for the workbook, re-read from the Trades sheet if someone else wrote it."""
+    conn = _index(xlsx_path)
+    if not xlsx_path.exists() and conn.execute("SELECT 1 FROM rows LIMIT 1").fetchone():
+        rebuild_workbook(str(xlsx_path))
+        return conn
+    got = conn.execute("SELECT v FROM meta WHERE k='stamp'").fetchone()
+    if got and xlsx_path.exists() and got[0] == _stamp(xlsx_path):
+        return conn
+    _ensure_workbook(xlsx_path)
+    wb = load_workbook(xlsx_path, read_only=True, data_only=True)
+    idx = HEADERS.index("OrderId")
+    with conn:
+        conn.execute("DELETE FROM rows WHERE pending=0")
+        conn.executemany("INSERT INTO rows (order_id, row) VALUES (?, ?)",
+                         ((str(r[idx]) if len(r) > idx and r[idx] is not None else "", json.dumps(list(r), default=str))
+                          for r in wb["Trades"].iter_rows(min_row=2, values_only=True) if any(v is not None for v in r)))
+        _set_stamp(conn, xlsx_path)
+    wb.close()
+    return conn
+
 def _order_id_exists(xlsx_path: Path, order_id: str) -> bool:
-    if not xlsx_path.exists():
+    if not xlsx_path.exists() and not _index_path(xlsx_path).exists():
         return False
-    wb = load_workbook(xlsx_path, read_only=True, data_only=True)
+    conn = _sync_index(xlsx_path)
+    return conn.execute("SELECT 1 FROM rows WHERE order_id=? LIMIT 1", (str(order_id),)).fetchone() is not None
+
+def flush(xlsx: str = "logs/trades.xlsx") -> int:
+    """Append buffered rows to the workbook in one load/save. Returns the number written.
+    Rows stay buffered if the save fails (e.g. the workbook is open in Excel)."""
+    xlsx_path = Path(xlsx)
+    conn = _sync_index(xlsx_path)
+    pending = conn.execute("SELECT seq, row FROM rows WHERE pending=1 ORDER BY seq").fetchall()
+    if not pending:
+        return 0
+    wb = load_workbook(xlsx_path)
     ws = wb["Trades"]
-    idx = HEADERS.index("OrderId")
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        cell = row[idx]
-        if cell is not None and str(cell) == str(order_id):
-            return True
-    return False
+    for _, row in pending:
+        ws.append(json.loads(row))
+    wb.save(xlsx_path)
+    with conn:
+        conn.execute("UPDATE rows SET pending=0 WHERE pending=1 AND seq<=?", (pending[-1][0],))
+        _set_stamp(conn, xlsx_path)
+    return len(pending)
 
-def log_order_fill(resp: Dict[str, Any], env: str = None, xlsx: str = "logs/trades.xlsx") -> str:
+def rebuild_workbook(xlsx: str = "logs/trades.xlsx") -> str:
+    """Rewrite the Trades sheet from the index (buffered rows included); other sheets are kept."""
+    xlsx_path = Path(xlsx)
+    conn = _index(xlsx_path)
+    if xlsx_path.exists():
+        wb = load_workbook(xlsx_path)
+        at = wb.sheetnames.index("Trades") if "Trades" in wb.sheetnames else 0
+        if "Trades" in wb.sheetnames:
+            wb.remove(wb["Trades"])
+        ws = wb.create_sheet("Trades", at)
+    else:
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Trades"
+    ws.append(HEADERS)
+    ws.freeze_panes = "A2"
+    for (row,) in conn.execute("SELECT row FROM rows ORDER BY pending, seq"):
+        ws.append(json.loads(row))
+    wb.save(xlsx_path)
+    with conn:
+        conn.execute("UPDATE rows SET pending=0")
+        _set_stamp(conn, xlsx_path)
+    return str(xlsx_path)
+
+def _flush_at_exit():
+    for xlsx in list(_atexit_books):
+        try:
+            flush(xlsx)
+        except Exception as e:
+            print(f"[excel] buffered rows not written to {xlsx} ({e}); they are kept in the index")
+
+def log_order_fill(resp: Dict[str, Any], env: str = None, xlsx: str = "logs/trades.xlsx", buffered: bool = False) -> str:
     """
     Append an order response to Excel.
-    - Idempotent by OrderId.
+    - Idempotent by OrderId (checked against the sidecar index).
     - If 'fills' missing, computes AvgFillPrice from cummulativeQuoteQty / executedQty when available.
+    - buffered=True only records the row in the index; rows reach the workbook in batches
+      (FLUSH_EVERY, growing with the book by FLUSH_GROWTH), on flush(), or at interpreter exit.
     """
     xlsx_path = Path(xlsx)
-    _ensure_workbook(xlsx_path)
+    conn = _sync_index(xlsx_path)
 
     order_id = resp.get("orderId")
-    if order_id and _order_id_exists(xlsx_path, order_id):
+    if order_id and conn.execute("SELECT 1 FROM rows WHERE order_id=? LIMIT 1", (str(order_id),)).fetchone():
         return str(xlsx_path)
 
     now_utc = datetime.now(timezone.utc).isoformat()
@@ -109,8 +226,6 @@ def log_order_fill(resp: Dict[str, Any], env: str = None, xlsx: str = "logs/trad
         if filled_qty and filled_qty > 0 and cum_quote > 0:
             avg_price = round(cum_quote / filled_qty, 8)
 
-    wb = load_workbook(xlsx_path)
-    ws = wb["Trades"]
     row = [
         now_utc,
         now_local,
@@ -131,6 +246,18 @@ def log_order_fill(resp: Dict[str, Any], env: str = None, xlsx: str = "logs/trad
         tif,
         ""  # IsMaker (not on order response; available via myTrades)
     ]
-    ws.append(row)
-    wb.save(xlsx_path)
+    with conn:
+        seq = conn.execute("INSERT INTO rows (order_id, row, pending) VALUES (?, ?, 1)",
+                           (str(order_id or ""), json.dumps(row))).lastrowid
+    if not buffered:
+        flush(xlsx)
+        return str(xlsx_path)
+    if not _atexit_books:
+        atexit.register(_flush_at_exit)
+    _atexit_books.add(xlsx)
+    oldest = conn.execute("SELECT MIN(seq) FROM rows WHERE pending=1").fetchone()[0]
+    if oldest is not None:
+        pending = seq - oldest + 1
+        if pending >= FLUSH_EVERY and pending >= FLUSH_GROWTH * _written_rows(xlsx_path, conn):
+            flush(xlsx)
     return str(xlsx_path)
@@ -7,6 +7,8 @@ from typing import Dict, List, Any
 import requests
 from openpyxl import load_workbook
 
+from scripts.price_store import PriceStore
+
 TRADES_SHEET = "Trades"
 CLOSED_SHEET = "ClosedTrades"
 OPEN_SHEET   = "OpenPositions"
@@ -32,15 +34,14 @@ def _parse_dt(x):
 # --- price converters (at trade time) ---
 BASE = "https://api.binance.com"
 def _kl_close(symbol: str, ts_ms: int):
-    # 1m candle around the timestamp
-    try:
-        params = {"symbol": symbol, "interval": "1m", "startTime": ts_ms-60_000, "endTime": ts_ms+60_000, "limit": 1}
-        r = requests.get(f"{BASE}/api/v3/klines", params=params, timeout=10)
-        r.raise_for_status()
-        arr = r.json()
-        if arr:
-            return float(arr[0][4])  # close
-    except: pass
+    # 1m candle around the timestamp, from the local price store (fetched once, kept on disk)
+    store = price_store()
+    px = store.close_at(symbol, ts_ms)
+    if px is None:
+        store.ensure(symbol, [ts_ms])
+        px = store.close_at(symbol, ts_ms)
+    if px is not None:
+        return px
     # fallback: spot now
     try:
         r2 = requests.get(f"{BASE}/api/v3/ticker/price", params={"symbol": symbol}, timeout=10)
@@ -48,20 +49,45 @@ def _kl_close(symbol: str, ts_ms: int):
         return float(r2.json()["price"])
     except: return None
 
+_store: PriceStore | None = None
 _price_cache: Dict[tuple, float] = {}
 
+def price_store() -> PriceStore:
+    global _store
+    if _store is None:
+        _store = PriceStore(base_url=BASE)
+    return _store
+
+def _fee_symbol(asset: str) -> str | None:
+    if not asset or asset.upper() in ("USDT", "FDUSD", "BUSD"):
+        return None
+    return f"{asset.upper()}USDT"
+
 def convert_fee_to_usdt(asset: str, amt: float, ts_ms: int) -> float:
     if not asset or amt == 0: return 0.0
-    if asset.upper() in ("USDT", "FDUSD", "BUSD"):
+    sym = _fee_symbol(asset)
+    if sym is None:
         return amt
-    sym = f"{asset.upper()}USDT"
-    key = (sym, ts_ms//60_000)  # minute-bucket cache
+    key = (sym, ts_ms)
     if key not in _price_cache:
         px = _kl_close(sym, ts_ms)
         _price_cache[key] = px or 0.0
     px = _price_cache[key]
     return round(amt * px, 8) if px else 0.0
 
+def prefetch_fee_prices(rows: List[Dict[str, Any]]):
+    """Fill the price store for every fee conversion up front (grouped klines requests per symbol)."""
+    need: Dict[str, List[int]] = {}
+    for row in rows:
+        sym = _fee_symbol((row.get("FeeAsset") or "").strip())
+        if sym and _to_f(row.get("Fee")) != 0 and str(row["Symbol"] or "").upper().endswith("USDT"):
+            dt = _parse_dt(row["DateUTC"]) or _parse_dt(row["DateLocal"])
+            if dt:
+                need.setdefault(sym, []).append(int(dt.replace(tzinfo=timezone.utc).timestamp()*1000))
+    store = price_store()
+    for sym, ts_list in need.items():
+        store.ensure(sym, ts_list)
+
 def _safe_save(wb, path: Path):
     import time
     for _ in range(10):
@@ -108,6 +134,7 @@ def compute_feeaware_fifo(rows: List[Dict[str, Any]]):
     """
     Realized P&L in USDT using FIFO, subtracting fees on both legs (converted to USDT at trade time).
     """
+    prefetch_fee_prices(rows)
     open_lots: Dict[str, List[Dict[str,float]]] = {}
     closed = []
     for row in rows:
@@ -0,0 +1,199 @@
+from __future__ import annotations
+# Local 1m close store (per symbol, columnar .npy files, memory-mapped).
+#
+#   data/klines/<host>/<SYMBOL>/open_time.npy   int64   candle open time (ms), sorted
+#                               close.npy       float64 close
+#                               coverage.npy    int64   (n, 2) open-time ranges already fetched
+#
+# Lookups are a binary search (np.searchsorted) over the mapped open_time column.
+# Missing ranges are fetched in bulk (<=1000 candles per klines request) and merged in.
+# Files are rewritten atomically; the host directory keeps testnet and mainnet apart.
+#
+#   python -m scripts.price_store BNBUSDT 2025-01-01 2025-01-31    # backfill a range
+import os, sys, time
+from pathlib import Path
+from urllib.parse import urlparse
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import requests
+
+BASE = "https://api.binance.com"
+STORE_ROOT = os.getenv("PRICE_STORE_DIR", "data/klines")
+MINUTE_MS = 60_000
+PAGE = 1000          # klines per request (Binance max)
+WINDOW_MS = 60_000   # a lookup at ts uses the first candle opening in [ts-60s, ts+60s]
+
+Fetch = Callable[[str, int, int, int], list]
+
+
+def http_klines(base_url: str = BASE, session: Optional[requests.Session] = None) -> Fetch:
+    s = session or requests.Session()
+    def fetch(symbol: str, start_ms: int, end_ms: int, limit: int = PAGE) -> list:
+        params = {"symbol": symbol, "interval": "1m", "startTime": start_ms, "endTime": end_ms, "limit": limit}
+        r = s.get(f"{base_url}/api/v3/klines", params=params, timeout=10)
+        r.raise_for_status()
+        return r.json()
+    return fetch
+
+
+def _merge(ranges: Iterable[Tuple[int, int]], gap: int = MINUTE_MS) -> List[Tuple[int, int]]:
+    out: List[List[int]] = []
+    for a, b in sorted(ranges):
+        if out and a <= out[-1][1] + gap:
+            out[-1][1] = max(out[-1][1], b)
+        else:
+            out.append([a, b])
+    return [(a, b) for a, b in out]
+
+
+def _subtract(ranges: List[Tuple[int, int]], covered: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Parts of `ranges` (minute-aligned, inclusive) not inside `covered`."""
+    out = []
+    for a, b in ranges:
+        cur = a
+        for c, d in covered:
+            if d < cur or c > b:
+                continue
+            if c > cur:
+                out.append((cur, c - MINUTE_MS))
+            cur = max(cur, d + MINUTE_MS)
+            if cur > b:
+                break
+        if cur <= b:
+            out.append((cur, b))
+    return out
+
+
+class PriceStore:
+    def __init__(self, root: str = STORE_ROOT, base_url: str = BASE, fetch: Optional[Fetch] = None):
+        self.base_url = base_url.rstrip("/")
+        self.dir = Path(root) / (urlparse(self.base_url).hostname or "local")
+        self.fetch = fetch or http_klines(self.base_url)
+        self._cols: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.requests = 0   # klines calls made by this instance
+        self.lookups = 0
+        self.unavailable = set()  # symbols whose klines requests failed (not retried by this instance)
+
+    # ---------- storage ----------
+    def _sym_dir(self, symbol: str) -> Path:
+        return self.dir / symbol.upper()
+
+    def columns(self, symbol: str) -> Tuple[np.ndarray, np.ndarray]:
+        symbol = symbol.upper()
+        if symbol not in self._cols:
+            d = self._sym_dir(symbol)
+            if (d / "open_time.npy").exists():
+                self._cols[symbol] = (np.load(d / "open_time.npy", mmap_mode="r"),
+                                      np.load(d / "close.npy", mmap_mode="r"))
+            else:
+                self._cols[symbol] = (np.empty(0, np.int64), np.empty(0, np.float64))
+        return self._cols[symbol]
+
+    def coverage(self, symbol: str) -> List[Tuple[int, int]]:
+        p = self._sym_dir(symbol) / "coverage.npy"
+        if not p.exists():
+            return []
+        return [(int(a), int(b)) for a, b in np.load(p)]
+
+    def _save(self, d: Path, name: str, arr: np.ndarray):
+        tmp = d / f"{name}.tmp.npy"
+        np.save(tmp, arr)
+        os.replace(tmp, d / f"{name}.npy")
+
+    def add_klines(self, symbol: str, rows: list, covered: Iterable[Tuple[int, int]] = ()):
+        """Merge raw klines rows ([openTime, o, h, l, close, ...]) and mark `covered` ranges as fetched."""
+        symbol = symbol.upper()
+        now_ms = int(time.time() * 1000)
+        rows = [r for r in rows if int(r[6]) < now_ms]  # closed candles only
+        old_t, old_c = self.columns(symbol)
+        new_t = np.array([int(r[0]) for r in rows], dtype=np.int64)
+        new_c = np.array([float(r[4]) for r in rows], dtype=np.float64)
+        t = np.concatenate([new_t, np.asarray(old_t)])
+        c = np.concatenate([new_c, np.asarray(old_c)])
+        t, first = np.unique(t, return_index=True)  # sorted; fresh rows win on duplicates
+        c = c[first]
+
+        last_closed = (now_ms // MINUTE_MS - 1) * MINUTE_MS
+        cov = _merge(self.coverage(symbol) +
+                     [(a, min(b, last_closed)) for a, b in covered if a <= min(b, last_closed)])
+
+        d = self._sym_dir(symbol)
+        d.mkdir(parents=True, exist_ok=True)
+        self._cols.pop(symbol, None)  # drop the old maps first (Windows cannot replace a mapped file)
+        self._save(d, "open_time", t)
+        self._save(d, "close", c)
+        self._save(d, "coverage", np.array(cov, dtype=np.int64).reshape(-1, 2))
+
+    # ---------- gap filling ----------
+    def fill_range(self, symbol: str, start_ms: int, end_ms: int):
+        """Fetch every missing candle in [start_ms, end_ms] (paged, <=1000 per request)."""
+        a = start_ms - start_ms % MINUTE_MS
+        b = end_ms - end_ms % MINUTE_MS
+        self._fill(symbol.upper(), _subtract([(a, b)], self.coverage(symbol)))
+
+    def ensure(self, symbol: str, ts_list: Iterable[int]):
+        """Make close_at() answerable locally for every ts: one pass, grouped klines requests."""
+        symbol = symbol.upper()
+        windows = []
+        for ts in ts_list:
+            lo = ts - WINDOW_MS
+            lo += (-lo) % MINUTE_MS  # first minute boundary >= ts-60s
+            windows.append((lo, ts + WINDOW_MS - (ts + WINDOW_MS) % MINUTE_MS))
+        missing = _subtract(_merge(windows), self.coverage(symbol))
+        # Group nearby gaps so one request (<=1000 candles) serves several of them
+        groups: List[Tuple[int, int]] = []
+        for a, b in missing:
+            if groups and b - groups[-1][0] < PAGE * MINUTE_MS:
+                groups[-1] = (groups[-1][0], b)
+            else:
+                groups.append((a, b))
+        self._fill(symbol, groups)
+
+    def _fill(self, symbol: str, ranges: List[Tuple[int, int]]):
+        if symbol in self.unavailable:
+            return
+        rows, covered = [], []
+        for a, b in ranges:
+            cur = a
+            try:
+                while cur <= b:
+                    page = self.fetch(symbol, cur, b, PAGE)
+                    self.requests += 1
+                    rows.extend(page)
+                    if len(page) < PAGE:
+                        break
+                    cur = int(page[-1][0]) + MINUTE_MS
+            except Exception as e:
+                print(f"[prices] {symbol} klines failed, using fallback prices this run: {e}")
+                self.unavailable.add(symbol)
+                break
+            covered.append((a, b))
+        if rows or covered:
+            self.add_klines(symbol, rows, covered)
+
+    # ---------- lookups ----------
+    def close_at(self, symbol: str, ts_ms: int) -> Optional[float]:
+        """Close of the first 1m candle opening in [ts-60s, ts+60s] (what a klines limit=1 call returns)."""
+        self.lookups += 1
+        t, c = self.columns(symbol)
+        i = int(np.searchsorted(t, ts_ms - WINDOW_MS, side="left"))
+        if i < len(t) and t[i] <= ts_ms + WINDOW_MS:
+            return float(c[i])
+        return None
+
+
+def _parse_day(s: str) -> int:
+    return int(datetime.strptime(s, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("usage: python -m scripts.price_store SYMBOL YYYY-MM-DD YYYY-MM-DD"); sys.exit(2)
+    sym, start, end = sys.argv[1].upper(), _parse_day(sys.argv[2]), _parse_day(sys.argv[3]) + 86_400_000 - MINUTE_MS
+    store = PriceStore()
+    t0 = time.time()
+    store.fill_range(sym, start, end)
+    t, _ = store.columns(sym)
+    print({"symbol": sym, "candles": len(t), "requests": store.requests, "sec": round(time.time() - t0, 2), "dir": str(store.dir)})
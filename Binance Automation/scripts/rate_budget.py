@@ -0,0 +1,56 @@
+from __future__ import annotations
+# Request-weight budget shared by the threads of one process (token bucket).
+#
+# Binance counts REQUEST_WEIGHT per IP in fixed windows (1 minute). A bucket holding at most
+# `burst` tokens and refilling (limit - burst) per interval can never spend more than `limit`
+# inside any window, whatever the phase. Responses carry X-MBX-USED-WEIGHT-1M; when the
+# exchange reports more than this bucket can spend (another process on the same IP),
+# everyone waits for the next window. Keep `limit` below the exchange limit for headroom.
+# 418/429 pause all threads for Retry-After seconds.
+import time, threading
+
+USED_WEIGHT_HEADER = "X-MBX-USED-WEIGHT-1M"
+
+
+class WeightBudget:
+    def __init__(self, limit: int = 4800, interval_s: float = 60.0, burst_frac: float = 0.1):
+        self.limit = limit
+        self.interval = interval_s
+        self.burst = max(1.0, limit * burst_frac)
+        self.rate = (limit - self.burst) / interval_s   # tokens per second
+        self.tokens = self.burst
+        self.stamp = time.monotonic()
+        self.paused_until = 0.0
+        self.spent = 0        # weight acquired so far
+        self.waited = 0.0     # seconds threads spent blocked
+        self._lock = threading.Lock()
+
+    def acquire(self, weight: int = 1):
+        need = min(float(weight), self.burst)
+        t0 = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.tokens >= need:
+                    self.tokens -= weight
+                    self.spent += weight
+                    self.waited += now - t0
+                    return
+                else:
+                    wait = (need - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def observe(self, headers):
+        """Sync with the exchange's own count for the current window."""
+        used = headers.get(USED_WEIGHT_HEADER)
+        if used and int(used) > self.limit:
+            self.pause(self.interval - time.time() % self.interval)
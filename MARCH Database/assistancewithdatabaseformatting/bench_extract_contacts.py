@@ -0,0 +1,218 @@
+# bench_extract_contacts.py
+# Rows/second of extract_contacts_all_sheets on a synthetic 50-sheet workbook, before
+# (eager read_all_sheets + iterrows/per-cell regex + drop_duplicates dedupe) and after
+# (streamed sheets, column-wise regex, hashed dedupe; in-process and with a process per sheet),
+# and a check that both produce the same contacts.
+#
+#   python bench_extract_contacts.py [--sheets 50] [--rows 2000] [--workers 4]
+import argparse, os, pathlib, random, sys, tempfile, time
+import pandas as pd
+from openpyxl import Workbook
+
+import extract_contacts_all_sheets as ex
+
+HEADERS = {
+    "business_name": ["Company", "Raison sociale", "Business Name", "ENTREPRISE", "Organisation"],
+    "email": ["Email", "E-mail", "Courriel", "Adresse email"],
+    "phone": ["Phone", "Tel", "Téléphone", "Mobile", "Contact Number"],
+    "address": ["Address", "Adresse", "Location"],
+    "name": ["Contact Person", "Nom", "Responsable"],
+    "title": ["Title", "Fonction", "Position"],
+    "website": ["Website", "Site web", "URL"],
+    "sector": ["Sector", "Secteur", "Industry"],
+}
+JUNK = ["Notes", "Remarks", "Fax", "Date added", "Ref"]
+WORDS = ["ocean", "island", "royal", "port", "sugar", "lagoon", "coral", "tropic", "indigo", "summit",
+         "vanilla", "harbour", "phoenix", "moka", "flacq", "grand", "baie", "curepipe", "rose", "hill"]
+KINDS = ["Ltd", "Co. Ltd", "Trading", "Services", "Holdings", "& Sons", "Group"]
+SECTORS = ["Hotels", "Construction", "Finance", "Retail", "ICT", "Textile", "Logistics", "Agro"]
+
+
+def company(rng):
+    name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {rng.choice(KINDS)}"
+    dom = name.split()[0].lower() + name.split()[1].lower() + ".mu"
+    return {"business_name": name, "domain": dom, "sector": rng.choice(SECTORS),
+            "phone": f"5{rng.randrange(10**7):07d}", "land": f"2{rng.randrange(10**6):06d}"}
+
+
+def cell(rng, key, c):
+    r = rng.random()
+    if r < 0.08:
+        return None
+    if key == "business_name":
+        return c["business_name"] if r > 0.2 else "  " + c["business_name"].upper() + " "
+    if key == "email":
+        e = f"{rng.choice(['info', 'sales', 'contact'])}@{c['domain']}"
+        return e if r > 0.3 else f"{e}; ADMIN@{c['domain'].upper()} / hr@{c['domain']}"
+    if key == "phone":
+        if r < 0.3:
+            return int(c["phone"])
+        if r < 0.6:
+            return f"+230 {c['phone'][:4]} {c['phone'][4:]}"
+        return f"{c['land'][:3]}-{c['land'][3:]} / {c['phone']}"
+    if key == "address":
+        return f"{rng.randint(1, 200)}, {rng.choice(WORDS).title()} Street,\n{rng.choice(WORDS).title()}"
+    if key == "name":
+        return f"Mr. {rng.choice(WORDS).title()} {rng.choice(WORDS).title()}"
+    if key == "title":
+        return rng.choice(["Director", "Manager", "HR Officer", "CEO", ""])
+    if key == "website":
+        return rng.choice([f"www.{c['domain']}", f"https://{c['domain']}/contact", f"http://WWW.{c['domain'].upper()}"])
+    if key == "sector":
+        return c["sector"]
+    # junk columns: free text that may still hold contacts
+    return rng.choice([None, "called twice", f"see www.{c['domain']}, tel {c['land']}", f"mail {c['business_name']}",
+                       "2024-03-01", f"ref {rng.randrange(10**5)}"])
+
+
+def make_book(path, sheets, rows, seed=7):
+    rng = random.Random(seed)
+    pool = [company(rng) for _ in range(max(50, sheets * rows // 3))]   # shared pool -> cross-sheet duplicates
+    wb = Workbook(write_only=True)
+    for s in range(sheets):
+        ws = wb.create_sheet(f"Sheet {s + 1}")
+        keys = rng.sample(list(HEADERS), rng.randint(4, len(HEADERS)))
+        if rng.random() < 0.3:
+            keys.append("phone")                                         # duplicate header -> coalesce
+        cols = [(k, rng.choice(HEADERS[k])) for k in keys] + [("junk", j) for j in rng.sample(JUNK, 2)]
+        rng.shuffle(cols)
+        for _ in range(rng.randint(0, 3)):
+            ws.append([f"Directory {s + 1}"] if rng.random() < 0.5 else [])
+        ws.append([h for _, h in cols])
+        for _ in range(rows):
+            if rng.random() < 0.03:
+                ws.append([])
+                continue
+            c = rng.choice(pool)
+            ws.append([cell(rng, k, c) for k, _ in cols])
+    wb.save(path)
+
+
+# ---- reference implementation (the script before the columnar path) ----
+def legacy_find_header_row(df, lookahead=25):
+    best_i, best = -1, -1
+    for i in range(min(len(df), lookahead)):
+        row = [str(x) for x in df.iloc[i].tolist()]
+        score = 0
+        for x in row:
+            sx = ex.slug(x)
+            for syns in ex.SYN_MAP.values():
+                if sx in {ex.slug(t) for t in syns}: score += 1; break
+        if score > best: best, best_i = score, i
+    return best_i
+
+
+def legacy_harvest_from_row(row, cols_all):
+    def val(k): return row[k] if k in row and pd.notna(row[k]) else ""
+    out = {col: ex.norm_space(val(key)) for col, key in ex.FIELD_COLS.items()}
+    blob = " ; ".join([str(row[c]) for c in cols_all if c in row and pd.notna(row[c])])
+    emails = set(e.lower() for e in ex.EMAIL_RE.findall(blob))
+    if out["Email"]:
+        emails.update(x.strip().lower() for x in out["Email"].split(";") if x.strip())
+    out["Email"] = "; ".join(sorted(emails))
+    phones = set()
+    for p in [x for x in ex.PHONE_RE.findall(blob) if isinstance(x, str)] + out["Phone number"].split(";"):
+        p = ex.clean_phone(p)
+        if p: phones.add(p)
+    out["Phone number"] = "; ".join(sorted(phones))
+    urls = set()
+    for u in ex.URL_RE.findall(blob):
+        u = u[0] if isinstance(u, tuple) else u
+        u = u.strip().rstrip(').,;')
+        if not u.lower().startswith(("http://", "https://")): u = "http://" + u
+        urls.add(u.lower())
+    if out["Website"]: urls.add(out["Website"].lower())
+    out["Website"] = "; ".join(sorted(urls))
+    return out
+
+
+def legacy_normalize_sheet(raw, source_file):
+    if raw is None or raw.empty: return None
+    h = legacy_find_header_row(raw)
+    if h < 0: return None
+    headers = raw.iloc[h].tolist()
+    data = raw.iloc[h + 1:].reset_index(drop=True)
+    data.columns = ex.map_headers(headers)
+    data = ex.coalesce_duplicate_columns(data)
+    data = ex.make_unique_columns(data)
+    data = data.dropna(axis=1, how="all")
+    for c in data.columns:
+        if data[c].dtype == "object":
+            data[c] = data[c].astype(str).str.strip().replace({"": pd.NA})
+    cols_all = list(data.columns)
+    rows = []
+    for _, r in data.iterrows():
+        if all(pd.isna(x) or str(x).strip() == "" for x in r.tolist()): continue
+        rec = legacy_harvest_from_row(r, cols_all)
+        if any(rec[k] for k in ["Business Name", "Email", "Phone number", "Website", "Address", "Name"]):
+            rec["Source"] = source_file; rows.append(rec)
+    if not rows: return None
+    df = pd.DataFrame(rows, columns=ex.FINAL_COLS)
+    for col in ["Email", "Phone number", "Website"]:
+        df[col] = df[col].fillna("").map(ex.dedup_semicolon)
+    for col in ex.FINAL_COLS:
+        df[col] = df[col].fillna("").map(ex.norm_space)
+    return df
+
+
+def legacy_dedupe_contacts(df):
+    out = df.copy()
+    def first_tok(s):
+        if not s: return ""
+        for t in [x.strip() for x in s.split(";") if x.strip()]: return t.lower()
+        return ""
+    out["_e"] = out["Email"].map(first_tok)
+    out["_p"] = out["Phone number"].map(first_tok)
+    out["_w"] = out["Website"].map(first_tok)
+    out["_b"] = out["Business Name"].str.lower().str.replace(r'[^a-z0-9]+', '', regex=True)
+    out = out.drop_duplicates(subset=["_e"], keep="first")
+    out = out.drop_duplicates(subset=["_p"], keep="first")
+    out = out.drop_duplicates(subset=["_b", "_w", "Address"], keep="first")
+    return out.drop(columns=[c for c in out.columns if c.startswith("_")])
+
+
+def legacy_extract(path):
+    rows = [legacy_normalize_sheet(raw, str(path)) for raw in ex.read_all_sheets(path).values()]
+    return [df for df in rows if df is not None and not df.empty]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sheets", type=int, default=50)
+    ap.add_argument("--rows", type=int, default=2000, help="data rows per sheet")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    a = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        book = pathlib.Path(tmp) / "synthetic.xlsx"
+        make_book(book, a.sheets, a.rows)
+        total = a.sheets * a.rows
+        print(f"{a.sheets} sheets x {a.rows} rows ({os.cpu_count()} CPUs)")
+
+        runs = {}
+        t0 = time.perf_counter()
+        rows = legacy_extract(book)
+        t1 = time.perf_counter()
+        runs["before"] = (pd.concat(rows, ignore_index=True), t1 - t0)
+        runs["before"] += (legacy_dedupe_contacts(runs["before"][0]), time.perf_counter() - t1)
+        for label, workers in [("after, streamed", 1), (f"after, {a.workers} workers", a.workers)]:
+            t0 = time.perf_counter()
+            rows, report = ex.extract_contacts([book], workers)
+            t1 = time.perf_counter()
+            runs[label] = (pd.concat(rows, ignore_index=True), t1 - t0)
+            runs[label] += (ex.dedupe_contacts(runs[label][0]), time.perf_counter() - t1)
+
+        base = runs["before"]
+        ok = True
+        for label, (harvested, secs, deduped, dsecs) in runs.items():
+            same = harvested.equals(base[0]) and deduped.equals(base[2]) and deduped.index.equals(base[2].index)
+            ok &= same
+            print(f"{label:>20}: {total / secs:>8,.0f} rows/s ({secs:.1f}s), dedupe {dsecs * 1000:.0f} ms "
+                  f"-> {len(harvested)} contacts, {len(deduped)} after dedupe; same as before: {same}")
+
+    print("RESULT:", "PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
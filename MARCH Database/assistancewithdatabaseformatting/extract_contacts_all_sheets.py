@@ -1,5 +1,7 @@
 ﻿# extract_contacts_all_sheets.py
-import argparse, pathlib, re, sys
+import argparse, os, pathlib, re, sys, time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 
 FINAL_COLS = [
@@ -21,14 +23,17 @@ SYN_MAP = {
 def slug(s:str)->str:
     return re.sub(r'_+','_', re.sub(r'[^a-z0-9]+','_', str(s).strip().lower())).strip('_')
 
+# slug -> internal key (first key in SYN_MAP order wins, as before)
+HEADER_KEYS={}
+for _key,_syns in SYN_MAP.items():
+    for _syn in sorted(_syns)+[_key]: HEADER_KEYS.setdefault(slug(_syn), _key)
+SYN_SLUGS={slug(t) for syns in SYN_MAP.values() for t in syns}
+
 def map_headers(cols):
     res=[]
     for c in cols:
-        sc=slug(c); mapped=None
-        for key,syns in SYN_MAP.items():
-            if sc in {slug(x) for x in syns} or sc==key:
-                mapped=key; break
-        res.append(mapped if mapped else sc)
+        sc=slug(c)
+        res.append(HEADER_KEYS.get(sc, sc))
     return res
 
 def coalesce_duplicate_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -53,17 +58,22 @@ def read_all_sheets(path: pathlib.Path):
         return pd.read_excel(path, sheet_name=None, header=None, dtype=str, engine="odf")
     return pd.read_excel(path, sheet_name=None, header=None, dtype=str)
 
+def _open_book(path: pathlib.Path)->pd.ExcelFile:
+    return pd.ExcelFile(path, engine="odf" if path.suffix.lower()==".ods" else None)
+
+def iter_sheets(path: pathlib.Path):
+    """Streaming counterpart of read_all_sheets: (name, raw) one sheet at a time, so only one
+    sheet of a very large workbook is ever held in memory."""
+    with _open_book(path) as xf:
+        for name in xf.sheet_names:
+            yield name, xf.parse(name, header=None, dtype=str)
+
 def find_header_row(df: pd.DataFrame, lookahead=25)->int:
-    best_i,best=-1,-1
-    for i in range(min(len(df),lookahead)):
-        row=[str(x) for x in df.iloc[i].tolist()]
-        score=0
-        for x in row:
-            sx=slug(x)
-            for syns in SYN_MAP.values():
-                if sx in {slug(t) for t in syns}: score+=1; break
-        if score>best: best, best_i=score,i
-    return best_i
+    # only the first `lookahead` rows are ever candidates; score = cells naming a known header
+    prefix=df.head(lookahead)
+    if prefix.empty: return -1
+    scores=[sum(slug(x) in SYN_SLUGS for x in row) for row in prefix.astype(str).itertuples(index=False)]
+    return int(np.argmax(scores))
 
 EMAIL_RE=re.compile(r'\b[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}\b', re.I)
 PHONE_RE=re.compile(r'(?:(?:\+?\d{1,3}[\s-]?)?(?:\(?\d{2,4}\)?[\s-]?)?\d{3,4}[\s-]?\d{3,4}(?:[\s-]?\d{0,4})?)')
@@ -82,38 +92,59 @@ def clean_phone(p:str)->str:
     p=re.sub(r'[^\d+]+','', str(p))
     return p if len(p)>=7 else ""
 
-def harvest_from_row(row: pd.Series, cols_all:list)->dict:
-    def val(k): return row[k] if k in row and pd.notna(row[k]) else ""
-    out={
-        "Sector": norm_space(val("sector")),
-        "Business Name": norm_space(val("business_name")),
-        "Email": norm_space(val("email")),
-        "Phone number": norm_space(val("phone")),
-        "Address": norm_space(val("address")),
-        "Name": norm_space(val("name")),
-        "Title of Contact Person": norm_space(val("title")),
-        "Website": norm_space(val("website")),
-    }
-    blob=" ; ".join([str(row[c]) for c in cols_all if c in row and pd.notna(row[c])])
-    emails=set(e.lower() for e in EMAIL_RE.findall(blob))
-    if out["Email"]:
-        emails.update(x.strip().lower() for x in out["Email"].split(";") if x.strip())
-    out["Email"]="; ".join(sorted(emails))
-
-    phones=set()
-    for p in [x for x in PHONE_RE.findall(blob) if isinstance(x,str)] + out["Phone number"].split(";"):
-        p=clean_phone(p)
-        if p: phones.add(p)
-    out["Phone number"]="; ".join(sorted(phones))
-
-    urls=set()
-    for u in URL_RE.findall(blob):
-        u=u[0] if isinstance(u,tuple) else u
-        u=u.strip().rstrip(').,;')
-        if not u.lower().startswith(("http://","https://")): u="http://"+u
-        urls.add(u.lower())
-    if out["Website"]: urls.add(out["Website"].lower())
-    out["Website"]="; ".join(sorted(urls))
+FIELD_COLS={"Sector":"sector","Business Name":"business_name","Email":"email","Phone number":"phone",
+            "Address":"address","Name":"name","Title of Contact Person":"title","Website":"website"}
+SEP=" ; "   # joins cells; none of the regexes can match across it
+
+def norm_space_col(s: pd.Series)->pd.Series:
+    return s.str.replace(r'\s+',' ', regex=True).str.strip()
+
+def column_matches(cells: pd.Series, rx, need:str)->pd.DataFrame:
+    """(row, match) for every rx match in a column of strings, in one regex pass over the
+    whole column joined by SEP instead of one call per cell. Cells without `need` (a character
+    every match contains) are skipped."""
+    cells=cells[cells.str.contains(need, regex=need.startswith("\\"))]
+    if cells.empty: return pd.DataFrame({"row":pd.Series(dtype=cells.index.dtype), "val":pd.Series(dtype=object)})
+    ends=np.cumsum(cells.str.len().to_numpy()+len(SEP))
+    pos, found=[], []
+    for m in rx.finditer(SEP.join(cells.tolist())):
+        pos.append(m.start()); found.append(m.group(1) if rx.groups else m.group(0))
+    return pd.DataFrame({"row":cells.index[np.searchsorted(ends, pos, side="right")], "val":pd.Series(found, dtype=object)})
+
+def join_sets(long: pd.DataFrame, index)->pd.Series:
+    """Per row: sorted, de-duplicated values joined with '; ' ('' when none)."""
+    long=long[long["val"]!=""].drop_duplicates().sort_values("val", kind="stable").sort_values("row", kind="stable")
+    r=long["row"].to_numpy(); v=long["val"].tolist()
+    cut=np.flatnonzero(np.r_[True, r[1:]!=r[:-1]]).tolist() if len(r) else []
+    joined=["; ".join(v[a:b]) for a,b in zip(cut, cut[1:]+[len(v)])]
+    return pd.Series(joined, index=r[cut], dtype=object).reindex(index, fill_value="")
+
+def harvest_columns(data: pd.DataFrame)->pd.DataFrame:
+    """Per-row harvest (mapped fields plus emails/phones/URLs found anywhere in the row),
+    computed column by column for the whole sheet."""
+    idx=data.index
+    out=pd.DataFrame(index=idx)
+    for col,key in FIELD_COLS.items():
+        out[col]=norm_space_col(data[key].dropna().astype(str)).reindex(idx, fill_value="") if key in data.columns else ""
+    cells=pd.concat([data[c].dropna().astype(str) for c in data.columns]) if len(data.columns) else pd.Series(dtype=object)
+
+    given=out["Email"].str.split(";").explode().str.strip().str.lower()
+    emails=pd.concat([column_matches(cells, EMAIL_RE, "@").assign(val=lambda d: d["val"].str.lower()),
+                      pd.DataFrame({"row":given.index, "val":given.to_numpy()})])
+    out["Email"]=join_sets(emails, idx)
+
+    given=out["Phone number"].str.split(";").explode()
+    phones=pd.concat([column_matches(cells, PHONE_RE, r"\d"), pd.DataFrame({"row":given.index, "val":given.to_numpy()})])
+    phones["val"]=phones["val"].str.replace(r'[^\d+]+','', regex=True)
+    phones.loc[phones["val"].str.len()<7, "val"]=""
+    out["Phone number"]=join_sets(phones, idx)
+
+    urls=column_matches(cells, URL_RE, ".")
+    u=urls["val"].str.strip().str.rstrip(').,;')
+    u=u.where(u.str.lower().str.startswith(("http://","https://")), "http://"+u)
+    site=out["Website"][out["Website"]!=""].str.lower()
+    urls=pd.concat([pd.DataFrame({"row":urls["row"], "val":u.str.lower()}), pd.DataFrame({"row":site.index, "val":site.to_numpy()})])
+    out["Website"]=join_sets(urls, idx)
     return out
 
 def normalize_sheet(raw: pd.DataFrame, source_file:str):
@@ -129,62 +160,100 @@ def normalize_sheet(raw: pd.DataFrame, source_file:str):
     for c in data.columns:
         if data[c].dtype=="object":
             data[c]=data[c].astype(str).str.strip().replace({"": pd.NA})
-    cols_all=list(data.columns)
-    rows=[]
-    for _,r in data.iterrows():
-        if all(pd.isna(x) or str(x).strip()=="" for x in r.tolist()): continue
-        rec=harvest_from_row(r, cols_all)
-        if any(rec[k] for k in ["Business Name","Email","Phone number","Website","Address","Name"]):
-            rec["Source"]=source_file; rows.append(rec)
-    if not rows: return None
-    df=pd.DataFrame(rows, columns=FINAL_COLS)
+    rows=harvest_columns(data)
+    keep=data.notna().any(axis=1) & (rows[["Business Name","Email","Phone number","Website","Address","Name"]]!="").any(axis=1)
+    if not keep.any(): return None
+    rows=rows[keep].assign(Source=source_file)
+    df=rows[FINAL_COLS].reset_index(drop=True)
     for col in ["Email","Phone number","Website"]:
         df[col]=df[col].fillna("").map(dedup_semicolon)
     for col in FINAL_COLS:
-        df[col]=df[col].fillna("").map(norm_space)
+        df[col]=norm_space_col(df[col].fillna("").astype(str))
     return df
 
+def first_tok(s:str)->str:
+    """First non-empty ';'-separated token, stripped and lowercased ('' when none)."""
+    t=s.split(";",1)[0].strip()
+    if t or ";" not in s: return t.lower()
+    for t in s.split(";"):
+        t=t.strip()
+        if t: return t.lower()
+    return ""
+
 def dedupe_contacts(df: pd.DataFrame)->pd.DataFrame:
-    out=df.copy()
-    def first_tok(s:str)->str:
-        if not s: return ""
-        for t in [x.strip() for x in s.split(";") if x.strip()]: return t.lower()
-        return ""
-    out["_e"]=out["Email"].map(first_tok)
-    out["_p"]=out["Phone number"].map(first_tok)
-    out["_w"]=out["Website"].map(first_tok)
-    out["_b"]=out["Business Name"].str.lower().str.replace(r'[^a-z0-9]+','', regex=True)
-    out=out.drop_duplicates(subset=["_e"], keep="first")
-    out=out.drop_duplicates(subset=["_p"], keep="first")
-    out=out.drop_duplicates(subset=["_b","_w","Address"], keep="first")
-    out=out.drop(columns=[c for c in out.columns if c.startswith("_")])
-    return out
+    """First row wins per first email, then (of the survivors) per first phone, then per
+    business name + first website + address. Keys are compared as 64-bit hashes."""
+    b=df["Business Name"].str.lower().str.replace(r'[^a-z0-9]+','', regex=True)
+    keys=[pd.util.hash_pandas_object(k, index=False).to_numpy() for k in (
+        df["Email"].fillna("").map(first_tok), df["Phone number"].fillna("").map(first_tok),
+        pd.DataFrame({"b":b, "w":df["Website"].fillna("").map(first_tok), "a":df["Address"]}))]
+    keep=np.ones(len(df), bool)
+    for h in keys:
+        alive=np.flatnonzero(keep)
+        keep[alive[pd.Series(h[alive]).duplicated().to_numpy()]]=False
+    return df[keep]
+
+def sheet_result(p: pathlib.Path, sheet, raw: pd.DataFrame):
+    """(report row, contacts or None) for one sheet."""
+    try:
+        df=normalize_sheet(raw, str(p))
+        if df is None or df.empty:
+            return (str(p), str(sheet), "NO_HEADER_MATCH_OR_EMPTY", len(raw), 0), None
+        return (str(p), str(sheet), "OK", len(raw), len(df)), df
+    except Exception as e:
+        return (str(p), str(sheet), "ERROR:"+str(e), len(raw), 0), None
+
+_book=None   # per worker process: the last workbook opened, reused for its other sheets
+
+def _sheet_job(p: pathlib.Path, sheet):
+    global _book
+    if _book is None or _book[0]!=p:
+        if _book is not None: _book[1].close()
+        _book=(p, _open_book(p))
+    try:
+        raw=_book[1].parse(sheet, header=None, dtype=str)
+    except Exception as e:
+        return (str(p), str(sheet), "READ_ERROR:"+str(e), 0, 0), None
+    return sheet_result(p, sheet, raw)
+
+def extract_contacts(inputs, workers=None):
+    """Contacts of every sheet of every input (in input/sheet order) and the per-sheet report.
+
+    workers>1 reads and normalizes sheets in that many processes, each opening the
+    workbook once; workers=1 streams the sheets in this process one at a time."""
+    workers=workers or os.cpu_count() or 1
+    out=[]; jobs=[]   # out: (report row, contacts) per sheet in input order; None = queued job
+    for f in inputs:
+        p=pathlib.Path(f)
+        if not p.exists():
+            out.append(((str(p),"*","MISSING",0,0), None)); continue
+        try:
+            if workers==1:
+                out+=[sheet_result(p, sheet, raw) for sheet,raw in iter_sheets(p)]
+            else:
+                with _open_book(p) as xf: names=xf.sheet_names
+                jobs+=[(len(out)+k, p, sheet) for k,sheet in enumerate(names)]
+                out+=[None]*len(names)
+        except Exception as e:
+            out.append(((str(p),"*","READ_ERROR:"+str(e),0,0), None))
+    if jobs:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as ex:
+            for (k,_,_),res in zip(jobs, ex.map(_sheet_job, [j[1] for j in jobs], [j[2] for j in jobs])):
+                out[k]=res
+    return [df for _,df in out if df is not None], [rep for rep,_ in out]
 
 def main():
     ap=argparse.ArgumentParser(description="Extract contacts from ALL sheets of many spreadsheets.")
     ap.add_argument("-o","--output", required=True, help="Output Excel path")
+    ap.add_argument("-j","--workers", type=int, default=None, help="Sheets processed in parallel (default: CPU count; 1 = stream in-process)")
     ap.add_argument("inputs", nargs="+", help="Input .xlsx/.ods files")
     a=ap.parse_args()
 
-    rows=[]; report=[]
-    for f in a.inputs:
-        p=pathlib.Path(f)
-        if not p.exists():
-            report.append((str(p),"*","MISSING",0,0)); continue
-        try:
-            book=read_all_sheets(p)
-        except Exception as e:
-            report.append((str(p),"*","READ_ERROR:"+str(e),0,0)); continue
-        for sheet,raw in book.items():
-            try:
-                df=normalize_sheet(raw, str(p))
-                if df is None or df.empty:
-                    report.append((str(p), str(sheet), "NO_HEADER_MATCH_OR_EMPTY", len(raw), 0))
-                else:
-                    rows.append(df)
-                    report.append((str(p), str(sheet), "OK", len(raw), len(df)))
-            except Exception as e:
-                report.append((str(p), str(sheet), "ERROR:"+str(e), len(raw), 0))
+    t0=time.perf_counter()
+    rows,report=extract_contacts(a.inputs, a.workers)
+    secs=time.perf_counter()-t0
+    rows_in=sum(r[3] for r in report)
+    print(f"Read {rows_in} rows from {len(report)} sheets in {secs:.1f}s ({rows_in/max(secs,1e-9):,.0f} rows/s)")
 
     if not rows:
         print("No rows extracted. See report.csv."); 
@@ -0,0 +1,172 @@
+# bench_scan.py — regression corpus + throughput for the single-pass risk scanner
+#
+#   python bench_scan.py [--docs 300]
+#
+# Builds a seeded corpus of synthetic agreements (1–50 pages) from clause snippets that
+# trigger, nearly trigger, or overlap the RX rules (case changes, unicode case folds,
+# hits inside other hits, stems inside longer words). For every document and doc_type the
+# findings must be identical to the previous per-rule _scan, and every rule's hit spans
+# must equal RX[rule].finditer(). Then reports MB/s for both scanners by page count.
+
+import sys
+import time
+import random
+import argparse
+from statistics import median
+
+import server
+from server import RX, DocType, RiskSeverity, _add, _snippet, _scan, _score, _verdict
+
+PAGE_CHARS = 3000
+
+CLAUSES = [
+    "The Supplier shall indemnify the Client with unlimited liability and shall indemnify all losses.",
+    "Liability under this Agreement is UNCAPPED and without limit, and the parties agree to indemnify.",
+    "Limitation of Liability: total liability cap equals fees paid in the prior 12 months.",
+    "This Agreement shall automatically renew for successive one-year terms.",
+    "The Contractor agrees to a non-compete and restrictive covenant for 2 years (24 months).",
+    "Noncompete obligations apply for 2\tyears; nondisclosure continues thereafter.",
+    "Working hours are 9am to 5pm (09:00–17:00); set hours apply on site.",
+    "The engagement is exclusive and the Consultant shall work solely for the Client.",
+    "Either party may terminate on notice of 30 days; termination for convenience is permitted.",
+    "Invoices are payable Net 60, or net90 for international orders; NET 30 is preferred.",
+    "All Confidential Information and the NDA survive termination.",
+    "Neither party is liable for delays caused by Force Majeure events.",
+    "Disputes are subject to binding and final arbitration in London.",
+    "This Agreement is governed by the governing law of England; venue and jurisdiction lie in London.",
+    "The software is provided AS IS with no warranties and without warranty of fitness.",
+    "Deliverables are work for hire and the Contractor assigns all rights and assignment all rights to the Client.",
+    "Unassigned tasks, noted nothing, assist, asset, networking, settlement, forces, 2024, 240 days.",
+    "Long-s and dotless forms: ſet hours, non-compete for 2 years, the ſupplier; Bınding arbitration.",
+    "İstanbul office: UNLIMITED exposure; the party shall INDEMNIFY the Company.",
+    "The Parties agree that notices must be delivered in writing to the addresses set out above.",
+    "Payment shall be made within thirty days of receipt of a valid invoice.",
+    "The Services will be performed with reasonable skill and care in accordance with good industry practice.",
+]
+
+FILLER = [
+    "The Parties shall cooperate in good faith to deliver the Services described in Schedule 1.",
+    "Each Party warrants that it has the authority to enter into this Agreement.",
+    "Any amendment must be agreed in writing and signed by both Parties.",
+    "Headings are for convenience only and do not affect interpretation.",
+]
+
+
+# The per-rule scan as it was before the single-pass scanner (reference implementation)
+def legacy_scan(text: str, doc_type: DocType):
+    flags = []
+    if RX["unlimited_indemnity"].search(text):
+        _add(flags, RiskSeverity.CRITICAL, "Legal", "Unlimited Indemnity Exposure",
+             "Uncapped exposure. Negotiate a liability cap (often fees paid / contract value).",
+             _snippet(text, RX["unlimited_indemnity"]))
+    if RX["explicit_uncapped"].search(text) and RX["limitation_liability"].search(text) is None:
+        _add(flags, RiskSeverity.CRITICAL, "Legal", "Explicit Uncapped Liability (No Liability Cap Clause)",
+             "Explicit uncapped liability language detected. Add a limitation of liability clause.",
+             _snippet(text, RX["explicit_uncapped"]))
+    if not RX["termination_convenience"].search(text):
+        _add(flags, RiskSeverity.CRITICAL, "Operational", "Locked In (No Termination on Notice/Convenience)",
+             "No clean exit clause. Add termination on notice (e.g., 30 days) or termination for convenience.")
+    if doc_type == DocType.contractor_agreement and RX["exclusive"].search(text):
+        _add(flags, RiskSeverity.CRITICAL, "Tax/Compliance", "Exclusivity Clause (Employee Signal)",
+             "Exclusivity can look like employment. Aim for non-exclusive engagement.",
+             _snippet(text, RX["exclusive"]))
+    if doc_type == DocType.contractor_agreement and RX["set_hours"].search(text):
+        _add(flags, RiskSeverity.CRITICAL, "Tax/Compliance", "Fixed Hours / Schedule (Employee Signal)",
+             "Fixed schedules can signal employment. Contractors usually control hours/methods.",
+             _snippet(text, RX["set_hours"]))
+    if RX["auto_renew"].search(text):
+        _add(flags, RiskSeverity.HIGH, "Commercial", "Auto-Renewal Clause",
+             "Auto-renew can trap you. Require reminder + clear cancellation window (e.g., 30 days).",
+             _snippet(text, RX["auto_renew"]))
+    if RX["non_compete"].search(text) and RX["two_years"].search(text):
+        _add(flags, RiskSeverity.HIGH, "HR/Labor", "Excessive Non-Compete Duration",
+             "2 years is often unenforceable and commercially harmful. Negotiate 6–12 months.",
+             _snippet(text, RX["non_compete"]))
+    if doc_type != DocType.nda and RX["confidential"].search(text) is None:
+        _add(flags, RiskSeverity.HIGH, "Legal", "No Confidentiality Clause Detected",
+             "Missing confidentiality protection. Add mutual confidentiality or a separate NDA.")
+    if RX["net60"].search(text):
+        _add(flags, RiskSeverity.MEDIUM, "Financial", "Long Payment Terms (Net 60/90)",
+             "Long terms strain cashflow. Prefer Net 30 or milestone-based payments.",
+             _snippet(text, RX["net60"]))
+    if RX["force_majeure"].search(text) is None:
+        _add(flags, RiskSeverity.MEDIUM, "Legal", "Missing Force Majeure",
+             "No protection for unexpected events (pandemics, disasters). Add standard clause.")
+    if RX["binding_arbitration"].search(text):
+        _add(flags, RiskSeverity.MEDIUM, "Legal", "Binding Arbitration Requirement",
+             "You may waive court/jury rights. Ensure venue, rules, costs are acceptable.",
+             _snippet(text, RX["binding_arbitration"]))
+    if RX["governing_law"].search(text) is None:
+        _add(flags, RiskSeverity.MEDIUM, "Legal", "Undefined Governing Law / Venue",
+             "Contract should specify governing law and venue/jurisdiction to avoid surprises.")
+    if RX["warranty_disclaimer"].search(text):
+        _add(flags, RiskSeverity.MEDIUM, "Commercial", "Broad Warranty Disclaimer ('AS IS')",
+             "Broad disclaimers reduce remedies. Ensure minimum warranties or acceptance criteria.",
+             _snippet(text, RX["warranty_disclaimer"]))
+    if doc_type in (DocType.service_agreement, DocType.contractor_agreement) and RX["ip_assignment"].search(text) is None:
+        _add(flags, RiskSeverity.MEDIUM, "IP", "Missing IP Assignment / Work-for-Hire Language",
+             "You may not own deliverables. Add work-for-hire and IP assignment.")
+    return flags[:server.MAX_FLAGS]
+
+
+def make_doc(rng: random.Random, pages: int, clause_rate: float = 0.3) -> str:
+    parts, size = [], 0
+    while size < pages * PAGE_CHARS:
+        s = rng.choice(CLAUSES) if rng.random() < clause_rate else rng.choice(FILLER)
+        if rng.random() < 0.2:
+            s = s.upper() if rng.random() < 0.5 else s.title()
+        parts.append(s)
+        size += len(s) + 1
+    return (" " if rng.random() < 0.5 else "\n").join(parts)
+
+
+def check_corpus(docs: int) -> int:
+    rng = random.Random(7)
+    mismatches = 0
+    for i in range(docs):
+        text = make_doc(rng, rng.choice([1, 1, 2, 5, 10]), clause_rate=rng.choice([0.02, 0.1, 0.5]))
+        hits = server._scan_hits(text)
+        for name, rx in RX.items():
+            if [m.span() for m in rx.finditer(text)] != hits.get(name, []):
+                mismatches += 1
+                print(f"doc {i}: hit spans differ for {name}")
+        for doc_type in DocType:
+            old, new = legacy_scan(text, doc_type), _scan(text, doc_type)
+            if old != new or _verdict(_score(old)) != _verdict(_score(new)):
+                mismatches += 1
+                print(f"doc {i} ({doc_type.value}): findings differ")
+    return mismatches
+
+
+def mb_per_s(fn, text: str, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(text, DocType.contractor_agreement)
+        times.append(time.perf_counter() - start)
+    return len(text.encode("utf-8")) / 1e6 / median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=300)
+    args = parser.parse_args()
+
+    mismatches = check_corpus(args.docs)
+    print(f"regression corpus: {args.docs} docs x {len(DocType)} doc types, {mismatches} mismatches")
+
+    rng = random.Random(11)
+    print(f"{'pages':>5} {'KB':>6} | {'per-rule':>10} | {'single-pass':>11} | speedup")
+    for pages in (1, 5, 10, 25, 50):
+        text = make_doc(rng, pages, clause_rate=0.05)
+        repeats = max(5, 200 // pages)
+        old = mb_per_s(legacy_scan, text, repeats)
+        new = mb_per_s(_scan, text, repeats)
+        print(f"{pages:>5} {len(text) / 1024:>6.0f} | {old:>6.1f} MB/s | {new:>7.1f} MB/s | {new / old:.1f}x")
+
+    print("RESULT:", "PASS" if mismatches == 0 else "FAIL")
+    sys.exit(0 if mismatches == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -363,8 +363,11 @@ def _snippet(text: str, pattern: re.Pattern, max_len: int = 260) -> Optional[str
     m = pattern.search(text)
     if not m:
         return None
-    start = max(0, m.start() - 80)
-    end = min(len(text), m.end() + 180)
+    return _snippet_at(text, m.span(), max_len)
+
+def _snippet_at(text: str, span: Tuple[int, int], max_len: int = 260) -> str:
+    start = max(0, span[0] - 80)
+    end = min(len(text), span[1] + 180)
     s = re.sub(r"\s+", " ", text[start:end].strip())
     return s[:max_len]
 
@@ -396,64 +399,144 @@ RX = {
     "ip_assignment": re.compile(r"\bwork for hire\b|\bassign(?:s|ment)? all rights\b", re.IGNORECASE),
 }
 
+# Single-pass scanner.
+# Every RX alternative starts with \b + a literal word, so a match can only begin where
+# one of these lowercase stems starts a word. One combined stem regex walks the text once;
+# each stem hit is then confirmed with the owning RX patterns (.match at that offset).
+# Hits per rule are the same spans RX[rule].finditer(text) would return.
+RX_STEMS = {
+    "unlimited_indemnity": ("unlimited",),
+    "limitation_liability": ("limit", "liability"),
+    "explicit_uncapped": ("uncapped", "without"),
+    "auto_renew": ("automatic",),
+    "non_compete": ("non", "restrictive"),
+    "two_years": ("2", "24"),
+    "set_hours": ("9am", "09", "5pm", "17", "set", "working"),
+    "exclusive": ("exclusive", "solely"),
+    "termination_convenience": ("termination", "terminate"),
+    "net60": ("net",),
+    "confidential": ("confidential", "nda"),
+    "force_majeure": ("force",),
+    "binding_arbitration": ("binding",),
+    "governing_law": ("governing", "jurisdiction", "venue"),
+    "warranty_disclaimer": ("as", "no", "without"),
+    "ip_assignment": ("work", "assign"),
+}
+
+def _build_stem_index() -> Tuple[re.Pattern, re.Pattern, Dict[str, List[str]]]:
+    owners: Dict[str, List[str]] = {}
+    for name, stems in RX_STEMS.items():
+        for stem in stems:
+            owners.setdefault(stem, []).append(name)
+    ordered = sorted(owners, key=len, reverse=True)  # longest stem wins at a given offset
+    # A shorter stem can start at the same offset ("2" inside "24"): its rules are checked too
+    rules_at = {stem: [name for name in RX if any(stem.startswith(s) for s in RX_STEMS[name])] for stem in ordered}
+    alternation = "|".join(re.escape(s) for s in ordered)
+    return re.compile(rf"\b(?:{alternation})"), re.compile(rf"\b(?:{alternation})", re.IGNORECASE), rules_at
+
+RX_STEM, RX_STEM_IC, RX_STEM_RULES = _build_stem_index()
+
+# Characters re.IGNORECASE folds onto an ASCII stem letter that str.lower() leaves alone
+_FOLD_FIXES = {"\u0131": "i", "\u017f": "s"}  # dotless i, long s
+
+def _stem_rules(found: str) -> List[str]:
+    rules = RX_STEM_RULES.get(found) or RX_STEM_RULES.get(found.lower())
+    if rules is None:  # case-insensitive path, case-folded letter (e.g. "\u017fet")
+        rules = next(r for stem, r in RX_STEM_RULES.items() if re.fullmatch(re.escape(stem), found, re.IGNORECASE))
+    return rules
+
+def _scan_hits(text: str, first_only: bool = False) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Every RX hit as (start, end), keyed by rule name, from one pass over the text.
+    first_only keeps just the first hit per rule (all _scan needs) and stops once every rule has one.
+    """
+    tl = text.lower()
+    if len(tl) != len(text):
+        tl = text.replace("\u0130", "i").lower()  # only U+0130 lowers to two code points
+    for ch, ascii_ch in _FOLD_FIXES.items():
+        if ch in tl:
+            tl = tl.replace(ch, ascii_ch)
+    if len(tl) == len(text):
+        candidates = RX_STEM.finditer(tl)
+    else:
+        candidates = RX_STEM_IC.finditer(text)
+
+    hits: Dict[str, List[Tuple[int, int]]] = {}
+    next_pos: Dict[str, int] = {}
+    for c in candidates:
+        pos = c.start()
+        for name in _stem_rules(c.group()):
+            if pos < next_pos.get(name, 0):
+                continue  # inside the previous hit (finditer does not overlap)
+            m = RX[name].match(text, pos)
+            if m:
+                hits.setdefault(name, []).append(m.span())
+                next_pos[name] = len(text) + 1 if first_only else m.end()
+        if first_only and len(hits) == len(RX):
+            break
+    return hits
+
 def _scan(text: str, doc_type: DocType) -> List[RiskFlag]:
     flags: List[RiskFlag] = []
-    tl = text.lower()
+    hits = _scan_hits(text, first_only=True)
+
+    def snip(name: str) -> str:
+        return _snippet_at(text, hits[name][0])
 
     # CRITICAL
-    if RX["unlimited_indemnity"].search(text):
+    if "unlimited_indemnity" in hits:
         _add(flags, RiskSeverity.CRITICAL, "Legal", "Unlimited Indemnity Exposure",
              "Uncapped exposure. Negotiate a liability cap (often fees paid / contract value).",
-             _snippet(text, RX["unlimited_indemnity"]))
-    if RX["explicit_uncapped"].search(text) and RX["limitation_liability"].search(text) is None:
+             snip("unlimited_indemnity"))
+    if "explicit_uncapped" in hits and "limitation_liability" not in hits:
         _add(flags, RiskSeverity.CRITICAL, "Legal", "Explicit Uncapped Liability (No Liability Cap Clause)",
              "Explicit uncapped liability language detected. Add a limitation of liability clause.",
-             _snippet(text, RX["explicit_uncapped"]))
-    if not RX["termination_convenience"].search(text):
+             snip("explicit_uncapped"))
+    if "termination_convenience" not in hits:
         _add(flags, RiskSeverity.CRITICAL, "Operational", "Locked In (No Termination on Notice/Convenience)",
              "No clean exit clause. Add termination on notice (e.g., 30 days) or termination for convenience.")
-    if doc_type == DocType.contractor_agreement and RX["exclusive"].search(text):
+    if doc_type == DocType.contractor_agreement and "exclusive" in hits:
         _add(flags, RiskSeverity.CRITICAL, "Tax/Compliance", "Exclusivity Clause (Employee Signal)",
              "Exclusivity can look like employment. Aim for non-exclusive engagement.",
-             _snippet(text, RX["exclusive"]))
-    if doc_type == DocType.contractor_agreement and RX["set_hours"].search(text):
+             snip("exclusive"))
+    if doc_type == DocType.contractor_agreement and "set_hours" in hits:
         _add(flags, RiskSeverity.CRITICAL, "Tax/Compliance", "Fixed Hours / Schedule (Employee Signal)",
              "Fixed schedules can signal employment. Contractors usually control hours/methods.",
-             _snippet(text, RX["set_hours"]))
+             snip("set_hours"))
 
     # HIGH
-    if RX["auto_renew"].search(text):
+    if "auto_renew" in hits:
         _add(flags, RiskSeverity.HIGH, "Commercial", "Auto-Renewal Clause",
              "Auto-renew can trap you. Require reminder + clear cancellation window (e.g., 30 days).",
-             _snippet(text, RX["auto_renew"]))
-    if RX["non_compete"].search(text) and RX["two_years"].search(text):
+             snip("auto_renew"))
+    if "non_compete" in hits and "two_years" in hits:
         _add(flags, RiskSeverity.HIGH, "HR/Labor", "Excessive Non-Compete Duration",
              "2 years is often unenforceable and commercially harmful. Negotiate 6–12 months.",
-             _snippet(text, RX["non_compete"]))
-    if doc_type != DocType.nda and RX["confidential"].search(text) is None:
+             snip("non_compete"))
+    if doc_type != DocType.nda and "confidential" not in hits:
         _add(flags, RiskSeverity.HIGH, "Legal", "No Confidentiality Clause Detected",
              "Missing confidentiality protection. Add mutual confidentiality or a separate NDA.")
 
     # MEDIUM
-    if RX["net60"].search(text):
+    if "net60" in hits:
         _add(flags, RiskSeverity.MEDIUM, "Financial", "Long Payment Terms (Net 60/90)",
              "Long terms strain cashflow. Prefer Net 30 or milestone-based payments.",
-             _snippet(text, RX["net60"]))
-    if RX["force_majeure"].search(text) is None:
+             snip("net60"))
+    if "force_majeure" not in hits:
         _add(flags, RiskSeverity.MEDIUM, "Legal", "Missing Force Majeure",
              "No protection for unexpected events (pandemics, disasters). Add standard clause.")
-    if RX["binding_arbitration"].search(text):
+    if "binding_arbitration" in hits:
         _add(flags, RiskSeverity.MEDIUM, "Legal", "Binding Arbitration Requirement",
              "You may waive court/jury rights. Ensure venue, rules, costs are acceptable.",
-             _snippet(text, RX["binding_arbitration"]))
-    if RX["governing_law"].search(text) is None:
+             snip("binding_arbitration"))
+    if "governing_law" not in hits:
         _add(flags, RiskSeverity.MEDIUM, "Legal", "Undefined Governing Law / Venue",
              "Contract should specify governing law and venue/jurisdiction to avoid surprises.")
-    if RX["warranty_disclaimer"].search(text):
+    if "warranty_disclaimer" in hits:
         _add(flags, RiskSeverity.MEDIUM, "Commercial", "Broad Warranty Disclaimer ('AS IS')",
              "Broad disclaimers reduce remedies. Ensure minimum warranties or acceptance criteria.",
-             _snippet(text, RX["warranty_disclaimer"]))
-    if doc_type in (DocType.service_agreement, DocType.contractor_agreement) and RX["ip_assignment"].search(text) is None:
+             snip("warranty_disclaimer"))
+    if doc_type in (DocType.service_agreement, DocType.contractor_agreement) and "ip_assignment" not in hits:
         _add(flags, RiskSeverity.MEDIUM, "IP", "Missing IP Assignment / Work-for-Hire Language",
              "You may not own deliverables. Add work-for-hire and IP assignment.")
 
@@ -0,0 +1,113 @@
+import asyncio
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+from playwright.async_api import async_playwright
+
+from crawl_pool import CrawlPool
+
+# -----------------------------
+# CRAWL BENCH (static site fixture)
+# -----------------------------
+# python crawl_bench.py --pages 200 --workers 4
+#
+# Writes a static site of N linked pages to a temp directory and serves it locally.
+# Links use shuffled query strings and utm_* params so the frontier has to dedup them,
+# and one link is broken. The site is crawled with 1 worker and then with N workers,
+# and pages/minute is printed for each. A third run stops halfway, resumes from its
+# checkpoint, and must reach every page exactly once.
+
+LINKS_PER_PAGE = 5
+
+
+def build_site(root: Path, pages: int):
+    for i in range(pages):
+        links = []
+        for k in range(1, LINKS_PER_PAGE + 1):
+            j = (i * 7 + k * 13) % pages
+            # Same page, three spellings: the frontier must treat them as one URL
+            links.append(f'<a href="/p{j}.html?b=2&a=1">p{j}</a>')
+            links.append(f'<a href="/p{j}.html?a=1&b=2&utm_source=bench#top">p{j} again</a>')
+        links.append(f'<a href="/p{(i + 1) % pages}.html?a=1&b=2">next</a>')
+        if i == 0:
+            links.append('<a href="/missing.html">broken</a>')
+        (root / f"p{i}.html").write_text(
+            f"<html><body><h1>Page {i}</h1>{''.join(links)}</body></html>", encoding="utf-8")
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    latency = 0.0
+
+    def do_GET(self):
+        time.sleep(self.latency)  # stand-in for server render time
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(root: Path, latency: float):
+    QuietHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=str(root)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+async def run_once(browser, base_url: str, pages: int, workers: int, **kwargs) -> CrawlPool:
+    accept = lambda u: u.startswith(base_url)
+    pool = CrawlPool(browser, f"{base_url}/p0.html?a=1&b=2", accept, max_pages=kwargs.pop("max_pages", pages + 1),
+                     workers=workers, per_host=workers, host_delay_ms=0, **kwargs)
+    await pool.run()
+    return pool
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=int, default=50)
+    args = parser.parse_args()
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "site"
+        root.mkdir()
+        build_site(root, args.pages)
+        server, base_url = serve(root, args.latency_ms / 1000.0)
+        expected = args.pages + 1  # every page plus /missing.html
+
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            try:
+                for workers in (1, args.workers):
+                    pool = await run_once(browser, base_url, args.pages, workers)
+                    visited = pool.frontier.visited
+                    print(f"workers={workers}: {len(visited)} pages, {len(pool.broken_links)} broken, "
+                          f"{pool.elapsed:.1f}s, {pool.pages_per_minute:.0f} pages/min")
+                    ok &= len(visited) == len(set(visited)) == expected and len(pool.broken_links) == 1
+
+                # Interrupted crawl + resume
+                checkpoint = Path(tmp) / "checkpoint.json"
+                first = await run_once(browser, base_url, args.pages, args.workers,
+                                       max_pages=expected // 2, checkpoint_path=checkpoint)
+                second = await run_once(browser, base_url, args.pages, args.workers,
+                                        max_pages=expected, checkpoint_path=checkpoint, resume=True)
+                visited = second.frontier.visited
+                print(f"resume: first run {len(first.frontier.visited)} pages, after resume {len(visited)} pages")
+                ok &= len(visited) == len(set(visited)) == expected
+            finally:
+                await browser.close()
+                server.shutdown()
+
+    print("RESULT:", "PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,251 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+from collections import deque
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# -----------------------------
+# CONCURRENT CRAWL POOL
+# -----------------------------
+# N browser contexts pull from one shared frontier. Each host gets a concurrency cap
+# and a minimum gap between requests. Pages are considered loaded on network-idle (or
+# a readiness selector) instead of a fixed sleep. The frontier can be checkpointed to
+# JSON and resumed.
+
+DEFAULT_WORKERS = 4
+DEFAULT_PER_HOST = 2            # concurrent requests per host
+DEFAULT_HOST_DELAY_MS = 100     # minimum gap between request starts on one host
+DEFAULT_IDLE_TIMEOUT_MS = 5000  # cap on the network-idle wait; the page is still crawled after it
+CHECKPOINT_EVERY = 25           # pages between checkpoint writes
+
+# Query params that never change page content
+TRACKING_PARAMS = {"fbclid", "gclid", "msclkid", "ref", "_ga"}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form for dedup:
+    - lower-case scheme and host
+    - drop default ports and the fragment
+    - strip a trailing slash
+    - sort query params and drop tracking params (utm_*, gclid, ...)
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k not in TRACKING_PARAMS and not k.startswith("utm_")]
+    path = parts.path.rstrip("/")
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ""))
+
+
+class Frontier:
+    """BFS queue plus a `seen` set keyed on the normalized URL."""
+
+    def __init__(self, max_pages: int):
+        self.max_pages = max_pages
+        self.queue = deque()
+        self.seen = set()       # everything ever enqueued
+        self.visited = []       # pages actually crawled, in order
+        self.in_flight = set()
+
+    def add(self, url: str) -> bool:
+        url = normalize_url(url)
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        self.queue.append(url)
+        return True
+
+    def next(self):
+        """Returns the next URL, or None while the budget is spent or nothing is queued."""
+        if not self.queue or len(self.visited) + len(self.in_flight) >= self.max_pages:
+            return None
+        url = self.queue.popleft()
+        self.in_flight.add(url)
+        return url
+
+    def done(self, url: str):
+        self.in_flight.discard(url)
+        self.visited.append(url)
+
+    @property
+    def finished(self) -> bool:
+        if self.in_flight:
+            return False
+        return not self.queue or len(self.visited) >= self.max_pages
+
+    def to_dict(self) -> dict:
+        # In-flight pages were not finished: put them back at the front on resume
+        return {
+            "queue": sorted(self.in_flight) + list(self.queue),
+            "seen": sorted(self.seen),
+            "visited": self.visited,
+        }
+
+    def load(self, state: dict):
+        self.queue = deque(state.get("queue", []))
+        self.seen = set(state.get("seen", [])) | set(self.queue)
+        self.visited = list(state.get("visited", []))
+        self.in_flight = set()
+
+
+class HostLimiter:
+    """Per-host politeness: at most `per_host` requests in flight, `delay_ms` between starts."""
+
+    def __init__(self, per_host: int = DEFAULT_PER_HOST, delay_ms: int = DEFAULT_HOST_DELAY_MS):
+        self.per_host = per_host
+        self.delay = delay_ms / 1000.0
+        self._sems = {}
+        self._next_start = {}
+        self._locks = {}
+
+    def _host(self, url: str) -> str:
+        return (urlsplit(url).netloc or "").lower()
+
+    async def acquire(self, url: str):
+        host = self._host(url)
+        sem = self._sems.setdefault(host, asyncio.Semaphore(self.per_host))
+        await sem.acquire()
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            wait = self._next_start.get(host, 0.0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_start[host] = time.monotonic() + self.delay
+
+    def release(self, url: str):
+        self._sems[self._host(url)].release()
+
+
+class CrawlPool:
+    """
+    Concurrent same-origin crawl.
+
+    accept(url) decides which discovered links are crawled (same origin, not skipped).
+    on_page(page) is called for every new page so the caller can attach console/network listeners.
+    Results land in `broken_links` (same shape as inspector.broken_links) and `frontier.visited`.
+    """
+
+    def __init__(self, browser, start_url: str, accept, *, max_pages: int, workers: int = DEFAULT_WORKERS,
+                 per_host: int = DEFAULT_PER_HOST, host_delay_ms: int = DEFAULT_HOST_DELAY_MS,
+                 idle_timeout_ms: int = DEFAULT_IDLE_TIMEOUT_MS, ready_selector: str = None,
+                 context_options: dict = None, on_page=None, checkpoint_path: Path = None, resume: bool = False):
+        self.browser = browser
+        self.accept = accept
+        self.workers = max(1, workers)
+        self.limiter = HostLimiter(per_host, host_delay_ms)
+        self.idle_timeout_ms = idle_timeout_ms
+        self.ready_selector = ready_selector
+        self.context_options = context_options or {}
+        self.on_page = on_page
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+
+        self.frontier = Frontier(max_pages)
+        self.broken_links = []
+        self._wake = asyncio.Event()
+        self._since_checkpoint = 0
+        self.started_at = None
+        self.elapsed = 0.0
+
+        if resume and self.checkpoint_path and self.checkpoint_path.exists():
+            state = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+            self.frontier.load(state.get("frontier", {}))
+            self.broken_links = state.get("broken_links", [])
+            print(f"[CRAWL] Resumed: {len(self.frontier.visited)} visited, {len(self.frontier.queue)} queued")
+        if not self.frontier.seen:
+            self.frontier.add(start_url)
+
+    # --- checkpoint ---
+
+    def save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"frontier": self.frontier.to_dict(), "broken_links": self.broken_links}),
+                       encoding="utf-8")
+        tmp.replace(self.checkpoint_path)
+        self._since_checkpoint = 0
+
+    # --- page work ---
+
+    async def _wait_ready(self, page):
+        try:
+            if self.ready_selector:
+                await page.wait_for_selector(self.ready_selector, timeout=self.idle_timeout_ms)
+            else:
+                await page.wait_for_load_state("networkidle", timeout=self.idle_timeout_ms)
+        except Exception:
+            pass  # long-polling pages never go idle; crawl what has rendered
+
+    async def _visit(self, page, url: str):
+        print(f"[CRAWL] Crawling: {url}")
+        await self.limiter.acquire(url)
+        try:
+            response = await page.goto(url, wait_until="domcontentloaded", timeout=10000)
+        finally:
+            self.limiter.release(url)
+
+        if not response:
+            self.broken_links.append({"url": url, "status": 0, "reason": "No response object"})
+            print(f"[FAIL] Broken: {url} (no response)")
+            return
+        if response.status >= 400:
+            self.broken_links.append({"url": url, "status": response.status, "reason": "HTTP Error"})
+            print(f"[FAIL] Broken: {url} ({response.status})")
+            return
+
+        await self._wait_ready(page)
+        hrefs = await page.eval_on_selector_all("a[href]", "els => els.map(e => e.href)")
+        for h in hrefs:
+            if h and self.accept(h) and self.frontier.add(h):
+                self._wake.set()
+
+    async def _worker(self):
+        context = await self.browser.new_context(**self.context_options)
+        page = await context.new_page()
+        if self.on_page:
+            self.on_page(page)
+        try:
+            while not self.frontier.finished:
+                url = self.frontier.next()
+                if url is None:
+                    # Others are still fetching pages that may add links
+                    self._wake.clear()
+                    await self._wake.wait()
+                    continue
+                try:
+                    await self._visit(page, url)
+                except Exception as e:
+                    self.broken_links.append({"url": url, "status": 0, "reason": str(e)})
+                    print(f"[FAIL] Failed: {url} - {str(e)}")
+                finally:
+                    self.frontier.done(url)
+                    self._since_checkpoint += 1
+                    if self._since_checkpoint >= CHECKPOINT_EVERY:
+                        self.save_checkpoint()
+                    self._wake.set()
+        finally:
+            self._wake.set()
+            await context.close()
+
+    async def run(self):
+        self.started_at = time.monotonic()
+        try:
+            await asyncio.gather(*(self._worker() for _ in range(self.workers)))
+        finally:
+            self.elapsed = time.monotonic() - self.started_at
+            self.save_checkpoint()
+        return self.frontier.visited
+
+    @property
+    def pages_per_minute(self) -> float:
+        return len(self.frontier.visited) / self.elapsed * 60 if self.elapsed else 0.0
@@ -6,11 +6,12 @@ import uuid
 import os
 from datetime import datetime, timezone
 from pathlib import Path
-from collections import deque
 from urllib.parse import urlparse
 
 from playwright.async_api import async_playwright
 
+from crawl_pool import CrawlPool, DEFAULT_WORKERS, DEFAULT_PER_HOST, DEFAULT_HOST_DELAY_MS
+
 # -----------------------------
 # CONFIG / DEFAULTS
 # -----------------------------
@@ -36,6 +37,7 @@ console_errors = []
 console_warnings = []
 network_failures = []
 journey_results = []
+crawl_stats = {}
 
 # -----------------------------
 # PATHS (portable)
@@ -61,10 +63,6 @@ def hostname(url: str) -> str:
     except Exception:
         return ""
 
-def normalize_url(url: str) -> str:
-    u = url.split("#")[0].rstrip("/")
-    return u
-
 def is_same_origin(url: str, base_url: str) -> bool:
     bu = parse_url(base_url)
     uu = parse_url(url)
@@ -95,47 +93,33 @@ def should_skip_url(url: str) -> bool:
     return False
 
 # -----------------------------
-# CRAWL (QUEUE-BASED)
+# CRAWL (CONCURRENT POOL)
 # -----------------------------
-async def crawl(page, start_url: str, base_url: str, max_pages: int):
-    start_url = normalize_url(start_url)
-    q = deque([start_url])
-
-    while q and len(visited) < max_pages:
-        url = normalize_url(q.popleft())
-        if url in visited: continue
-        if not is_same_origin(url, base_url): continue
-        if should_skip_url(url): continue
-
-        print(f"[CRAWL] Crawling: {url}")
-        visited.add(url)
-
-        try:
-            response = await page.goto(url, wait_until="domcontentloaded", timeout=10000)
-            await page.wait_for_timeout(300)
-
-            if not response:
-                broken_links.append({"url": url, "status": 0, "reason": "No response object"})
-                print(f"[FAIL] Broken: {url} (no response)")
-                continue
-
-            if response.status >= 400:
-                broken_links.append({"url": url, "status": response.status, "reason": "HTTP Error"})
-                print(f"[FAIL] Broken: {url} ({response.status})")
-                continue
-
-            hrefs = await page.eval_on_selector_all("a[href]", "els => els.map(e => e.href)")
-            for h in hrefs:
-                if not h: continue
-                h = normalize_url(h)
-                if h in visited: continue
-                if not is_same_origin(h, base_url): continue
-                if should_skip_url(h): continue
-                q.append(h)
-
-        except Exception as e:
-            broken_links.append({"url": url, "status": 0, "reason": str(e)})
-            print(f"[FAIL] Failed: {url} - {str(e)}")
+async def crawl(browser, start_url: str, base_url: str, max_pages: int, *, workers: int = DEFAULT_WORKERS,
+                per_host: int = DEFAULT_PER_HOST, host_delay_ms: int = DEFAULT_HOST_DELAY_MS,
+                ready_selector: str = None, context_options: dict = None, on_page=None,
+                checkpoint_path: Path = None, resume: bool = False):
+    def accept(url: str) -> bool:
+        return is_same_origin(url, base_url) and not should_skip_url(url)
+
+    pool = CrawlPool(
+        browser, start_url, accept,
+        max_pages=max_pages, workers=workers, per_host=per_host, host_delay_ms=host_delay_ms,
+        ready_selector=ready_selector, context_options=context_options, on_page=on_page,
+        checkpoint_path=checkpoint_path, resume=resume,
+    )
+    await pool.run()
+
+    visited.update(pool.frontier.visited)
+    broken_links.extend(pool.broken_links)
+    crawl_stats.update({
+        "workers": pool.workers,
+        "elapsed_sec": round(pool.elapsed, 2),
+        "pages_per_minute": round(pool.pages_per_minute, 1),
+    })
+    print(f"[CRAWL] {len(pool.frontier.visited)} pages in {pool.elapsed:.1f}s "
+          f"({pool.pages_per_minute:.0f} pages/min, {pool.workers} workers)")
+    return pool
 
 # -----------------------------
 # JOURNEY: GRANTS (INTAKE -> GENERATE)
@@ -296,6 +280,11 @@ async def main():
     parser.add_argument("--strict", action="store_true", help="Strict mode: fail on any console error and broken links")
     parser.add_argument("--strict-warnings", action="store_true", help="If set, warnings also fail the run")
     parser.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Browser contexts crawling in parallel")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help="Max concurrent requests per host")
+    parser.add_argument("--host-delay-ms", type=int, default=DEFAULT_HOST_DELAY_MS, help="Min gap between requests to one host")
+    parser.add_argument("--ready-selector", default=None, help="Wait for this selector instead of network-idle")
+    parser.add_argument("--resume", action="store_true", help="Resume the crawl from reports/crawl_checkpoint.json")
     args = parser.parse_args()
 
     strict_mode = args.strict
@@ -308,10 +297,11 @@ async def main():
 
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            user_agent="TITAN-Inspector/1.0",
-            extra_http_headers={"X-Titan-Inspector": "1"},
-        )
+        context_options = {
+            "user_agent": "TITAN-Inspector/1.0",
+            "extra_http_headers": {"X-Titan-Inspector": "1"},
+        }
+        context = await browser.new_context(**context_options)
         page = await context.new_page()
 
         def console_handler(msg):
@@ -339,17 +329,31 @@ async def main():
             except Exception:
                 network_failures.append(f"{req.method} {req.url if req else 'UNKNOWN'} - requestfailed")
 
-        page.on("console", console_handler)
-        page.on("requestfailed", request_failed)
+        def attach_listeners(pg):
+            pg.on("console", console_handler)
+            pg.on("requestfailed", request_failed)
+
+        attach_listeners(page)
+
+        crawl_kwargs = {
+            "workers": args.workers,
+            "per_host": args.per_host,
+            "host_delay_ms": args.host_delay_ms,
+            "ready_selector": args.ready_selector,
+            "context_options": context_options,
+            "on_page": attach_listeners,
+            "checkpoint_path": report_dir / "crawl_checkpoint.json",
+            "resume": args.resume,
+        }
 
         try:
             if args.mode == "crawl":
-                await crawl(page, args.url, base_url, max_pages)
+                await crawl(browser, args.url, base_url, max_pages, **crawl_kwargs)
             elif args.mode == "journey":
                 await run_journey_grants(page, base_url)
             elif args.mode == "both":
                 await run_journey_grants(page, base_url)
-                await crawl(page, args.url, base_url, max_pages)
+                await crawl(browser, args.url, base_url, max_pages, **crawl_kwargs)
 
         except Exception as e:
             print(f"[FAIL] CRITICAL INSPECTOR CRASH: {e}")
@@ -366,6 +370,7 @@ async def main():
                 "mode": args.mode,
                 "max_pages": max_pages,
                 "visited_count": len(visited),
+                "crawl": crawl_stats,
                 "broken_links": broken_links,
                 "console_errors": console_errors,
                 "console_warnings": console_warnings,
@@ -404,7 +409,8 @@ async def main():
                     "broken_links_count": len(broken_links),
                     "console_errors_count": len(console_errors),
                     "network_failures_count": len(network_failures),
-                    "journeys_count": len(journey_results)
+                    "journeys_count": len(journey_results),
+                    "pages_per_minute": crawl_stats.get("pages_per_minute", 0),
                 },
                 "next_steps": _next_steps(severity),
                 # Legacy Back-compat
@@ -26,6 +26,7 @@ Write-Host "[+] Created app directories" -ForegroundColor Green
 # 2. Copy Inspector
 Write-Host "[*] Copying Inspector..."
 Copy-Item -Path "$SourceDir\apps\inspector\inspector.py" -Destination "$InspectorDir\inspector.py" -Force
+Copy-Item -Path "$SourceDir\apps\inspector\crawl_pool.py" -Destination "$InspectorDir\crawl_pool.py" -Force
 # Create empty reports dir
 New-Item -ItemType Directory -Force -Path "$InspectorDir\reports\latest" | Out-Null
 
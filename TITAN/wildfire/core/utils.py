@@ -4,6 +4,11 @@ import time
 import httpx
 from typing import Optional, Dict, Any, List
 
+try:
+    from aogrl_ops_pack.supabase_client import SupabaseRest  # pooled client (py/, when installed)
+except ImportError:
+    SupabaseRest = None
+
 # Configuration
 SUPABASE_URL = os.environ.get("SUPABASE_URL", "").strip()
 SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY", "").strip()
@@ -23,24 +28,45 @@ def sb_url(table: str) -> str:
 def now_iso() -> str:
     return time.strftime("%Y-%m-%dT%H:%M:%S%z")
 
+_REST = None
+
+def shared_rest() -> Optional["SupabaseRest"]:
+    """Process-wide pooled PostgREST client (keep-alive, retries, latency metrics); None without aogrl_ops_pack."""
+    global _REST
+    if _REST is None and SupabaseRest is not None:
+        _REST = SupabaseRest(SUPABASE_URL, SUPABASE_KEY)
+    return _REST
+
 class SupabaseClient:
     def __init__(self):
         if not SUPABASE_URL or not SUPABASE_KEY:
             raise ValueError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY")
+        self.rest = shared_rest()
 
     def select(self, table: str, query: str) -> List[Dict]:
-        return httpx.get(f"{sb_url(table)}?{query}", headers=sb_headers()).json()
+        if self.rest is None:
+            return httpx.get(f"{sb_url(table)}?{query}", headers=sb_headers()).json()
+        return self.rest.get(table, query).json()
 
     def insert(self, table: str, payload: Dict) -> List[Dict]:
-        r = httpx.post(sb_url(table), headers=sb_headers(), json=payload)
+        if self.rest is None:
+            r = httpx.post(sb_url(table), headers=sb_headers(), json=payload)
+        else:
+            r = self.rest.post(table, payload)
         r.raise_for_status()
         return r.json()
 
     def patch(self, table: str, query: str, payload: Dict) -> List[Dict]:
-        r = httpx.patch(f"{sb_url(table)}?{query}", headers=sb_headers(), json=payload)
+        if self.rest is None:
+            r = httpx.patch(f"{sb_url(table)}?{query}", headers=sb_headers(), json=payload)
+        else:
+            r = self.rest.patch(table, query, payload)
         r.raise_for_status()
         return r.json()
 
+    def metrics(self) -> Dict[str, Dict]:
+        return self.rest.metrics() if self.rest is not None else {}
+
     def emit_event(self, source: str, event_type: str, message: str, payload: Dict = None, command_id: str = None, severity: str = "info"):
         payload = payload or {}
         # 1. Log to DB
@@ -0,0 +1,413 @@
+"""
+TITAN HR - Batch Engine (many clients, large payrolls)
+CSV chunks -> column-wise rules -> JSONL details + summary -> PDF -> Audit
+
+Same checks and evidence as validate_employees.run_validation, but:
+  - the CSV is streamed in chunks (memory stays flat at any payroll size)
+  - rules run over whole columns (NumPy arrays) instead of one employee at a time
+  - salaries are compared as scaled integers, so results stay exact-decimal
+    (non-trivial values such as exponents or >4 decimals fall back to Decimal)
+  - per-employee details go to validation.jsonl; only FAIL/WARNING rows stay in memory
+  - many client runs are processed concurrently in a process pool, PDF included
+
+Usage:
+  python batch_engine.py --month 2025-12 CID1=path/a.csv CID2=path/b.csv --workers 4
+"""
+
+import re
+import json
+import argparse
+from pathlib import Path
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import uuid4
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from audit import log_event
+import run_worker
+from run_worker import _require_month, _client_dirs, _build_pdf_data
+from validate_employees import load_rules
+
+CHUNK_ROWS = 50_000
+SCALE_DIGITS = 4
+SCALE = 10 ** SCALE_DIGITS
+
+# Non-negative plain decimals with <= SCALE_DIGITS decimals take the integer fast path
+_PLAIN_DECIMAL = rf"^\d+(?:\.\d{{0,{SCALE_DIGITS}}})?$"
+
+LEAVE_LIMIT = 21
+LEAVE_LOW = 5
+TAX_THRESHOLD = 3000
+
+COLUMN_DEFAULTS = {
+    "employee_id": "UNKNOWN",
+    "full_name": None,
+    "job_grade": None,
+    "hire_date": None,
+    "contract_type": "Permanent",
+    "salary": "",
+    "performance_status": "",
+    "increment_proposed": "false",
+    "leave_taken_annual": "",
+    "overtime_hours": "",
+}
+
+
+# -----------------------------
+# Exact decimals as scaled integers
+# -----------------------------
+def to_scaled(values: pd.Series):
+    """
+    Parse decimal strings into (scaled int64, fraction digits, Decimal fallbacks).
+    Blank means 0 (as `or 0` does in the per-employee validator). Rows that don't fit
+    the integer fast path are returned as {row_index: Decimal} and handled exactly.
+    """
+    s = values.fillna("").astype(str)
+    s = s.where(s != "", "0")
+    fast = s.str.match(_PLAIN_DECIMAL).to_numpy()
+
+    scaled = np.zeros(len(s), dtype=np.int64)
+    digits = np.zeros(len(s), dtype=np.int64)
+    if fast.any():
+        parts = s[fast].str.split(".", n=1, expand=True)
+        whole = parts[0].astype(np.int64).to_numpy()
+        if parts.shape[1] > 1:
+            frac_txt = parts[1].fillna("")
+        else:
+            frac_txt = pd.Series([""] * len(parts), index=parts.index)
+        digits[fast] = frac_txt.str.len().to_numpy()
+        frac = frac_txt.str.ljust(SCALE_DIGITS, "0").replace("", "0").astype(np.int64).to_numpy()
+        scaled[fast] = whole * SCALE + frac
+
+    fallback = {int(i): Decimal(s.iat[i]) for i in np.flatnonzero(~fast)}
+    return scaled, digits, fallback
+
+
+def format_scaled(value: int, digits: int) -> str:
+    """str(Decimal) of a scaled non-negative integer shown with `digits` decimals."""
+    whole, frac = divmod(value, SCALE)
+    if digits <= 0:
+        return str(whole)
+    return f"{whole}.{str(frac).rjust(SCALE_DIGITS, '0')[:digits]}"
+
+
+LEAVE_LIMIT_RULE = {"id": "WRA-2019-SEC24", "name": "Annual Leave Limit"}
+OVERTIME_RULE = {"id": "WRA-2019-SEC29", "name": "Overtime Payment"}
+TAX_RULE = {"id": "TAX-CSG-001", "name": "Statutory Contributions (Est.)"}
+
+
+def _check(rule_id: str, rule_name: str, verdict: str, evidence) -> dict:
+    return {"rule_id": rule_id, "rule_name": rule_name, "verdict": verdict, "evidence": evidence}
+
+
+def _leave_fail_check(taken: float) -> dict:
+    return _check(LEAVE_LIMIT_RULE["id"], LEAVE_LIMIT_RULE["name"], "FAIL",
+                  {"taken": taken, "limit": LEAVE_LIMIT, "gap": taken - LEAVE_LIMIT})
+
+
+# json.dumps(..., ensure_ascii=False) as used for the per-employee details
+_dumps = json.JSONEncoder(ensure_ascii=False).encode
+_JSON_ESCAPE = re.compile(r'[\x00-\x1f"\\]')
+
+
+def _json_strings(values: np.ndarray) -> list:
+    """_dumps of each str/None cell; the encoder only runs when some cell needs escaping."""
+    values = values.tolist()
+    if _JSON_ESCAPE.search("".join(v for v in values if v is not None)):
+        return [_dumps(v) for v in values]
+    return ["null" if v is None else f'"{v}"' for v in values]
+
+
+def _texts(values) -> np.ndarray:
+    """Object array of strings, ready for element-wise concatenation."""
+    out = np.empty(len(values), dtype=object)
+    out[:] = values
+    return out
+
+
+def _check_head(rule_id: str, rule_name: str) -> str:
+    """JSON text of a check up to its verdict value."""
+    return f'{{"rule_id": {_dumps(rule_id)}, "rule_name": {_dumps(rule_name)}, "verdict": '
+
+
+def _check_column(n: int, rows, text) -> np.ndarray:
+    """One check's JSON text where `rows` is set, "" elsewhere."""
+    out = np.full(n, "", dtype=object)
+    out[rows] = text
+    return out
+
+
+def _floats(values: pd.Series) -> np.ndarray:
+    """float(x or 0) for a whole column; non-numeric text raises ValueError like float() does."""
+    s = values.fillna("").astype(str)
+    return s.where(s != "", "0").to_numpy().astype(np.float64)
+
+
+# -----------------------------
+# Column-wise rule evaluation
+# -----------------------------
+def validate_chunk(df: pd.DataFrame, rules: dict, details_out=None):
+    """
+    Evaluates one chunk. Writes one JSON line per employee to `details_out` (if given)
+    and returns (rows, failures, findings), where findings holds only FAIL/WARNING checks.
+    """
+    n = len(df)
+    col = {c: (df[c] if c in df.columns else pd.Series([d] * n, index=df.index, dtype=object))
+           for c, d in COLUMN_DEFAULTS.items()}
+
+    fail = np.zeros(n, dtype=bool)
+
+    # 1. PRB26-SAL-001 salary floor (exact)
+    sal_rule = rules.get("PRB26-SAL-001")
+    if sal_rule:
+        floor = Decimal(str(sal_rule.get("value", 0)))
+        salary, sal_digits, sal_fallback = to_scaled(col["salary"])
+        floor_digits = max(-floor.as_tuple().exponent, 0)
+        floor_fast = floor >= 0 and floor_digits <= SCALE_DIGITS
+        if floor_fast:
+            floor_scaled = int(floor * SCALE)
+            sal_pass = salary >= floor_scaled
+        else:
+            sal_pass = np.zeros(n, dtype=bool)
+            sal_fallback = {i: sal_fallback.get(i, Decimal(format_scaled(salary[i], sal_digits[i])))
+                            for i in range(n)}
+        for i, d in sal_fallback.items():
+            sal_pass[i] = d >= floor
+        fail |= ~sal_pass
+        floor_str = str(floor)
+
+    # 2. PRB26-PMS-001 increment gate
+    pms_rule = rules.get("PRB26-PMS-001")
+    if pms_rule:
+        required = pms_rule["parameters"]["required_status"]
+        status = col["performance_status"].fillna("").astype(str).str.lower()
+        proposed = (col["increment_proposed"].fillna("false").astype(str).str.lower() == "true").to_numpy()
+        status_ok = status.isin(required).to_numpy()
+        pms_fail = proposed & ~status_ok
+        fail |= pms_fail
+        status_arr = status.to_numpy()
+
+    # 3. Annual leave, 4. overtime, 5. statutory contributions
+    leave = _floats(col["leave_taken_annual"])
+    leave_fail = leave > LEAVE_LIMIT
+    leave_low = leave < LEAVE_LOW
+    fail |= leave_fail
+    ot = _floats(col["overtime_hours"])
+    basic = _floats(col["salary"])
+    npf = basic * 0.06
+    nsf = basic * 0.025
+
+    # Missing cells of short rows are None, as csv.DictReader gives the per-employee validator
+    ids, names, grades, hires, contracts = (
+        col[c].astype(object).where(col[c].notna(), None).to_numpy()
+        for c in ("employee_id", "full_name", "job_grade", "hire_date", "contract_type"))
+
+    if pms_rule:
+        pms_skip = _check(pms_rule["id"], pms_rule["name"], "PASS",
+                          "No increment proposed, policy constraint not triggered.")
+    leave_warn = _check("WRA-2019-SEC24", "Annual Leave Utilization", "WARNING",
+                        "Employee has taken very few leave days (Risk of burnout/accumulation).")
+
+    # Salary evidence: employee salary for every row, gap only where the floor is missed
+    if sal_rule:
+        sal_str = _texts([format_scaled(v, d) for v, d in zip(salary.tolist(), sal_digits.tolist())])
+        sal_gap = np.full(n, "0", dtype=object)
+        if floor_fast:
+            short = ~sal_pass
+            short[list(sal_fallback)] = False
+            sal_gap[short] = [format_scaled(v, d) for v, d in zip(
+                (floor_scaled - salary[short]).tolist(), np.maximum(sal_digits[short], floor_digits).tolist())]
+        for i, d in sal_fallback.items():
+            sal_str[i] = str(d)
+            if not sal_pass[i]:
+                sal_gap[i] = str(floor - d)
+
+    flagged = fail | leave_low
+    if details_out is not None:
+        # One column of check JSON per rule ("" where the rule adds nothing), then one
+        # pass that joins each record into the text json.dumps gives the per-employee details
+        columns = []
+        if sal_rule:
+            verdict = np.where(sal_pass, '"PASS"', '"FAIL"').astype(object)
+            columns.append(_check_head(sal_rule["id"], sal_rule["name"]) + verdict
+                           + ', "evidence": {"employee_salary": "' + sal_str
+                           + f'", "floor_required": {_dumps(floor_str)}, "gap": "' + sal_gap + '"}}')
+        if pms_rule:
+            pms_col = _check_column(n, ~proposed, _dumps(pms_skip))
+            verdict = np.where(pms_fail[proposed], '"FAIL"', '"PASS"').astype(object)
+            status_json = _texts(_json_strings(status_arr[proposed]))
+            pms_col[proposed] = (_check_head(pms_rule["id"], pms_rule["name"]) + verdict
+                                 + ', "evidence": {"performance_status": ' + status_json
+                                 + f', "increment_proposed": true, "allowed_statuses": {_dumps(required)}}}}}')
+            columns.append(pms_col)
+        leave_col = _check_column(n, leave_low, _dumps(leave_warn))
+        leave_col[leave_fail] = [_dumps(_leave_fail_check(t)) for t in leave[leave_fail].tolist()]
+        columns.append(leave_col)
+        has_ot = ot > 0
+        columns.append(_check_column(n, has_ot, _check_head(OVERTIME_RULE["id"], OVERTIME_RULE["name"])
+                                     + '"INFO", "evidence": "Employee worked '
+                                     + _texts([repr(h) for h in ot[has_ot].tolist()])
+                                     + ' OT hours. Ensure paid at 1.5x hourly rate."}'))
+        taxed = basic > TAX_THRESHOLD
+        columns.append(_check_column(n, taxed, _check_head(TAX_RULE["id"], TAX_RULE["name"])
+                                     + '"INFO", "evidence": "Est. Employer Cost: NPF Rs '
+                                     + _texts([f"{v:.2f}" for v in npf[taxed].tolist()])
+                                     + ' | NSF Rs ' + _texts([f"{v:.2f}" for v in nsf[taxed].tolist()]) + '"}'))
+
+        record = ('{"employee_id": %s, "name": %s, "designation": %s, "hire_date": %s, '
+                  '"contract_type": %s, "checks": [%s]}\n')
+        people = [_json_strings(c) for c in (ids, names, grades, hires, contracts)]
+        checks = zip(*(c.tolist() for c in columns))
+        details_out.write("".join(record % (i, nm, g, h, c, ", ".join(filter(None, row)))
+                                  for i, nm, g, h, c, row in zip(*people, checks)))
+
+    # Findings (kept in memory for the PDF) are built only for FAIL/WARNING rows
+    rows = np.flatnonzero(flagged)
+    none = [None] * len(rows)
+    sal_bad = (~sal_pass[rows]).tolist() if sal_rule else none
+    pms_bad = pms_fail[rows].tolist() if pms_rule else none
+    findings = []
+    for i, s_bad, p_bad, l_bad, taken in zip(rows.tolist(), sal_bad, pms_bad,
+                                             leave_fail[rows].tolist(), leave[rows].tolist()):
+        checks = []
+        if s_bad:
+            checks.append(_check(sal_rule["id"], sal_rule["name"], "FAIL", {
+                "employee_salary": sal_str[i], "floor_required": floor_str, "gap": sal_gap[i]}))
+        if p_bad:
+            checks.append(_check(pms_rule["id"], pms_rule["name"], "FAIL", {
+                "performance_status": status_arr[i], "increment_proposed": True,
+                "allowed_statuses": required}))
+        if l_bad:
+            checks.append(_leave_fail_check(taken))
+        elif taken < LEAVE_LOW:
+            checks.append(leave_warn)
+        findings.append({
+            "employee_id": ids[i],
+            "name": names[i],
+            "designation": grades[i],
+            "hire_date": hires[i],
+            "contract_type": contracts[i],
+            "checks": checks,
+        })
+
+    return n, int(fail.sum()), findings
+
+
+def stream_validate(csv_path, rules_doc: dict, details_path: Path = None, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """
+    Validates a CSV of any size chunk by chunk. Returns the run_validation summary
+    fields plus `details` = FAIL/WARNING findings only (enough for _build_pdf_data).
+    """
+    rules = {r["id"]: r for r in rules_doc["rules"]}
+    result = {
+        "schema_version": "1.0",
+        "block": "TITAN-HR",
+        "block_version": "1.0.0",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "total_employees": 0,
+        "failures": 0,
+        "details": [],
+    }
+    out = open(details_path, "w", encoding="utf-8") if details_path else None
+    try:
+        reader = pd.read_csv(csv_path, encoding="utf-8-sig", dtype=str, keep_default_na=False,
+                             chunksize=chunk_rows)
+        for chunk in reader:
+            rows, failures, findings = validate_chunk(chunk, rules, out)
+            result["total_employees"] += rows
+            result["failures"] += failures
+            result["details"].extend(findings)
+    finally:
+        if out:
+            out.close()
+    return result
+
+
+# -----------------------------
+# One client run (executed inside a pool worker)
+# -----------------------------
+def process_run_streaming(client_cid: str, csv_path: str, month: str, make_pdf: bool = True,
+                          chunk_rows: int = CHUNK_ROWS) -> dict:
+    """Streaming twin of run_worker.process_run (same folders, audit events and result shape)."""
+    month = _require_month(month)
+    run_id = str(uuid4())
+
+    _, inbox_dir, working_dir, outputs_dir, _ = _client_dirs(client_cid, month)
+    inbox_dir.mkdir(parents=True, exist_ok=True)
+    working_dir.mkdir(parents=True, exist_ok=True)
+    outputs_dir.mkdir(parents=True, exist_ok=True)
+
+    def audit(event_type, payload, status="OK"):
+        log_event(data_root=str(run_worker.DATA_ROOT), event_type=event_type, client_cid=client_cid,
+                  run_id=run_id, payload=payload, status=status)
+
+    audit("RUN_STARTED", {"csv_path": str(csv_path), "month": month, "mode": "batch"})
+    try:
+        rules_doc = load_rules(run_worker.RULES_FILE)
+        audit("RULES_LOADED", {"rules_version": rules_doc.get("version"), "rules_count": len(rules_doc.get("rules", []))})
+
+        details_path = working_dir / "validation.jsonl"
+        validation_result = stream_validate(csv_path, rules_doc, details_path, chunk_rows)
+
+        json_path = working_dir / "validation.json"
+        summary = {k: v for k, v in validation_result.items() if k != "details"}
+        summary["details_jsonl"] = str(details_path)
+        json_path.write_text(json.dumps(summary, indent=2, ensure_ascii=False), encoding="utf-8")
+        audit("VALIDATION_COMPLETE", {
+            "total_employees": validation_result.get("total_employees"),
+            "failures": validation_result.get("failures"),
+            "json_path": str(json_path),
+        })
+
+        pdf_data = _build_pdf_data(validation_result, month)
+        pdf_path = None
+        if make_pdf:
+            from pdf_generator import CompliancePDFGenerator
+            pdf_gen = CompliancePDFGenerator(str(outputs_dir))
+            pdf_filename = f"HR_Compliance_Report_{client_cid}_{month}.pdf"
+            pdf_path = pdf_gen.generate_report(client_cid, month, pdf_data, filename=pdf_filename)
+            audit("REPORT_GENERATED", {"pdf_path": str(pdf_path), "score": pdf_data.get("compliance_score")})
+
+        audit("RUN_FINISHED", {"status": "SUCCESS"})
+        return {
+            "status": "SUCCESS",
+            "client_cid": client_cid,
+            "run_id": run_id,
+            "month": month,
+            "score": pdf_data.get("compliance_score"),
+            "total_employees": validation_result["total_employees"],
+            "validation_json": str(json_path),
+            "pdf_path": str(pdf_path) if pdf_path else None,
+        }
+    except Exception as e:
+        audit("RUN_FAILED", {"error": str(e)}, status="FAIL")
+        return {"status": "FAIL", "client_cid": client_cid, "run_id": run_id, "error": str(e)}
+
+
+def run_batch(runs, month: str, workers: int = None, make_pdf: bool = True) -> list:
+    """runs: [(client_cid, csv_path), ...]. Each client runs in its own pool worker."""
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(process_run_streaming, cid, path, month, make_pdf): cid for cid, path in runs}
+        for fut in as_completed(futures):
+            res = fut.result()
+            print(f"[{res['status']}] {futures[fut]}: {res.get('total_employees', '-')} employees, "
+                  f"score {res.get('score', '-')}")
+            results.append(res)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TITAN-HR batch compliance runs")
+    parser.add_argument("runs", nargs="+", help="CID=path/to/employees.csv")
+    parser.add_argument("--month", required=True, help="YYYY-MM")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--no-pdf", action="store_true")
+    args = parser.parse_args()
+
+    jobs = [tuple(r.split("=", 1)) for r in args.runs]
+    out = run_batch(jobs, args.month, args.workers, make_pdf=not args.no_pdf)
+    print(json.dumps(out, indent=2))
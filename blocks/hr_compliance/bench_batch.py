@@ -0,0 +1,126 @@
+"""
+TITAN HR - Batch Engine benchmark
+Compares the per-employee validator (csv -> list of dicts -> run_validation) with the
+streaming column-wise engine on a large synthetic payroll, each in its own process so
+peak RSS is measured cleanly, then checks parity and times a multi-client batch with PDFs.
+
+    python bench_batch.py [--rows 500000] [--clients 4] [--workers 4]
+"""
+
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+from pathlib import Path
+
+import batch_engine
+import run_worker
+from generate_dataset import make_employees, write_csv
+from validate_employees import load_rules, load_employees, run_validation, RULES_FILE
+
+EDGE_ROWS = [
+    # salary edge cases: decimals, trailing dot, leading zeros, blank, exponent, >4 decimals, negative
+    {"salary": "16499.99"}, {"salary": "16500."}, {"salary": "016500.0"}, {"salary": ""},
+    {"salary": "1.65e4"}, {"salary": "16499.999999"}, {"salary": "-20"}, {"salary": "3000.5"},
+    {"leave_taken_annual": "", "overtime_hours": "2.5"}, {"leave_taken_annual": "21.5"},
+    {"increment_proposed": "TRUE", "performance_status": "Satisfactory"},
+    {"increment_proposed": "True", "performance_status": ""},
+]
+
+
+def _measure(mode: str, csv_path: str, out_dir: str):
+    rules_doc = load_rules(RULES_FILE)
+    start = time.perf_counter()
+    if mode == "legacy":
+        result = run_validation(load_employees(Path(csv_path)), rules_doc)
+        Path(out_dir, "legacy.json").write_text(json.dumps(result), encoding="utf-8")
+    else:
+        result = batch_engine.stream_validate(csv_path, rules_doc, Path(out_dir, "stream.jsonl"))
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"rows": result["total_employees"], "failures": result["failures"],
+                      "seconds": elapsed, "peak_mb": peak_mb}))
+
+
+def measure(mode: str, csv_path: Path, out_dir: Path) -> dict:
+    out = subprocess.run([sys.executable, __file__, "--measure", mode, str(csv_path), str(out_dir)],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def check_parity(csv_path: Path, tmp: Path) -> bool:
+    rules_doc = load_rules(RULES_FILE)
+    legacy = run_validation(load_employees(csv_path), rules_doc)
+    jsonl = tmp / "parity.jsonl"
+    stream = batch_engine.stream_validate(csv_path, rules_doc, jsonl, chunk_rows=97)
+    lines = jsonl.read_text(encoding="utf-8").splitlines()
+
+    ok = lines == [json.dumps(d, ensure_ascii=False) for d in legacy["details"]]
+    ok &= (stream["total_employees"], stream["failures"]) == (legacy["total_employees"], legacy["failures"])
+    ok &= run_worker._build_pdf_data(stream, "2025-12") == run_worker._build_pdf_data(legacy, "2025-12")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the HR batch engine")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        # Parity: generated payroll plus hand-written edge cases
+        employees = make_employees(1500, 600)
+        for i, edge in enumerate(EDGE_ROWS):
+            employees[i * 7].update(edge)
+        parity_csv = tmp / "parity.csv"
+        write_csv(parity_csv, employees)
+        parity_ok = check_parity(parity_csv, tmp)
+        print(f"parity (details, totals, pdf data): {'PASS' if parity_ok else 'FAIL'}")
+
+        # Large payroll: per-employee vs streaming
+        big = make_employees(int(args.rows * 150 / 210), args.rows - int(args.rows * 150 / 210))
+        big_csv = tmp / "big.csv"
+        write_csv(big_csv, big)
+        del big
+        print(f"\n{args.rows} rows ({big_csv.stat().st_size / 1e6:.0f} MB CSV)")
+        print(f"{'':<22} {'rows/s':>10} {'seconds':>9} {'peak RSS':>10}")
+        for label, mode in (("per-employee", "legacy"), ("streaming columnar", "stream")):
+            r = measure(mode, big_csv, tmp)
+            print(f"{label:<22} {r['rows'] / r['seconds']:>10,.0f} {r['seconds']:>8.1f}s {r['peak_mb']:>7.0f} MB")
+
+        # Multi-client batch with PDFs
+        run_worker.DATA_ROOT = tmp / "data"
+        run_worker.RULES_FILE = RULES_FILE
+        runs = []
+        for c in range(args.clients):
+            path = tmp / f"client{c}.csv"
+            write_csv(path, make_employees(1500, 600))
+            runs.append((f"CID{c:03d}", str(path)))
+
+        start = time.perf_counter()
+        for cid, path in runs:
+            batch_engine.process_run_streaming(cid, path, "2025-12")
+        serial = time.perf_counter() - start
+        start = time.perf_counter()
+        results = batch_engine.run_batch(runs, "2025-12", args.workers)
+        pooled = time.perf_counter() - start
+        batch_ok = all(r["status"] == "SUCCESS" and Path(r["pdf_path"]).exists() for r in results)
+        print(f"\n{args.clients} clients x 2100 rows + PDF: one by one {serial:.1f}s, "
+              f"pool {pooled:.1f}s ({args.workers or 'all'} workers)")
+
+    ok = parity_ok and batch_ok
+    print("RESULT:", "PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "--measure":
+        _measure(*sys.argv[2:])
+    else:
+        main()
@@ -0,0 +1,125 @@
+"""
+PRB search benchmark
+Query latency of the old linear substring scan vs the BM25 inverted index, plus
+get_page_text with and without the page-text cache (needs pdfplumber). Checks that a
+word still finds its longer forms (as the substring scan did) and that searches from
+several threads, during a rebuild, return the single-threaded results.
+
+    python bench_prb_search.py [repeats]
+"""
+import sys
+import time
+import json
+import threading
+from pathlib import Path
+
+from prb_search import PRBDocumentSearch
+
+DOCS = Path(__file__).parent / "docs"
+QUERIES = [
+    "What is the salary floor for 2026?",
+    "increment eligibility rules",
+    "Rs 16,500 minimum salary",
+    "long service increment",
+    "teacher allowance",
+    "bad road allowance motorcycles",
+]
+
+
+def legacy_search(v2: dict, v1: dict, query: str) -> list:
+    """The scan PRBDocumentSearch.search did before the index: substring counts over every entry."""
+    stop_words = {'what', 'is', 'the', 'a', 'an', 'for', 'in', 'on', 'at', 'to', 'of'}
+    keywords = [w for w in query.lower().split() if w not in stop_words and len(w) > 2]
+    results = []
+    for finding in v2.get('key_findings', []):
+        snippet = finding.get('snippet', '') + finding.get('text', '')
+        matches = sum(1 for kw in keywords if kw in snippet.lower())
+        if matches:
+            results.append({'page': finding.get('page'), 'relevance': matches})
+    for table in v2.get('salary_tables', []):
+        table_lower = str(table.get('data', '')).lower()
+        matches = sum(1 for kw in keywords if kw in table_lower)
+        if matches:
+            results.append({'page': table.get('page'), 'relevance': matches})
+    if "salary" in keywords or "increment" in keywords or "16500" in keywords:
+        for rule in v1.get('increment_rules', []):
+            matches = sum(1 for kw in keywords if kw in rule.get('snippet', '').lower())
+            if matches:
+                results.append({'page': rule.get('page'), 'relevance': matches})
+    results.sort(key=lambda x: x['relevance'], reverse=True)
+    return results[:10]
+
+
+def per_query_us(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for q in QUERIES:
+            fn(q)
+    return (time.perf_counter() - start) / (repeats * len(QUERIES)) * 1e6
+
+
+def main(repeats: int = 200):
+    v2 = json.loads((DOCS / "extracted_data.json").read_text(encoding="utf-8"))
+    v1 = json.loads((DOCS / "master_salary_table.json").read_text(encoding="utf-8"))
+
+    (DOCS / "prb_index.sqlite").unlink(missing_ok=True)
+    start = time.perf_counter()
+    searcher = PRBDocumentSearch(str(DOCS))
+    build_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    PRBDocumentSearch(str(DOCS))
+    open_ms = (time.perf_counter() - start) * 1000
+    print(f"index: {searcher.index.n_entries} entries, cold build {build_ms:.0f} ms, reopen {open_ms:.0f} ms")
+
+    scan = per_query_us(lambda q: legacy_search(v2, v1, q), repeats)
+    indexed = per_query_us(searcher.search, repeats)
+    ranged = per_query_us(lambda q: searcher.search_salary_range(2000, 2500), repeats)
+    print(f"{'linear scan':<22} {scan:>8.0f} us/query")
+    print(f"{'BM25 index':<22} {indexed:>8.0f} us/query ({scan / indexed:.1f}x)")
+    print(f"{'salary range query':<22} {ranged:>8.0f} us/query")
+
+    def hits(q):
+        return {(r['volume'], r['page'], r['type'], r['text']) for r in searcher.index.search(q, limit=10_000)}
+
+    longer = hits("increments")
+    print(f"'increment' finds the {len(longer)} entries for 'increments': {bool(longer) and longer <= hits('increment')}")
+
+    expected = {q: searcher.search(q) for q in QUERIES}
+    errors, mismatches = [], []
+
+    def worker():
+        try:
+            for _ in range(20):
+                for q in QUERIES:
+                    if [r['text'] for r in searcher.search(q)] != [r['text'] for r in expected[q]]:
+                        mismatches.append(q)
+        except Exception as e:
+            errors.append(repr(e))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for _ in range(5):
+        searcher.index.build()
+    for t in threads:
+        t.join()
+    print(f"8 threads searching during 5 rebuilds: {len(errors)} errors, {len(mismatches)} mismatched results")
+
+    try:
+        import pdfplumber  # noqa: F401
+    except ImportError:
+        print("page text: pdfplumber not installed, skipped")
+        return
+    pdf = str(searcher.volume1_path)
+    start = time.perf_counter()
+    searcher.get_page_text(pdf, 431)
+    cold = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for _ in range(repeats):
+        searcher.get_page_text(pdf, 431)
+    warm = (time.perf_counter() - start) / repeats * 1000
+    print(f"page text: pdfplumber {cold:.0f} ms, cached {warm:.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -30,11 +30,15 @@ def get_creative_name(is_local=True):
 
 OUTPUT_FILE = "F:/AION-ZERO/data/clients/AOGRL-001/inbox/aogrl_test_data_210.csv"
 
-def generate_data():
+FIELDNAMES = ["employee_id", "full_name", "salary", "performance_status",
+              "increment_proposed", "hire_date", "job_grade", "contract_type",
+              "leave_taken_annual", "leave_taken_sick", "overtime_hours"]
+
+def make_employees(n_local=150, n_expat=60):
     employees = []
     
     # 1. Locals (150)
-    for i in range(150):
+    for i in range(n_local):
         # 10% chance of salary violation (below 16500)
         is_violation_salary = random.random() < 0.1
         salary = random.randint(15500, 16400) if is_violation_salary else random.randint(17000, 45000)
@@ -57,7 +61,7 @@ def generate_data():
         })
 
     # 2. Imported Labor (60)
-    for i in range(60):
+    for i in range(n_expat):
         # Expats usually strictly managed
         leave = random.randint(22, 40) if random.random() < 0.05 else random.randint(0, 21)
         
@@ -75,16 +79,26 @@ def generate_data():
             "overtime_hours": random.randint(0, 50) 
         })
         
+    return employees
+
+def write_csv(path, employees):
     # Write CSV (Strict Schema)
-    with open(OUTPUT_FILE, 'w', newline='') as f:
-        fieldnames = ["employee_id", "full_name", "salary", "performance_status", 
-                      "increment_proposed", "hire_date", "job_grade", "contract_type",
-                      "leave_taken_annual", "leave_taken_sick", "overtime_hours"]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
         writer.writeheader()
         writer.writerows(employees)
-        
-    print(f"Generated {len(employees)} rows at {OUTPUT_FILE}")
+
+def generate_data(output_file=OUTPUT_FILE, rows=210):
+    # Keep the 150:60 local/expat mix at any size
+    n_local = rows * 150 // 210
+    employees = make_employees(n_local, rows - n_local)
+    write_csv(output_file, employees)
+    print(f"Generated {len(employees)} rows at {output_file}")
 
 if __name__ == "__main__":
-    generate_data()
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate synthetic employee CSV")
+    parser.add_argument("--rows", type=int, default=210)
+    parser.add_argument("--out", default=OUTPUT_FILE)
+    args = parser.parse_args()
+    generate_data(args.out, args.rows)
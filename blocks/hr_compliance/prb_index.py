@@ -0,0 +1,396 @@
+"""
+PRB Search Index
+Persistent inverted index over the extracted PRB data (and cached PDF page text)
+
+docs/prb_index.sqlite holds:
+  entries    - one row per searchable item (key finding, salary table, increment rule, page)
+  postings   - term -> entry, term frequency (words, word bigrams, grade labels);
+               a query word also matches indexed words it is a prefix of ('increment' -> 'increments')
+  amounts    - Rs amounts found in salary table rows, for range queries
+  page_text  - extracted page text keyed by PDF hash (pdfplumber runs once per page)
+  meta       - source signature; the index rebuilds itself when the inputs change
+
+Usage:
+  python prb_index.py --build [--pages]     # --pages extracts every PDF page into the cache first
+  python prb_index.py "long service increment"
+  python prb_index.py --range 2000 2500
+"""
+import json
+import math
+import re
+import sqlite3
+import hashlib
+import threading
+import argparse
+from pathlib import Path
+from typing import List, Dict, Optional, Iterable
+
+INDEX_FILE = "prb_index.sqlite"
+INDEX_VERSION = "1"
+
+VOLUME1 = "Volume 1 (General Conditions)"
+VOLUME2 = "Volume 2 (Parastatal Bodies)"
+
+STOP_WORDS = {'what', 'is', 'the', 'a', 'an', 'for', 'in', 'on', 'at', 'to', 'of', 'and', 'or', 'be', 'by', 'as'}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Rs amounts in salary/allowance tables (thousand separators allowed, times like 0900 are not amounts)
+_AMOUNT_RE = re.compile(r'(?<![\d.])([1-9]\d{0,2}(?:,\d{3})+|[1-9]\d{2,6})(?![\d.])')
+_WORD_RE = re.compile(r"[a-z0-9]+(?:,\d{3})*")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    volume TEXT, page INTEGER, type TEXT, text TEXT, pdf_path TEXT, length INTEGER
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT, entry_id INTEGER, tf INTEGER,
+    PRIMARY KEY (term, entry_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS amounts (
+    entry_id INTEGER, row INTEGER, grade TEXT, amount INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_amounts_amount ON amounts(amount);
+CREATE TABLE IF NOT EXISTS page_text (
+    pdf_hash TEXT, page INTEGER, text TEXT,
+    PRIMARY KEY (pdf_hash, page)
+) WITHOUT ROWID;
+"""
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words; '16,500' -> '16500'; stop words and 1-2 letter words dropped (numbers kept)."""
+    words = [w.replace(',', '') for w in _WORD_RE.findall(text.lower())]
+    return [w for w in words if w not in STOP_WORDS and (len(w) > 2 or w.isdigit())]
+
+
+def terms_for(text: str, grades: Iterable[str] = ()) -> List[str]:
+    """Index terms: words, word bigrams ('long_service') and whole grade labels ('grade:teacher senior teacher')."""
+    words = tokenize(text)
+    terms = words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+    terms += [f"grade:{g}" for g in (grade_key(x) for x in grades) if g]
+    return terms
+
+
+def grade_key(label) -> str:
+    return " ".join(tokenize(str(label or "")))
+
+
+def file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class PRBIndex:
+    def __init__(self, docs_dir: Path, volume1_path: Path, volume2_path: Path):
+        self.docs_dir = Path(docs_dir)
+        self.pdfs = {VOLUME1: Path(volume1_path), VOLUME2: Path(volume2_path)}
+        # No docs directory (e.g. the default Windows path on another machine): an empty in-memory index
+        self.db_path = self.docs_dir / INDEX_FILE if self.docs_dir.is_dir() else None
+        # One connection shared by the Streamlit session threads; every use holds self.lock
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(str(self.db_path or ":memory:"), check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self._hashes = {}  # path -> (mtime, size, sha256)
+        self._stamp = None
+        self.ensure_current()
+
+    # -----------------------------
+    # Build
+    # -----------------------------
+    def source_hash(self, path) -> Optional[str]:
+        """sha256 of a source file, re-hashed only when its mtime/size change."""
+        path = Path(path)
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        cached = self._hashes.get(str(path))
+        if cached and cached[:2] == (st.st_mtime, st.st_size):
+            return cached[2]
+        digest = file_hash(path)
+        self._hashes[str(path)] = (st.st_mtime, st.st_size, digest)
+        return digest
+
+    def _signature(self) -> str:
+        # Page rows cached lazily by page_text() are not part of the signature (a cache miss must not
+        # force a rebuild); extract_all_pages() + build() brings them into the index.
+        parts = [INDEX_VERSION]
+        for name in ("extracted_data.json", "master_salary_table.json"):
+            path = self.docs_dir / name
+            parts.append(self.source_hash(path) or "-")
+        for pdf in self.pdfs.values():
+            parts.append(self.source_hash(pdf) or "-")
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+    def _sources_stamp(self) -> tuple:
+        stamp = []
+        for path in [self.docs_dir / "extracted_data.json", self.docs_dir / "master_salary_table.json", *self.pdfs.values()]:
+            try:
+                st = path.stat()
+                stamp.append((st.st_mtime, st.st_size))
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def ensure_current(self) -> bool:
+        """Rebuilds the index if the JSON or the PDFs changed. Returns True if rebuilt."""
+        stamp = self._sources_stamp()
+        with self.lock:
+            if stamp == self._stamp:
+                return False
+            self._stamp = stamp
+            sig = self._signature()
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+            if row and row[0] == sig:
+                self._load_stats()
+                return False
+            self.build(sig)
+            return True
+
+    def _load_json(self, filename: str) -> dict:
+        path = self.docs_dir / filename
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _entries(self):
+        """Yields (volume, page, type, display_text, index_text, grades, amount_rows)."""
+        v2 = self._load_json("extracted_data.json")
+        v1 = self._load_json("master_salary_table.json")
+
+        for finding in v2.get('key_findings', []):
+            snippet = finding.get('snippet', '') + finding.get('text', '')
+            yield VOLUME2, finding.get('page'), finding.get('type', 'general'), snippet[:300], snippet, (), ()
+
+        for table in v2.get('salary_tables', []):
+            data = table.get('data') or []
+            grades, rows = [], []
+            for r, cells in enumerate(data):
+                cells = [str(c) for c in (cells or []) if c]
+                if not cells:
+                    continue
+                grade = cells[0].replace('\n', ' ')
+                grades.append(grade)
+                for cell in cells[1:]:
+                    for m in _AMOUNT_RE.findall(cell):
+                        rows.append((r, grade, int(m.replace(',', ''))))
+            yield (VOLUME2, table.get('page'), 'salary_table',
+                   f"Salary/Allowance table found (Table {table.get('table_index', 0)})",
+                   str(data), grades, rows)
+
+        for rule in v1.get('increment_rules', []):
+            snippet = rule.get('snippet', '')
+            yield VOLUME1, rule.get('page'), 'increment_rule', snippet[:300], snippet, (), ()
+
+        salary_floor = v1.get('salary_floor')
+        if salary_floor:
+            text = salary_floor.get('context', 'Rs 16,500 minimum salary floor')
+            yield VOLUME1, salary_floor.get('page'), 'salary_floor', text, f"{text} salary floor minimum 16500", (), ()
+
+        for volume, pdf in self.pdfs.items():
+            digest = self.source_hash(pdf)
+            for page, text in self.conn.execute(
+                    "SELECT page, text FROM page_text WHERE pdf_hash = ? ORDER BY page", (digest,)):
+                if text:
+                    yield volume, page, 'page', text[:300], text, (), ()
+
+    def build(self, signature: str = None):
+        conn = self.conn
+        with self.lock, conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM postings")
+            conn.execute("DELETE FROM amounts")
+            for volume, page, kind, display, text, grades, amounts in self._entries():
+                terms = terms_for(text, grades)
+                cur = conn.execute(
+                    "INSERT INTO entries (volume, page, type, text, pdf_path, length) VALUES (?, ?, ?, ?, ?, ?)",
+                    (volume, page, kind, display, str(self.pdfs[volume]), len(terms)))
+                entry_id = cur.lastrowid
+                tf = {}
+                for t in terms:
+                    tf[t] = tf.get(t, 0) + 1
+                conn.executemany("INSERT INTO postings VALUES (?, ?, ?)",
+                                 [(t, entry_id, n) for t, n in tf.items()])
+                conn.executemany("INSERT INTO amounts VALUES (?, ?, ?, ?)",
+                                 [(entry_id, r, grade_key(g), a) for r, g, a in amounts])
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('signature', ?)", (signature or self._signature(),))
+            self._load_stats()
+
+    def _load_stats(self):
+        n, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM entries").fetchone()
+        self.n_entries = n
+        self.avg_length = (total / n) if n else 0.0
+        self._lengths = dict(self.conn.execute("SELECT id, length FROM entries"))
+
+    # -----------------------------
+    # Query
+    # -----------------------------
+    def search(self, query: str, limit: int = 10, salary_min: int = None, salary_max: int = None,
+               grade: str = None) -> List[Dict]:
+        """
+        BM25 over words + bigrams; a word matches every indexed word it is a prefix of, and those
+        count as one term. salary_min/salary_max/grade restrict results to salary tables with a
+        matching row. relevance is scaled 0-5 against the best hit; score is raw BM25.
+        """
+        with self.lock:
+            return self._search(query, limit, salary_min, salary_max, grade)
+
+    def _search(self, query, limit, salary_min, salary_max, grade) -> List[Dict]:
+        words = tokenize(query)
+        terms = list(dict.fromkeys(words + [f"{a}_{b}" for a, b in zip(words, words[1:])]))
+        allowed = None
+        if salary_min is not None or salary_max is not None or grade:
+            allowed = {r["entry_id"] for r in self.salary_range(salary_min, salary_max, grade)}
+            if not terms:
+                return self._range_entries(allowed, limit)
+
+        if not terms or not self.n_entries:
+            return []
+        variants = {t: self._expand(t) for t in terms}
+        query_term = {v: t for t, vs in variants.items() for v in vs}
+        placeholders = ",".join("?" * len(query_term))
+        rows = self.conn.execute(
+            f"SELECT term, entry_id, tf FROM postings WHERE term IN ({placeholders})", list(query_term)).fetchall()
+
+        tfs = {}
+        for term, entry_id, tf in rows:
+            plist = tfs.setdefault(query_term[term], {})
+            plist[entry_id] = plist.get(entry_id, 0) + tf
+        postings = {term: list(plist.items()) for term, plist in tfs.items()}
+
+        scores = {}
+        for term, plist in postings.items():
+            idf = math.log(1 + (self.n_entries - len(plist) + 0.5) / (len(plist) + 0.5))
+            for entry_id, tf in plist:
+                if allowed is not None and entry_id not in allowed:
+                    continue
+                norm = tf + K1 * (1 - B + B * self._lengths[entry_id] / self.avg_length)
+                scores[entry_id] = scores.get(entry_id, 0.0) + idf * tf * (K1 + 1) / norm
+
+        top = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+        if not top:
+            return []
+        best = top[0][1]
+        entries = self._fetch([entry_id for entry_id, _ in top])
+        return [dict(entries[entry_id], relevance=round(5 * score / best, 1), score=round(score, 3))
+                for entry_id, score in top]
+
+    def _expand(self, term: str) -> List[str]:
+        """Indexed words starting with a query word ('increment' -> increment, increments, incremental).
+        Numbers, bigrams and grade labels only match exactly."""
+        if not term.isalpha():
+            return [term]
+        rows = self.conn.execute(
+            "SELECT DISTINCT term FROM postings WHERE term >= ? AND term < ? "
+            "AND instr(term, '_') = 0 AND instr(term, ':') = 0", (term, term + "\uffff")).fetchall()
+        return [t for (t,) in rows] or [term]
+
+    def salary_range(self, salary_min: int = None, salary_max: int = None, grade: str = None) -> List[Dict]:
+        """Salary table rows with an amount in [salary_min, salary_max] (either bound optional)."""
+        sql = "SELECT entry_id, row, grade, amount FROM amounts WHERE 1 = 1"
+        args = []
+        if salary_min is not None:
+            sql += " AND amount >= ?"
+            args.append(int(salary_min))
+        if salary_max is not None:
+            sql += " AND amount <= ?"
+            args.append(int(salary_max))
+        if grade:
+            sql += " AND grade LIKE ?"
+            args.append(f"%{grade_key(grade)}%")
+        with self.lock:
+            rows = self.conn.execute(sql + " ORDER BY amount", args).fetchall()
+            entries = self._fetch({r[0] for r in rows})
+        return [dict(entries[e], entry_id=e, row=r, grade=g, amount=a) for e, r, g, a in rows]
+
+    def _range_entries(self, entry_ids, limit: int) -> List[Dict]:
+        entries = self._fetch(entry_ids)
+        return [dict(e, relevance=5, score=0.0) for e in sorted(entries.values(), key=lambda e: e["page"] or 0)][:limit]
+
+    def _fetch(self, entry_ids) -> Dict[int, Dict]:
+        ids = list(entry_ids)
+        if not ids:
+            return {}
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT id, volume, page, type, text, pdf_path FROM entries WHERE id IN ({','.join('?' * len(ids))})",
+                ids).fetchall()
+        return {r[0]: {'volume': r[1], 'page': r[2], 'type': r[3], 'text': r[4], 'pdf_path': r[5]} for r in rows}
+
+    # -----------------------------
+    # Page text cache
+    # -----------------------------
+    def page_text(self, pdf_path: str, page_num: int) -> str:
+        """Full text of one page; pdfplumber only runs on a cache miss."""
+        digest = self.source_hash(pdf_path)
+        if digest is None:
+            return f"Error extracting page: file not found: {pdf_path}"
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT text FROM page_text WHERE pdf_hash = ? AND page = ?", (digest, page_num)).fetchone()
+        if row:
+            return row[0]
+        try:
+            import pdfplumber
+            with pdfplumber.open(pdf_path) as pdf:
+                if not 0 < page_num <= len(pdf.pages):
+                    return ""
+                text = pdf.pages[page_num - 1].extract_text() or ""
+        except Exception as e:
+            return f"Error extracting page: {e}"
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO page_text VALUES (?, ?, ?)", (digest, page_num, text))
+        return text
+
+    def extract_all_pages(self):
+        """Fills the page cache for both volumes (needed once for full-text page search)."""
+        import pdfplumber
+        for volume, pdf_path in self.pdfs.items():
+            digest = self.source_hash(pdf_path)
+            if digest is None:
+                continue
+            with self.lock:
+                done = {p for (p,) in self.conn.execute("SELECT page FROM page_text WHERE pdf_hash = ?", (digest,))}
+            with pdfplumber.open(str(pdf_path)) as pdf:
+                for i, page in enumerate(pdf.pages, 1):
+                    if i in done:
+                        continue
+                    text = page.extract_text() or ""
+                    with self.lock, self.conn:
+                        self.conn.execute("INSERT OR REPLACE INTO page_text VALUES (?, ?, ?)", (digest, i, text))
+            print(f"   {volume}: {len(pdf.pages)} pages cached")
+
+
+if __name__ == "__main__":
+    from prb_search import PRBDocumentSearch
+
+    parser = argparse.ArgumentParser(description="PRB search index")
+    parser.add_argument("query", nargs="?", default="")
+    parser.add_argument("--docs", default=None, help="docs directory (default: PRBDocumentSearch default)")
+    parser.add_argument("--build", action="store_true", help="rebuild the index")
+    parser.add_argument("--pages", action="store_true", help="extract all PDF pages into the cache first")
+    parser.add_argument("--range", nargs=2, type=int, metavar=("MIN", "MAX"))
+    args = parser.parse_args()
+
+    searcher = PRBDocumentSearch(args.docs) if args.docs else PRBDocumentSearch()
+    index = searcher.index
+    if args.pages:
+        index.extract_all_pages()
+    if args.build or args.pages:
+        index.ensure_current() or index.build()
+        print(f"🔹 Indexed {index.n_entries} entries -> {index.db_path}")
+    if args.range:
+        for r in index.salary_range(*args.range):
+            print(f"Rs {r['amount']:>7}  p.{r['page']:<4} {r['grade'][:60]}")
+    elif args.query:
+        for r in index.search(args.query):
+            print(f"{r['relevance']:>4}  {r['volume']} p.{r['page']}  [{r['type']}]  {r['text'][:100]!r}")
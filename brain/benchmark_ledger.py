@@ -0,0 +1,95 @@
+# F:\AION-ZERO\brain\benchmark_ledger.py
+"""
+Benchmark for the Loop-5 ledger write path.
+
+    python brain/benchmark_ledger.py [requests]
+
+Runs against a throwaway DB. Reports:
+  - events/second: inline commits (AZ_LEDGER_SYNC=1, the old path) vs write-behind
+  - p50/p99 latency a Citadel request pays for its ledger calls
+    (_ledger_event + _ledger_outcome, like /api/status)
+  - redaction time on 200 KB blobs: per-key re.sub loop vs the compiled single pass
+"""
+import os, re, sys, time, tempfile, statistics, importlib.util
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_ledger(db_path: str):
+    os.environ["AZ_LEDGER_DB"] = db_path
+    spec = importlib.util.spec_from_file_location("az_ledger_bench", os.path.join(HERE, "ledger.py"))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    mod.init()
+    return mod
+
+
+def legacy_redact(ledger, text: str) -> str:
+    """What _redact() used to do: one replace per secret, then three re.sub per key."""
+    t = text
+    for k in ledger.REDACT_KEYS:
+        val = os.environ.get(k)
+        if val and val.strip():
+            t = t.replace(val, "[REDACTED]")
+    for k in ledger.REDACT_KEYS:
+        t = re.sub(rf"({re.escape(k)}\s*=\s*)([^\n\r]+)", r"\1[REDACTED]", t)
+        t = re.sub(rf'("{re.escape(k)}"\s*:\s*")([^"]+)(")', r'\1[REDACTED]\3', t)
+        t = re.sub(rf"('{re.escape(k)}'\s*:\s*')([^']+)(')", r"\1[REDACTED]\3", t)
+    return ledger._clip(t, ledger.MAX_TEXT)
+
+
+def citadel_request(ledger, payload: dict):
+    ev = ledger.log_event(project="citadel", actor="kernel", event_type="read", intent="bench",
+                          input=payload, risk_level="low", tags=[])
+    ledger.log_outcome(event_id=ev["event_id"], metric="bench_ok", value=1, score=100,
+                       verdict="win", evidence=payload)
+
+
+def run_mode(ledger, sync: bool, requests: int, payload: dict):
+    ledger.SYNC_WRITES = sync
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        citadel_request(ledger, payload)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    ledger.flush()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p99 = latencies[min(int(0.99 * len(latencies)), len(latencies) - 1)]
+    return 2 * requests / elapsed, statistics.median(latencies), p99
+
+
+def main(requests: int = 2000):
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench-secret-value")
+    payload = {"ts": "2026-01-01T00:00:00+00:00", "rows": ["x" * 64] * 30, "note": "SUPABASE_ANON_KEY=abc"}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = load_ledger(os.path.join(tmp, "ledger.db"))
+
+        print(f"{'mode':<14} | {'events/s':>10} | {'p50 / request':>13} | {'p99 / request':>13}")
+        for name, sync in (("inline commit", True), ("write-behind", False)):
+            eps, p50, p99 = run_mode(ledger, sync, requests, payload)
+            print(f"{name:<14} | {eps:>10,.0f} | {p50:>10.3f} ms | {p99:>10.3f} ms")
+
+        with ledger.connect() as con:
+            n = con.execute("select count(*) from az_events").fetchone()[0]
+        assert n == 2 * requests, n
+        print(f"rows committed: {n} events, writer stats {ledger.writer_stats()}")
+
+        blobs = {
+            "plain": ("ordinary tool output, nothing sensitive in this line 12345\n" * 4000)[:200_000],
+            "key-heavy": ("line of log output with GOOGLE_API_KEY=abc and bench-secret-value inside\n" * 3000)[:200_000],
+        }
+        for label, blob in blobs.items():
+            assert legacy_redact(ledger, blob) == ledger._redact(blob)
+            for name, fn in (("per-key re.sub", lambda: legacy_redact(ledger, blob)),
+                             ("compiled pass", lambda: ledger._redact(blob))):
+                t0 = time.perf_counter()
+                for _ in range(20):
+                    fn()
+                print(f"redact 200 KB {label:<9}, {name:<15}: {(time.perf_counter() - t0) / 20 * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
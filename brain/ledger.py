@@ -1,5 +1,5 @@
 # F:\AION-ZERO\brain\ledger.py
-import os, json, sqlite3, hashlib, re
+import os, json, sqlite3, hashlib, re, time, queue, atexit, threading
 from datetime import datetime, timezone
 from uuid import uuid4
 
@@ -19,6 +19,12 @@ REDACT_KEYS = [
 MAX_TEXT = 200_000          # cap any single stored blob
 MAX_ARTIFACT_PREVIEW = 2_000
 
+# Write-behind: log_* calls enqueue rows; one background thread group-commits them
+WRITE_QUEUE_MAX = int(os.environ.get("AZ_LEDGER_QUEUE_MAX", "10000"))   # bounded: callers block when full
+WRITE_BATCH_MAX = int(os.environ.get("AZ_LEDGER_BATCH_MAX", "500"))     # commit after this many rows...
+WRITE_FLUSH_SEC = float(os.environ.get("AZ_LEDGER_FLUSH_SEC", "0.25"))  # ...or after this long
+SYNC_WRITES = os.environ.get("AZ_LEDGER_SYNC") == "1"                   # 1 = old behaviour, commit inline
+
 def _now():
     # store as UTC (stable across machines)
     return datetime.now(timezone.utc).isoformat(timespec="seconds")
@@ -37,43 +43,84 @@ def _clip(s: str, n: int) -> str:
         return s
     return s if len(s) <= n else (s[:n] + "…")
 
+# Every alternative starts with a literal, so the regex engine can skip ahead on
+# first characters; the one capture group in each key alternative is the value.
+_KEY_PATTERNS = []
+for _k in REDACT_KEYS:
+    _e = re.escape(_k)
+    _KEY_PATTERNS += [
+        rf"{_e}\s*=\s*([^\n\r]+)",          # KEY=something (until newline)
+        rf'"{_e}"\s*:\s*"([^"]+)(?=")',      # "KEY": "something"
+        rf"'{_e}'\s*:\s*'([^']+)(?=')",      # 'KEY': 'something'
+    ]
+_KEY_NAME_RE = re.compile("|".join(re.escape(k) for k in REDACT_KEYS))
+_KEY_STEPS = [re.compile(p) for p in _KEY_PATTERNS]
+_redactor_cache = {}
+
+def _redactor(secrets: tuple):
+    """One compiled pattern per set of env secret values (key patterns first, then values, longest first)."""
+    rx = _redactor_cache.get(secrets)
+    if rx is None:
+        values = [re.escape(v) for v in sorted(secrets, key=len, reverse=True)]
+        rx = re.compile("|".join(_KEY_PATTERNS + values))
+        _redactor_cache.clear()  # env changes are rare; keep only the current set
+        _redactor_cache[secrets] = rx
+    return rx
+
+def _redact_match(m) -> str:
+    if m.lastindex is None:
+        return "[REDACTED]"  # a secret value
+    return m.string[m.start():m.start(m.lastindex)] + "[REDACTED]"
+
+def _redact_sequential(text: str, secrets: tuple) -> str:
+    """Key-by-key passes. Only needed when one key's value contains another key name."""
+    for v in secrets:
+        text = text.replace(v, "[REDACTED]")
+    for rx in _KEY_STEPS:
+        text = rx.sub(_redact_match, text)
+    return text
+
 def _redact(text: str) -> str:
     """
     Best-effort redaction:
       - replaces actual secret VALUES if present in env
       - redacts patterns like KEY=xxxxx or "KEY":"xxxxx"
     Never rewrites the key name itself (prevents corrupting code/JSON).
+    Single pass over the text with a precompiled pattern.
     """
     if not text:
         return text
 
+    secrets = tuple(v for v in (os.environ.get(k) for k in REDACT_KEYS)
+                    if v and isinstance(v, str) and v.strip())
     t = text
+    # Cheap substring pre-check: most payloads mention no key and no secret
+    if any(k in t for k in REDACT_KEYS) or any(v in t for v in secrets):
+        nested = False
 
-    # 1) redact any actual env secret values
-    for k in REDACT_KEYS:
-        val = os.environ.get(k)
-        if val and isinstance(val, str) and val.strip():
-            t = t.replace(val, "[REDACTED]")
+        def _sub(m):
+            nonlocal nested
+            if m.lastindex is not None and _KEY_NAME_RE.search(m.group(m.lastindex)):
+                nested = True  # e.g. "A_KEY=x B_KEY\n=y": key-by-key passes redact more here
+            return _redact_match(m)
 
-    # 2) redact KEY=... patterns (dotenv style)
-    for k in REDACT_KEYS:
-        # KEY=something (until newline)
-        t = re.sub(rf"({re.escape(k)}\s*=\s*)([^\n\r]+)", r"\1[REDACTED]", t)
+        t = _redactor(secrets).sub(_sub, t)
+        if nested:
+            t = _redact_sequential(text, secrets)
 
-        # "KEY": "something"
-        t = re.sub(rf'("{re.escape(k)}"\s*:\s*")([^"]+)(")', r'\1[REDACTED]\3', t)
-
-        # 'KEY': 'something'
-        t = re.sub(rf"('{re.escape(k)}'\s*:\s*')([^']+)(')", r"\1[REDACTED]\3", t)
-
-    # 3) clip to protect DB size
+    # clip to protect DB size
     return _clip(t, MAX_TEXT)
 
+_wal_set = False
+
 def connect():
+    global _wal_set
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
     con = sqlite3.connect(DB_PATH, timeout=10)  # busy timeout fallback
-    # Hardening
-    con.execute("PRAGMA journal_mode=WAL;")
+    # Hardening (journal_mode is persistent in the DB file; set it once per process)
+    if not _wal_set:
+        con.execute("PRAGMA journal_mode=WAL;")
+        _wal_set = True
     con.execute("PRAGMA synchronous=NORMAL;")
     con.execute("PRAGMA foreign_keys=ON;")
     con.execute("PRAGMA busy_timeout=5000;")
@@ -137,6 +184,127 @@ def init():
         con.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_event ON az_artifacts(event_id)")
         con.commit()
 
+EVENT_SQL = """INSERT INTO az_events
+        (id, ts, project, actor, event_type, intent, input, output, status, error, risk_level, correlation_id, parent_id, tags)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+OUTCOME_SQL = """INSERT INTO az_outcomes
+        (id, event_id, ts, metric, value, unit, target, score, verdict, evidence, lesson, next_action)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+ARTIFACT_SQL = """INSERT INTO az_artifacts
+        (id, ts, event_id, kind, path, before_hash, after_hash, preview, content)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+
+class _LedgerWriter:
+    """
+    Background writer that owns one SQLite connection.
+    Rows are committed in groups: when WRITE_BATCH_MAX rows are pending or
+    WRITE_FLUSH_SEC has passed since the first pending row, whichever comes first.
+    Rows keep their enqueue order, so an event always lands before its outcomes.
+    """
+
+    def __init__(self):
+        self.q = queue.Queue(maxsize=WRITE_QUEUE_MAX)
+        self.pid = os.getpid()
+        self.written = 0
+        self.failed = 0
+        self.thread = threading.Thread(target=self._run, name="az-ledger-writer", daemon=True)
+        self.thread.start()
+
+    def put(self, sql: str, row: tuple):
+        self.q.put((sql, row))  # blocks when full (backpressure instead of unbounded memory)
+
+    def flush(self, timeout: float = None) -> bool:
+        """Blocks until every row enqueued before this call is committed."""
+        done = threading.Event()
+        self.q.put((None, done))
+        return done.wait(timeout)
+
+    def _run(self):
+        con = connect()
+        while True:
+            item = self.q.get()
+            batch, waiters = [], []
+            deadline = time.monotonic() + WRITE_FLUSH_SEC
+            while True:
+                sql, payload = item
+                if sql is None:
+                    waiters.append(payload)
+                    break  # flush requested: commit what we have now
+                batch.append(item)
+                if len(batch) >= WRITE_BATCH_MAX:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.q.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            self._commit(con, batch)
+            for w in waiters:
+                w.set()
+
+    def _commit(self, con, batch):
+        if not batch:
+            return
+        try:
+            with con:  # one transaction for the whole group
+                for sql, row in batch:
+                    con.execute(sql, row)
+            self.written += len(batch)
+        except Exception as e:
+            # One bad row (e.g. outcome for an unknown event_id) must not drop the rest
+            print(f"[LEDGER] group commit failed ({e}); retrying {len(batch)} rows one by one")
+            for sql, row in batch:
+                try:
+                    with con:
+                        con.execute(sql, row)
+                    self.written += 1
+                except Exception as row_err:
+                    self.failed += 1
+                    print(f"[LEDGER] dropped row {row[0]}: {row_err}")
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def _get_writer() -> _LedgerWriter:
+    global _writer
+    w = _writer
+    if w is None or w.pid != os.getpid() or not w.thread.is_alive():
+        with _writer_lock:
+            if _writer is None or _writer.pid != os.getpid() or not _writer.thread.is_alive():
+                _writer = _LedgerWriter()
+            w = _writer
+    return w
+
+def _write(sql: str, row: tuple):
+    if SYNC_WRITES:
+        with connect() as con:
+            con.execute(sql, row)
+        return
+    _get_writer().put(sql, row)
+
+def flush(timeout: float = None) -> bool:
+    """
+    Durable flush: returns once every log_* call made before it is committed to
+    ledger.db (False if `timeout` ran out first). Use it before reading back rows
+    you just logged, or before exiting.
+    """
+    if SYNC_WRITES or _writer is None or _writer.pid != os.getpid():
+        return True
+    return _writer.flush(timeout)
+
+def writer_stats() -> dict:
+    w = _writer
+    if w is None:
+        return {"queued": 0, "written": 0, "failed": 0}
+    return {"queued": w.q.qsize(), "written": w.written, "failed": w.failed}
+
+atexit.register(flush, 5.0)
+
+
 def log_event(*, project=None, actor=None, event_type="unknown", intent=None,
               input=None, output=None, status=None, error=None,
               risk_level="low", correlation_id=None, parent_id=None, tags=None):
@@ -152,11 +320,7 @@ def log_event(*, project=None, actor=None, event_type="unknown", intent=None,
         risk_level, cid, parent_id, _json(tags or []),
     )
 
-    with connect() as con:
-        con.execute("""INSERT INTO az_events
-        (id, ts, project, actor, event_type, intent, input, output, status, error, risk_level, correlation_id, parent_id, tags)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", row)
-        con.commit()
+    _write(EVENT_SQL, row)
 
     return {"event_id": eid, "correlation_id": cid}
 
@@ -169,11 +333,7 @@ def log_outcome(*, event_id: str, metric: str, value=None, unit=None, target=Non
         _clip(_redact(lesson) if lesson else None, 10_000),
         _clip(_redact(next_action) if next_action else None, 10_000),
     )
-    with connect() as con:
-        con.execute("""INSERT INTO az_outcomes
-        (id, event_id, ts, metric, value, unit, target, score, verdict, evidence, lesson, next_action)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", row)
-        con.commit()
+    _write(OUTCOME_SQL, row)
     return oid
 
 def log_artifact(*, event_id: str, kind: str, path: str, before_text: str = "", after_text: str = "", content: str = ""):
@@ -197,9 +357,5 @@ def log_artifact(*, event_id: str, kind: str, path: str, before_text: str = "",
         _clip(_redact(content), MAX_TEXT),
     )
 
-    with connect() as con:
-        con.execute("""INSERT INTO az_artifacts
-        (id, ts, event_id, kind, path, before_hash, after_hash, preview, content)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""", row)
-        con.commit()
+    _write(ARTIFACT_SQL, row)
     return aid
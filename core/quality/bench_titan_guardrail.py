@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Cold vs warm TitanGuardrail runs on a copy of a tree (the repo by default).
+
+Usage:
+  python core/quality/bench_titan_guardrail.py [--target .] [--workers 4]
+
+The .py files and tool configs of --target are copied to a temp dir, then timed:
+  no cache    every file read, ruff/bandit over the whole target (the behaviour before the cache)
+  cold        empty cache: every file scanned, ruff/bandit per file, cache written
+  warm        nothing changed
+  touched     every mtime bumped, contents unchanged (e.g. after a branch switch)
+  one edit    one file changed
+Findings must be identical between cold, warm and touched, and the one-edit run must match
+a cold run of the edited tree. Non-tool findings must match the no-cache run.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from titan_guardrail import DEFAULT_EXCLUDE_DIRS, TitanGuardrail
+
+TOOL_CODES = {"RUFF_FAIL", "BANDIT_ISSUES"}
+CONFIG_FILES = {"pyproject.toml", "ruff.toml", ".ruff.toml", "setup.cfg", ".bandit"}
+
+
+def copy_tree(src: Path, dst: Path):
+    def ignore(d, names):
+        keep_dir = lambda n: os.path.isdir(os.path.join(d, n)) and n.lower() not in {x.lower() for x in DEFAULT_EXCLUDE_DIRS}
+        return [n for n in names if not (keep_dir(n) or n.endswith(".py") or n in CONFIG_FILES)]
+    shutil.copytree(src, dst, ignore=ignore, symlinks=True)
+
+
+def run(target: Path, cache: Path, workers: int, use_cache: bool = True):
+    guard = TitanGuardrail(str(target), cache_path=str(cache), use_cache=use_cache, workers=workers)
+    t0 = time.perf_counter()
+    _, report = guard.execute()
+    return time.perf_counter() - t0, report, guard.cache_stats
+
+
+def findings(report, tools=True):
+    return [json.dumps(f, sort_keys=True) for f in report["findings"] if tools or f["code"] not in TOOL_CODES]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--target", default=str(Path(__file__).resolve().parents[2]))
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tree = Path(tmp) / Path(args.target).resolve().name
+        copy_tree(Path(args.target).resolve(), tree)
+        cache = Path(tmp) / "cache.json"
+
+        rows = []
+        secs, base, _ = run(tree, cache, args.workers, use_cache=False)
+        rows.append(("no cache", secs, None))
+        secs, cold, stats = run(tree, cache, args.workers)
+        rows.append(("cold", secs, stats))
+        secs, warm, stats = run(tree, cache, args.workers)
+        rows.append(("warm", secs, stats))
+
+        now = time.time() + 5
+        files = sorted(tree.rglob("*.py"))
+        for p in files:
+            os.utime(p, (now, now))
+        secs, touched, stats = run(tree, cache, args.workers)
+        rows.append(("touched", secs, stats))
+
+        edited = files[len(files) // 2]
+        with open(edited, "a", encoding="utf-8") as f:
+            f.write("\nimport subprocess\nsubprocess.run('true', shell=True)\n")
+        secs, one_edit, stats = run(tree, cache, args.workers)
+        rows.append(("one edit", secs, stats))
+        _, fresh, _ = run(tree, Path(tmp) / "fresh.json", args.workers)
+
+    checks = {
+        "non-tool findings same as no cache": findings(cold, False) == findings(base, False),
+        "tool gates same as no cache": {f["code"] for f in cold["findings"]} & TOOL_CODES
+        == {f["code"] for f in base["findings"]} & TOOL_CODES,
+        "warm == cold": findings(warm) == findings(cold),
+        "touched == cold": findings(touched) == findings(cold),
+        "one edit == cold run of the edited tree": findings(one_edit) == findings(fresh),
+    }
+
+    print(f"{cold['scanned_file_count']} files, {len(cold['findings'])} findings, {args.workers} workers ({os.cpu_count()} CPUs)")
+    for label, secs, stats in rows:
+        detail = f"{stats['reused']} unchanged, {stats['rescanned']} rescanned" if stats else "ruff/bandit over the whole tree"
+        print(f"{label:>9}: {secs:6.2f} s  ({detail})")
+    print(f"warm speedup vs no cache: {rows[0][1] / rows[2][1]:.0f}x")
+    for name, ok in checks.items():
+        print(f"{name}: {ok}")
+    ok = all(checks.values())
+    print("RESULT:", "PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
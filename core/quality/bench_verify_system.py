@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Sequential vs scheduled verify_system runs on a copy of the blocks (hr_compliance,
+labour_obligations, env_compliance by default).
+
+Usage:
+  python core/quality/bench_verify_system.py [--workers 4] [--strict]
+
+The blocks, the shared core inputs and the harness are copied to a temp project root, then timed:
+  sequential   --workers 1 --no-cache (every block verified twice, one after another -- as before)
+  parallel     --no-cache, blocks concurrently
+  cold cache   empty cache: blocks concurrently, the team phase reuses the block phase
+  warm cache   nothing changed: every block served from the cache
+  one edit     one block's validator changed: only that block is verified again
+  dot-file     a .bandit added to one block: only that block is verified again
+  ancestor     a setup.cfg added at the project root: every block is verified again
+Per-block verdicts (guardrail/run ok, exit code, schema problems, pass) must match across runs.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BLOCKS = ["hr_compliance", "labour_obligations", "env_compliance"]
+COPY = ["core/autonomy.py", "core/autonomy_config.json", "core/reporting",
+        "core/quality/verify_system.py", "core/quality/titan_guardrail.py",
+        "pyproject.toml", "ruff.toml", ".ruff.toml", "setup.cfg", ".bandit"]
+
+
+def copy_project(dst: Path):
+    for rel in COPY + [f"blocks/{b}" for b in BLOCKS]:
+        src = ROOT / rel
+        if src.is_dir():
+            shutil.copytree(src, dst / rel, ignore=shutil.ignore_patterns("__pycache__", ".titan_guardrail_cache.json"))
+        elif src.exists():
+            (dst / rel).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(src, dst / rel)
+
+
+def run(root: Path, *flags):
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, str(root / "core/quality/verify_system.py"), *flags],
+                   capture_output=True, text=True, encoding="utf-8")
+    secs = time.perf_counter() - t0
+    return secs, json.loads((root / "logs/verification/latest_proof.json").read_text(encoding="utf-8"))
+
+
+def verdicts(proof):
+    blocks = {r["block"]: (r["guardrail"]["ok"], r["run"]["ok"], r["run"]["exit_code"], bool(r["report_path"]),
+                           r["schema_problems"], r["pass"]) for r in proof["results"]}
+    team = [(s["block"], s["guardrail_ok"], s["run_ok"], s["run_exit"], bool(s["report"]), s["schema_problems"])
+            for s in proof["team"]["meta"]["steps"]]
+    return blocks, team, proof["pass"]
+
+
+def sources(proof):
+    return [r["source"] for r in proof["results"]] + [s["source"] for s in proof["team"]["meta"]["steps"]]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--strict", action="store_true")
+    args = ap.parse_args()
+    strict = ["--strict"] if args.strict else []
+    workers = ["--workers", str(args.workers)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        copy_project(root)
+        run(root, *strict, "--no-cache")  # warm-up: the guardrail's own scan cache, .pyc files
+        rows = [("sequential", *run(root, *strict, "--workers", "1", "--no-cache"))]
+        rows.append(("parallel", *run(root, *strict, *workers, "--no-cache")))
+        rows.append(("cold cache", *run(root, *strict, *workers)))
+        rows.append(("warm cache", *run(root, *strict, *workers)))
+        with open(root / "blocks/labour_obligations/validator.py", "a", encoding="utf-8") as f:
+            f.write("\n# bench edit\n")
+        rows.append(("one edit", *run(root, *strict, *workers)))
+        (root / "blocks/hr_compliance/.bandit").write_text("[bandit]\n", encoding="utf-8")
+        rows.append(("dot-file", *run(root, *strict, *workers)))
+        (root / "setup.cfg").write_text("[metadata]\nname = bench\n", encoding="utf-8")
+        rows.append(("ancestor", *run(root, *strict, *workers)))
+        _, fresh = run(root, *strict, *workers, "--no-cache")
+
+    base = verdicts(rows[0][2])
+    checks = {
+        "verdicts identical in every mode": all(verdicts(p) == base for _, _, p in rows) and verdicts(fresh) == base,
+        "cold cache: team phase reuses the block phase": sources(rows[2][2]) == ["run"] * 3 + ["reused"] * 3,
+        "warm cache: nothing re-run": sources(rows[3][2]) == ["cache"] * 6,
+        "one edit: only the edited block re-run": sources(rows[4][2]) == ["cache", "cache", "run", "cache", "reused", "cache"],
+        "dot-file config: only that block re-run": sources(rows[5][2]) == ["cache", "run", "cache", "reused", "cache", "cache"],
+        "ancestor config: every block re-run": sources(rows[6][2]) == ["run"] * 3 + ["reused"] * 3,
+    }
+
+    print(f"{len(BLOCKS)} blocks, workers {args.workers} ({os.cpu_count()} CPUs), strict={args.strict}, "
+          f"pass={rows[0][2]['pass']}")
+    for label, secs, proof in rows:
+        print(f"{label:>11}: {secs:6.2f} s  (harness wall {proof['wall_sec']:.2f} s; {' '.join(sources(proof))})")
+    for name, ok in checks.items():
+        print(f"{name}: {ok}")
+    ok = all(checks.values())
+    print("RESULT:", "PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
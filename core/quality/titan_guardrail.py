@@ -6,6 +6,17 @@ Status: ACTIVE
 Usage:
   python core/quality/titan_guardrail.py --target blocks/hr_block
   python core/quality/titan_guardrail.py --target . --json out.json --strict
+  python core/quality/titan_guardrail.py --target . --no-cache   # full cold audit
+
+Scan cache:
+  Per-file findings (sizes, secrets, business heuristics, ruff, bandit) are kept in
+  <target>/.titan_guardrail_cache.json, keyed by content hash. A run only rereads files
+  whose mtime/size changed and only runs ruff/bandit on files whose content changed.
+  Any change to this module or to --max-lines discards the cache; a different ruff/bandit
+  install discards that tool's results, and a changed ruff/bandit config (pyproject.toml,
+  ruff.toml, .ruff.toml, setup.cfg, .bandit in a file's directory or any ancestor) those of
+  the files below it. Custom --ruff-args/--bandit-args run over the
+  whole target as before.
 
 Exit codes:
   0 = PASS
@@ -19,12 +30,15 @@ import hashlib
 import json
 import os
 import re
+import shutil
 import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 
 # -----------------------------
@@ -61,6 +75,26 @@ ALLOW_LARGE_FILE_DIRECTIVE = re.compile(r"^\s*#\s*titan:\s*allow-large-file\s*$"
 # Count "logical" lines: skip blank and pure comments
 COMMENT_LINE = re.compile(r"^\s*#")
 
+SECRET_SCAN_SUFFIXES = {".py", ".env", ".txt", ".md", ".toml", ".json", ".yml", ".yaml"}
+
+# Business context heuristics
+FLOAT_MONEY = re.compile(r"\bfloat\(")
+TIMEZONE_NAIVE = re.compile(r"datetime\.now\(\)")
+SHELL_TRUE = re.compile(r"shell\s*=\s*True")
+
+# Scan cache
+DEFAULT_CACHE_NAME = ".titan_guardrail_cache.json"
+DEFAULT_RUFF_ARGS = ["check"]
+DEFAULT_BANDIT_ARGS = ["-r", "-ll"]  # medium+ only
+PARALLEL_MIN_FILES = 64  # fewer changed files than this are scanned in-process
+TOOL_BATCH_FILES = 100  # paths per ruff/bandit invocation (command-line length limits)
+# Config files a tool reads from a file's directory and its ancestors; their content is part
+# of that tool's cache key for every file below them.
+TOOL_CONFIG_FILES = {
+    "ruff": ("pyproject.toml", "ruff.toml", ".ruff.toml"),
+    "bandit": ("pyproject.toml", "setup.cfg", ".bandit"),
+}
+
 
 @dataclass
 class Finding:
@@ -79,6 +113,121 @@ def sha256_text(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
 
 
+def ruleset_version(max_lines_per_file: int) -> str:
+    # The rules live in this module, so its source is the rule-set version.
+    source = Path(__file__).read_text(encoding="utf-8", errors="ignore")
+    return sha256_text(f"{source}\nmax_lines={max_lines_per_file}")
+
+
+def scan_file(path_str: str, max_lines_per_file: int) -> Tuple[Optional[str], Dict[str, List[dict]]]:
+    """
+    Content checks for one file from a single read (module-level so a worker process can run it).
+    Returns (sha256 of the bytes or None if unreadable, {"size"|"secrets"|"business": [finding dicts]});
+    the findings have no path, it is filled in when the report is assembled.
+    """
+    path = Path(path_str)
+    checks: Dict[str, List[dict]] = {"size": [], "secrets": [], "business": []}
+    try:
+        data = path.read_bytes()
+    except Exception as e:
+        if path.suffix == ".py":
+            checks["size"].append(asdict(Finding(level="ERROR", code="FILE_READ_ERROR", message=f"Could not read file: {e}")))
+        return None, checks
+    # Same text as read_text(encoding="utf-8", errors="ignore"), universal newlines included
+    content = data.decode("utf-8", errors="ignore").replace("\r\n", "\n").replace("\r", "\n")
+
+    # Guardrail 1: Small Unit Rule
+    if path.suffix == ".py" and not ALLOW_LARGE_FILE_DIRECTIVE.search(content):
+        logical_lines = 0
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            if COMMENT_LINE.match(line):
+                continue
+            logical_lines += 1
+
+        if logical_lines > max_lines_per_file:
+            checks["size"].append(asdict(Finding(
+                level="WARN",
+                code="FILE_TOO_LARGE",
+                message=f"{path.name} has {logical_lines} logical lines (> {max_lines_per_file}). Consider splitting.",
+                meta={"logical_lines": logical_lines, "max": max_lines_per_file},
+            )))
+
+    # Guardrail 5: No-Secrets Gate
+    if path.suffix in SECRET_SCAN_SUFFIXES:
+        for rx, label in SECRET_PATTERNS:
+            m = rx.search(content)
+            if m:
+                # hash the matched substring to avoid printing secrets
+                snippet_hash = sha256_text(m.group(0))
+                checks["secrets"].append(asdict(Finding(
+                    level="FAIL",
+                    code="POSSIBLE_SECRET",
+                    message=f"Possible secret detected: {label}. Remove it and use env/secret manager.",
+                    meta={"match_hash": snippet_hash, "pattern": label},
+                )))
+
+    # Guardrail 6: Business context checklist
+    if path.suffix == ".py":
+        if FLOAT_MONEY.search(content):
+            # Ignore test/dummy files where float is fine
+            if "dummy" not in path.name.lower() and "test" not in path.name.lower():
+                checks["business"].append(asdict(Finding(
+                    level="WARN",
+                    code="MONEY_FLOAT_RISK",
+                    message="Found float(...) usage. Prefer Decimal for currency.",
+                )))
+        if TIMEZONE_NAIVE.search(content):
+            checks["business"].append(asdict(Finding(
+                level="WARN",
+                code="TIMEZONE_NAIVE_DATETIME",
+                message="Found datetime.now() usage. Prefer timezone-aware (UTC default).",
+            )))
+        if SHELL_TRUE.search(content):
+            checks["business"].append(asdict(Finding(
+                level="FAIL",
+                code="SHELL_TRUE_FORBIDDEN",
+                message="subprocess shell=True detected. Forbidden unless explicitly justified and isolated.",
+            )))
+
+    return hashlib.sha256(data).hexdigest(), checks
+
+
+def _real(path: str) -> str:
+    return os.path.normcase(os.path.realpath(path))
+
+
+def parse_ruff_json(stdout: str, target: Path) -> Optional[Dict[str, List[str]]]:
+    """`ruff check --output-format json` -> {real path: ["rel:row:col: CODE message", ...]}; None if not JSON."""
+    try:
+        diagnostics = json.loads(stdout or "[]")
+    except ValueError:
+        return None
+    out: Dict[str, List[str]] = {}
+    for d in diagnostics:
+        loc = d.get("location") or {}
+        rel = os.path.relpath(d.get("filename", ""), target)
+        out.setdefault(_real(d.get("filename", "")), []).append(
+            f"{rel}:{loc.get('row')}:{loc.get('column')}: {d.get('code') or 'syntax-error'} {d.get('message', '')}")
+    return out
+
+
+def parse_bandit_json(stdout: str, target: Path) -> Optional[Dict[str, List[str]]]:
+    """`bandit -f json` -> {real path: ["rel:line:col: B602:name [High/High] text", ...]}; None if not JSON."""
+    try:
+        results = json.loads(stdout)["results"]
+    except (ValueError, KeyError, TypeError):
+        return None
+    out: Dict[str, List[str]] = {}
+    for r in results:
+        rel = os.path.relpath(r.get("filename", ""), target)
+        out.setdefault(_real(r.get("filename", "")), []).append(
+            f"{rel}:{r.get('line_number')}:{r.get('col_offset')}: {r.get('test_id')}:{r.get('test_name')} "
+            f"[{r.get('issue_severity')}/{r.get('issue_confidence')}] {r.get('issue_text')}")
+    return out
+
+
 class TitanGuardrail:
     def __init__(
         self,
@@ -89,6 +238,9 @@ class TitanGuardrail:
         allow_missing_tools: bool = True,
         ruff_args: Optional[List[str]] = None,
         bandit_args: Optional[List[str]] = None,
+        cache_path: Optional[str] = None,
+        use_cache: bool = True,
+        workers: Optional[int] = None,
     ):
         self.target = Path(target_dir).resolve()
         self.max_lines_per_file = max_lines_per_file
@@ -96,8 +248,8 @@ class TitanGuardrail:
         self.json_path = Path(json_path).resolve() if json_path else None
         self.allow_missing_tools = allow_missing_tools
 
-        self.ruff_args = ruff_args or ["check"]
-        self.bandit_args = bandit_args or ["-r", "-ll"]  # medium+ only
+        self.ruff_args = ruff_args or list(DEFAULT_RUFF_ARGS)
+        self.bandit_args = bandit_args or list(DEFAULT_BANDIT_ARGS)
 
         self.findings: List[Finding] = []
         self.scanned_files: List[Path] = []
@@ -105,6 +257,16 @@ class TitanGuardrail:
         if not self.target.exists():
             raise FileNotFoundError(f"Target does not exist: {self.target}")
 
+        base = self.target if self.target.is_dir() else self.target.parent
+        self.cache_path = (Path(cache_path).resolve() if cache_path else base / DEFAULT_CACHE_NAME) if use_cache else None
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.cache_stats: Optional[dict] = None
+
+        self._test_files: Optional[List[Path]] = None
+        self._test_dirs: List[Path] = []
+        self._entries: Optional[Dict[str, dict]] = None  # rel path -> cache entry for this run
+        self._config_digests: Dict[Tuple[str, Path], str] = {}
+
     # -----------------------------
     # File discovery
     # -----------------------------
@@ -119,62 +281,131 @@ class TitanGuardrail:
         return False
 
     def _collect_files(self) -> List[Path]:
+        # One walk that never enters excluded dirs; test files/dirs are noted on the way for check_tests_exist.
         files: List[Path] = []
-        for pattern in DEFAULT_INCLUDE_GLOBS:
-            for p in self.target.glob(pattern):
-                if p.is_file() and not self._is_excluded(p):
+        test_files: List[Path] = []
+        test_dirs: List[Path] = []
+        excluded_dirs = {d.lower() for d in DEFAULT_EXCLUDE_DIRS}
+        name_globs = [g[3:] for g in DEFAULT_INCLUDE_GLOBS if g.startswith("**/") and "/" not in g[3:]]
+        for root, dirs, names in os.walk(self.target):
+            dirs[:] = [d for d in dirs if d.lower() not in excluded_dirs]
+            base = Path(root)
+            test_dirs.extend(base / d for d in dirs if d in REQUIRED_TEST_DIR_NAMES)
+            for name in names:
+                p = base / name
+                if fnmatch.fnmatch(name, REQUIRED_TEST_FILE_GLOB):
+                    test_files.append(p)
+                if any(fnmatch.fnmatch(name, g) for g in name_globs) and p.is_file() and not self._is_excluded(p):
                     files.append(p)
-        return sorted(files)
+        for pattern in DEFAULT_INCLUDE_GLOBS:
+            if pattern[3:] not in name_globs:
+                for p in self.target.glob(pattern):
+                    if p.is_file() and not self._is_excluded(p):
+                        files.append(p)
+
+        self._test_files = sorted(p for p in test_files if not self._is_excluded(p))
+        self._test_dirs = sorted(p for p in test_dirs if not self._is_excluded(p))
+        return sorted(set(files))
 
     # -----------------------------
-    # Guardrail 1: Small Unit Rule (line sizes)
+    # Scan cache
     # -----------------------------
-    def check_file_sizes(self):
+    def _rel(self, path: Path) -> str:
+        return path.relative_to(self.target).as_posix() if path != self.target else path.name
+
+    def _load_cache(self) -> Dict[str, dict]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        try:
+            cache = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(cache, dict) or cache.get("ruleset") != ruleset_version(self.max_lines_per_file):
+            return {}
+        return cache.get("files") or {}
+
+    def _save_cache(self):
+        if self.cache_path is None or self._entries is None:
+            return
+        cache = {
+            "ruleset": ruleset_version(self.max_lines_per_file),
+            "files": {rel: e for rel, e in self._entries.items() if e.get("sha")},
+        }
+        tmp = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(cache, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            pass  # a read-only target still gets a full report, just no cache
+
+    def _scan_all(self, paths: List[str]) -> List[Tuple[Optional[str], Dict[str, List[dict]]]]:
+        limits = [self.max_lines_per_file] * len(paths)
+        if self.workers > 1 and len(paths) >= PARALLEL_MIN_FILES:
+            try:
+                with ProcessPoolExecutor(self.workers) as pool:
+                    return list(pool.map(scan_file, paths, limits, chunksize=16))
+            except (OSError, BrokenProcessPool):
+                pass  # no worker processes here (sandbox, frozen app): scan in-process
+        return list(map(scan_file, paths, limits))
+
+    def scan_files(self):
+        """
+        Per-file content checks for every scanned file. Files whose mtime and size match the cache
+        are not read; the rest are rescanned (in parallel when there are many). A rescanned file
+        whose content hash is unchanged keeps its cached ruff/bandit results.
+        """
+        cached = self._load_cache()
+        self._entries = {}
+        todo = []
         for path in self.scanned_files:
-            if path.suffix != ".py":
-                continue
+            rel = self._rel(path)
             try:
-                content = path.read_text(encoding="utf-8", errors="ignore")
-            except Exception as e:
-                self.findings.append(Finding(
-                    level="ERROR",
-                    code="FILE_READ_ERROR",
-                    message=f"Could not read file: {e}",
-                    path=str(path),
-                ))
-                continue
-
-            if ALLOW_LARGE_FILE_DIRECTIVE.search(content):
-                continue
+                st = path.stat()
+            except OSError:
+                st = None
+            old = cached.get(rel)
+            if st and old and old.get("mtime_ns") == st.st_mtime_ns and old.get("size") == st.st_size:
+                self._entries[rel] = old
+            else:
+                todo.append((path, rel, st, old or {}))
+
+        results = self._scan_all([str(path) for path, *_ in todo])
+        for (_, rel, st, old), (sha, checks) in zip(todo, results):
+            entry = {"mtime_ns": st and st.st_mtime_ns, "size": st and st.st_size, "sha": sha, "checks": checks}
+            if sha and old.get("sha") == sha:
+                entry.update({tool: old[tool] for tool in ("ruff", "bandit") if tool in old})
+            self._entries[rel] = entry
+
+        self.cache_stats = {
+            "files": len(self.scanned_files),
+            "reused": len(self.scanned_files) - len(todo),
+            "rescanned": len(todo),
+            "cache": str(self.cache_path) if self.cache_path else None,
+        }
 
-            logical_lines = 0
-            for line in content.splitlines():
-                if not line.strip():
-                    continue
-                if COMMENT_LINE.match(line):
-                    continue
-                logical_lines += 1
+    def _add_scan_findings(self, check: str):
+        if self._entries is None:
+            self.scan_files()
+        for path in self.scanned_files:
+            for f in self._entries[self._rel(path)]["checks"][check]:
+                self.findings.append(Finding(**{**f, "path": str(path)}))
 
-            if logical_lines > self.max_lines_per_file:
-                self.findings.append(Finding(
-                    level="WARN",
-                    code="FILE_TOO_LARGE",
-                    message=f"{path.name} has {logical_lines} logical lines (> {self.max_lines_per_file}). Consider splitting.",
-                    path=str(path),
-                    meta={"logical_lines": logical_lines, "max": self.max_lines_per_file},
-                ))
+    # -----------------------------
+    # Guardrail 1: Small Unit Rule (line sizes)
+    # -----------------------------
+    def check_file_sizes(self):
+        self._add_scan_findings("size")
 
     # -----------------------------
     # Guardrail 2: Test-First Mandate
     # -----------------------------
     def check_tests_exist(self):
         # Must have tests folder or at least one test_*.py under target
-        test_files = list(self.target.rglob(REQUIRED_TEST_FILE_GLOB))
-        test_dirs = [p for p in self.target.rglob("*") if p.is_dir() and p.name in REQUIRED_TEST_DIR_NAMES]
-
-        # Exclude ignored dirs
-        test_files = [p for p in test_files if not self._is_excluded(p)]
-        test_dirs = [p for p in test_dirs if not self._is_excluded(p)]
+        if self._test_files is None:
+            self._collect_files()
+        test_files = self._test_files
+        test_dirs = self._test_dirs
 
         if not test_files and not test_dirs:
             self.findings.append(Finding(
@@ -207,144 +438,134 @@ class TitanGuardrail:
                 ))
 
     # -----------------------------
-    # Guardrail 3: Security Scan Gate (Bandit)
+    # Ruff / Bandit runner
     # -----------------------------
-    def run_security_scan(self):
-        cmd = ["bandit", *self.bandit_args, str(self.target)]
+    def _config_digest(self, tool: str, directory: Path) -> str:
+        """Hash of the tool's config files in `directory` and all its ancestors (memoised per directory)."""
+        key = (tool, directory)
+        if key not in self._config_digests:
+            h = hashlib.sha256()
+            if directory.parent != directory:
+                h.update(self._config_digest(tool, directory.parent).encode())
+            for name in TOOL_CONFIG_FILES.get(tool, ()):
+                try:
+                    h.update(f"{name}:".encode() + (directory / name).read_bytes())
+                except OSError:
+                    continue
+            self._config_digests[key] = h.hexdigest()
+        return self._config_digests[key]
+
+    def _run_tool_incremental(
+        self,
+        tool: str,
+        exe: str,
+        argv: List[str],
+        parse: Callable[[str, Path], Optional[Dict[str, List[str]]]],
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Runs `exe argv <files>` only on .py files with no result for their current content and
+        tool config (in batches, several at once) and caches the per-file issue lines. Returns
+        (issue lines for all files, in scan order; output of runs that could not be parsed).
+        """
         try:
-            subprocess.run(["bandit", "--version"], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        except FileNotFoundError:
-            msg = "Bandit not installed. Run: pip install bandit"
-            if self.allow_missing_tools:
-                self.findings.append(Finding(level="WARN", code="BANDIT_MISSING", message=msg))
-                return
-            self.findings.append(Finding(level="FAIL", code="BANDIT_MISSING", message=msg))
-            return
-        except Exception as e:
-            self.findings.append(Finding(level="ERROR", code="BANDIT_ERROR", message=f"Bandit version check failed: {e}"))
+            exe_mtime = os.stat(exe).st_mtime_ns
+        except OSError:
+            exe_mtime = 0
+        key = f"{exe}|{exe_mtime}|{' '.join(argv)}"
+        if self._entries is None:
+            self.scan_files()
+
+        py_files = [(p, self._rel(p)) for p in self.scanned_files if p.suffix == ".py"]
+        keys = {rel: f"{key}|{self._config_digest(tool, p.parent)}" for p, rel in py_files}
+        todo = [(p, rel) for p, rel in py_files if (self._entries[rel].get(tool) or {}).get("key") != keys[rel]]
+        batches = [todo[i:i + TOOL_BATCH_FILES] for i in range(0, len(todo), TOOL_BATCH_FILES)]
+
+        def run(batch):
+            return batch, subprocess.run([exe, *argv, *(str(p) for p, _ in batch)], capture_output=True, text=True)
+
+        failed: List[str] = []
+        if batches:
+            with ThreadPoolExecutor(min(self.workers, len(batches))) as pool:
+                for batch, result in pool.map(run, batches):
+                    issues = parse(result.stdout, self.target)
+                    if issues is None:
+                        failed.append(f"{result.stdout or ''}\n{result.stderr or ''}".strip())
+                        continue
+                    for p, rel in batch:
+                        self._entries[rel][tool] = {"key": keys[rel], "issues": issues.get(_real(str(p)), [])}
+
+        lines = [line for _, rel in py_files for line in (self._entries[rel].get(tool) or {}).get("issues", [])]
+        return lines, failed
+
+    def _run_tool(self, tool: str, label: str, args: List[str], default_args: List[str],
+                  incremental_argv: List[str], parse, fail_code: str, fail_message: str):
+        cmd = [tool, *args, str(self.target)]
+        exe = shutil.which(tool)
+        if exe is None:
+            msg = f"{label} not installed. Run: pip install {tool}"
+            level = "WARN" if self.allow_missing_tools else "FAIL"
+            self.findings.append(Finding(level=level, code=f"{tool.upper()}_MISSING", message=msg))
             return
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            # Bandit returns non-zero when issues found OR on errors.
-            if result.returncode != 0:
-                out = (result.stdout or "")[:2000]
-                err = (result.stderr or "")[:2000]
+            if self.cache_path is not None and args == default_args:
+                lines, failed = self._run_tool_incremental(tool, exe, incremental_argv, parse)
+                failing, out, err = bool(lines or failed), "\n".join(lines), "\n\n".join(failed)
+            else:
+                result = subprocess.run([exe, *args, str(self.target)], capture_output=True, text=True)
+                # Non-zero when issues are found OR on errors.
+                failing, out, err = result.returncode != 0, result.stdout or "", result.stderr or ""
+            if failing:
                 self.findings.append(Finding(
                     level="FAIL",
-                    code="BANDIT_ISSUES",
-                    message="Bandit found security issues.",
+                    code=fail_code,
+                    message=fail_message,
                     path=str(self.target),
-                    meta={"stdout": out, "stderr": err, "cmd": cmd},
+                    meta={"stdout": out[:2000], "stderr": err[:2000], "cmd": cmd},
                 ))
         except Exception as e:
-            self.findings.append(Finding(level="ERROR", code="BANDIT_EXEC_ERROR", message=str(e), path=str(self.target)))
+            self.findings.append(Finding(level="ERROR", code=f"{tool.upper()}_EXEC_ERROR", message=str(e), path=str(self.target)))
+
+    # -----------------------------
+    # Guardrail 3: Security Scan Gate (Bandit)
+    # -----------------------------
+    def run_security_scan(self):
+        self._run_tool(
+            "bandit", "Bandit", self.bandit_args, DEFAULT_BANDIT_ARGS,
+            ["-ll", "-q", "-f", "json"], parse_bandit_json,
+            "BANDIT_ISSUES", "Bandit found security issues.",
+        )
 
     # -----------------------------
     # Guardrail 4: Ruff Lint Gate
     # -----------------------------
     def run_linter(self):
         # We default to ruff check; you can pass extra args via CLI
-        cmd = ["ruff", *self.ruff_args, str(self.target)]
-        try:
-            subprocess.run(["ruff", "--version"], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        except FileNotFoundError:
-            msg = "Ruff not installed. Run: pip install ruff"
-            if self.allow_missing_tools:
-                self.findings.append(Finding(level="WARN", code="RUFF_MISSING", message=msg))
-                return
-            self.findings.append(Finding(level="FAIL", code="RUFF_MISSING", message=msg))
-            return
-        except Exception as e:
-            self.findings.append(Finding(level="ERROR", code="RUFF_ERROR", message=f"Ruff version check failed: {e}"))
-            return
-
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                out = (result.stdout or "")[:2000]
-                err = (result.stderr or "")[:2000]
-                self.findings.append(Finding(
-                    level="FAIL",
-                    code="RUFF_FAIL",
-                    message="Ruff lint failed.",
-                    path=str(self.target),
-                    meta={"stdout": out, "stderr": err, "cmd": cmd},
-                ))
-        except Exception as e:
-            self.findings.append(Finding(level="ERROR", code="RUFF_EXEC_ERROR", message=str(e), path=str(self.target)))
+        self._run_tool(
+            "ruff", "Ruff", self.ruff_args, DEFAULT_RUFF_ARGS,
+            ["check", "--output-format", "json", "--force-exclude"], parse_ruff_json,
+            "RUFF_FAIL", "Ruff lint failed.",
+        )
 
     # -----------------------------
     # Guardrail 5: No-Secrets Gate (fast heuristic)
     # -----------------------------
     def check_secrets(self):
-        for path in self.scanned_files:
-            if path.suffix not in {".py", ".env", ".txt", ".md", ".toml", ".json", ".yml", ".yaml"}:
-                continue
-            try:
-                content = path.read_text(encoding="utf-8", errors="ignore")
-            except Exception:
-                continue
-
-            for rx, label in SECRET_PATTERNS:
-                m = rx.search(content)
-                if m:
-                    # hash the matched substring to avoid printing secrets
-                    snippet_hash = sha256_text(m.group(0))
-                    self.findings.append(Finding(
-                        level="FAIL",
-                        code="POSSIBLE_SECRET",
-                        message=f"Possible secret detected: {label}. Remove it and use env/secret manager.",
-                        path=str(path),
-                        meta={"match_hash": snippet_hash, "pattern": label},
-                    ))
+        self._add_scan_findings("secrets")
 
     # -----------------------------
     # Guardrail 6: Business context checklist (lightweight static checks)
     # -----------------------------
     def check_business_context_heuristics(self):
         # This is not a replacement for review. It catches obvious anti-patterns.
-        float_money = re.compile(r"\bfloat\(")
-        timezone_naive = re.compile(r"datetime\.now\(\)")
-        shell_true = re.compile(r"shell\s*=\s*True")
-
-        for path in self.scanned_files:
-            if path.suffix != ".py":
-                continue
-            try:
-                content = path.read_text(encoding="utf-8", errors="ignore")
-            except Exception:
-                continue
-
-            if float_money.search(content):
-                # Ignore test/dummy files where float is fine
-                if "dummy" not in path.name.lower() and "test" not in path.name.lower():
-                    self.findings.append(Finding(
-                        level="WARN",
-                        code="MONEY_FLOAT_RISK",
-                        message="Found float(...) usage. Prefer Decimal for currency.",
-                        path=str(path),
-                    ))
-            if timezone_naive.search(content):
-                self.findings.append(Finding(
-                    level="WARN",
-                    code="TIMEZONE_NAIVE_DATETIME",
-                    message="Found datetime.now() usage. Prefer timezone-aware (UTC default).",
-                    path=str(path),
-                ))
-            if shell_true.search(content):
-                self.findings.append(Finding(
-                    level="FAIL",
-                    code="SHELL_TRUE_FORBIDDEN",
-                    message="subprocess shell=True detected. Forbidden unless explicitly justified and isolated.",
-                    path=str(path),
-                ))
+        self._add_scan_findings("business")
 
     # -----------------------------
     # Run
     # -----------------------------
     def execute(self) -> Tuple[bool, dict]:
         self.scanned_files = self._collect_files()
+        self.scan_files()
 
         report = {
             "tool": "titan_guardrail",
@@ -364,6 +585,7 @@ class TitanGuardrail:
         self.run_security_scan()
         self.check_secrets()
         self.check_business_context_heuristics()
+        self._save_cache()
 
         # Determine pass/fail
         fails = [f for f in self.findings if f.level in ("FAIL", "ERROR")]
@@ -433,6 +655,9 @@ def main():
     parser.add_argument("--require-tools", action="store_true", help="Fail if ruff/bandit missing")
     parser.add_argument("--ruff-args", default=None, help='Override ruff args, e.g. "check --fix"')
     parser.add_argument("--bandit-args", default=None, help='Override bandit args, e.g. "-r -ll -x tests"')
+    parser.add_argument("--cache", default=None, help=f"Scan cache file (default: <target>/{DEFAULT_CACHE_NAME})")
+    parser.add_argument("--no-cache", action="store_true", help="Rescan every file and run ruff/bandit on the whole target")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel file scans / tool runs (default: CPU count)")
 
     args = parser.parse_args()
 
@@ -448,6 +673,9 @@ def main():
             allow_missing_tools=not args.require_tools,
             ruff_args=ruff_args,
             bandit_args=bandit_args,
+            cache_path=args.cache,
+            use_cache=not args.no_cache,
+            workers=args.workers,
         )
 
         ok, report = guard.execute()
@@ -458,6 +686,9 @@ def main():
             Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
 
         print_human_report(report)
+        if guard.cache_path is not None:
+            c = guard.cache_stats
+            print(f"   scan cache: {c['reused']}/{c['files']} files unchanged, {c['rescanned']} rescanned ({c['cache']})")
 
         sys.exit(0 if ok else 1)
 
@@ -12,11 +12,19 @@ Usage:
   python core/quality/verify_system.py --strict
   python core/quality/verify_system.py --strict --only hr_compliance
   python core/quality/verify_system.py --strict --skip-team
+  python core/quality/verify_system.py --strict --workers 2 --no-cache
+
+Blocks are verified concurrently (--workers, default: CPU count). A block whose input hash
+(block files, shared core inputs, this harness, the guardrail, ruff/bandit configs in the
+block's ancestors, the tool versions and today's date) matches the last completed
+verification is not re-run: its recorded result is reused and marked source=cache in the
+proof. --no-cache runs everything.
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import os
 import re
@@ -24,10 +32,12 @@ import shutil
 import subprocess
 import sys
 import time
-from dataclasses import dataclass, asdict
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, asdict, field, replace
+from datetime import date, datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Set
+from typing import Dict, List, Optional, Tuple
 
 # -------------------------
 # Config
@@ -42,6 +52,19 @@ VERIFY_LOG_DIR = LOGS_DIR / "verification"
 
 DEFAULT_TIMEOUT_SEC = 180
 
+BLOCK_CACHE_PATH = VERIFY_LOG_DIR / ".block_cache.json"
+# Outside the block dir but read by every block entrypoint (autonomy gate, PDF service)
+SHARED_INPUTS = [
+    PROJECT_ROOT / "core" / "autonomy.py",
+    PROJECT_ROOT / "core" / "autonomy_config.json",
+    PROJECT_ROOT / "core" / "reporting",
+]
+HASH_SKIP_DIRS = {"__pycache__", ".pytest_cache", ".ruff_cache"}
+# Written by the verification itself
+HASH_SKIP_FILES = {".titan_guardrail_cache.json", ".titan_guardrail_cache.json.tmp"}
+# ruff/bandit read these from a block's directory and every ancestor
+TOOL_CONFIG_FILES = ("pyproject.toml", "ruff.toml", ".ruff.toml", "setup.cfg", ".bandit")
+
 REQUIRED_REPORT_FIELDS = {"schema_version", "block", "block_version", "timestamp", "failures", "details"}
 
 UTC_ISO_RE = re.compile(r"\+00:00$|Z$")
@@ -98,7 +121,7 @@ def run_cmd(cmd: List[str], cwd: Optional[Path] = None, timeout: int = DEFAULT_T
             exit_code=2,
             stdout="",
             stderr=str(e),
-            meta={"cmd": cmd, "cwd": str(cwd) if cwd else None},
+            meta={"cmd": cmd, "cwd": str(cwd) if cwd else None, "launch_error": True},
         )
 
 
@@ -126,30 +149,29 @@ def load_block_manifests() -> Dict[str, dict]:
     return manifests
 
 
-def get_dir_snapshot(path: Path) -> Set[Path]:
-    """Returns a set of all files in the directory."""
+def get_dir_snapshot(path: Path) -> Dict[Path, int]:
+    """Returns all files in the directory with their mtime (ns)."""
     if not path.exists():
-        return set()
-    return set(path.rglob("*"))
+        return {}
+    return {p: p.stat().st_mtime_ns for p in path.rglob("*")}
 
 
-def find_new_report(report_dir: Path, before_snapshot: Set[Path], pattern: str = "*.json") -> Optional[Path]:
-    """Finds a file that exists now but didn't exist in the snapshot, or was modified."""
+def find_new_report(report_dir: Path, before_snapshot: Dict[Path, int], pattern: str = "*.json") -> Optional[Path]:
+    """Finds a file that exists now but didn't exist in the snapshot, or was rewritten since."""
     if not report_dir.exists():
         return None
     
     current_files = list(report_dir.glob(pattern))
     
-    # 1. Look for brand new files
-    new_files = [f for f in current_files if f not in before_snapshot]
+    # Brand new files, or files rewritten by this run: validators name reports by the second, so a
+    # re-run within the same second (e.g. block check then team pipeline) overwrites the same file.
+    new_files = [f for f in current_files if before_snapshot.get(f) != f.stat().st_mtime_ns]
     if new_files:
         # Sort by modification time, newest first
         new_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
         return new_files[0]
         
-    # 2. If no new files, look for modified files (if we allow overwriting, which we shouldn't really, but mostly we create new filenames)
-    # Our validators generate timestamped filenames, so "new file" logic should hold.
-    # Fallback to absolute newest file if we are desperate/legacy, but audit-grade demands NEW file.
+    # Audit-grade demands a report written by this run; never fall back to an older file.
     return None
 
 
@@ -285,9 +307,230 @@ def run_block(block_name: str, manifest: dict) -> Tuple[StepResult, Optional[Pat
     return run_res, latest, report_data, schema_problems
 
 
-def run_team_pipeline(order: List[str], manifests: Dict[str, dict], strict: bool) -> StepResult:
+# -------------------------
+# Block scheduler + result cache
+# -------------------------
+@dataclass
+class BlockOutcome:
+    block: str
+    guardrail: StepResult
+    run: StepResult
+    report_path: Optional[Path]
+    schema_problems: List[str]
+    input_hash: str = ""
+    source: str = "run"  # run | cache (earlier harness run) | reused (earlier phase of this run)
+    cached_run_id: Optional[str] = None
+    timings: Dict[str, List[float]] = field(default_factory=dict)  # step -> [start, end] sec from harness start
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def iter_input_files(root: Path, skip: Optional[Path] = None):
+    if root.is_file():
+        yield root
+        return
+    for p in sorted(root.rglob("*")):
+        rel = p.relative_to(root).parts
+        if not p.is_file() or p.name in HASH_SKIP_FILES:
+            continue
+        if any(part.startswith(".") or part in HASH_SKIP_DIRS for part in rel[:-1]):
+            continue
+        if skip is not None and skip in p.parents:
+            continue
+        yield p
+
+
+@lru_cache(maxsize=None)
+def tool_version(tool: str) -> Optional[str]:
+    exe = shutil.which(tool)
+    if exe is None:
+        return None
+    try:
+        res = subprocess.run([exe, "--version"], capture_output=True, text=True, timeout=60)
+        return (res.stdout + res.stderr).strip()
+    except (OSError, subprocess.SubprocessError) as e:
+        return f"{exe}: {e}"
+
+
+def block_input_hash(block_name: str, manifest: dict, strict: bool) -> str:
+    """
+    Everything a block verification reads, except its own report dir (which it writes).
+    Blocks read the clock (e.g. labour_obligations checks deadlines against today), so the
+    date is part of the hash: a cached verdict never outlives the day it was made.
+    """
+    block_dir = BLOCKS_DIR / block_name
+    report_dir = block_dir / manifest.get("report_dir", "reports")
+    h = hashlib.sha256()
+    h.update(json.dumps({
+        "block": block_name,
+        "manifest": manifest,
+        "strict": strict,
+        "python": sys.version,
+        "tools": {t: tool_version(t) for t in ("ruff", "bandit")},
+        "date": [date.today().isoformat(), datetime.now(timezone.utc).date().isoformat()],
+    }, sort_keys=True, default=str).encode("utf-8"))
+    for d in block_dir.parents:
+        for name in TOOL_CONFIG_FILES:
+            if (d / name).is_file():
+                h.update(f"{d / name}:{file_sha256(d / name)}".encode("utf-8"))
+    for root in [Path(__file__).resolve(), GUARDRAIL_PATH, *SHARED_INPUTS, block_dir]:
+        if not root.exists():
+            continue
+        for p in iter_input_files(root, skip=report_dir):
+            h.update(str(p.relative_to(PROJECT_ROOT)).encode("utf-8"))
+            h.update(file_sha256(p).encode("ascii"))
+    return h.hexdigest()
+
+
+def completed(res: StepResult) -> bool:
+    """False if the subprocess timed out or could not start -- not a property of the inputs."""
+    meta = res.meta or {}
+    return not (meta.get("timeout") or meta.get("launch_error"))
+
+
+def verify_block(block_name: str, manifest: dict, strict: bool, t0: float) -> BlockOutcome:
+    started = time.perf_counter() - t0
+    g = guardrail_block(block_name, strict=strict)
+    mid = time.perf_counter() - t0
+    r, report_path, _, schema_problems = run_block(block_name, manifest)
+    ended = time.perf_counter() - t0
+    return BlockOutcome(
+        block=block_name,
+        guardrail=g,
+        run=r,
+        report_path=report_path,
+        schema_problems=schema_problems,
+        timings={"guardrail": [round(started, 3), round(mid, 3)], "run": [round(mid, 3), round(ended, 3)]},
+    )
+
+
+class BlockScheduler:
+    """
+    Verifies blocks (guardrail, run, report schema) on a thread pool of `workers`. A block's
+    steps stay in order and it is never verified twice at once (its report dir and guardrail log
+    are shared); different blocks run concurrently. Completed outcomes are kept per block with
+    their input hash, in memory for the team phase and in BLOCK_CACHE_PATH for later runs.
+    """
+
+    def __init__(self, manifests: Dict[str, dict], strict: bool, workers: Optional[int] = None,
+                 use_cache: bool = True, cache_path: Path = BLOCK_CACHE_PATH, run_id: str = ""):
+        self.manifests = manifests
+        self.strict = strict
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.use_cache = use_cache
+        self.cache_path = cache_path
+        self.run_id = run_id
+        self.t0 = time.perf_counter()
+        self.memo: Dict[str, BlockOutcome] = {}
+        self.disk: Dict[str, dict] = self._load() if use_cache else {}
+        self.rows: List[dict] = []
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            return json.loads(self.cache_path.read_text(encoding="utf-8")).get("blocks", {})
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        if not self.use_cache:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"blocks": self.disk}, indent=2), encoding="utf-8")
+        os.replace(tmp, self.cache_path)
+
+    def _lookup(self, block_name: str, key: str) -> Optional[BlockOutcome]:
+        if not self.use_cache:
+            return None
+        hit = self.memo.get(block_name)
+        if hit is not None and hit.input_hash == key:
+            return replace(hit, source="reused", timings={})
+        entry = self.disk.get(block_name)
+        if not entry or entry.get("input_hash") != key:
+            return None
+        report = entry.get("report_path")
+        if report and not Path(report).exists():  # evidence must still be on disk
+            return None
+        return BlockOutcome(
+            block=block_name,
+            guardrail=StepResult(**entry["guardrail"]),
+            run=StepResult(**entry["run"]),
+            report_path=Path(report) if report else None,
+            schema_problems=entry["schema_problems"],
+            input_hash=key,
+            source="cache",
+            cached_run_id=entry.get("run_id"),
+        )
+
+    def _store(self, outcome: BlockOutcome):
+        self.memo[outcome.block] = outcome
+        if completed(outcome.guardrail) and completed(outcome.run):
+            self.disk[outcome.block] = {
+                "input_hash": outcome.input_hash,
+                "run_id": self.run_id,
+                "guardrail": asdict(outcome.guardrail),
+                "run": asdict(outcome.run),
+                "report_path": str(outcome.report_path) if outcome.report_path else None,
+                "schema_problems": outcome.schema_problems,
+            }
+
+    def verify(self, blocks: List[str], phase: str = "block") -> Dict[str, BlockOutcome]:
+        results: Dict[str, BlockOutcome] = {}
+        todo: List[Tuple[str, str]] = []
+        for b in dict.fromkeys(blocks):
+            key = block_input_hash(b, self.manifests[b], self.strict)
+            hit = self._lookup(b, key)
+            if hit is not None:
+                results[b] = hit
+            else:
+                todo.append((b, key))
+
+        if todo:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(todo))) as pool:
+                futures = {pool.submit(verify_block, b, self.manifests[b], self.strict, self.t0): (b, key) for b, key in todo}
+                for fut in as_completed(futures):
+                    b, key = futures[fut]
+                    outcome = fut.result()
+                    outcome.input_hash = key
+                    self._store(outcome)
+                    results[b] = outcome
+
+        for b in blocks:
+            if b in results:
+                o = results[b]
+                self.rows.append({"phase": phase, "block": b, "source": o.source, **o.timings})
+        return results
+
+    def wall(self) -> float:
+        return time.perf_counter() - self.t0
+
+    def waterfall(self, width: int = 40) -> List[str]:
+        total = max([r["run"][1] for r in self.rows if "run" in r] + [self.wall(), 1e-9])
+        lines = []
+        for r in self.rows:
+            label = f"{r['phase']:<6} {r['block']:<22}"
+            if "run" not in r:
+                lines.append(f"{label} {'':>6} {'':>6}  {r['source']}")
+                continue
+            (gs, ge), (_, re_) = r["guardrail"], r["run"]
+            cols = [int(t / total * width) for t in (gs, ge, re_)]
+            bar = " " * cols[0] + "░" * max(cols[1] - cols[0], 1) + "█" * max(cols[2] - cols[1], 1)
+            lines.append(f"{label} {gs:6.2f} {re_ - gs:6.2f}s |{bar:<{width + 2}}|")
+        return lines
+
+
+def run_team_pipeline(order: List[str], manifests: Dict[str, dict], strict: bool,
+                      scheduler: Optional[BlockScheduler] = None) -> StepResult:
     steps: List[dict] = []
     ok_all = True
+    scheduler = scheduler or BlockScheduler(manifests, strict, use_cache=False)
+    outcomes = scheduler.verify([b for b in order if b in manifests], phase="team")
 
     for b in order:
         if b not in manifests:
@@ -295,8 +538,8 @@ def run_team_pipeline(order: List[str], manifests: Dict[str, dict], strict: bool
             steps.append({"block": b, "ok": False, "error": "MISSING_MANIFEST"})
             continue
 
-        g = guardrail_block(b, strict=strict)
-        r, report_path, _, schema_problems = run_block(b, manifests[b])
+        o = outcomes[b]
+        g, r, report_path, schema_problems = o.guardrail, o.run, o.report_path, o.schema_problems
 
         # Block passed if: Guardrail OK AND Run matches expectations AND Report Valid
         # NOTE: run_res.ok (exit 0) is required for "Harness Pass" even if validator exits 1 for compliance fail.
@@ -315,6 +558,7 @@ def run_team_pipeline(order: List[str], manifests: Dict[str, dict], strict: bool
                 "run_exit": r.exit_code,
                 "report": str(report_path) if report_path else None,
                 "schema_problems": schema_problems,
+                "source": o.source,
             }
         )
 
@@ -333,6 +577,8 @@ def main():
     parser.add_argument("--strict", action="store_true", help="Strict mode (guardrail strict + require tools)")
     parser.add_argument("--only", default=None, help="Run only one block by name")
     parser.add_argument("--skip-team", action="store_true", help="Skip integrated team pipeline")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Blocks verified concurrently")
+    parser.add_argument("--no-cache", action="store_true", help="Re-run every block, ignoring cached results")
     args = parser.parse_args()
 
     ensure_dirs()
@@ -356,15 +602,21 @@ def main():
         "project_root": str(PROJECT_ROOT),
         "strict": bool(args.strict),
         "blocks": blocks,
+        "workers": args.workers,
+        "cache": not args.no_cache,
         "results": [],
         "team": None,
+        "waterfall": [],
         "pass": True,
     }
+    scheduler = BlockScheduler(manifests, strict=args.strict, workers=args.workers,
+                               use_cache=not args.no_cache, run_id=run_id)
 
-    # 1) Independent checks (each block)
+    # 1) Independent checks (each block, concurrently)
+    outcomes = scheduler.verify(blocks)
     for b in blocks:
-        g = guardrail_block(b, strict=args.strict)
-        r, report_path, _, schema_problems = run_block(b, manifests[b])
+        o = outcomes[b]
+        g, r, report_path, schema_problems = o.guardrail, o.run, o.report_path, o.schema_problems
 
         block_ok = g.ok and r.ok and (report_path is not None) and (len([p for p in schema_problems if "MISSING" in p]) == 0)
         if not block_ok:
@@ -378,6 +630,9 @@ def main():
                 "report_path": str(report_path) if report_path else None,
                 "schema_problems": schema_problems,
                 "pass": block_ok,
+                "source": o.source,
+                "cached_run_id": o.cached_run_id,
+                "input_hash": o.input_hash,
             }
         )
 
@@ -387,11 +642,15 @@ def main():
         order = ["hr_compliance", "labour_obligations", "env_compliance"]
         order = [b for b in order if b in manifests]
         if order:
-            team_res = run_team_pipeline(order, manifests, strict=args.strict)
+            team_res = run_team_pipeline(order, manifests, strict=args.strict, scheduler=scheduler)
             proof["team"] = asdict(team_res)
             if not team_res.ok:
                 proof["pass"] = False
 
+    scheduler.save()
+    proof["waterfall"] = scheduler.rows
+    proof["wall_sec"] = round(scheduler.wall(), 3)
+
     # Write proof bundle
     out = VERIFY_LOG_DIR / f"verify_{run_id}.json"
     out.write_text(json.dumps(proof, indent=2), encoding="utf-8")
@@ -410,6 +669,10 @@ def main():
     print(f"   proof:  {out}")
     print(f"   alias:  {latest_proof}")
     print("")
+    print(f"⏱️  BLOCK WATERFALL (wall {scheduler.wall():.2f}s, workers {args.workers}; ░ guardrail █ run)")
+    for line in scheduler.waterfall():
+        print(f"   {line}")
+    print("")
 
     if not proof["pass"]:
         print("⛔ FAIL - DETAILED LOG:")
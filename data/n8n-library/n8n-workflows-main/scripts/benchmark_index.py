@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark the workflow indexer on the bundled library.
+Measures a cold full index and a no-op reindex for the previous per-file loop and for
+the parallel/bulk indexer, then checks that both databases hold the same rows and
+return the same FTS results.
+
+    python scripts/benchmark_index.py [--workers N]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from workflow_db import WorkflowDatabase
+
+COMPARE_COLUMNS = (
+    "filename, name, workflow_id, active, description, trigger_type, complexity, "
+    "node_count, integrations, tags, created_at, updated_at, file_hash, file_size"
+)
+FTS_QUERIES = ["telegram", "slack AND openai", "webhook", "google sheets"]
+
+
+def legacy_index(db: WorkflowDatabase, force_reindex: bool = False) -> dict:
+    """The indexer as it was: one hash + SELECT + INSERT OR REPLACE per file, FTS triggers on."""
+    json_files = [str(p) for p in Path(db.workflows_dir).rglob("*.json")]
+    conn = sqlite3.connect(db.db_path)
+    conn.row_factory = sqlite3.Row
+    stats = {"processed": 0, "skipped": 0, "errors": 0}
+    for file_path in json_files:
+        filename = os.path.basename(file_path)
+        if not force_reindex:
+            current_hash = db.get_file_hash(file_path)
+            row = conn.execute(
+                "SELECT file_hash FROM workflows WHERE filename = ?", (filename,)
+            ).fetchone()
+            if row and row["file_hash"] == current_hash:
+                stats["skipped"] += 1
+                continue
+        w = db.analyze_workflow_file(file_path)
+        if not w:
+            stats["errors"] += 1
+            continue
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO workflows (
+                filename, name, workflow_id, active, description, trigger_type,
+                complexity, node_count, integrations, tags, created_at, updated_at,
+                file_hash, file_size, analyzed_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """,
+            (
+                w["filename"], w["name"], w["workflow_id"], w["active"], w["description"],
+                w["trigger_type"], w["complexity"], w["node_count"],
+                json.dumps(w["integrations"]), json.dumps(w["tags"]),
+                w["created_at"], w["updated_at"], w["file_hash"], w["file_size"],
+            ),
+        )
+        stats["processed"] += 1
+    conn.commit()
+    conn.close()
+    return stats
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def snapshot(db_path: str):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(f"SELECT {COMPARE_COLUMNS} FROM workflows ORDER BY filename").fetchall()
+    fts = {
+        q: sorted(
+            r[0]
+            for r in conn.execute(
+                "SELECT w.filename FROM workflows_fts JOIN workflows w ON w.id = workflows_fts.rowid "
+                "WHERE workflows_fts MATCH ?",
+                (q,),
+            )
+        )
+        for q in FTS_QUERIES
+    }
+    conn.close()
+    return rows, fts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the workflow indexer")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    os.chdir(Path(__file__).parent.parent)  # workflows/ is relative to the repo root
+    with tempfile.TemporaryDirectory() as tmp:
+        old_db = WorkflowDatabase(os.path.join(tmp, "legacy.db"))
+        new_db = WorkflowDatabase(os.path.join(tmp, "bulk.db"))
+
+        t_old_cold, old_stats = timed(legacy_index, old_db)
+        t_old_noop, _ = timed(legacy_index, old_db)
+        t_new_cold, new_stats = timed(new_db.index_all_workflows, workers=args.workers)
+        t_new_noop, noop_stats = timed(new_db.index_all_workflows, workers=args.workers)
+
+        print()
+        print(f"workers: {args.workers or os.cpu_count()}  files: {old_stats['processed'] + old_stats['errors']}")
+        print(f"{'':<22} {'cold full index':>16} {'no-op reindex':>15}")
+        print(f"{'per-file loop':<22} {t_old_cold:>14.2f} s {t_old_noop:>13.3f} s")
+        print(f"{'parallel + bulk':<22} {t_new_cold:>14.2f} s {t_new_noop:>13.3f} s")
+        print(f"no-op run: {noop_stats}")
+
+        old_rows, old_fts = snapshot(old_db.db_path)
+        new_rows, new_fts = snapshot(new_db.db_path)
+        ok = old_rows == new_rows and old_fts == new_fts and noop_stats["processed"] == 0
+        print("RESULT:", "PASS - identical rows and FTS results" if ok else "FAIL")
+        sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,41 @@ import json
 import os
 import datetime
 import hashlib
+import time
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 
+# Below this many changed files, parse inline (pool start-up costs more than it saves)
+PARALLEL_MIN_FILES = 64
+# Above this many changed files, drop the FTS triggers and rebuild the index once
+FTS_REBUILD_MIN_FILES = 200
+WRITE_BATCH_SIZE = 500
+
+UPSERT_SQL = """
+    INSERT INTO workflows (
+        filename, name, workflow_id, active, description, trigger_type,
+        complexity, node_count, integrations, tags, created_at, updated_at,
+        file_hash, file_size, file_mtime, analyzed_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(filename) DO UPDATE SET
+        name = excluded.name,
+        workflow_id = excluded.workflow_id,
+        active = excluded.active,
+        description = excluded.description,
+        trigger_type = excluded.trigger_type,
+        complexity = excluded.complexity,
+        node_count = excluded.node_count,
+        integrations = excluded.integrations,
+        tags = excluded.tags,
+        created_at = excluded.created_at,
+        updated_at = excluded.updated_at,
+        file_hash = excluded.file_hash,
+        file_size = excluded.file_size,
+        file_mtime = excluded.file_mtime,
+        analyzed_at = CURRENT_TIMESTAMP
+"""
+
 
 class WorkflowDatabase:
     """High-performance SQLite database for workflow metadata and search."""
@@ -50,6 +82,7 @@ class WorkflowDatabase:
                 updated_at TEXT,
                 file_hash TEXT,
                 file_size INTEGER,
+                file_mtime REAL,
                 analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
@@ -80,7 +113,18 @@ class WorkflowDatabase:
         )
         conn.execute("CREATE INDEX IF NOT EXISTS idx_filename ON workflows(filename)")
 
+        # Migration: mtime lets unchanged files be skipped without hashing them
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(workflows)")}
+        if "file_mtime" not in columns:
+            conn.execute("ALTER TABLE workflows ADD COLUMN file_mtime REAL")
+
         # Create triggers to keep FTS table in sync
+        self._create_fts_triggers(conn)
+
+        conn.commit()
+        conn.close()
+
+    def _create_fts_triggers(self, conn: sqlite3.Connection):
         conn.execute("""
             CREATE TRIGGER IF NOT EXISTS workflows_ai AFTER INSERT ON workflows BEGIN
                 INSERT INTO workflows_fts(rowid, filename, name, description, integrations, tags)
@@ -104,8 +148,9 @@ class WorkflowDatabase:
             END
         """)
 
-        conn.commit()
-        conn.close()
+    def _drop_fts_triggers(self, conn: sqlite3.Connection):
+        for trigger in ("workflows_ai", "workflows_ad", "workflows_au"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
 
     def get_file_hash(self, file_path: str) -> str:
         """Get MD5 hash of file for change detection."""
@@ -452,8 +497,23 @@ class WorkflowDatabase:
 
         return desc + "."
 
-    def index_all_workflows(self, force_reindex: bool = False) -> Dict[str, int]:
-        """Index all workflow files. Only reprocesses changed files unless force_reindex=True."""
+    def index_all_workflows(
+        self,
+        force_reindex: bool = False,
+        workers: Optional[int] = None,
+        prune: bool = False,
+        verbose: bool = True,
+    ) -> Dict[str, int]:
+        """
+        Index all workflow files. Only reprocesses changed files unless force_reindex=True.
+
+        Files whose mtime and size match the stored row are skipped without reading them.
+        Files whose mtime changed but whose hash did not only get their mtime refreshed.
+        Changed files are hashed, parsed and analyzed in a process pool (`workers`, default
+        CPU count). One writer upserts the results in a single transaction. For large
+        batches the FTS triggers are dropped and the FTS index is rebuilt once at the end.
+        With prune=True, rows for files that no longer exist are deleted.
+        """
         if not os.path.exists(self.workflows_dir):
             print(f"Warning: Workflows directory '{self.workflows_dir}' not found.")
             return {"processed": 0, "skipped": 0, "errors": 0}
@@ -465,77 +525,114 @@ class WorkflowDatabase:
             print(f"Warning: No JSON files found in '{self.workflows_dir}' directory.")
             return {"processed": 0, "skipped": 0, "errors": 0}
 
-        print(f"Indexing {len(json_files)} workflow files...")
-
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
 
-        stats = {"processed": 0, "skipped": 0, "errors": 0}
-
-        for file_path in json_files:
-            filename = os.path.basename(file_path)
-
-            try:
-                # Check if file needs to be reprocessed
-                if not force_reindex:
-                    current_hash = self.get_file_hash(file_path)
-                    cursor = conn.execute(
-                        "SELECT file_hash FROM workflows WHERE filename = ?",
-                        (filename,),
-                    )
-                    row = cursor.fetchone()
-                    if row and row["file_hash"] == current_hash:
-                        stats["skipped"] += 1
-                        continue
+        stats = {"processed": 0, "skipped": 0, "errors": 0, "removed": 0}
 
-                # Analyze workflow
-                workflow_data = self.analyze_workflow_file(file_path)
-                if not workflow_data:
-                    stats["errors"] += 1
-                    continue
-
-                # Insert or update in database
-                conn.execute(
-                    """
-                    INSERT OR REPLACE INTO workflows (
-                        filename, name, workflow_id, active, description, trigger_type,
-                        complexity, node_count, integrations, tags, created_at, updated_at,
-                        file_hash, file_size, analyzed_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                """,
-                    (
-                        workflow_data["filename"],
-                        workflow_data["name"],
-                        workflow_data["workflow_id"],
-                        workflow_data["active"],
-                        workflow_data["description"],
-                        workflow_data["trigger_type"],
-                        workflow_data["complexity"],
-                        workflow_data["node_count"],
-                        json.dumps(workflow_data["integrations"]),
-                        json.dumps(workflow_data["tags"]),
-                        workflow_data["created_at"],
-                        workflow_data["updated_at"],
-                        workflow_data["file_hash"],
-                        workflow_data["file_size"],
-                    ),
-                )
+        existing = {
+            row["filename"]: (row["file_hash"], row["file_mtime"], row["file_size"])
+            for row in conn.execute(
+                "SELECT filename, file_hash, file_mtime, file_size FROM workflows"
+            )
+        }
 
-                stats["processed"] += 1
+        # Rows are keyed by basename; if two files share one, the last one wins (as before)
+        files = {os.path.basename(p): p for p in json_files}
 
-            except Exception as e:
+        # Stat pass: decide what needs reading at all
+        jobs = []
+        for filename, file_path in files.items():
+            try:
+                st = os.stat(file_path)
+            except OSError as e:
                 print(f"Error processing {file_path}: {str(e)}")
                 stats["errors"] += 1
                 continue
+            known = existing.get(filename)
+            if (
+                not force_reindex
+                and known
+                and known[1] == st.st_mtime
+                and known[2] == st.st_size
+            ):
+                stats["skipped"] += 1
+                continue
+            known_hash = None if force_reindex or not known else known[0]
+            jobs.append((file_path, st.st_mtime, known_hash))
 
-        conn.commit()
-        conn.close()
+        if jobs:
+            print(f"Indexing {len(jobs)} of {len(json_files)} workflow files...")
 
-        print(
-            f"✅ Indexing complete: {stats['processed']} processed, {stats['skipped']} skipped, {stats['errors']} errors"
-        )
+        results = self._analyze_jobs(jobs, workers)
+
+        upserts, touches = [], []
+        for kind, payload in results:
+            if kind == "row":
+                upserts.append(payload)
+            elif kind == "touch":
+                touches.append(payload)
+            else:
+                print(payload)
+                stats["errors"] += 1
+        stats["processed"] = len(upserts)
+        stats["skipped"] += len(touches)
+        removed = [name for name in existing if name not in files] if prune else []
+        stats["removed"] = len(removed)
+
+        rebuild_fts = len(upserts) + len(removed) >= FTS_REBUILD_MIN_FILES
+        try:
+            conn.execute("BEGIN")
+            if rebuild_fts:
+                self._drop_fts_triggers(conn)
+            for i in range(0, len(upserts), WRITE_BATCH_SIZE):
+                conn.executemany(UPSERT_SQL, upserts[i : i + WRITE_BATCH_SIZE])
+            if touches:
+                conn.executemany(
+                    "UPDATE workflows SET file_mtime = ? WHERE filename = ?", touches
+                )
+            if removed:
+                conn.executemany(
+                    "DELETE FROM workflows WHERE filename = ?", [(n,) for n in removed]
+                )
+            if rebuild_fts:
+                conn.execute("INSERT INTO workflows_fts(workflows_fts) VALUES('rebuild')")
+                self._create_fts_triggers(conn)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        if verbose:
+            print(
+                f"✅ Indexing complete: {stats['processed']} processed, {stats['skipped']} skipped, {stats['errors']} errors"
+            )
         return stats
 
+    def _analyze_jobs(self, jobs: List[tuple], workers: Optional[int]) -> List[tuple]:
+        if len(jobs) < PARALLEL_MIN_FILES or workers == 1:
+            return [_analyze_job(job, self) for job in jobs]
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, min(64, len(jobs) // (workers * 4)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_analyze_job, jobs, chunksize=chunksize))
+
+    def watch(self, interval: float = 2.0, workers: Optional[int] = None):
+        """Reindex whenever workflow files change (mtime, then hash). Runs until interrupted."""
+        print(f"👀 Watching '{self.workflows_dir}' every {interval}s (Ctrl+C to stop)")
+        try:
+            while True:
+                stats = self.index_all_workflows(workers=workers, prune=True, verbose=False)
+                if stats.get("processed") or stats.get("removed"):
+                    print(
+                        f"🔄 {stats['processed']} updated, {stats.get('removed', 0)} removed"
+                    )
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("Stopped watching.")
+
     def search_workflows(
         self,
         query: str = "",
@@ -792,6 +889,51 @@ class WorkflowDatabase:
         return results, total
 
 
+_worker_db = None
+
+
+def _analyze_job(job: tuple, db: Optional[WorkflowDatabase] = None) -> tuple:
+    """
+    Process-pool task: hash one file and, if it changed, analyze it.
+    Returns ("row", upsert params), ("touch", (mtime, filename)) or ("error", message).
+    """
+    global _worker_db
+    file_path, mtime, known_hash = job
+    if db is None:
+        if _worker_db is None:
+            # Analysis needs no database state; skip __init__ (and its schema setup)
+            _worker_db = WorkflowDatabase.__new__(WorkflowDatabase)
+        db = _worker_db
+    filename = os.path.basename(file_path)
+    try:
+        if known_hash is not None and db.get_file_hash(file_path) == known_hash:
+            return "touch", (mtime, filename)
+
+        workflow_data = db.analyze_workflow_file(file_path)
+        if not workflow_data:
+            return "error", f"Error reading {file_path}"
+
+        return "row", (
+            workflow_data["filename"],
+            workflow_data["name"],
+            workflow_data["workflow_id"],
+            workflow_data["active"],
+            workflow_data["description"],
+            workflow_data["trigger_type"],
+            workflow_data["complexity"],
+            workflow_data["node_count"],
+            json.dumps(workflow_data["integrations"]),
+            json.dumps(workflow_data["tags"]),
+            workflow_data["created_at"],
+            workflow_data["updated_at"],
+            workflow_data["file_hash"],
+            workflow_data["file_size"],
+            mtime,
+        )
+    except Exception as e:
+        return "error", f"Error processing {file_path}: {str(e)}"
+
+
 def main():
     """Command-line interface for workflow database."""
     import argparse
@@ -801,15 +943,21 @@ def main():
     parser.add_argument("--force", action="store_true", help="Force reindex all files")
     parser.add_argument("--search", help="Search workflows")
     parser.add_argument("--stats", action="store_true", help="Show database statistics")
+    parser.add_argument("--watch", action="store_true", help="Reindex changed files continuously")
+    parser.add_argument("--interval", type=float, default=2.0, help="Watch poll interval (seconds)")
+    parser.add_argument("--workers", type=int, help="Parser processes (default: CPU count)")
 
     args = parser.parse_args()
 
     db = WorkflowDatabase()
 
     if args.index:
-        stats = db.index_all_workflows(force_reindex=args.force)
+        stats = db.index_all_workflows(force_reindex=args.force, workers=args.workers)
         print(f"Indexed {stats['processed']} workflows")
 
+    elif args.watch:
+        db.watch(interval=args.interval, workers=args.workers)
+
     elif args.search:
         results, total = db.search_workflows(args.search, limit=10)
         print(f"Found {total} workflows:")
@@ -1,7 +1,11 @@
 import requests
-import json
 from logging_config import log
 
+try:
+    from aogrl_ops_pack import shared_ollama  # cached calls to Ollama (py/, when installed)
+except ImportError:
+    shared_ollama = None
+
 class OllamaClient:
     """
     Client for interacting with local Ollama instance.
@@ -16,8 +20,6 @@ class OllamaClient:
         """
         Generates text completion using the local LLM.
         """
-        url = f"{self.base_url}/api/generate"
-        
         full_prompt = f"System: {system_prompt}\nUser: {prompt}" if system_prompt else prompt
         
         payload = {
@@ -31,11 +33,15 @@ class OllamaClient:
         }
         
         try:
-            response = requests.post(url, json=payload, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+            if shared_ollama is not None:
+                # temperature 0.1 + fixed seed: repeated headlines are served from the shared cache
+                data = shared_ollama(self.base_url).generate(payload, timeout_sec=30)
+            else:
+                response = requests.post(f"{self.base_url}/api/generate", json=payload, timeout=30)
+                response.raise_for_status()
+                data = response.json()
             return data.get("response", "").strip()
-        except requests.exceptions.RequestException as e:
+        except Exception as e:  # HTTP, bad JSON or cache errors: the caller treats "ERROR" as no answer
             log.error(f"Ollama API Error: {e}")
             return "ERROR"
 
@@ -6,20 +6,29 @@ class MarketRegime(Enum):
     TRENDING = 1
     RANGING = 2
 
-def get_market_regime(data: pd.DataFrame, adx_threshold: int = 25) -> MarketRegime:
+def get_market_regime(data: pd.DataFrame, adx_threshold: int = 25, indicators=None) -> MarketRegime:
     """
     Determines the market regime based on the Average Directional Index (ADX).
 
     Args:
         data (pd.DataFrame): OHLCV data. Must contain 'high', 'low', and 'close' columns.
+                             May be None when `indicators` is given.
         adx_threshold (int): The ADX value above which the market is considered trending.
+        indicators (IndicatorState, optional): Streaming indicator state. When given,
+                             its ADX is used instead of recomputing it from `data`.
 
     Returns:
         MarketRegime: An enum indicating if the market is TRENDING or RANGING.
     """
-    if len(data) < 20: # ADX typically needs a longer lookback
+    history_len = indicators.count if indicators is not None else len(data)
+    if history_len < 20: # ADX typically needs a longer lookback
         return MarketRegime.RANGING # Default to ranging if not enough data
 
+    if indicators is not None:
+        if indicators.adx.value > adx_threshold:
+            return MarketRegime.TRENDING
+        return MarketRegime.RANGING
+
     # Calculate the ADX using the pandas-ta library
     # The adx() method automatically calculates ADX, +DI, and -DI
     adx_data = data.ta.adx()
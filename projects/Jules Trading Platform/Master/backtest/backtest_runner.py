@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import asyncio
 from logging_config import log
@@ -5,27 +6,38 @@ from logging_config import log
 # --- Import our custom modules ---
 from data.binance_client import BinanceDataClient
 from strategy.orchestrator import StrategyOrchestrator
+from strategy.base_strategy import Signal
 from risk.risk_manager import RiskManager
+from backtest.vectorized_engine import VectorizedBacktestEngine, VALVE_MIN_HISTORY
 
 class BacktestRunner:
     """
     Runs a backtest of a given strategy on historical data.
     """
 
-    def __init__(self, strategy_config: dict, capital: float):
+    ENGINES = ("loop", "vectorized")
+
+    def __init__(self, strategy_config: dict, capital: float, engine: str = "loop", data_client=None):
         """
         Initializes the Backtest Runner.
 
         Args:
             strategy_config (dict): Configuration for the strategy module.
             capital (float): The initial starting capital for the backtest.
+            engine (str): "loop" replays the orchestrator candle by candle;
+                          "vectorized" precomputes indicators once (same trade list, much faster).
+            data_client: Optional market data client. Only needed when data must be
+                         fetched from Binance; offline runs on local CSVs leave it None.
         """
-        self.strategy = StrategyOrchestrator()
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown backtest engine '{engine}'. Expected one of {self.ENGINES}.")
+        self.engine = engine
+        self.strategy = StrategyOrchestrator(config=strategy_config)
         self.risk_manager = RiskManager(client=None)
         self.risk_manager.total_capital = capital # Manually set for backtest
         self.risk_manager.risk_per_trade_usd = capital * self.risk_manager.risk_per_trade_percent
         self.initial_capital = capital
-        self.data_client = BinanceDataClient()
+        self.data_client = data_client
         self.trades = [] # List to store details of each simulated trade
 
     def _simulate_trade(self, data: pd.DataFrame, entry_index: int, signal: str):
@@ -96,8 +108,13 @@ class BacktestRunner:
         """
         Executes the backtest over the entire historical dataset.
         """
-        log.info(f"Running backtest on {len(historical_data)} candles...")
-        
+        log.info(f"Running backtest on {len(historical_data)} candles ({self.engine} engine)...")
+
+        if self.engine == "vectorized":
+            self._run_vectorized(historical_data)
+            log.info("Backtest complete.")
+            return
+
         start_index = self.strategy.lookback_period
         
         for i in range(start_index, len(historical_data)):
@@ -113,6 +130,68 @@ class BacktestRunner:
         
         log.info("Backtest complete.")
 
+    def _run_vectorized(self, historical_data: pd.DataFrame, sentiment_score: float = 0.0):
+        """
+        Single-pass equivalent of the candle loop: indicators are computed once,
+        signals come out as a column and exits are resolved with array searches.
+        """
+        engine = VectorizedBacktestEngine(self.strategy)
+        indicators = engine.precompute_indicators(historical_data)
+        signals = engine.generate_signals(historical_data, indicators, sentiment_score=sentiment_score)
+        signals[:self.strategy.lookback_period] = Signal.NO_TRADE.value
+
+        index = historical_data.index
+        close = historical_data['close'].to_numpy(dtype=float)
+        high = historical_data['high'].to_numpy(dtype=float)
+        low = historical_data['low'].to_numpy(dtype=float)
+        atr = indicators['atr'].to_numpy()
+
+        entries = np.flatnonzero(signals != Signal.NO_TRADE.value)
+        log.info(f"Vectorized engine: {len(entries)} signals found.")
+
+        for entry_index in entries:
+            is_long = signals[entry_index] == Signal.GO_LONG.value
+            entry_price = close[entry_index]
+            stop_loss_price = low[entry_index] if is_long else high[entry_index]
+
+            risk_per_share = abs(entry_price - stop_loss_price)
+            reward_per_share = risk_per_share * 2.0
+            take_profit_price = entry_price + reward_per_share if is_long else entry_price - reward_per_share
+
+            # Same Volatility Valve as the loop, fed from the precomputed ATR column.
+            has_valve_history = entry_index + 1 >= VALVE_MIN_HISTORY
+            position_size = self.risk_manager.calculate_position_size(
+                entry_price=entry_price,
+                stop_loss_price=stop_loss_price,
+                is_long=is_long,
+                min_trade_size=0.001,
+                trade_size_step=0.001,
+                current_atr=atr[entry_index] if has_valve_history else None
+            )
+
+            if position_size <= 0:
+                continue
+
+            exit_info = engine.find_exit(low, high, entry_index, is_long, stop_loss_price, take_profit_price)
+            if exit_info is None:
+                continue
+
+            exit_index, exit_price, exit_reason = exit_info
+            if is_long:
+                pnl = (exit_price - entry_price) * position_size
+            else:
+                pnl = (entry_price - exit_price) * position_size
+
+            self.trades.append({
+                "entry_time": index[entry_index],
+                "exit_time": index[exit_index],
+                "direction": "LONG" if is_long else "SHORT",
+                "entry_price": entry_price,
+                "exit_price": exit_price,
+                "pnl": pnl,
+                "exit_reason": exit_reason
+            })
+
     def get_results(self) -> dict:
         """
         Calculates performance metrics from the executed trades.
@@ -205,6 +284,7 @@ async def main():
         log.info("Local data loaded successfully.")
     except FileNotFoundError:
         log.warning("Local data file not found. Falling back to Binance API.")
+        runner.data_client = runner.data_client or BinanceDataClient()
         historical_data = await runner.data_client.get_historical_klines(
             symbol_to_test, timeframe, data_start_date
         )
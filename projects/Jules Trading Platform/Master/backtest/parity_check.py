@@ -0,0 +1,94 @@
+import sys
+import glob
+import time
+import numpy as np
+import pandas as pd
+
+from backtest.backtest_runner import BacktestRunner
+from logging_config import log
+
+# ---
+# Note to the user:
+# Comparison harness for the two backtest engines. It runs the classic candle loop
+# and the vectorized engine on the same data and requires the trade lists to be
+# IDENTICAL (same entries, exits, prices and PnL, compared exactly).
+#
+#     python -m backtest.parity_check
+#
+# The bundled CSVs are short, so a seeded synthetic series with volatility bursts is
+# checked as well to make sure both engines actually trade.
+# ---
+
+STRATEGY_CONFIGS = [
+    {"lookback_period": 20, "volume_multiplier": 3.0, "price_move_multiplier": 2.5},
+    {"lookback_period": 5, "volume_multiplier": 2.0, "price_move_multiplier": 1.5},
+]
+
+
+def synthetic_candles(n: int = 1500, seed: int = 7) -> pd.DataFrame:
+    """Builds a reproducible 1m OHLCV series with trends, flat candles and volume bursts."""
+    rng = np.random.default_rng(seed)
+    drift = np.repeat(rng.normal(0, 0.05, n // 100 + 1), 100)[:n]
+    close = 100 + np.cumsum(drift + rng.normal(0, 0.15, n))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.1, n))
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.integers(800, 1500, n).astype(float)
+
+    bursts = rng.choice(np.arange(50, n), size=n // 40, replace=False)
+    close[bursts] = open_[bursts] + rng.choice([-1.0, 1.0], size=len(bursts)) * 2.5
+    high[bursts] = np.maximum(open_[bursts], close[bursts]) + 0.2
+    low[bursts] = np.minimum(open_[bursts], close[bursts]) - 0.2
+    volume[bursts] *= 6
+
+    flat = rng.choice(np.arange(n), size=5, replace=False)
+    high[flat] = low[flat] = open_[flat] = close[flat]
+
+    index = pd.date_range("2024-01-01", periods=n, freq="1min", name="open_time")
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": volume}, index=index)
+
+
+def run_engine(engine: str, data: pd.DataFrame, symbol: str, config: dict, capital: float = 100.0):
+    """Runs one engine on a private copy of the data and returns (trades, seconds)."""
+    frame = data.copy()
+    frame.symbol = symbol
+    runner = BacktestRunner(strategy_config=config, capital=capital, engine=engine)
+    started = time.perf_counter()
+    runner.run(frame)
+    return runner.trades, time.perf_counter() - started
+
+
+def check(name: str, data: pd.DataFrame, config: dict) -> bool:
+    """Compares both engines on one dataset/config pair."""
+    loop_trades, loop_secs = run_engine("loop", data, name, config)
+    vec_trades, vec_secs = run_engine("vectorized", data, name, config)
+
+    identical = loop_trades == vec_trades
+    status = "OK" if identical else "MISMATCH"
+    log.info(f"[{status}] {name} {config}: {len(loop_trades)} trades | "
+             f"loop {loop_secs:.2f}s vs vectorized {vec_secs:.3f}s")
+    if not identical:
+        print(pd.DataFrame(loop_trades).compare(pd.DataFrame(vec_trades)) if len(loop_trades) == len(vec_trades)
+              else f"Trade count differs: loop={len(loop_trades)} vectorized={len(vec_trades)}")
+    return identical
+
+
+def main() -> int:
+    datasets = {}
+    for path in sorted(glob.glob("data/*-1m-data.csv")):
+        symbol = path.split("/")[-1].split("-")[0]
+        datasets[symbol] = pd.read_csv(path, index_col='open_time', parse_dates=True)
+    datasets["SYNTHETIC"] = synthetic_candles()
+
+    results = [check(name, data, config) for name, data in datasets.items() for config in STRATEGY_CONFIGS]
+
+    if all(results):
+        log.info(f"--- Parity confirmed on {len(results)} runs ---")
+        return 0
+    log.error(f"--- Parity FAILED on {results.count(False)} of {len(results)} runs ---")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
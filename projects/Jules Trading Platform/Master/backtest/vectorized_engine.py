@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+
+from strategy.base_strategy import Signal
+from strategy.orchestrator import StrategyOrchestrator
+
+# ---
+# Note to the user:
+# The classic backtest loop hands `historical_data.iloc[:i+1]` to the orchestrator
+# for every candle, so every indicator is recomputed from scratch on every step (O(n^2)).
+# This engine computes every indicator the strategies use ONCE over the full frame,
+# turns the strategy rules into boolean columns, and resolves SL/TP exits with
+# array searches. It must produce exactly the same trade list as the loop; run
+# `python -m backtest.parity_check` after touching either engine.
+# ---
+
+ATR_LENGTH = 14
+SMA_TREND_LENGTH = 200
+ADX_MIN_HISTORY = 20      # get_market_regime(): not enough data below this
+VALVE_MIN_HISTORY = 20    # RiskManager.calculate_volatility_multiplier(): same guard
+EXIT_SEARCH_BLOCK = 256   # First window size for the galloping SL/TP search
+
+
+def _causal(history_df: pd.DataFrame, indicator) -> pd.Series:
+    """
+    Runs a pandas_ta indicator over the full frame so that row i matches the value
+    the loop sees when it calls the same indicator on `history_df.iloc[:i+1]`.
+
+    ATR/ADX are recursive (Wilder smoothing) and therefore causal, with one catch:
+    pandas_ta's true range adds machine epsilon to *every* row as soon as one
+    candle in the input has high == low. A prefix that ends before the first flat
+    candle never gets that epsilon, so those rows are computed on the prefix alone.
+    """
+    def run(frame):
+        result = indicator(frame)
+        if result is None:  # pandas_ta returns None when the frame is too short
+            return pd.Series(np.nan, index=frame.index)
+        return result
+
+    full = run(history_df)
+    flat = (history_df['high'] - history_df['low']).to_numpy() == 0
+    if not flat.any():
+        return full
+
+    first_flat = int(np.argmax(flat))
+    if first_flat == 0:
+        return full
+
+    head = run(history_df.iloc[:first_flat])
+    merged = full.copy()
+    merged.iloc[:first_flat] = head.to_numpy()
+    return merged
+
+
+def _trailing_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Mean of the `window` values *before* each row (the row itself excluded),
+    matching `series.iloc[-(window + 1):-1].mean()` in the strategy.
+    Each window is reduced as its own contiguous row so the float summation order
+    is the same as reducing the slice directly.
+    """
+    out = np.full(len(values), np.nan)
+    if len(values) <= window:
+        return out
+    windows = np.ascontiguousarray(np.lib.stride_tricks.sliding_window_view(values[:-1], window))
+    out[window:] = windows.sum(axis=1) / window
+    return out
+
+
+class VectorizedBacktestEngine:
+    """
+    Single-pass signal generation and exit resolution for the BacktestRunner.
+    Mirrors StrategyOrchestrator + VolatilityBreakoutStrategy + get_market_regime.
+    """
+
+    def __init__(self, orchestrator: StrategyOrchestrator, adx_threshold: int = 25):
+        """
+        Initializes the engine.
+
+        Args:
+            orchestrator (StrategyOrchestrator): The orchestrator whose rules are mirrored.
+            adx_threshold (int): ADX level above which the market counts as trending.
+        """
+        self.orchestrator = orchestrator
+        self.strategy = orchestrator.vol_breakout
+        self.adx_threshold = adx_threshold
+
+    def precompute_indicators(self, historical_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Computes every indicator used by the strategy stack once over the full frame.
+
+        Returns:
+            pd.DataFrame: Columns 'atr', 'adx', 'sma200', 'avg_body', 'avg_volume', 'body'.
+        """
+        lookback = self.strategy.lookback_period
+
+        atr = _causal(historical_data, lambda f: ta.atr(f['high'], f['low'], f['close'], length=ATR_LENGTH))
+
+        def adx(frame):
+            adx_data = frame.ta.adx()
+            if adx_data is None or 'ADX_14' not in adx_data:
+                return None
+            return adx_data['ADX_14']
+
+        body = (historical_data['close'] - historical_data['open']).abs().to_numpy(dtype=float)
+        volume = historical_data['volume'].to_numpy(dtype=float)
+
+        return pd.DataFrame({
+            'atr': atr.to_numpy(),
+            'adx': _causal(historical_data, adx).to_numpy(),
+            'sma200': historical_data['close'].rolling(window=SMA_TREND_LENGTH).mean().to_numpy(),
+            'avg_body': _trailing_mean(body, lookback),
+            'avg_volume': _trailing_mean(volume, lookback),
+            'body': body,
+        }, index=historical_data.index)
+
+    def generate_signals(self, historical_data: pd.DataFrame, indicators: pd.DataFrame,
+                         sentiment_score: float = 0.0) -> np.ndarray:
+        """
+        Emits the orchestrator's decision for every candle as a vectorized column.
+
+        Returns:
+            np.ndarray: Signal values (Signal.GO_LONG.value, Signal.GO_SHORT.value or
+                        Signal.NO_TRADE.value) aligned with `historical_data`.
+        """
+        n = len(historical_data)
+        history_len = np.arange(1, n + 1)
+        open_ = historical_data['open'].to_numpy(dtype=float)
+        close = historical_data['close'].to_numpy(dtype=float)
+        volume = historical_data['volume'].to_numpy(dtype=float)
+
+        # Orchestrator: extreme volatility vetoes everything once 200 candles are available.
+        vol_pct = (indicators['atr'].to_numpy() / close) * 100
+        extreme_vol = (history_len >= SMA_TREND_LENGTH) & (vol_pct > 3.0)
+
+        # Strategy: ADX regime filter + volume surge + body expansion.
+        trending = (history_len >= ADX_MIN_HISTORY) & (indicators['adx'].to_numpy() > self.adx_threshold)
+        enough_history = history_len >= self.strategy.lookback_period + 1
+        is_volume_surge = volume > indicators['avg_volume'].to_numpy() * self.strategy.volume_multiplier
+        is_price_expansion = indicators['body'].to_numpy() > indicators['avg_body'].to_numpy() * self.strategy.price_move_multiplier
+        breakout = enough_history & trending & is_volume_surge & is_price_expansion & ~extreme_vol
+
+        go_long = breakout & (close > open_)
+        go_short = breakout & (close < open_)
+
+        # Orchestrator: sentiment filter.
+        if sentiment_score < -0.2:
+            go_long[:] = False
+        if sentiment_score > 0.2:
+            go_short[:] = False
+
+        signals = np.full(n, Signal.NO_TRADE.value)
+        signals[go_long] = Signal.GO_LONG.value
+        signals[go_short] = Signal.GO_SHORT.value
+        return signals
+
+    @staticmethod
+    def find_exit(low: np.ndarray, high: np.ndarray, entry_index: int, is_long: bool,
+                  stop_loss_price: float, take_profit_price: float):
+        """
+        Finds the first candle after `entry_index` that touches the stop or the target.
+        The search gallops through growing windows, so short trades stay cheap on long frames.
+        The stop is checked before the target on the same candle, exactly like the loop.
+
+        Returns:
+            tuple: (exit_index, exit_price, exit_reason), or None if the trade never closes.
+        """
+        n = len(low)
+        start = entry_index + 1
+        block = EXIT_SEARCH_BLOCK
+        while start < n:
+            stop = min(start + block, n)
+            if is_long:
+                stop_hit = low[start:stop] <= stop_loss_price
+                target_hit = high[start:stop] >= take_profit_price
+            else:
+                stop_hit = high[start:stop] >= stop_loss_price
+                target_hit = low[start:stop] <= take_profit_price
+
+            hits = np.flatnonzero(stop_hit | target_hit)
+            if hits.size:
+                offset = hits[0]
+                if stop_hit[offset]:
+                    return start + offset, stop_loss_price, "Stop-Loss"
+                return start + offset, take_profit_price, "Take-Profit"
+
+            start = stop
+            block *= 4
+        return None
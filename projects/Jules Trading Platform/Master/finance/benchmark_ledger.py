@@ -0,0 +1,64 @@
+import csv
+import sys
+import time
+import tempfile
+
+from finance.ledger import LedgerManager
+
+# ---
+# Note to the user:
+# Benchmark for the ledger storage backend.
+#
+#     python -m finance.benchmark_ledger [rows]
+#
+# Grows a throwaway ledger to `rows` transactions (default 1,000,000) and at each
+# checkpoint measures the balance lookup, a cold start (snapshot + tail
+# recovery), and the old approach of rereading the whole CSV for comparison.
+# ---
+
+CHECKPOINTS = [1_000, 10_000, 100_000, 1_000_000]
+LOOKUPS = 10_000
+
+
+def legacy_balance(file_path: str) -> float:
+    """What get_current_balance() used to do: read every row to find the last balance."""
+    with open(file_path, 'r') as f:
+        rows = list(csv.DictReader(f))
+        return float(rows[-1]['balance_after']) if rows else 0.0
+
+
+def main(total_rows: int = 1_000_000):
+    checkpoints = [c for c in CHECKPOINTS if c < total_rows] + [total_rows]
+    with tempfile.TemporaryDirectory() as data_dir:
+        ledger = LedgerManager(data_dir=data_dir)
+        written = ledger.store.count
+
+        print(f"{'rows':>10} | {'balance lookup':>15} | {'cold start':>11} | {'legacy CSV reread':>17}")
+        for checkpoint in checkpoints:
+            while written < checkpoint:
+                ledger.store.append("REALIZED_PNL" if written % 3 else "FEE", 0.01 if written % 2 else -0.01, "bench", "SOLUSDT")
+                written += 1
+
+            started = time.perf_counter()
+            for _ in range(LOOKUPS):
+                ledger.get_current_balance()
+            lookup_us = (time.perf_counter() - started) / LOOKUPS * 1e6
+
+            ledger.store.snapshot()
+            started = time.perf_counter()
+            reopened = LedgerManager(data_dir=data_dir)
+            cold_ms = (time.perf_counter() - started) * 1e3
+            assert reopened.get_current_balance() == ledger.get_current_balance()
+
+            started = time.perf_counter()
+            legacy = legacy_balance(ledger.file_path)
+            legacy_ms = (time.perf_counter() - started) * 1e3
+            assert legacy == ledger.get_current_balance()
+
+            print(f"{checkpoint:>10,} | {lookup_us:>12.2f} us | {cold_ms:>8.2f} ms | {legacy_ms:>14.1f} ms")
+
+        ledger.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -1,9 +1,9 @@
 import os
-import csv
 import logging
-from datetime import datetime
 from typing import List, Dict, Optional
 
+from .ledger_store import LedgerStore
+
 log = logging.getLogger(__name__)
 
 class LedgerManager:
@@ -11,6 +11,9 @@ class LedgerManager:
     Manages the financial ledger of the trading bot.
     Tracks all money movements: Deposits, Withdrawals, Realized PnL.
     Source of Truth for 'Net Capital'.
+
+    Backed by a LedgerStore: the balance and per-category totals are kept in memory
+    (recovered from a snapshot + journal tail), so lookups do not reread the CSV.
     """
 
     def __init__(self, data_dir="data"):
@@ -18,10 +21,9 @@ class LedgerManager:
         self._ensure_file_exists()
 
     def _ensure_file_exists(self):
-        if not os.path.exists(self.file_path):
-            with open(self.file_path, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(["id", "timestamp", "type", "amount", "balance_after", "description", "symbol"])
+        is_new = not os.path.exists(self.file_path)
+        self.store = LedgerStore(self.file_path)
+        if is_new:
             log.info("Initialized new Ledger at %s", self.file_path)
             # Add initial capital if empty (Simulation Genesis)
             self.add_transaction("DEPOSIT", 100.00, "Genesis Capital")
@@ -29,12 +31,8 @@ class LedgerManager:
     def get_current_balance(self) -> float:
         """Returns the latest balance from the ledger."""
         try:
-            with open(self.file_path, 'r') as f:
-                reader = csv.DictReader(f)
-                rows = list(reader)
-                if not rows:
-                    return 0.0
-                return float(rows[-1]['balance_after'])
+            self.store.refresh()
+            return self.store.balance
         except Exception as e:
             log.error("Failed to read balance: %s", e)
             return 0.0
@@ -44,38 +42,37 @@ class LedgerManager:
         Records a transaction and returns the new balance.
         tx_type: DEPOSIT, WITHDRAWAL, REALIZED_PNL, FEE
         """
-        current_bal = self.get_current_balance()
-        new_bal = current_bal + amount
-        
-        tx_id = datetime.now().strftime('%Y%m%d%H%M%S%f')
-        timestamp = datetime.now().isoformat()
-        
         try:
-            with open(self.file_path, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([tx_id, timestamp, tx_type, amount, new_bal, description, symbol])
+            row = self.store.append(tx_type, amount, description, symbol)
+            new_bal = row["balance_after"]
             log.info(f"Ledger: {tx_type} | ${amount:.2f} | New Bal: ${new_bal:.2f}")
             return new_bal
         except Exception as e:
             log.error("Failed to write to ledger: %s", e)
-            return current_bal
+            return self.store.balance
 
     def get_history(self) -> List[Dict]:
         """Returns full transaction history."""
         try:
-            with open(self.file_path, 'r') as f:
-                reader = csv.DictReader(f)
-                return list(reader)
+            return list(self.store.iter_rows())
         except Exception as e:
             log.error("Failed to read ledger history: %s", e)
             return []
 
     def get_summary(self) -> Dict:
         """Returns financial stats."""
-        history = self.get_history()
-        total_pnl = sum(float(x['amount']) for x in history if x['type'] in ['REALIZED_PNL', 'FEE'])
+        self.store.refresh()
+        totals = self.store.totals
         return {
-            "current_balance": self.get_current_balance(),
-            "transaction_count": len(history),
-            "total_realized_pnl": total_pnl
+            "current_balance": self.store.balance,
+            "transaction_count": self.store.count,
+            "total_realized_pnl": totals.get('REALIZED_PNL', 0.0) + totals.get('FEE', 0.0)
         }
+
+    def export_csv(self, dest_path: str):
+        """Exports the ledger as a CSV statement."""
+        self.store.export_csv(dest_path)
+
+    def close(self):
+        """Flushes the journal and writes a fresh snapshot."""
+        self.store.close()
@@ -0,0 +1,231 @@
+import os
+import io
+import csv
+import json
+import zlib
+import logging
+from datetime import datetime
+from typing import Dict, Iterator, List
+
+log = logging.getLogger(__name__)
+
+LEDGER_FIELDS = ["id", "timestamp", "type", "amount", "balance_after", "description", "symbol"]
+
+
+class LedgerStore:
+    """
+    Append-only ledger storage with an in-memory running balance.
+
+    The CSV journal is only ever appended to. Balance, transaction count and
+    per-category totals live in memory, so reading them does not depend on the
+    size of the history. A compact JSON snapshot records those aggregates
+    together with the journal byte offset they cover and a CRC-32 of those bytes.
+    On startup the store loads the snapshot and replays only the journal tail
+    written after it. If the snapshot is missing or does not match the journal
+    (shorter, or same prefix length with different bytes), it rebuilds from the
+    full journal.
+
+    One process writes (the bot); others only read and refresh(). A torn last
+    line left by a crashed writer is moved to '<file_path>.torn' before the next
+    append, so it never becomes part of the journal.
+    """
+
+    def __init__(self, file_path: str, snapshot_path: str = None, snapshot_every: int = 1000):
+        """
+        Args:
+            file_path: The CSV journal (data/ledger.csv).
+            snapshot_path: Where the aggregates snapshot is kept. Defaults to '<file_path>.snapshot.json'.
+            snapshot_every: Write a new snapshot after this many appends.
+        """
+        self.file_path = file_path
+        self.snapshot_path = snapshot_path or f"{file_path}.snapshot.json"
+        self.snapshot_every = snapshot_every
+
+        self.offset = 0           # Journal bytes already folded into the aggregates
+        self.crc = 0              # CRC-32 of journal bytes [0, offset)
+        self.balance = 0.0
+        self.count = 0
+        self.totals: Dict[str, float] = {}
+        self.type_counts: Dict[str, int] = {}
+        self._since_snapshot = 0
+        self._fh = None
+
+        self._recover()
+
+    # --- Recovery ---
+
+    def _recover(self):
+        if not os.path.exists(self.file_path):
+            with open(self.file_path, 'wb') as f:
+                f.write(self._encode(LEDGER_FIELDS))
+            self.offset = os.path.getsize(self.file_path)
+            self.crc = self._prefix_crc(self.offset)
+            return
+
+        if not self._load_snapshot():
+            self._reset()
+        self._replay_tail()
+
+    def _reset(self):
+        self.offset = 0
+        self.crc = 0
+        self.balance = 0.0
+        self.count = 0
+        self.totals = {}
+        self.type_counts = {}
+
+    def _load_snapshot(self) -> bool:
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                snap = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (json.JSONDecodeError, OSError) as e:
+            log.warning("Ignoring unreadable ledger snapshot %s: %s", self.snapshot_path, e)
+            return False
+
+        if snap.get("journal_size", 0) > os.path.getsize(self.file_path):
+            log.warning("Ledger snapshot is ahead of the journal (journal replaced?). Rebuilding.")
+            return False
+        if snap.get("journal_crc") != self._prefix_crc(snap.get("journal_size", 0)):
+            log.warning("Ledger snapshot does not match the journal contents (journal rewritten?). Rebuilding.")
+            return False
+
+        self.offset = snap["journal_size"]
+        self.crc = snap["journal_crc"]
+        self.balance = snap["balance"]
+        self.count = snap["count"]
+        self.totals = snap["totals"]
+        self.type_counts = snap["type_counts"]
+        return True
+
+    def _prefix_crc(self, size: int) -> int:
+        crc = 0
+        with open(self.file_path, 'rb') as f:
+            while size > 0:
+                block = f.read(min(size, 1 << 20))
+                if not block:
+                    break
+                crc = zlib.crc32(block, crc)
+                size -= len(block)
+        return crc
+
+    @staticmethod
+    def _encode(row: list) -> bytes:
+        buf = io.StringIO()
+        csv.writer(buf).writerow(row)
+        return buf.getvalue().encode('utf-8')
+
+    def _quarantine_torn_tail(self):
+        """Moves bytes after the last complete line (a crashed writer's torn line) to '<file>.torn'."""
+        size = os.path.getsize(self.file_path)
+        if size <= self.offset:
+            return
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset)
+            torn = f.read(size - self.offset)
+        with open(f"{self.file_path}.torn", 'ab') as f:
+            f.write(torn + b'\n')
+        os.truncate(self.file_path, self.offset)
+        log.warning("Moved a torn ledger line (%d bytes) to %s.torn", len(torn), self.file_path)
+
+    def _replay_tail(self):
+        """Folds every complete journal line after `self.offset` into the aggregates."""
+        size = os.path.getsize(self.file_path)
+        if size <= self.offset:
+            return
+
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+
+        end = chunk.rfind(b'\n') + 1
+        if end == 0:
+            return  # Only a partial line so far (writer mid-append, or a torn write)
+
+        self.crc = zlib.crc32(chunk[:end], self.crc)
+        text = chunk[:end].decode('utf-8')
+        for row in csv.reader(io.StringIO(text, newline='')):
+            if not row or row[0] == LEDGER_FIELDS[0]:
+                continue  # Header
+            self._apply(row)
+        self.offset += end
+
+    def _apply(self, row: List[str]):
+        try:
+            tx_type, amount, balance_after = row[2], float(row[3]), float(row[4])
+        except (IndexError, ValueError):
+            log.warning("Skipping malformed ledger line: %s", row)
+            return
+        self.balance = balance_after
+        self.count += 1
+        self.totals[tx_type] = self.totals.get(tx_type, 0.0) + amount
+        self.type_counts[tx_type] = self.type_counts.get(tx_type, 0) + 1
+
+    def refresh(self):
+        """Picks up lines appended by another process (e.g. the live bot while the web UI reads)."""
+        if os.path.getsize(self.file_path) != self.offset:
+            self._replay_tail()
+
+    # --- Writes ---
+
+    def append(self, tx_type: str, amount: float, description: str, symbol: str = "") -> Dict:
+        """Appends one transaction and returns the written row."""
+        self.refresh()
+        new_bal = self.balance + amount
+        row = [datetime.now().strftime('%Y%m%d%H%M%S%f'), datetime.now().isoformat(),
+               tx_type, amount, new_bal, description, symbol]
+
+        if self._fh is None:
+            self._quarantine_torn_tail()
+            self._fh = open(self.file_path, 'ab')
+        line = self._encode(row)
+        self._fh.write(line)
+        self._fh.flush()
+
+        self.offset = self._fh.tell()
+        self.crc = zlib.crc32(line, self.crc)
+        self._apply([str(v) for v in row])
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+        return dict(zip(LEDGER_FIELDS, row))
+
+    def snapshot(self):
+        """Atomically persists the aggregates and the journal offset they cover."""
+        snap = {
+            "journal_size": self.offset,
+            "journal_crc": self.crc,
+            "balance": self.balance,
+            "count": self.count,
+            "totals": self.totals,
+            "type_counts": self.type_counts,
+        }
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(snap, f)
+        os.replace(tmp_path, self.snapshot_path)
+        self._since_snapshot = 0
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        if self._since_snapshot:
+            self.snapshot()
+
+    # --- Reads ---
+
+    def iter_rows(self) -> Iterator[Dict]:
+        """Streams the full history as CSV dict rows."""
+        with open(self.file_path, 'r', newline='') as f:
+            yield from csv.DictReader(f)
+
+    def export_csv(self, dest_path: str):
+        """Writes a clean copy of the ledger (header + well-formed rows) to `dest_path`."""
+        with open(dest_path, 'w', newline='') as out:
+            writer = csv.DictWriter(out, fieldnames=LEDGER_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            for row in self.iter_rows():
+                if row.get('balance_after'):
+                    writer.writerow(row)
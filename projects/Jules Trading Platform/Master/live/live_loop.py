@@ -9,6 +9,7 @@ from collections import deque
 # --- Import our custom modules ---
 from data.binance_client import BinanceDataClient
 from strategy.orchestrator import StrategyOrchestrator
+from analysis.streaming_indicators import IndicatorState
 from risk.risk_manager import RiskManager
 from execution.order_executor import OrderExecutor
 from execution.position_manager import PositionManager, Position
@@ -83,6 +84,16 @@ class LiveTradingLoop:
         self.dashboard = Dashboard()
         self.market_data = {symbol: 0.0 for symbol in self.trading_universe}
         self.historical_data = {symbol: deque(maxlen=100) for symbol in self.trading_universe}
+        # O(1)-per-candle indicators consumed by the orchestrator and risk manager on candle close.
+        # By default they see what the 100-candle deque gave them (so detect_regime's 200-candle
+        # guard keeps returning SIDEWAYS). LIVE_FULL_HISTORY_INDICATORS=1 warms them on the whole
+        # CSV instead, which enables the SMA200 regimes and the extreme-volatility veto live.
+        self.full_history_indicators = os.getenv("LIVE_FULL_HISTORY_INDICATORS", "0") == "1"
+        window = None if self.full_history_indicators else self.historical_data[self.trading_universe[0]].maxlen
+        self.indicator_state = {
+            symbol: IndicatorState(symbol, lookback_period=self.orchestrator.lookback_period, window=window)
+            for symbol in self.trading_universe
+        }
         
         log.info("Live Trading Loop initialized with symbols: %s", self.trading_universe)
         self._update_dashboard_state("STARTING") # Force file creation immediately
@@ -98,7 +109,13 @@ class LiveTradingLoop:
                 df = pd.read_csv(local_data_file, index_col='open_time', parse_dates=True)
                 
                 df = df[['open', 'high', 'low', 'close', 'volume']]
-                
+
+                # Warm the streaming indicators up on the deque window (or the full file if enabled)
+                warmup = df if self.full_history_indicators else df.tail(self.historical_data[symbol].maxlen)
+                for open_time, candle in zip(warmup.index, warmup.to_dict('records')):
+                    candle['open_time'] = open_time
+                    self.indicator_state[symbol].update(candle)
+
                 records = df.tail(self.historical_data[symbol].maxlen).to_dict('records')
                 
                 self.historical_data[symbol].extend(records)
@@ -287,8 +304,8 @@ class LiveTradingLoop:
                 'close': float(candle_data['c']), 'volume': float(candle_data['v'])
             }
             self.historical_data[symbol].append(new_row)
-            history_df = pd.DataFrame(list(self.historical_data[symbol]))
-            history_df.symbol = symbol
+            indicators = self.indicator_state[symbol]
+            indicators.update(new_row)
 
             if self.daily_pnl <= self.daily_loss_limit:
                 log.warning("Daily loss limit of %.2f reached. No new trades will be opened.", self.daily_loss_limit)
@@ -307,7 +324,7 @@ class LiveTradingLoop:
                  return
 
             # 3. Orchestrator + Sentinel Signal
-            signal = self.orchestrator.get_signal(history_df, self.current_sentiment_score)
+            signal = self.orchestrator.get_signal(None, self.current_sentiment_score, indicators=indicators)
             
             if signal.name in ["GO_LONG", "GO_SHORT"]:
                 # 4. Risk Manager (Sizing + Shield)
@@ -320,7 +337,7 @@ class LiveTradingLoop:
                     self.decision_logger.log_context(symbol, signal.name, self.current_sentiment_score, 0, False, "Circuit Breaker Active")
                     return
 
-                size = self.risk_manager.calculate_position_size(entry_price, stop_loss_price, is_long, history_df=history_df)
+                size = self.risk_manager.calculate_position_size(entry_price, stop_loss_price, is_long, indicators=indicators)
                 
                 if size <= 0:
                     self.decision_logger.log_context(symbol, signal.name, self.current_sentiment_score, 0, False, "Risk Sizing = 0")
@@ -383,6 +400,7 @@ async def cleanup(loop):
     # Clean shutdown of agents would go here
     await loop.data_client.close_connection()
     loop.db_manager.close_connection()
+    loop.ledger.close()
     log.info("Bot shutdown complete.")
 
 if __name__ == "__main__":
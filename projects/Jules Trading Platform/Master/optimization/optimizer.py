@@ -1,9 +1,11 @@
+import argparse
 import pandas as pd
 import asyncio
 import itertools
 import json
 
 from backtest.backtest_runner import BacktestRunner
+from optimization.parallel_sweep import ParallelSweepExecutor
 from logging_config import log
 
 # ---
@@ -24,9 +26,16 @@ class Optimizer:
         self.initial_capital = initial_capital
         self.results = []
 
-    async def run_optimization(self, parameter_space: dict):
+    async def run_optimization(self, parameter_space: dict, workers: int = 1, resume: bool = False):
         """
         Runs the optimization process.
+
+        Args:
+            parameter_space (dict): Parameter name -> list of values to sweep.
+            workers (int): Number of processes. Above 1, the sweep runs on the
+                           ParallelSweepExecutor (shared-memory data, incremental results).
+            resume (bool): Parallel mode only. Skip combinations already saved in
+                           optimization/results.json by an interrupted sweep.
         """
         log.info("--- Starting Parameter Optimization ---")
         
@@ -54,6 +63,14 @@ class Optimizer:
             log.error("Could not fetch historical data. Aborting optimization.")
             return
 
+        if workers > 1:
+            executor = ParallelSweepExecutor(
+                historical_data, self.symbol, self.initial_capital, workers=workers
+            )
+            self.results = executor.run(param_combinations, resume=resume)
+            log.info("\n--- Optimization Complete ---")
+            return
+
         for i, params in enumerate(param_combinations):
             log.info(f"\n[{i+1}/{len(param_combinations)}] Testing parameters: {params}")
             
@@ -93,7 +110,7 @@ class Optimizer:
             log.error(f"Error saving optimization results: {e}")
 
 
-async def main():
+async def main(workers: int, resume: bool):
     parameter_grid = {
         "lookback_period": [10, 20, 30],
         "volume_multiplier": [2.0, 3.0, 4.0],
@@ -107,8 +124,12 @@ async def main():
         initial_capital=100.0
     )
 
-    await optimizer.run_optimization(parameter_grid)
+    await optimizer.run_optimization(parameter_grid, workers=workers, resume=resume)
     optimizer.print_report()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Strategy parameter optimizer")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (1 = serial loop engine; >1 = parallel vectorized sweep)")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted parallel sweep")
+    args = parser.parse_args()
+    asyncio.run(main(args.workers, args.resume))
@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+from backtest.backtest_runner import BacktestRunner
+from logging_config import log
+
+# ---
+# Note to the user:
+# The serial optimizer copies the full history for every parameter combination and
+# runs them one at a time on one core. This executor places the OHLCV arrays in
+# shared memory ONCE, fans combinations out to a process pool (each worker maps the
+# same memory, nothing is copied), and rewrites `results.json` after every finished
+# combination. If a sweep is interrupted, rerunning it skips every combination that
+# is already in the results file.
+# ---
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# Per-worker state, populated by _attach_shared_frame() in each pool process.
+_worker_state = {}
+
+
+def _params_key(params: dict) -> str:
+    """The key used for resuming. Matches the stringified 'parameters' stored in results.json."""
+    return str(params)
+
+
+def _attach_shared_frame(spec: dict):
+    """Pool initializer: maps the shared OHLCV block and rebuilds a zero-copy DataFrame."""
+    values_shm = shared_memory.SharedMemory(name=spec['values_name'])
+    index_shm = shared_memory.SharedMemory(name=spec['index_name'])
+
+    values = np.ndarray(spec['shape'], dtype=np.float64, buffer=values_shm.buf)
+    index = np.ndarray((spec['shape'][0],), dtype=np.int64, buffer=index_shm.buf)
+    frame = pd.DataFrame(values, columns=OHLCV_COLUMNS, index=pd.DatetimeIndex(index.view('datetime64[ns]'), name='open_time'), copy=False)
+    frame.symbol = spec['symbol']
+
+    # Keep the segments referenced for the lifetime of the worker.
+    _worker_state.update(frame=frame, segments=(values_shm, index_shm), spec=spec)
+
+
+def _run_combination(params: dict) -> dict:
+    """Runs one backtest inside a pool worker against the shared frame."""
+    spec = _worker_state['spec']
+    runner = BacktestRunner(strategy_config=params, capital=spec['initial_capital'], engine=spec['engine'])
+    runner.run(_worker_state['frame'])
+
+    report = runner.get_results()
+    report.pop('equity_curve', None)  # Series; not JSON serializable
+    report = {k: (v.item() if isinstance(v, np.generic) else v) for k, v in report.items()}
+    report['parameters'] = params
+    return report
+
+
+class ParallelSweepExecutor:
+    """
+    Runs a parameter sweep across a process pool with the OHLCV data in shared memory.
+    """
+
+    def __init__(self, historical_data: pd.DataFrame, symbol: str, initial_capital: float,
+                 results_path: str = "optimization/results.json", workers: int = None,
+                 engine: str = "vectorized"):
+        """
+        Initializes the executor.
+
+        Args:
+            historical_data (pd.DataFrame): OHLCV candles indexed by open time.
+            symbol (str): Symbol the data belongs to.
+            initial_capital (float): Starting capital for every backtest.
+            results_path (str): JSON file that is rewritten after every finished combination.
+            workers (int): Pool size. Defaults to the number of CPUs.
+            engine (str): BacktestRunner engine used by the workers.
+        """
+        self.historical_data = historical_data
+        self.symbol = symbol
+        self.initial_capital = initial_capital
+        self.results_path = results_path
+        self.workers = workers or os.cpu_count() or 1
+        self.engine = engine
+        self.results = []
+
+    def _load_previous_results(self) -> list:
+        """Loads results from an earlier (possibly interrupted) sweep."""
+        try:
+            with open(self.results_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+        except json.JSONDecodeError as e:
+            log.warning(f"Ignoring unreadable results file {self.results_path}: {e}")
+            return []
+
+    def _save_results(self):
+        """Atomically rewrites the results file, sorted best-first like Optimizer.print_report()."""
+        records = []
+        for report in self.results:
+            record = dict(report)
+            record['parameters'] = _params_key(report['parameters']) if isinstance(report['parameters'], dict) else report['parameters']
+            records.append(record)
+        records.sort(key=lambda r: r.get('profit_factor', 0), reverse=True)
+
+        tmp_path = f"{self.results_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(records, f, indent=4)
+        os.replace(tmp_path, self.results_path)
+
+    def _create_shared_frame(self):
+        """Copies the OHLCV arrays into shared memory once. Returns (spec, segments)."""
+        values = np.ascontiguousarray(self.historical_data[OHLCV_COLUMNS].to_numpy(dtype=np.float64))
+        index = pd.DatetimeIndex(self.historical_data.index).as_unit('ns').asi8
+
+        values_shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        index_shm = shared_memory.SharedMemory(create=True, size=max(index.nbytes, 1))
+        np.ndarray(values.shape, dtype=np.float64, buffer=values_shm.buf)[:] = values
+        np.ndarray(index.shape, dtype=np.int64, buffer=index_shm.buf)[:] = index
+
+        spec = {
+            'values_name': values_shm.name,
+            'index_name': index_shm.name,
+            'shape': values.shape,
+            'symbol': self.symbol,
+            'initial_capital': self.initial_capital,
+            'engine': self.engine,
+        }
+        return spec, (values_shm, index_shm)
+
+    def run(self, param_combinations: list, resume: bool = True) -> list:
+        """
+        Executes the sweep.
+
+        Args:
+            param_combinations (list): Parameter dicts to test.
+            resume (bool): Skip combinations already present in the results file.
+
+        Returns:
+            list: One report per combination (previous and new).
+        """
+        self.results = self._load_previous_results() if resume else []
+        done = {r['parameters'] if isinstance(r['parameters'], str) else _params_key(r['parameters']) for r in self.results}
+        pending = [p for p in param_combinations if _params_key(p) not in done]
+
+        if len(pending) < len(param_combinations):
+            log.info(f"Resuming sweep: {len(param_combinations) - len(pending)} combinations already in {self.results_path}.")
+        if not pending:
+            log.info("Nothing left to run.")
+            return self.results
+
+        log.info(f"Parallel sweep: {len(pending)} combinations on {self.workers} workers ({self.engine} engine)...")
+        spec, segments = self._create_shared_frame()
+        started = time.perf_counter()
+        completed = 0
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_attach_shared_frame, initargs=(spec,)) as pool:
+                futures = {pool.submit(_run_combination, params): params for params in pending}
+                for future in as_completed(futures):
+                    params = futures[future]
+                    try:
+                        report = future.result()
+                    except Exception as e:
+                        log.error(f"Combination {params} failed: {e}")
+                        continue
+
+                    self.results.append(report)
+                    self._save_results()
+                    completed += 1
+
+                    elapsed = time.perf_counter() - started
+                    log.info(f"[{completed}/{len(pending)}] {params} -> PF {report['profit_factor']:.2f} | "
+                             f"{completed / elapsed:.2f} combos/s")
+        finally:
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+
+        elapsed = time.perf_counter() - started
+        rate = completed / elapsed if elapsed > 0 else 0.0
+        log.info(f"Parallel sweep finished: {completed} combinations in {elapsed:.1f}s ({rate:.2f} combos/s).")
+        return self.results
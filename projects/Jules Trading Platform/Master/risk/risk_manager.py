@@ -96,21 +96,35 @@ class RiskManager:
             self.breaker_reset_time = datetime.now() + timedelta(hours=24)
             log.warning("🛡️ CIRCUIT BREAKER TRIGGERED: 3 Consecutive Losses. Trading halted for 24h.")
 
-    def calculate_volatility_multiplier(self, history_df: pd.DataFrame) -> float:
+    def calculate_volatility_multiplier(self, history_df: pd.DataFrame, indicators=None) -> float:
         """
         Calculates a 'Volatility Multiplier' based on ATR.
         High Volatility -> Low Multiplier (Reduce Size).
         Low Volatility -> High Multiplier (Increase Size).
+        With a streaming `IndicatorState`, its ATR is used instead of `history_df`.
         """
+        if indicators is not None:
+            if indicators.count < 20:
+                return 1.0
+            return self.volatility_multiplier_from_atr(indicators.atr.value, indicators.close)
+
         if history_df.empty or len(history_df) < 20:
             return 1.0
 
         # Calculate ATR
         atr = ta.atr(history_df['high'], history_df['low'], history_df['close'], length=14)
         current_atr = atr.iloc[-1]
-        
-        # Normalize ATR by price to get percentage volatility
         current_price = history_df['close'].iloc[-1]
+
+        return self.volatility_multiplier_from_atr(current_atr, current_price)
+
+    def volatility_multiplier_from_atr(self, current_atr: float, current_price: float) -> float:
+        """
+        Converts an already-computed ATR into the Volatility Valve multiplier.
+        Lets callers with precomputed indicators (e.g. the vectorized backtester)
+        skip the per-call ATR recomputation.
+        """
+        # Normalize ATR by price to get percentage volatility
         volatility_pct = (current_atr / current_price) * 100
 
         # Logic: Base volatility is 1%.
@@ -147,11 +161,16 @@ class RiskManager:
         is_long: bool,
         history_df: pd.DataFrame = None,
         min_trade_size: float = 0.001,
-        trade_size_step: float = 0.001
+        trade_size_step: float = 0.001,
+        current_atr: float = None,
+        indicators=None
     ) -> float:
         """
         Calculates the appropriate position size to adhere to the risk-per-trade limit.
         Uses the Volatility Valve to adjust size dynamically.
+
+        If `current_atr` is given it is used (against `entry_price`) instead of
+        recomputing ATR from `history_df`; likewise for a streaming `indicators` state.
         """
         getcontext().prec = 28
 
@@ -160,7 +179,11 @@ class RiskManager:
             
         # Volatility Adjustment
         vol_multiplier = 1.0
-        if history_df is not None:
+        if current_atr is not None:
+            vol_multiplier = self.volatility_multiplier_from_atr(current_atr, entry_price)
+        elif indicators is not None:
+            vol_multiplier = self.calculate_volatility_multiplier(None, indicators=indicators)
+        elif history_df is not None:
             vol_multiplier = self.calculate_volatility_multiplier(history_df)
 
         d_entry_price = Decimal(str(entry_price))
@@ -16,31 +16,41 @@ class StrategyOrchestrator:
     The 'Brain' of the operation.
     It decides WHICH strategy to use based on Market Regime and Sentiment.
     """
-    def __init__(self):
+    def __init__(self, config: dict = None):
         # Initialize strategies
-        self.vol_breakout = VolatilityBreakoutStrategy(config={
+        self.vol_breakout = VolatilityBreakoutStrategy(config=config or {
             "lookback_period": 20, "volume_multiplier": 3.0, "price_move_multiplier": 2.5
         })
+        # Minimum history before the primary strategy can emit a signal (used by the backtester).
+        self.lookback_period = self.vol_breakout.lookback_period
         
         # In the future, we can add 'MeanReversionStrategy' or 'TrendFollowingStrategy' here.
         # For now, we use VolatilityBreakout as the primary weapon, but we change its aggression.
         
         self.current_regime = MarketRegime.SIDEWAYS
 
-    def detect_regime(self, history_df: pd.DataFrame) -> MarketRegime:
+    def detect_regime(self, history_df: pd.DataFrame, indicators=None) -> MarketRegime:
         """
         Determines the current market regime using technical indicators.
+        If a streaming `IndicatorState` is given, its SMA200/ATR are used and
+        `history_df` is not read.
         """
-        if len(history_df) < 200:
+        history_len = indicators.count if indicators is not None else len(history_df)
+        if history_len < 200:
             return MarketRegime.SIDEWAYS # Not enough data
-            
-        current_price = history_df['close'].iloc[-1]
-        
-        # SMA 200 for Trend
-        sma200 = history_df['close'].rolling(window=200).mean().iloc[-1]
-        
-        # ATR for Volatility
-        atr = ta.atr(history_df['high'], history_df['low'], history_df['close'], length=14).iloc[-1]
+
+        if indicators is not None:
+            current_price = indicators.close
+            sma200 = indicators.sma200.value
+            atr = indicators.atr.value
+        else:
+            current_price = history_df['close'].iloc[-1]
+
+            # SMA 200 for Trend
+            sma200 = history_df['close'].rolling(window=200).mean().iloc[-1]
+
+            # ATR for Volatility
+            atr = ta.atr(history_df['high'], history_df['low'], history_df['close'], length=14).iloc[-1]
         vol_pct = (atr / current_price) * 100
         
         # Regime Logic
@@ -53,11 +63,12 @@ class StrategyOrchestrator:
         else:
             return MarketRegime.SIDEWAYS
 
-    def get_signal(self, history_df: pd.DataFrame, sentiment_score: float) -> Signal:
+    def get_signal(self, history_df: pd.DataFrame, sentiment_score: float, indicators=None) -> Signal:
         """
         Selects the strategy and gets the signal.
+        With a streaming `IndicatorState`, no indicator is recomputed and `history_df` may be None.
         """
-        self.current_regime = self.detect_regime(history_df)
+        self.current_regime = self.detect_regime(history_df, indicators=indicators)
         
         # --- Logic Layer 1: The Regime Check ---
         if self.current_regime == MarketRegime.BEAR_TREND:
@@ -77,7 +88,7 @@ class StrategyOrchestrator:
         # If Sentiment is Super Bullish (> 0.5), we ignore Sell signals? (Maybe too risky).
         # If Sentiment is Super Bearish (< -0.5), we ignore Buy signals.
         
-        raw_signal = self.vol_breakout.get_signal(historical_data=history_df)
+        raw_signal = self.vol_breakout.get_signal(historical_data=history_df, indicators=indicators)
         
         if raw_signal == Signal.GO_LONG and sentiment_score < -0.2:
             log.info("Orchestrator: BLOCKED Buy Signal due to Negative Sentiment (%.2f)", sentiment_score)
@@ -22,24 +22,37 @@ class VolatilityBreakoutStrategy(BaseStrategy):
         self.volume_multiplier = float(self.config.get("volume_multiplier", 3.0))
         self.price_move_multiplier = float(self.config.get("price_move_multiplier", 2.5))
 
-    def get_signal(self, historical_data: pd.DataFrame) -> Signal:
+    def get_signal(self, historical_data: pd.DataFrame, indicators=None) -> Signal:
         """
         Analyzes the latest candle to detect a volatility breakout.
+
+        If a streaming `IndicatorState` (built with the same lookback period) is given,
+        the latest candle and the lookback averages come from it instead of `historical_data`.
         """
-        if len(historical_data) < self.lookback_period + 1:
+        history_len = indicators.count if indicators is not None else len(historical_data)
+        if history_len < self.lookback_period + 1:
             return Signal.NO_TRADE
 
-        regime = get_market_regime(historical_data)
+        regime = get_market_regime(historical_data, indicators=indicators)
         if regime != MarketRegime.TRENDING:
             return Signal.NO_TRADE
 
-        lookback_data = historical_data.iloc[-(self.lookback_period + 1):-1]
+        if indicators is not None:
+            average_body_size = indicators.avg_body
+            average_volume = indicators.avg_volume
+            latest_candle = indicators.last_candle
+            candle_time = latest_candle.get('open_time')
+            symbol = indicators.symbol
+        else:
+            lookback_data = historical_data.iloc[-(self.lookback_period + 1):-1]
+
+            average_body_size = (lookback_data['close'] - lookback_data['open']).abs().mean()
+            average_volume = lookback_data['volume'].mean()
 
-        average_body_size = (lookback_data['close'] - lookback_data['open']).abs().mean()
-        average_volume = lookback_data['volume'].mean()
+            latest_candle = historical_data.iloc[-1]
+            candle_time = latest_candle.name
+            symbol = historical_data.symbol
 
-        latest_candle = historical_data.iloc[-1]
-        
         current_body_size = abs(latest_candle['close'] - latest_candle['open'])
         current_volume = latest_candle['volume']
 
@@ -48,12 +61,12 @@ class VolatilityBreakoutStrategy(BaseStrategy):
 
         if is_volume_surge and is_price_expansion:
             if latest_candle['close'] > latest_candle['open']:
-                log.info(f"[{latest_candle.name}] Bullish Breakout Detected on {historical_data.symbol}: "
+                log.info(f"[{candle_time}] Bullish Breakout Detected on {symbol}: "
                          f"Volume {current_volume:.2f} vs Avg {average_volume:.2f}, "
                          f"Body {current_body_size:.4f} vs Avg {average_body_size:.4f}")
                 return Signal.GO_LONG
             elif latest_candle['close'] < latest_candle['open']:
-                log.info(f"[{latest_candle.name}] Bearish Breakout Detected on {historical_data.symbol}: "
+                log.info(f"[{candle_time}] Bearish Breakout Detected on {symbol}: "
                          f"Volume {current_volume:.2f} vs Avg {average_volume:.2f}, "
                          f"Body {current_body_size:.4f} vs Avg {average_body_size:.4f}")
                 return Signal.GO_SHORT
@@ -0,0 +1,170 @@
+"""
+Benchmark for dedupe_engine on synthetic construction companies (no Supabase needed).
+
+    python scrapers/bench_dedupe.py [--companies 200000] [--dup-rate 0.15]
+
+Builds a seeded table where ~dup-rate of the rows are near-duplicates of another row
+(typos, suffix/punctuation changes, dropped words, reformatted phone/email/website),
+then reports pairs compared, pair reduction ratio, runtime per stage, pairwise
+precision/recall against the ground truth (and for the old exact canonical-name key),
+and the size of the change set versus truncate-and-reload.
+"""
+
+import argparse
+import random
+import string
+import time
+
+import numpy as np
+
+import dedupe_engine as de
+
+INDUSTRY = ["construction", "builders", "contracting", "engineering", "civil works", "building", "renovation",
+            "steel", "plumbing", "roofing", "electrical", "concrete", "architects", "developers", "infrastructure"]
+SUFFIX = ["ltd", "limited", "co ltd", "company limited", "", "ltée", "(mauritius) ltd", "pvt ltd"]
+SYL = ["ba", "ra", "mo", "li", "ta", "ne", "so", "ka", "vi", "du", "ze", "po", "gu", "ha", "ri", "lo", "me", "sa",
+       "co", "ji", "fa", "we", "ny", "tr", "ch", "an", "el", "or", "is", "um"]
+
+
+def word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYL) for _ in range(rng.randint(2, 4)))
+
+
+def typo(rng: random.Random, s: str) -> str:
+    i = rng.randrange(len(s))
+    op = rng.randrange(3)
+    if op == 0:
+        return s[:i] + s[i + 1:]
+    if op == 1:
+        return s[:i] + rng.choice(string.ascii_lowercase) + s[i + 1:]
+    j = min(i + 1, len(s) - 1)
+    return s[:i] + s[j] + s[i] + s[j + 1:]
+
+
+def base_company(rng: random.Random, k: int, vocab) -> dict:
+    toks = [rng.choice(vocab)] + ([rng.choice(vocab)] if rng.random() < 0.8 else [])
+    name = " ".join(toks + [rng.choice(INDUSTRY)])
+    rec = {
+        "id": k + 1,
+        "company_name": (name + " " + rng.choice(SUFFIX)).strip().title(),
+        "phone": f"+230 5{rng.randrange(10**7):07d}" if rng.random() < 0.6 else None,
+        "email": f"info@{toks[0]}{k}.mu" if rng.random() < 0.3 else None,
+        "website": f"https://www.{toks[0]}{k}.mu" if rng.random() < 0.2 else None,
+        "address": f"{rng.randint(1, 99)} Royal Road" if rng.random() < 0.5 else None,
+        "source": "CIDB PDF",
+    }
+    return rec
+
+
+def variant(rng: random.Random, rec: dict, k: int) -> dict:
+    v = dict(rec, id=k + 1)
+    name = rec["company_name"].lower()
+    for _ in range(rng.choice([1, 1, 2])):
+        op = rng.randrange(5)
+        if op == 0:
+            parts = name.split()
+            t = rng.randrange(len(parts))
+            if len(parts[t]) > 3:
+                parts[t] = typo(rng, parts[t])
+            name = " ".join(parts)
+        elif op == 1:
+            name = name.replace(" ltd", " limited") if " ltd" in name else name + " ltd"
+        elif op == 2:
+            name = name.replace(" ", "-", 1).upper()
+        elif op == 3:
+            name = name.replace(" & ", " and ") + "."
+        else:
+            for ind in INDUSTRY:
+                name = name.replace(ind, "").strip()
+    v["company_name"] = name
+    if v["phone"] and rng.random() < 0.5:
+        d = v["phone"][-8:]
+        v["phone"] = rng.choice([d, f"{d[:4]} {d[4:]}", f"00230{d}", f"(230) {d[:4]}-{d[4:]}"])
+    elif rng.random() < 0.3:
+        v["phone"] = None
+    if v["email"] and rng.random() < 0.5:
+        v["email"] = v["email"].upper()
+    if v["website"] and rng.random() < 0.5:
+        v["website"] = v["website"].replace("https://www.", "http://")
+    if rng.random() < 0.4:
+        v["address"] = None
+    return v
+
+
+def make_table(n: int, dup_rate: float, seed: int = 17):
+    rng = random.Random(seed)
+    vocab = sorted({word(rng) for _ in range(80000)})
+    rows, truth = [], []
+    for k in range(n):
+        if rows and rng.random() < dup_rate:
+            src = rng.randrange(len(rows))
+            rows.append(variant(rng, rows[src], k))
+            truth.append(truth[src])
+        else:
+            rows.append(base_company(rng, k, vocab))
+            truth.append(k)
+    order = list(range(n))
+    rng.shuffle(order)
+    return [rows[i] for i in order], np.asarray([truth[i] for i in order])
+
+
+def pair_count(labels: np.ndarray) -> int:
+    _, c = np.unique(labels, return_counts=True)
+    return int((c * (c - 1) // 2).sum())
+
+
+def precision_recall(pred: np.ndarray, truth: np.ndarray):
+    joint = pred.astype(np.int64) * (truth.max() + 1) + truth
+    tp, p, t = pair_count(joint), pair_count(pred), pair_count(truth)
+    return tp / max(p, 1), tp / max(t, 1)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--companies", type=int, default=200_000)
+    ap.add_argument("--dup-rate", type=float, default=0.15)
+    args = ap.parse_args()
+
+    rows, truth = make_table(args.companies, args.dup_rate)
+    print(f"{len(rows)} companies, {len(rows) - len(set(truth.tolist()))} planted duplicates")
+
+    t0 = time.perf_counter()
+    feats = de.Features.of(rows)
+    t1 = time.perf_counter()
+    i, j = de.candidate_pairs(feats)
+    t2 = time.perf_counter()
+    match = de.score_pairs(feats, i, j)
+    t3 = time.perf_counter()
+    labels = de.clusters(len(rows), i[match], j[match])
+    t4 = time.perf_counter()
+
+    n = len(rows)
+    all_pairs = n * (n - 1) // 2
+    print(f"pairs compared: {len(i):,} of {all_pairs:,} (reduction ratio {1 - len(i) / all_pairs:.5%}), "
+          f"{int(match.sum()):,} matches")
+    print(f"runtime: normalise {t1 - t0:.1f}s, blocking {t2 - t1:.1f}s, scoring {t3 - t2:.1f}s, "
+          f"clustering {t4 - t3:.1f}s, total {t4 - t0:.1f}s")
+
+    p, r = precision_recall(labels, truth)
+    exact = {}
+    old = np.asarray([exact.setdefault(nm or f"__no_name__:{k}", k) for k, nm in enumerate(feats.names)])
+    op, orr = precision_recall(old, truth)
+    print(f"duplicate pairs: fuzzy precision {p:.3f} recall {r:.3f} | exact canonical key precision {op:.3f} recall {orr:.3f}")
+
+    t0 = time.perf_counter()
+    d = de.diff(rows)
+    secs = time.perf_counter() - t0
+    kept = n - len(d.deletes)
+    print(f"diff(): {len(d.updates):,} updates, {len(d.deletes):,} deletes (exact names), {len(d.review):,} fuzzy "
+          f"kept for review, {len(d.inserts)} inserts in {secs:.1f}s "
+          f"-> {len(d.updates) + len(d.deletes):,} row writes vs {n + kept:,} for truncate-and-reload")
+    # a delete is wrong when no kept row with its canonical name is the same company
+    pos = {r["id"]: k for k, r in enumerate(rows)}
+    gone = {pos[x] for x in d.deletes}
+    kept_as = {(feats.names[k], truth[k]) for k in range(n) if k not in gone}
+    wrong = sum((feats.names[k], truth[k]) not in kept_as for k in gone)
+    print(f"wrong deletes: {wrong} of {len(gone):,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 import os
-import re
 from typing import Dict, List
 
 from supabase import create_client, Client
 
+from dedupe_engine import DedupeDiff, diff as dedupe_diff
+
 # Try RX_* first, then REACHX_* as fallback, then hard-coded URL only
 SUPABASE_URL = (
     os.getenv("RX_SUPABASE_URL")
@@ -26,99 +27,54 @@ def log(msg: str) -> None:
     print(f"[dedupe_construction] {msg}")
 
 
-def fetch_all() -> List[Dict]:
+def fetch_all(page_size: int = 1000) -> List[Dict]:
     """
     Fetch all rows from reachx_construction_companies using supabase-py 2.x.
+    Paged (ordered by id), since PostgREST caps a single select at its max-rows setting.
     """
     log("Fetching existing records…")
-    res = supabase.table("reachx_construction_companies").select("*").execute()
-
-    # supabase-py 2.x: response has .data (list[dict]) and .model_dump_json() for raw
-    rows = getattr(res, "data", None)
-    if rows is None:
-        log("WARNING: response has no .data attribute or is None, treating as empty.")
-        return []
-
-    if not isinstance(rows, list):
-        log(f"WARNING: .data is not a list (got: {type(rows)}), treating as empty.")
-        return []
-
-    return rows
-
-
-COMMON_TOKENS = {
-    "ltd",
-    "limited",
-    "co",
-    "company",
-    "mauritius",
-    "maurice",
-    "pvt",
-    "pty",
-    "inc",
-    "corp",
-    "corporation",
-}
-
-
-def canonical_name(name: str) -> str:
-    """
-    Create a normalised key for company name.
-    Lowercase, remove punctuation, strip common suffixes.
-    """
-    if not name:
-        return ""
-
-    n = name.lower()
-    # replace non-alphanum with space
-    n = re.sub(r"[^a-z0-9]+", " ", n)
-    parts = [p for p in n.split() if p not in COMMON_TOKENS]
-    return " ".join(parts).strip()
-
-
-def dedupe(rows: List[Dict]) -> List[Dict]:
-    """
-    Deduplicate by canonicalised company name.
-    Keep the first record as the "winner".
-    """
-    log("Running dedupe logic…")
-
-    by_key: Dict[str, Dict] = {}
-
-    for row in rows:
-        raw_name = row.get("company_name") or row.get("name") or ""
-        key = canonical_name(raw_name)
-
-        if not key:
-            # keep these as-is but keyed by raw id so we don't lose them
-            fallback_key = f"__no_name__:{row.get('id')}"
-            by_key[fallback_key] = row
-            continue
-
-        if key not in by_key:
-            by_key[key] = row
-        else:
-            # If you want to merge phones/emails etc., do it here.
-            # For now, we just keep the first record.
-            pass
-
-    log(f"Deduped from {len(rows)} → {len(by_key)} records.")
-    return list(by_key.values())
-
-
-def replace_table(deduped: List[Dict]) -> None:
-    log("Clearing table before re-insert…")
-    supabase.table("reachx_construction_companies").delete().neq("id", 0).execute()
-
-    # remove 'id' so it uses fresh bigserial
-    for rec in deduped:
-        rec.pop("id", None)
-
-    batch_size = 100
-    for i in range(0, len(deduped), batch_size):
-        chunk = deduped[i : i + batch_size]
-        log(f"Inserting deduped batch {i // batch_size + 1} (size={len(chunk)})…")
-        supabase.table("reachx_construction_companies").insert(chunk).execute()
+    out: List[Dict] = []
+    while True:
+        res = (
+            supabase.table("reachx_construction_companies")
+            .select("*")
+            .order("id")
+            .range(len(out), len(out) + page_size - 1)
+            .execute()
+        )
+
+        # supabase-py 2.x: response has .data (list[dict]) and .model_dump_json() for raw
+        rows = getattr(res, "data", None)
+        if rows is None:
+            log("WARNING: response has no .data attribute or is None, treating as empty.")
+            return out
+
+        if not isinstance(rows, list):
+            log(f"WARNING: .data is not a list (got: {type(rows)}), treating as empty.")
+            return out
+
+        out.extend(rows)
+        if len(rows) < page_size:
+            return out
+
+
+def apply_diff(diff: DedupeDiff, batch_size: int = 100) -> None:
+    """Apply only the changes: fill winners' missing fields, delete exact duplicates, insert new rows."""
+    table = supabase.table("reachx_construction_companies")
+    if diff.updates:
+        log(f"Updating {len(diff.updates)} merged winners…")
+    for row in diff.updates:
+        # one UPDATE per winner: a bulk upsert of rows with different key sets NULLs the missing columns
+        changes = {k: v for k, v in row.items() if k != "id"}
+        table.update(changes).eq("id", row["id"]).execute()
+    for i in range(0, len(diff.deletes), batch_size):
+        chunk = diff.deletes[i : i + batch_size]
+        log(f"Deleting duplicates batch {i // batch_size + 1} (size={len(chunk)})…")
+        table.delete().in_("id", chunk).execute()
+    for i in range(0, len(diff.inserts), batch_size):
+        chunk = diff.inserts[i : i + batch_size]
+        log(f"Inserting new records batch {i // batch_size + 1} (size={len(chunk)})…")
+        table.insert(chunk).execute()
 
 
 def main():
@@ -130,10 +86,18 @@ def main():
         log("No companies found, nothing to dedupe.")
         return
 
-    deduped = dedupe(companies)
-    log(f"After dedupe: {len(deduped)} unique companies.")
-
-    replace_table(deduped)
+    log("Running dedupe logic…")
+    diff = dedupe_diff(companies)
+    st = diff.stats
+    log(f"Compared {st['pairs_compared']} candidate pairs "
+        f"(reduction {st['reduction_ratio']:.4%} vs all pairs), {st['matches']} matches.")
+    log(f"Deduped from {len(companies)} → {len(companies) - len(diff.deletes)} records: "
+        f"{len(diff.updates)} updates, {len(diff.deletes)} deletes, {len(diff.inserts)} inserts.")
+    if diff.review:
+        log(f"{len(diff.review)} fuzzy duplicates kept for review (not deleted), e.g. "
+            + ", ".join(f"{r['id']}~{r['duplicate_of']}" for r in diff.review[:10]))
+
+    apply_diff(diff)
     log("Dedupe complete.")
 
 
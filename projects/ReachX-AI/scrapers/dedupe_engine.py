@@ -0,0 +1,309 @@
+"""
+Fuzzy dedupe for ReachX company tables (no Supabase dependency).
+
+Records are grouped into blocks by cheap keys:
+  - exact canonical name
+  - phonetic key (Soundex of the first two name tokens)
+  - token prefixes (first 3 chars of the first two tokens, order-free)
+  - normalised phone, email and website domain
+Only pairs that share a block are compared. Name similarity is a MinHash estimate
+of character-trigram Jaccard, computed for all candidate pairs at once with NumPy,
+and combined with phone/email/domain agreement. Matches are clustered
+(union-find). diff() returns the minimal change set against the existing table; only
+exact canonical-name duplicates are deleted, fuzzy ones are listed for review.
+"""
+
+import re
+import zlib
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+COMMON_TOKENS = {
+    "ltd",
+    "limited",
+    "co",
+    "company",
+    "mauritius",
+    "maurice",
+    "pvt",
+    "pty",
+    "inc",
+    "corp",
+    "corporation",
+}
+
+# Free-mail domains say nothing about the company
+GENERIC_DOMAINS = {"gmail.com", "yahoo.com", "hotmail.com", "outlook.com", "live.com", "icloud.com", "intnet.mu", "orange.mu"}
+
+MERGE_FIELDS = ("phone", "contact_phone", "email", "website", "address")
+
+NUM_HASHES = 64
+MAX_BLOCK = 200        # fuzzy blocks larger than this are too generic to be useful
+NAME_MATCH = 0.80      # name similarity alone
+CONTACT_MATCH = 0.35   # name similarity when phone, email or domain agree
+
+# Multiply-shift hash family: ((a*h + b) mod 2**64) >> 32, a odd (uint64 arithmetic wraps)
+_rng = np.random.default_rng(20240611)
+_A = _rng.integers(0, np.iinfo(np.uint64).max, NUM_HASHES, dtype=np.uint64, endpoint=True) | np.uint64(1)
+_B = _rng.integers(0, np.iinfo(np.uint64).max, NUM_HASHES, dtype=np.uint64, endpoint=True)
+
+
+def canonical_name(name: str) -> str:
+    """
+    Create a normalised key for company name.
+    Lowercase, remove punctuation, strip common suffixes.
+    """
+    if not name:
+        return ""
+
+    n = name.lower()
+    # replace non-alphanum with space
+    n = re.sub(r"[^a-z0-9]+", " ", n)
+    parts = [p for p in n.split() if p not in COMMON_TOKENS]
+    return " ".join(parts).strip()
+
+
+def normalise_phone(phone) -> str:
+    """Digits only, without the +230 country code; last 8 digits (Mauritius numbers are 7-8)."""
+    digits = re.sub(r"\D", "", str(phone or ""))
+    if digits.startswith("00"):
+        digits = digits[2:]
+    if digits.startswith("230") and len(digits) > 8:
+        digits = digits[3:]
+    return digits[-8:] if len(digits) >= 7 else ""
+
+
+def normalise_email(email) -> str:
+    e = str(email or "").strip().lower()
+    return e if re.fullmatch(r"[^@\s]+@[^@\s]+\.[a-z]{2,}", e) else ""
+
+
+def website_domain(url) -> str:
+    u = str(url or "").strip().lower()
+    u = re.sub(r"^[a-z]+://", "", u)
+    u = u.split("/")[0].split("?")[0]
+    u = u[4:] if u.startswith("www.") else u
+    return u if "." in u else ""
+
+
+_SOUNDEX = str.maketrans("bfpvcgjkqsxzdtlmnr", "111122222222334556")
+
+
+@lru_cache(maxsize=1 << 16)  # name tokens repeat a lot across a table
+def soundex(token: str) -> str:
+    token = re.sub(r"[^a-z]", "", token.lower())
+    if not token:
+        return ""
+    coded = token.translate(_SOUNDEX)
+    out, last = token[0].upper(), coded[0]
+    for ch in coded[1:]:
+        if ch.isdigit() and ch != last:
+            out += ch
+        if ch not in "hw":
+            last = ch
+    return (out + "000")[:4]
+
+
+def _name(rec: Dict) -> str:
+    return rec.get("company_name") or rec.get("name") or ""
+
+
+@dataclass
+class Features:
+    names: List[str]
+    phones: List[str]
+    emails: List[str]
+    domains: List[str]
+
+    @classmethod
+    def of(cls, records: List[Dict]) -> "Features":
+        return cls(
+            names=[canonical_name(_name(r)) for r in records],
+            phones=[normalise_phone(r.get("phone") or r.get("contact_phone")) for r in records],
+            emails=[normalise_email(r.get("email") or r.get("contact_email")) for r in records],
+            domains=[website_domain(r.get("website")) for r in records],
+        )
+
+
+def blocking_keys(name: str, phone: str, email: str, domain: str) -> List[str]:
+    keys = []
+    if name:
+        toks = name.split()
+        keys.append("n:" + name)
+        keys.append("s:" + soundex(toks[0]) + (soundex(toks[1]) if len(toks) > 1 else ""))
+        keys.append("p:" + "|".join(sorted(t[:3] for t in toks[:2])))
+    if phone:
+        keys.append("t:" + phone)
+    if email:
+        keys.append("e:" + email)
+    if domain and domain not in GENERIC_DOMAINS:
+        keys.append("d:" + domain)
+    return keys
+
+
+def candidate_pairs(feats: Features, max_block: int = MAX_BLOCK) -> Tuple[np.ndarray, np.ndarray]:
+    """Unique (i, j), i < j, sharing at least one block. Exact-name blocks are never capped."""
+    blocks: Dict[str, List[int]] = {}
+    for i, keys in enumerate(map(blocking_keys, feats.names, feats.phones, feats.emails, feats.domains)):
+        for k in keys:
+            blocks.setdefault(k, []).append(i)
+    n = len(feats.names)
+    codes = []
+    for k, ids in blocks.items():
+        if len(ids) < 2 or (len(ids) > max_block and not k.startswith("n:")):
+            continue
+        a = np.asarray(ids, dtype=np.int64)
+        i, j = np.triu_indices(len(a), 1)
+        codes.append(a[i] * n + a[j])
+    if not codes:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    pairs = np.unique(np.concatenate(codes))
+    return pairs // n, pairs % n
+
+
+def minhash(names: List[str], chunk: int = 50000) -> np.ndarray:
+    """(n, NUM_HASHES) uint32 MinHash signatures over character trigrams of each name."""
+    gram_ids: Dict[str, int] = {}
+    ids, owner = [], []
+    for k, name in enumerate(names):
+        if not name:
+            continue
+        padded = f" {name} "
+        grams = {padded[i : i + 3] for i in range(len(padded) - 2)}
+        ids.extend(gram_ids.setdefault(g, len(gram_ids)) for g in grams)
+        owner.extend([k] * len(grams))
+    sig = np.full((len(names), NUM_HASHES), np.iinfo(np.uint32).max, dtype=np.uint32)
+    if not ids:
+        return sig
+    # each distinct trigram hashed once: (NUM_HASHES, grams) table
+    h = np.asarray([zlib.crc32(g.encode()) for g in gram_ids], dtype=np.uint64)
+    table = ((_A[:, None] * h[None, :] + _B[:, None]) >> np.uint64(32)).astype(np.uint32)
+    ids = np.asarray(ids)
+    owner = np.asarray(owner)
+    starts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+    for s in range(0, len(starts), chunk):
+        lo = starts[s]
+        hi = starts[s + chunk] if s + chunk < len(starts) else len(ids)
+        block = np.take(table, ids[lo:hi], axis=1)   # C-ordered (NUM_HASHES, grams of these records)
+        sig[owner[starts[s : s + chunk]]] = np.minimum.reduceat(block, starts[s : s + chunk] - lo, axis=1).T
+    return sig
+
+
+def score_pairs(feats: Features, i: np.ndarray, j: np.ndarray, sig: Optional[np.ndarray] = None) -> np.ndarray:
+    """Boolean match decision for each candidate pair (vectorised over all pairs)."""
+    if len(i) == 0:
+        return np.zeros(0, bool)
+    sig = minhash(feats.names) if sig is None else sig
+    name_sim = np.empty(len(i))
+    for s in range(0, len(i), 200_000):  # bound the (pairs, NUM_HASHES) temporary
+        name_sim[s : s + 200_000] = (sig[i[s : s + 200_000]] == sig[j[s : s + 200_000]]).mean(axis=1)
+
+    def agree(values: List[str], skip=()):
+        v = np.asarray([x if x and x not in skip else "" for x in values], dtype=object)
+        return (v[i] == v[j]) & (v[i] != "")
+
+    contact = agree(feats.phones) | agree(feats.emails) | agree(feats.domains, GENERIC_DOMAINS)
+    names = np.asarray(feats.names, dtype=object)
+    exact = (names[i] == names[j]) & (names[i] != "")
+    has_names = (names[i] != "") & (names[j] != "")
+    return exact | (has_names & ((name_sim >= NAME_MATCH) | (contact & (name_sim >= CONTACT_MATCH))))
+
+
+def clusters(n: int, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """Cluster label per record (smallest member index) from matched pairs."""
+    parent = np.arange(n)
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in zip(i.tolist(), j.tolist()):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    return np.asarray([find(x) for x in range(n)])
+
+
+@dataclass
+class DedupeDiff:
+    inserts: List[Dict] = field(default_factory=list)
+    updates: List[Dict] = field(default_factory=list)   # {"id": ..., <changed fields>}
+    deletes: List = field(default_factory=list)         # ids
+    review: List[Dict] = field(default_factory=list)    # {"id": ..., "duplicate_of": ...}, fuzzy matches kept
+    stats: Dict[str, float] = field(default_factory=dict)
+
+
+def _merge_into(winner: Dict, others: Iterable[Dict]) -> Dict:
+    """Fields the winner is missing, taken from the first other record that has them."""
+    changes = {}
+    for f in MERGE_FIELDS:
+        if f in winner and not winner.get(f):
+            for o in others:
+                if o.get(f):
+                    changes[f] = o[f]
+                    break
+    return changes
+
+
+def diff(existing: List[Dict], incoming: List[Dict] = (), delete_fuzzy: bool = False) -> DedupeDiff:
+    """
+    Minimal change set that dedupes `existing` (rows with an "id") and merges `incoming`
+    (new rows, no id) into it. Existing rows with the same canonical name collapse into
+    the one with the lowest id, which gets empty contact fields filled from the others;
+    the others are deleted. Existing rows joined only by a fuzzy match are not deleted
+    (fuzzy precision is below 1) but listed in `review` against the cluster's lowest id,
+    unless delete_fuzzy. Incoming rows matching an existing row are merged into it;
+    clusters made only of incoming rows become one insert.
+    """
+    incoming = list(incoming)
+    records = list(existing) + incoming
+    feats = Features.of(records)
+    i, j = candidate_pairs(feats)
+    match = score_pairs(feats, i, j)
+    labels = clusters(len(records), i[match], j[match])
+    names = np.asarray(feats.names, dtype=object)
+    exact = match & (names[i] == names[j]) & (names[i] != "")
+    same_name = labels if delete_fuzzy else clusters(len(records), i[exact], j[exact])
+
+    members: Dict[int, List[int]] = {}
+    for idx, lab in enumerate(labels.tolist()):
+        members.setdefault(lab, []).append(idx)
+
+    out = DedupeDiff()
+    n_existing = len(existing)
+    for idx_list in members.values():
+        olds = sorted((k for k in idx_list if k < n_existing), key=lambda k: (records[k].get("id") is None, records[k].get("id") or 0))
+        news = [records[k] for k in idx_list if k >= n_existing]
+        if not olds:
+            rec = dict(news[0])
+            rec.update(_merge_into(rec, news[1:]))
+            out.inserts.append(rec)
+            continue
+        groups: Dict[int, List[int]] = {}
+        for k in olds:
+            groups.setdefault(int(same_name[k]), []).append(k)
+        for g, ks in enumerate(groups.values()):
+            winner = records[ks[0]]
+            changes = _merge_into(winner, [records[k] for k in ks[1:]] + (news if g == 0 else []))
+            if changes:
+                out.updates.append({"id": winner.get("id"), **changes})
+            out.deletes.extend(records[k].get("id") for k in ks[1:])
+            if g:
+                out.review.append({"id": winner.get("id"), "duplicate_of": records[olds[0]].get("id")})
+
+    n = len(records)
+    out.stats = {
+        "records": n,
+        "pairs_compared": int(len(i)),
+        "all_pairs": n * (n - 1) // 2,
+        "reduction_ratio": 1 - len(i) / max(1, n * (n - 1) // 2),
+        "matches": int(match.sum()),
+        "exact_matches": int(exact.sum()),
+        "clusters": len(members),
+    }
+    return out
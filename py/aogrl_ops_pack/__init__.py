@@ -3,8 +3,12 @@ from .logging_setup import init_logging
 from .time_utils import now_tz
 from .cache import CacheManager
 from .http_client import HttpClient, RetryPolicy
+from .supabase_client import AsyncSupabaseRest, SupabaseRest, LatencyHistogram
+from .llm_client import OllamaClient, shared_ollama
 
 __all__ = [
     "Settings","get_settings","init_logging","now_tz",
-    "CacheManager","HttpClient","RetryPolicy"
+    "CacheManager","HttpClient","RetryPolicy",
+    "AsyncSupabaseRest","SupabaseRest","LatencyHistogram",
+    "OllamaClient","shared_ollama"
 ]
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+from diskcache import Cache
+
+from .settings import get_settings
+from .supabase_client import LatencyHistogram
+
+# Shared Ollama client for the local-LLM callers (Jarvis brain, data exec, trading sentinel).
+# Non-streaming responses are cached on disk, keyed by endpoint + the whole request body
+# (model, prompt/messages, system, format, options), with a TTL and a size cap, so they
+# survive restarts and are shared between processes. Identical requests already in flight
+# wait for the first one instead of reaching the model twice, and at most max_concurrency
+# requests run on the server at once (match it to OLLAMA_NUM_PARALLEL).
+
+DEFAULT_URL = "http://127.0.0.1:11434"
+TRANSPORT_KEYS = {"stream", "keep_alive"}  # do not change the answer
+
+
+def request_key(endpoint: str, payload: Dict[str, Any]) -> str:
+    body = {k: v for k, v in payload.items() if k not in TRANSPORT_KEYS}
+    canon = json.dumps([endpoint, body], sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()
+
+
+class OllamaClient:
+    """Cached, coalescing, concurrency-limited client for one Ollama server. Thread-safe."""
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_URL,
+        *,
+        cache_dir: Optional[str] = None,
+        cache: bool = True,
+        ttl_sec: Optional[float] = None,
+        size_limit_mb: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        timeout_sec: float = 600,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        cfg = get_settings().cache
+        self.ttl_sec = ttl_sec if ttl_sec is not None else cfg.ttl_sec_default
+        self.cache: Optional[Cache] = None
+        if cache:
+            limit_mb = size_limit_mb if size_limit_mb is not None else cfg.size_limit_mb
+            self.cache = Cache(cache_dir or str(Path(cfg.path) / "ollama"),
+                               size_limit=limit_mb * 1024 * 1024, eviction_policy="least-recently-used")
+        self.max_concurrency = max_concurrency or int(os.environ.get("OLLAMA_NUM_PARALLEL") or 1)
+        self.timeout = timeout_sec
+        self._client = httpx.Client(
+            timeout=timeout_sec,
+            limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+        )
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self.counts = {"requests": 0, "hits": 0, "coalesced": 0, "misses": 0, "errors": 0}
+        self.latency = LatencyHistogram()      # server round trip, per miss
+        self.queue_wait = LatencyHistogram()   # time spent waiting for a concurrency slot
+        self.token_latency = LatencyHistogram()  # ms per generated token (Ollama eval_duration / eval_count)
+        self.tokens = 0
+        self.eval_sec = 0.0
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] += 1
+
+    def _cached(self, key: str, ttl: float) -> Optional[Dict[str, Any]]:
+        return self.cache.get(key) if self.cache is not None and ttl > 0 else None
+
+    def request(self, endpoint: str, payload: Dict[str, Any], *, ttl_sec: Optional[float] = None,
+                timeout_sec: Optional[float] = None) -> Dict[str, Any]:
+        """
+        POST /api/<endpoint> without streaming and return the response JSON. ttl_sec=0 skips the
+        cache for this call (it is still coalesced). Raises httpx.HTTPError; failures are not cached.
+        """
+        ttl = self.ttl_sec if ttl_sec is None else ttl_sec
+        key = request_key(endpoint, payload)
+        self._count("requests")
+        hit = self._cached(key, ttl)
+        if hit is not None:
+            self._count("hits")
+            return hit
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            self._count("coalesced")
+            return copy.deepcopy(future.result())
+
+        try:
+            data = self._cached(key, ttl)  # the previous leader may have finished in between
+            if data is not None:
+                self._count("hits")
+            else:
+                self._count("misses")
+                data = self._post(endpoint, payload, timeout_sec)
+                if self.cache is not None and ttl > 0:
+                    self.cache.set(key, data, expire=ttl)
+            future.set_result(data)
+            return copy.deepcopy(data)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _post(self, endpoint: str, payload: Dict[str, Any], timeout_sec: Optional[float]) -> Dict[str, Any]:
+        waited = time.perf_counter()
+        with self._semaphore:
+            started = time.perf_counter()
+            self.queue_wait.observe((started - waited) * 1000)
+            try:
+                r = self._client.post(f"{self.base_url}/api/{endpoint}", json={**payload, "stream": False},
+                                      timeout=timeout_sec or self.timeout)
+                r.raise_for_status()
+                data = r.json()
+            except Exception:
+                self.latency.observe((time.perf_counter() - started) * 1000, error=True)
+                self._count("errors")
+                raise
+            self.latency.observe((time.perf_counter() - started) * 1000)
+        tokens, eval_ns = data.get("eval_count") or 0, data.get("eval_duration") or 0
+        if tokens and eval_ns:
+            self.token_latency.observe(eval_ns / 1e6 / tokens)
+            with self._lock:
+                self.tokens += tokens
+                self.eval_sec += eval_ns / 1e9
+        return data
+
+    def chat(self, payload: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        return self.request("chat", payload, **kwargs)
+
+    def generate(self, payload: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        return self.request("generate", payload, **kwargs)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self.counts)
+            tokens, eval_sec = self.tokens, self.eval_sec
+        served = counts["hits"] + counts["coalesced"]
+        return {
+            **counts,
+            "hit_rate": round(served / counts["requests"], 4) if counts["requests"] else 0.0,
+            "latency": self.latency.snapshot(),
+            "queue_wait": self.queue_wait.snapshot(),
+            "ms_per_token": self.token_latency.snapshot(),
+            "tokens_per_sec": round(tokens / eval_sec, 2) if eval_sec else 0.0,
+        }
+
+    def close(self) -> None:
+        self._client.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+_SHARED: Dict[str, OllamaClient] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_ollama(base_url: str = DEFAULT_URL, **kwargs) -> OllamaClient:
+    """Process-wide client per server URL, so every caller shares one pool, limiter and cache."""
+    url = base_url.rstrip("/")
+    with _SHARED_LOCK:
+        if url not in _SHARED:
+            _SHARED[url] = OllamaClient(url, **kwargs)
+        return _SHARED[url]
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import time
+import random
+import asyncio
+import threading
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Dict, Optional
+
+import httpx
+
+# Pooled Supabase (PostgREST) client shared by the bridge worker and Wildfire.
+# One httpx client per process keeps TCP/TLS connections alive between calls;
+# concurrency is bounded, transient failures are retried with full-jitter backoff,
+# and every endpoint gets a latency histogram.
+
+RETRY_STATUSES_ANY = {429, 503}             # request was not processed; safe to resend
+RETRY_STATUSES_IDEMPOTENT = {500, 502, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PATCH", "PUT", "DELETE"}
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+TRANSIENT_ERRORS = CONNECT_ERRORS + (httpx.ReadTimeout, httpx.ReadError, httpx.RemoteProtocolError)
+
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram plus a bounded window of raw samples for percentiles."""
+
+    def __init__(self, window: int = 5000) -> None:
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.samples: deque[float] = deque(maxlen=window)
+        self.total = 0
+        self.errors = 0
+
+    def observe(self, ms: float, error: bool = False) -> None:
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.samples.append(ms)
+        self.total += 1
+        self.errors += int(error)
+
+    def percentile(self, p: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(int(p / 100 * len(ordered)), len(ordered) - 1)]
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.total,
+            "errors": self.errors,
+            "p50_ms": round(self.percentile(50), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "buckets": {k: v for k, v in zip(labels, self.counts) if v},
+        }
+
+
+class _SupabaseRestBase:
+    def __init__(
+        self,
+        url: str,
+        key: str,
+        *,
+        schema: str = "public",
+        timeout_sec: float = 15,
+        max_connections: int = 20,
+        max_concurrency: int = 16,
+        retries: int = 3,
+        backoff_min: float = 0.2,
+        backoff_max: float = 5.0,
+    ) -> None:
+        if not url or not key:
+            raise ValueError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY")
+        self.base_url = url.rstrip("/") + "/rest/v1"
+        self.headers = {
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "Prefer": "return=representation",
+        }
+        if schema and schema != "public":
+            self.headers["Accept-Profile"] = schema
+            self.headers["Content-Profile"] = schema
+        self.timeout = httpx.Timeout(timeout_sec)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def _path(self, table: str, query: str = "") -> str:
+        return f"{self.base_url}/{table}" + (f"?{query}" if query else "")
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform(0, min(max, min * 2^attempt))
+        return random.uniform(0, min(self.backoff_max, self.backoff_min * (2 ** attempt)))
+
+    def _should_retry(self, method: str, attempt: int, *, status: int = None, exc: Exception = None) -> bool:
+        if attempt >= self.retries:
+            return False
+        if exc is not None:
+            return isinstance(exc, CONNECT_ERRORS) or method in IDEMPOTENT_METHODS
+        if status in RETRY_STATUSES_ANY:
+            return True
+        return status in RETRY_STATUSES_IDEMPOTENT and method in IDEMPOTENT_METHODS
+
+    def _observe(self, endpoint: str, started: float, error: bool) -> None:
+        hist = self.histograms.get(endpoint)
+        if hist is None:
+            hist = self.histograms[endpoint] = LatencyHistogram()
+        hist.observe((time.perf_counter() - started) * 1000, error)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-endpoint latency stats, keyed like 'GET az_commands'."""
+        return {k: h.snapshot() for k, h in sorted(self.histograms.items())}
+
+
+class AsyncSupabaseRest(_SupabaseRestBase):
+    """Async PostgREST client with a shared keep-alive pool. Create one per process and reuse it."""
+
+    def __init__(self, url: str, key: str, **kwargs) -> None:
+        super().__init__(url, key, **kwargs)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _ensure(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(headers=self.headers, timeout=self.timeout, limits=self.limits)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def request(self, method: str, table: str, query: str = "", json: Any = None, endpoint: str = None) -> httpx.Response:
+        client = self._ensure()
+        endpoint = endpoint or f"{method} {table}"
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                async with self._semaphore:
+                    r = await client.request(method, self._path(table, query), json=json)
+            except TRANSIENT_ERRORS as e:
+                self._observe(endpoint, started, True)
+                if not self._should_retry(method, attempt, exc=e):
+                    raise
+            else:
+                self._observe(endpoint, started, r.status_code >= 300)
+                if not self._should_retry(method, attempt, status=r.status_code):
+                    return r
+            await asyncio.sleep(self._backoff(attempt))
+            attempt += 1
+
+    async def get(self, table: str, query: str) -> httpx.Response:
+        return await self.request("GET", table, query)
+
+    async def post(self, table: str, payload: Any) -> httpx.Response:
+        return await self.request("POST", table, json=payload)
+
+    async def patch(self, table: str, query: str, payload: Any) -> httpx.Response:
+        return await self.request("PATCH", table, query, json=payload)
+
+    async def rpc(self, fn: str, params: Dict[str, Any]) -> httpx.Response:
+        return await self.request("POST", f"rpc/{fn}", json=params)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class SupabaseRest(_SupabaseRestBase):
+    """Thread-safe synchronous twin of AsyncSupabaseRest (same pooling, retries and metrics)."""
+
+    def __init__(self, url: str, key: str, **kwargs) -> None:
+        super().__init__(url, key, **kwargs)
+        self._client: Optional[httpx.Client] = None
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+
+    def _ensure(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None or self._client.is_closed:
+                self._client = httpx.Client(headers=self.headers, timeout=self.timeout, limits=self.limits)
+            return self._client
+
+    def request(self, method: str, table: str, query: str = "", json: Any = None, endpoint: str = None) -> httpx.Response:
+        client = self._ensure()
+        endpoint = endpoint or f"{method} {table}"
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                with self._semaphore:
+                    r = client.request(method, self._path(table, query), json=json)
+            except TRANSIENT_ERRORS as e:
+                self._observe(endpoint, started, True)
+                if not self._should_retry(method, attempt, exc=e):
+                    raise
+            else:
+                self._observe(endpoint, started, r.status_code >= 300)
+                if not self._should_retry(method, attempt, status=r.status_code):
+                    return r
+            time.sleep(self._backoff(attempt))
+            attempt += 1
+
+    def get(self, table: str, query: str) -> httpx.Response:
+        return self.request("GET", table, query)
+
+    def post(self, table: str, payload: Any) -> httpx.Response:
+        return self.request("POST", table, json=payload)
+
+    def patch(self, table: str, query: str, payload: Any) -> httpx.Response:
+        return self.request("PATCH", table, query, json=payload)
+
+    def rpc(self, fn: str, params: Dict[str, Any]) -> httpx.Response:
+        return self.request("POST", f"rpc/{fn}", json=params)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
@@ -0,0 +1,133 @@
+"""
+bench_graph_builder.py
+----------------------
+Full vs incremental code-graph builds of a tree (the repo by default), against the SQLite
+stand-in for az_graph_nodes / az_graph_edges.
+
+Usage:
+  python py/bench_graph_builder.py [--root .] [--workers 4] [--rtt-ms 60]
+
+before:  scan_directory as it was -- every file read twice, one upsert call per node/edge row.
+after:   IncrementalGraphBuilder, cold (empty manifest), warm (nothing changed) and after
+         editing one file and deleting another.
+The tree is copied to a temp dir first. Each graph must equal what the row-by-row scan gives
+on the same tree (stale edges included: the incremental build deletes them). --rtt-ms turns
+store calls into an estimate of the Supabase time, which the local numbers leave out.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from graph_incremental import (DEP_PARSERS, IncrementalGraphBuilder, SqliteGraphStore, node_type,
+                               parse_file, scan_file_safety)
+
+
+def legacy_scan(root_dir, store, source_label="local"):
+    """The old scan_directory loop, with upsert_node/upsert_edge as one store call each."""
+    for r, d, f in os.walk(root_dir):
+        if ".git" in r: continue
+        for file in f:
+            if file.startswith("."): continue
+            path = os.path.join(r, file)
+            if not scan_file_safety(path):
+                continue
+            name = file
+            ext = os.path.splitext(file)[1].lower()
+            store.upsert_nodes([{"name": name, "type": node_type(path), "meta": {"file_path": path, "source": source_label},
+                                 "updated_at": ""}])
+            try:
+                with open(path, "r", encoding="utf-8", errors="ignore") as f_obj:
+                    content = f_obj.read()
+                parser = DEP_PARSERS.get(ext)
+                for rel, target in (parser(content) if parser else []):
+                    store.upsert_nodes([{"name": target, "type": "concept",
+                                         "meta": {"file_path": "", "source": "inferred"}, "updated_at": ""}])
+                    store.upsert_edges([{"source": name, "target": target, "relation": rel, "updated_at": ""}])
+            except Exception as e:
+                print(f"  Error reading {file}: {e}")
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        out = fn(*args, **kwargs)
+    return time.perf_counter() - t0, out
+
+
+def same_graph(incremental, legacy):
+    """Edges equal; nodes equal except ones only an earlier version of the tree had (nodes are never deleted)."""
+    (inodes, iedges), (lnodes, ledges) = incremental.snapshot(), legacy.snapshot()
+    return iedges == ledges and {k: inodes.get(k) for k in lnodes} == lnodes
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--root", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--rtt-ms", type=float, default=60, help="assumed Supabase round trip per store call")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tree = os.path.join(tmp, "tree")
+        shutil.copytree(args.root, tree, ignore=shutil.ignore_patterns(".git"), symlinks=True)
+        manifest = os.path.join(tmp, "manifest.json")
+
+        legacy = SqliteGraphStore()
+        legacy_s, _ = timed(legacy_scan, tree, legacy)
+        store = SqliteGraphStore()
+        builder = IncrementalGraphBuilder(tree, store, manifest=manifest, workers=args.workers)
+
+        rows = [("before (full)", legacy_s, legacy.calls, None)]
+        checks = {}
+        for label in ("cold", "warm"):
+            calls = store.calls
+            secs, stats = timed(builder.build)
+            rows.append((label, secs, store.calls - calls, stats))
+        checks["cold/warm graph == before"] = same_graph(store, legacy)
+
+        files = sorted(os.path.join(r, f) for r, _, fs in os.walk(tree) for f in fs)
+        names = Counter(os.path.basename(p) for p in files)
+        py = [p for p in files if p.endswith(".py")]
+        # a uniquely named script with dependencies, so its edges go stale
+        gone = next((p for p in files if p.endswith(".ps1") and names[os.path.basename(p)] == 1
+                     and parse_file(p)[2]), None)
+        if not py or gone is None:
+            print(f"edit scenario skipped: {args.root} has no .py file or no uniquely named .ps1 with dependencies")
+        else:
+            with open(py[len(py) // 2], "a", encoding="utf-8") as f:
+                f.write("\nimport bench_graph_added_module\n")
+            os.remove(gone)
+            calls = store.calls
+            secs, stats = timed(builder.build)
+            rows.append(("1 edit, 1 delete", secs, store.calls - calls, stats))
+            fresh = SqliteGraphStore()
+            timed(legacy_scan, tree, fresh)
+            checks["edited graph == before on the edited tree"] = same_graph(store, fresh)
+            checks["stale edges deleted"] = stats["edges_deleted"] > 0
+
+    print(f"{rows[1][3]['files']} files, {rows[1][3]['nodes']} nodes, {rows[1][3]['edges']} edges "
+          f"({args.workers} workers, {os.cpu_count()} CPUs)")
+    print(f"{'':>17} | {'local s':>7} | {'store calls':>11} | {'est. with Supabase':>18} | parsed | upserts | deletes")
+    for label, secs, calls, stats in rows:
+        est = secs + calls * args.rtt_ms / 1000
+        parsed = stats["parsed"] if stats else "all"
+        upserts = stats["nodes_upserted"] + stats["edges_upserted"] if stats else calls
+        deletes = stats["edges_deleted"] if stats else 0
+        print(f"{label:>17} | {secs:7.2f} | {calls:>11,} | {est:>16,.1f} s | {parsed:>6} | {upserts:>7,} | {deletes:>7}")
+    for name, ok in checks.items():
+        print(f"{name}: {ok}")
+    ok = all(checks.values())
+    print("RESULT:", "PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
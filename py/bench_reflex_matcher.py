@@ -0,0 +1,118 @@
+"""
+bench_reflex_matcher.py
+-----------------------
+Replays synthetic incidents against synthetic reflex rules.
+
+Usage:
+  python py/bench_reflex_matcher.py [--rules 5000] [--incidents 100000] [--legacy-sample 2000]
+
+before: find_rule's scan (priority-ordered rules, pattern.lower() in text.lower() per rule),
+        timed on --legacy-sample incidents -- it is too slow to run on all of them. The
+        full-table fetch it also did per incident is not counted.
+after:  RuleMatcher over all incidents. Both must pick the same rule on the sample.
+Also reports the compile time (cold CLI run: read the cached rules JSON + build).
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from reflex_matcher import RuleMatcher, priority_order
+
+COMPONENTS = ["Jarvis-CommandsApi", "Jarvis-GraphBuilderWorker", "Jarvis-Watchdog", "Jarvis-CodeAgent",
+              "Jarvis-NotifyWorker", "Jarvis-MeshProxy", "Citadel", "ReachX-Scraper"]
+ERRORS = ["Connection refused", "Out of Memory", "Module not found", "Timeout after {n}ms", "HTTP {n} from upstream",
+          "Task Failed Code {n}", "ModuleNotFoundError: No module named '{w}'", "KeyError: '{w}'",
+          "Permission denied: '{w}.log'", "disk quota exceeded on {w}", "TLS handshake failed for {w}.mu",
+          "psycopg2.OperationalError: could not connect to {w}", "{w} exited with status {n}"]
+WORDS = ["alpha", "bravo", "cobalt", "delta", "ember", "falcon", "granite", "harbor", "indigo", "jasper",
+         "kestrel", "lumen", "meridian", "nimbus", "onyx", "pylon", "quartz", "raven", "sierra", "tundra"]
+ACTIONS = ["restart_service", "kill_process", "alert_user", "restart", "escalate", "clear_cache"]
+
+
+def phrase(rng):
+    return rng.choice(ERRORS).format(n=rng.randrange(1, 600), w=rng.choice(WORDS) + str(rng.randrange(300)))
+
+
+def make_rules(rng, n):
+    rules, seen = [], set()
+    while len(rules) < n:
+        p = phrase(rng)
+        if rng.random() < 0.3:               # some rules only key on the tail of a message
+            p = p[-rng.randint(10, 18):].strip()
+        if p.lower() in seen or len(p) < 4:
+            continue
+        seen.add(p.lower())
+        rules.append({"id": len(rules), "error_pattern": p, "priority": rng.randint(1, 50),
+                      "action_plan": {"action": rng.choice(ACTIONS), "target": "component"}})
+    return rules
+
+
+def make_incident(rng, rules):
+    comp = rng.choice(COMPONENTS)
+    err = rng.choice(rules)["error_pattern"] if rng.random() < 0.5 else phrase(rng)
+    if rng.random() < 0.3:
+        err = err.upper()
+    tail = " | ".join(f"[{rng.randrange(24):02d}:{rng.randrange(60):02d}] {comp}: {phrase(rng)}"
+                      for _ in range(rng.randint(2, 8)))
+    return f"{err}\nLastRun: {tail}"
+
+
+def legacy_find_rule(rules, text):
+    for rule in rules:
+        if rule["error_pattern"].lower() in text.lower():
+            return rule
+    return None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rules", type=int, default=5000)
+    ap.add_argument("--incidents", type=int, default=100_000)
+    ap.add_argument("--legacy-sample", type=int, default=2000)
+    args = ap.parse_args()
+
+    rng = random.Random(20)
+    rules = make_rules(rng, args.rules)
+    incidents = [make_incident(rng, rules) for _ in range(args.incidents)]
+    print(f"{len(rules)} rules, {len(incidents)} incidents, mean text {sum(map(len, incidents)) / len(incidents):.0f} chars")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, "reflex_rules.json")
+        with open(cache, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "rules": rules}, f)
+        t0 = time.perf_counter()
+        with open(cache, encoding="utf-8") as f:
+            matcher = RuleMatcher(json.load(f)["rules"], version=1)
+        cold_ms = (time.perf_counter() - t0) * 1000
+
+    ordered = priority_order(rules)
+    sample = incidents[: args.legacy_sample]
+    t0 = time.perf_counter()
+    expected = [legacy_find_rule(ordered, text) for text in sample]
+    legacy_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    got = [matcher.match(text) for text in incidents]
+    after_s = time.perf_counter() - t0
+
+    same = all((e and e["id"]) == (g and g["id"]) for e, g in zip(expected, got))
+    m = matcher.metrics()
+    print(f"compile: {m['build_ms']:.0f} ms build, {cold_ms:.0f} ms cold (cache read + build), {m['nodes']:,} automaton nodes")
+    print(f"before: {len(sample) / legacy_s:>9,.0f} incidents/s, {legacy_s / len(sample) * 1e6:>8.0f} us/incident "
+          f"(sample of {len(sample)})")
+    print(f"after:  {len(incidents) / after_s:>9,.0f} incidents/s, {after_s / len(incidents) * 1e6:>8.1f} us/incident "
+          f"(p50 {m['p50_us']} us, p99 {m['p99_us']} us, max {m['max_us']} us over the last {len(matcher.stats.samples)})")
+    print(f"hits: {m['hits']:,}/{m['lookups']:,}; speedup {legacy_s / len(sample) / (after_s / len(incidents)):.0f}x; "
+          f"same rule as before on the sample: {same}")
+    print("RESULT:", "PASS" if same else "FAIL")
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,17 +6,19 @@ Extracts dependencies, scans for safety, and populates Supabase Graph tables.
 
 Usage:
   python graph_builder.py --root "F:/AION-ZERO"
+  python graph_builder.py --root "F:/AION-ZERO" --full   # ignore the local manifest
 """
 
 import os
 import sys
 import argparse
 import re
-import shutil
 import subprocess
-import glob
 from datetime import datetime
 
+# safety scan + parsers live there too (no Supabase import, so workers/benchmarks can use them)
+from graph_incremental import IncrementalGraphBuilder
+
 # You might need 'pip install supabase'
 try:
     from supabase import create_client, Client
@@ -35,45 +37,6 @@ if not SUPABASE_URL or not SUPABASE_KEY:
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-# --- SAFETY SCANNER ---
-
-UNSAFE_EXTENSIONS = {'.exe', '.dll', '.so', '.bin', '.msi', '.bat', '.cmd', '.vbs'}
-SUSPICIOUS_PATTERNS = [
-    r'eval\(', 
-    r'exec\(', 
-    r'base64\.b64decode', 
-    r'subprocess\.call', 
-    r'os\.system'
-]
-
-def scan_file_safety(path):
-    """Returns True if safe, False if suspicious."""
-    ext = os.path.splitext(path)[1].lower()
-    if ext in UNSAFE_EXTENSIONS:
-        print(f" [UNSAFE] Blocked extension: {ext} in {path}")
-        return False
-    
-    # Size check (skip huge files)
-    if os.path.getsize(path) > 1024 * 1024 * 5: # 5MB limit
-        return False
-
-    try:
-        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-            # Basic heuristic scan
-            for p in SUSPICIOUS_PATTERNS:
-                if re.search(p, content):
-                    # Reduce noise: usually these are fine in python scripts, 
-                    # but for external ingestion we mark as 'manual review needed' or skip.
-                    # For now, we Log warning but allow if it looks like a standard library usage?
-                    # Strict mode: Reject.
-                    print(f" [WARNING] Suspicious pattern '{p}' in {path}")
-                    # return False # Uncomment to block
-    except Exception:
-        return False # Binaries masquerading as text
-
-    return True
-
 # --- DB OPS ---
 
 def upsert_node(name, type, file_path, source="local"):
@@ -89,95 +52,41 @@ def upsert_node(name, type, file_path, source="local"):
     except Exception as e:
         print(f"  Error upserting node: {e}")
 
-def upsert_edge(source, target, relation):
-    print(f"   --> [EDGE] {relation} --> {target}")
-    data = {
-        "source": source,
-        "target": target,
-        "relation": relation,
-        "updated_at": datetime.utcnow().isoformat()
-    }
-    try:
-        supabase.table("az_graph_edges").upsert(data, on_conflict="source, target, relation").execute()
-    except Exception as e:
-        print(f"  Error upserting edge: {e}")
-
-# --- PARSERS ---
-
-def extract_deps_ps1(content):
-    deps = []
-    matches_include = re.findall(r'^\s*\.\s+["\']([^"\']+)["\']', content, re.MULTILINE)
-    for m in matches_include:
-        deps.append(("imports", os.path.basename(m)))
-    
-    matches_table = re.findall(r'az_[a-z_]+', content)
-    for t in matches_table:
-        deps.append(("queries", t))
+class SupabaseGraphStore:
+    """Bulk writes for IncrementalGraphBuilder: BATCH rows per upsert, one delete per (source, relation)."""
+    BATCH = 500
 
-    return deps
+    def upsert_nodes(self, rows):
+        for i in range(0, len(rows), self.BATCH):
+            supabase.table("az_graph_nodes").upsert(rows[i:i + self.BATCH], on_conflict="name, type").execute()
 
-def extract_deps_py(content):
-    deps = []
-    matches_import = re.findall(r'^\s*import\s+(\w+)', content, re.MULTILINE)
-    for m in matches_import:
-        deps.append(("imports", m))
-    
-    matches_from = re.findall(r'^\s*from\s+(\w+)', content, re.MULTILINE)
-    for m in matches_from:
-        deps.append(("imports", m))
-    return deps
+    def upsert_edges(self, rows):
+        for i in range(0, len(rows), self.BATCH):
+            supabase.table("az_graph_edges").upsert(rows[i:i + self.BATCH], on_conflict="source, target, relation").execute()
 
-def extract_deps_sql(content):
-    deps = []
-    matches_table = re.findall(r'create table if not exists public\.(az_[a-z_]+)', content)
-    for t in matches_table:
-        deps.append(("defines", t))
-    return deps
+    def delete_edges(self, keys):
+        groups = {}
+        for source, target, relation in keys:
+            groups.setdefault((source, relation), []).append(target)
+        for (source, relation), targets in groups.items():
+            for i in range(0, len(targets), self.BATCH):
+                supabase.table("az_graph_edges").delete().eq("source", source).eq("relation", relation) \
+                    .in_("target", targets[i:i + self.BATCH]).execute()
 
 # --- INGESTION LOOPS ---
 
-def scan_directory(root_dir, source_label="local"):
+def scan_directory(root_dir, source_label="local", full=False, workers=None):
+    """Incremental: only changed files are parsed, only the graph diff is pushed (see graph_incremental)."""
     print(f"Scanning {root_dir} ({source_label})...")
-    
-    for r, d, f in os.walk(root_dir):
-        # Skip .git etc
-        if ".git" in r: continue
-
-        for file in f:
-            if file.startswith("."): continue
-            
-            path = os.path.join(r, file)
-            
-            # SCAN SAFETY
-            if not scan_file_safety(path):
-                continue
-
-            name = file
-            ext = os.path.splitext(file)[1].lower()
-            
-            node_type = "file"
-            if ext == ".ps1": node_type = "script_ps"
-            elif ext == ".py": node_type = "script_py"
-            elif ext == ".sql": node_type = "schema"
-            elif ext == ".md": node_type = "doc"
-            
-            upsert_node(name, node_type, path, source=source_label)
-
-            try:
-                with open(path, "r", encoding="utf-8", errors="ignore") as f_obj:
-                    content = f_obj.read()
-                    
-                    found_deps = []
-                    if ext == ".ps1": found_deps = extract_deps_ps1(content)
-                    elif ext == ".py": found_deps = extract_deps_py(content)
-                    elif ext == ".sql": found_deps = extract_deps_sql(content)
-                    
-                    for rel, target in found_deps:
-                        upsert_node(target, "concept", "", source="inferred") 
-                        upsert_edge(name, target, rel)
-
-            except Exception as e:
-                print(f"  Error reading {file}: {e}")
+    builder = IncrementalGraphBuilder(root_dir, SupabaseGraphStore(), source_label=source_label, workers=workers)
+    try:
+        stats = builder.build(full=full)
+    except Exception as e:
+        print(f"  Error pushing graph changes: {e}")
+        return
+    print(f" [GRAPH] {stats['files']} files ({stats['parsed']} parsed) -> {stats['nodes']} nodes, {stats['edges']} edges; "
+          f"upserted {stats['nodes_upserted']} nodes, {stats['edges_upserted']} edges; "
+          f"deleted {stats['edges_deleted']} stale edges")
 
 def process_external_repo(url, id):
     repo_name = url.split("/")[-1].replace(".git", "")
@@ -315,7 +224,7 @@ def seed_defaults():
         try:
             # We use upsert on URL content if schema constraint exists, but upsert syntax depends on library version.
             # Assuming 'url' is unique constraint in DB
-            resp = supabase.table("az_graph_sources").upsert(s, on_conflict="url").execute()
+            supabase.table("az_graph_sources").upsert(s, on_conflict="url").execute()
             print(f" [SEED] {s['category']}: {s['url']}")
         except Exception as e:
             print(f" [ERROR] Could not seed {s['url']}: {e}")
@@ -324,6 +233,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--root", default="F:/AION-ZERO", help="Root dir to scan")
     parser.add_argument("--seed", action="store_true", help="Seed default intelligence sources")
+    parser.add_argument("--full", action="store_true", help="Re-parse every file and re-upsert the whole local graph")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
     args = parser.parse_args()
     
     # Ensure staging dir
@@ -333,7 +244,7 @@ if __name__ == "__main__":
         seed_defaults()
 
     # 1. Local Scan
-    scan_directory(args.root, source_label="local")
+    scan_directory(args.root, source_label="local", full=args.full, workers=args.workers)
     
     # 2. External Scan
     process_external_sources()
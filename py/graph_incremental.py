@@ -0,0 +1,321 @@
+"""
+graph_incremental.py
+--------------------
+Incremental code-graph ingestion for graph_builder.
+
+A manifest (py/.cache/graph/<source>.json) remembers every file's mtime/size, content hash
+and dependencies, plus the nodes and edges last pushed for that source. A build re-reads only
+files whose mtime/size moved (parsed in a process pool when there are many), rebuilds the graph
+the tree describes now and diffs it against the manifest: new or changed nodes and new edges
+go out as bulk upserts, edges no file produces any more are deleted. Nodes are never deleted
+(concept nodes are shared between sources).
+
+The store is pluggable: graph_builder pushes to Supabase, SqliteGraphStore is a local stand-in
+with the same tables (benchmarks, offline runs).
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+
+MANIFEST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "graph")
+PARALLEL_MIN_FILES = 64  # fewer changed files than this are parsed in-process
+
+# --- SAFETY SCANNER ---
+
+UNSAFE_EXTENSIONS = {'.exe', '.dll', '.so', '.bin', '.msi', '.bat', '.cmd', '.vbs'}
+SUSPICIOUS_PATTERNS = [
+    r'eval\(',
+    r'exec\(',
+    r'base64\.b64decode',
+    r'subprocess\.call',
+    r'os\.system'
+]
+MAX_FILE_BYTES = 1024 * 1024 * 5  # 5MB limit
+
+def scan_file_safety(path):
+    """Returns True if safe, False if suspicious."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in UNSAFE_EXTENSIONS:
+        print(f" [UNSAFE] Blocked extension: {ext} in {path}")
+        return False
+
+    # Size check (skip huge files)
+    if os.path.getsize(path) > MAX_FILE_BYTES:
+        return False
+
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            warn_suspicious(f.read(), path)
+    except Exception:
+        return False # Binaries masquerading as text
+
+    return True
+
+def warn_suspicious(content, path):
+    for p in SUSPICIOUS_PATTERNS:
+        if re.search(p, content):
+            # Reduce noise: usually these are fine in python scripts,
+            # but for external ingestion we mark as 'manual review needed' or skip.
+            # For now, we Log warning but allow if it looks like a standard library usage?
+            # Strict mode: Reject.
+            print(f" [WARNING] Suspicious pattern '{p}' in {path}")
+            # return False # Uncomment to block
+
+# --- PARSERS ---
+
+def extract_deps_ps1(content):
+    deps = []
+    matches_include = re.findall(r'^\s*\.\s+["\']([^"\']+)["\']', content, re.MULTILINE)
+    for m in matches_include:
+        deps.append(("imports", os.path.basename(m)))
+
+    matches_table = re.findall(r'az_[a-z_]+', content)
+    for t in matches_table:
+        deps.append(("queries", t))
+
+    return deps
+
+def extract_deps_py(content):
+    deps = []
+    matches_import = re.findall(r'^\s*import\s+(\w+)', content, re.MULTILINE)
+    for m in matches_import:
+        deps.append(("imports", m))
+
+    matches_from = re.findall(r'^\s*from\s+(\w+)', content, re.MULTILINE)
+    for m in matches_from:
+        deps.append(("imports", m))
+    return deps
+
+def extract_deps_sql(content):
+    deps = []
+    matches_table = re.findall(r'create table if not exists public\.(az_[a-z_]+)', content)
+    for t in matches_table:
+        deps.append(("defines", t))
+    return deps
+
+DEP_PARSERS = {".ps1": extract_deps_ps1, ".py": extract_deps_py, ".sql": extract_deps_sql}
+NODE_TYPES = {".ps1": "script_ps", ".py": "script_py", ".sql": "schema", ".md": "doc"}
+
+def node_type(path):
+    return NODE_TYPES.get(os.path.splitext(path)[1].lower(), "file")
+
+def parse_file(path, known_sha=None):
+    """
+    Safety scan + dependency extraction from a single read (module-level for worker processes).
+    Returns (sha256 of the bytes or None, safe, [(relation, target), ...]); deps is None when
+    the content still hashes to known_sha, i.e. the last parse still holds.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in UNSAFE_EXTENSIONS:
+        print(f" [UNSAFE] Blocked extension: {ext} in {path}")
+        return None, False, []
+    try:
+        if os.path.getsize(path) > MAX_FILE_BYTES:
+            return None, False, []
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None, False, []
+    sha = hashlib.sha256(data).hexdigest()
+    if sha == known_sha:
+        return sha, True, None
+    # same text as open(path, 'r', encoding='utf-8', errors='ignore').read()
+    content = data.decode("utf-8", errors="ignore").replace("\r\n", "\n").replace("\r", "\n")
+    warn_suspicious(content, path)
+    parser = DEP_PARSERS.get(ext)
+    return sha, True, parser(content) if parser else []
+
+def walk_files(root_dir):
+    """(path, rel) for every file scan_directory ingests, in os.walk order."""
+    for r, d, f in os.walk(root_dir):
+        # Skip .git etc
+        if ".git" in r: continue
+        d[:] = [x for x in d if ".git" not in x]  # their paths would all be skipped anyway
+
+        for file in f:
+            if file.startswith("."): continue
+            path = os.path.join(r, file)
+            yield path, os.path.relpath(path, root_dir)
+
+# --- GRAPH ---
+
+def graph_of(files, source_label):
+    """
+    Nodes {(name, type): meta} and edges {(source, target, relation)} described by the
+    manifest entries of one scan, `files` being [(path, entry)] in walk order (so, as
+    with row-by-row upserts, the last file with a given name wins).
+    """
+    nodes, edges = {}, set()
+    for path, entry in files:
+        if not entry["safe"]:
+            continue
+        name = os.path.basename(path)
+        nodes[(name, node_type(path))] = {"file_path": path, "source": source_label}
+        for relation, target in entry["deps"]:
+            nodes[(target, "concept")] = {"file_path": "", "source": "inferred"}
+            edges.add((name, target, relation))
+    return nodes, edges
+
+def module_version():
+    # Parsers and safety rules live in this module: any edit re-parses everything.
+    with open(os.path.abspath(__file__), "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def manifest_path(root_dir, source_label):
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", source_label)[:60]
+    key = hashlib.sha256(f"{os.path.abspath(root_dir)}|{source_label}".encode()).hexdigest()[:12]
+    return os.path.join(MANIFEST_DIR, f"{slug}-{key}.json")
+
+class IncrementalGraphBuilder:
+    """Pushes the difference between a tree and its last-pushed graph to `store`."""
+
+    def __init__(self, root_dir, store, source_label="local", manifest=None, workers=None):
+        self.root_dir = root_dir
+        self.store = store
+        self.source_label = source_label
+        self.manifest = manifest or manifest_path(root_dir, source_label)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+
+    def _load(self):
+        try:
+            with open(self.manifest, encoding="utf-8") as f:
+                m = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return m if m.get("version") == module_version() else {"nodes": m.get("nodes"), "edges": m.get("edges")}
+
+    def _save(self, files, nodes, edges):
+        os.makedirs(os.path.dirname(self.manifest), exist_ok=True)
+        tmp = self.manifest + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": module_version(), "root": os.path.abspath(self.root_dir),
+                       "source": self.source_label, "files": files,
+                       "nodes": [[n, t, meta] for (n, t), meta in nodes.items()],
+                       "edges": sorted(edges)}, f)
+        os.replace(tmp, self.manifest)
+
+    def _parse_all(self, paths, known):
+        if self.workers > 1 and len(paths) >= PARALLEL_MIN_FILES:
+            try:
+                with ProcessPoolExecutor(self.workers) as pool:
+                    return list(pool.map(parse_file, paths, known, chunksize=32))
+            except (OSError, BrokenProcessPool):
+                pass  # no worker processes available: parse in-process
+        return list(map(parse_file, paths, known))
+
+    def _claimed_elsewhere(self, edges):
+        """Edges other sources' manifests still hold (edge rows carry no source, so they are shared)."""
+        claimed = set()
+        if not edges or not os.path.isdir(MANIFEST_DIR):
+            return claimed
+        for name in os.listdir(MANIFEST_DIR):
+            other = os.path.join(MANIFEST_DIR, name)
+            if not name.endswith(".json") or os.path.abspath(other) == os.path.abspath(self.manifest):
+                continue
+            try:
+                with open(other, encoding="utf-8") as f:
+                    claimed.update(tuple(e) for e in json.load(f).get("edges") or [] if tuple(e) in edges)
+            except (OSError, ValueError):
+                continue
+        return claimed
+
+    def build(self, full=False):
+        """
+        Scan, diff and push. full=True re-parses every file and re-upserts every node and edge
+        (stale edges are still deleted). The manifest is only written once the store accepted
+        everything, so a failed push is retried as a whole on the next run.
+        """
+        old = self._load()
+        old_files = {} if full else (old.get("files") or {})
+
+        walked, todo = [], []
+        for path, rel in walk_files(self.root_dir):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            prev = old_files.get(rel) or {}
+            if prev.get("mtime_ns") == st.st_mtime_ns and prev.get("size") == st.st_size:
+                entry = prev
+            else:
+                entry = {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+                todo.append((path, prev, entry))
+            walked.append((path, rel, entry))
+
+        results = self._parse_all([p for p, _, _ in todo], [prev.get("sha") for _, prev, _ in todo])
+        for (_, prev, entry), (sha, safe, deps) in zip(todo, results):
+            deps = prev["deps"] if deps is None else [list(x) for x in deps]
+            entry.update(sha=sha, safe=safe, deps=deps)
+
+        nodes, edges = graph_of([(path, entry) for path, _, entry in walked], self.source_label)
+        old_nodes = {} if full else {(n, t): meta for n, t, meta in old.get("nodes") or []}
+        old_edges = {tuple(e) for e in old.get("edges") or []}
+
+        now = datetime.now(timezone.utc).isoformat()
+        node_rows = [{"name": n, "type": t, "meta": meta, "updated_at": now}
+                     for (n, t), meta in nodes.items() if old_nodes.get((n, t)) != meta]
+        edge_rows = [{"source": s, "target": t, "relation": r, "updated_at": now}
+                     for s, t, r in sorted(edges if full else edges - old_edges)]
+        stale = old_edges - edges
+        stale = sorted(stale - self._claimed_elsewhere(stale))
+
+        self.store.upsert_nodes(node_rows)
+        self.store.upsert_edges(edge_rows)
+        self.store.delete_edges(stale)
+        self._save({rel: entry for _, rel, entry in walked}, nodes, edges)
+        return {"files": len(walked), "parsed": len(todo), "nodes": len(nodes), "edges": len(edges),
+                "nodes_upserted": len(node_rows), "edges_upserted": len(edge_rows), "edges_deleted": len(stale)}
+
+# --- LOCAL STORE ---
+
+class SqliteGraphStore:
+    """
+    az_graph_nodes / az_graph_edges in SQLite, upserting on the same keys as Supabase.
+    `calls` counts the requests SupabaseGraphStore would make for the same writes.
+    """
+    BATCH = 500
+
+    def __init__(self, path=":memory:"):
+        self.db = sqlite3.connect(path)
+        self.calls = 0
+        self.db.executescript("""
+            create table if not exists az_graph_nodes (
+              name text not null, type text not null, meta text, updated_at text, unique(name, type));
+            create table if not exists az_graph_edges (
+              source text not null, target text not null, relation text not null, updated_at text,
+              unique(source, target, relation));
+        """)
+
+    def upsert_nodes(self, rows):
+        self.calls += -(-len(rows) // self.BATCH)
+        with self.db:
+            self.db.executemany(
+                "insert into az_graph_nodes values (?, ?, ?, ?) on conflict(name, type) "
+                "do update set meta = excluded.meta, updated_at = excluded.updated_at",
+                [(r["name"], r["type"], json.dumps(r["meta"]), r["updated_at"]) for r in rows])
+
+    def upsert_edges(self, rows):
+        self.calls += -(-len(rows) // self.BATCH)
+        with self.db:
+            self.db.executemany(
+                "insert into az_graph_edges values (?, ?, ?, ?) on conflict(source, target, relation) "
+                "do update set updated_at = excluded.updated_at",
+                [(r["source"], r["target"], r["relation"], r["updated_at"]) for r in rows])
+
+    def delete_edges(self, keys):
+        groups = Counter((source, relation) for source, _, relation in keys)
+        self.calls += sum(-(-n // self.BATCH) for n in groups.values())
+        with self.db:
+            self.db.executemany("delete from az_graph_edges where source = ? and target = ? and relation = ?", keys)
+
+    def snapshot(self):
+        nodes = {(n, t): json.loads(m) for n, t, m in self.db.execute("select name, type, meta from az_graph_nodes")}
+        edges = set(self.db.execute("select source, target, relation from az_graph_edges"))
+        return nodes, edges
@@ -26,6 +26,7 @@ from datetime import datetime
 from bs4 import BeautifulSoup
 from googlesearch import search as google_search
 from supabase import create_client, Client # REQUIREMENT: pip install supabase
+from aogrl_ops_pack import shared_ollama
 import sys
 
 # Loop-5 Ledger Import
@@ -265,9 +266,8 @@ class JarvisBrain:
         }
         
         try:
-            r = requests.post(f"{OLLAMA_URL}/api/chat", json=payload, timeout=60)
-            r.raise_for_status()
-            return r.json()["message"]["content"]
+            # sampled at Ollama's default temperature: not cached, identical in-flight turns still coalesce
+            return shared_ollama(OLLAMA_URL).chat(payload, ttl_sec=0, timeout_sec=60)["message"]["content"]
         except Exception as e:
             print(f"[ERROR] Brain Freeze: {e}")
             return None
@@ -401,9 +401,8 @@ class JarvisBrain:
                 "stream": False,
                 "options": { "num_predict": 128, "temperature": 0.7 }
             }
-            r = requests.post(f"{OLLAMA_URL}/api/chat", json=payload, timeout=30)
-            r.raise_for_status()
-            reply = r.json()["message"]["content"]
+            # sampled at temperature 0.7: not cached, identical in-flight turns still coalesce
+            reply = shared_ollama(OLLAMA_URL).chat(payload, ttl_sec=0, timeout_sec=30)["message"]["content"]
             
             # Append assistant reply
             self.history.append({"role": "assistant", "content": reply})
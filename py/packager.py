@@ -10,6 +10,7 @@ PRODUCTS = {
     "REFLEX_ENGINE_PRO": {
         "files": [
             "py/reflex_engine.py",
+            "py/reflex_matcher.py",
             "scripts/Jarvis-ReflexEngine.ps1",
             "sql/az_reflex.sql"
         ],
@@ -5,6 +5,8 @@ import json
 import time
 from supabase import create_client, Client
 
+from reflex_matcher import RuleMatcher
+
 # Initialize Supabase
 url = os.environ.get("SUPABASE_URL")
 key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
@@ -15,6 +17,13 @@ if not url or not key:
 
 supabase: Client = create_client(url, key)
 
+# Compiled rules are reused until az_reflex_meta.rules_version moves (checked at most every
+# REFLEX_RULES_CHECK_S seconds) and kept on disk so one-shot CLI runs skip the full fetch too.
+# The disk copy is keyed by the Supabase URL as well: every project starts counting at 1.
+RULES_CHECK_S = float(os.environ.get("REFLEX_RULES_CHECK_S", "10"))
+RULES_CACHE_FILE = os.environ.get(
+    "REFLEX_RULES_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "reflex_rules.json"))
+
 def log_incident(component, error_msg):
     """Log the incident to DB and return ID."""
     data = {
@@ -30,17 +39,82 @@ def log_incident(component, error_msg):
         # Fallback if DB is down
         return None
 
+def fetch_rules():
+    resp = supabase.table("az_reflex_rules").select("*").order("priority", desc=True).execute()
+    return resp.data or []
+
+def rules_version():
+    """Counter bumped by a trigger on every az_reflex_rules change; None if unavailable."""
+    try:
+        resp = supabase.table("az_reflex_meta").select("value").eq("key", "rules_version").execute()
+        return resp.data[0]["value"] if resp.data else None
+    except Exception:
+        return None
+
+class ReflexRules:
+    """The current RuleMatcher, hot-reloaded when the rules version changes."""
+
+    def __init__(self, cache_file=RULES_CACHE_FILE, check_s=RULES_CHECK_S, source=url):
+        self.cache_file = cache_file
+        self.source = source.rstrip("/")
+        self.check_s = check_s
+        self.matcher = None
+        self.reloads = 0
+        self._checked = 0.0
+
+    def _read_cache(self, version):
+        try:
+            with open(self.cache_file, encoding="utf-8") as f:
+                cached = json.load(f)
+            fresh = cached.get("source") == self.source and cached.get("version") == version
+            return cached["rules"] if fresh else None
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_cache(self, version, rules):
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp = self.cache_file + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"source": self.source, "version": version, "rules": rules}, f)
+            os.replace(tmp, self.cache_file)
+        except OSError:
+            pass
+
+    def get(self):
+        now = time.monotonic()
+        if self.matcher is not None and now - self._checked < self.check_s:
+            return self.matcher
+        self._checked = now
+
+        version = rules_version()
+        if self.matcher is not None and version is not None and version == self.matcher.version:
+            return self.matcher
+
+        # unknown version (no az_reflex_meta yet): refetch every check_s, never trust the disk copy
+        rules = self._read_cache(version) if version is not None else None
+        if rules is None:
+            try:
+                rules = fetch_rules()
+            except Exception:
+                if self.matcher is None:
+                    raise
+                return self.matcher  # keep serving the last good rules
+            if version is not None:
+                self._write_cache(version, rules)
+        self.matcher = RuleMatcher(rules, version)
+        self.reloads += 1
+        return self.matcher
+
+    def metrics(self):
+        return {"reloads": self.reloads, **(self.matcher.metrics() if self.matcher else {})}
+
+RULES = ReflexRules()
+
 def find_rule(error_msg):
-    """Scan rules table for regex/keyword matches in the error message."""
+    """Highest-priority rule whose pattern occurs (case-insensitively) in the error message."""
     try:
-        # Fetch all rules (caching strategy would be better for prod)
-        resp = supabase.table("az_reflex_rules").select("*").order("priority", desc=True).execute()
-        rules = resp.data
-        
-        for rule in rules:
-            pattern = rule['error_pattern']
-            if pattern.lower() in error_msg.lower():
-                return rule
+        return RULES.get().match(error_msg)
     except Exception:
         pass
     return None
@@ -93,7 +167,10 @@ if __name__ == "__main__":
     parser.add_argument("--component", required=True)
     parser.add_argument("--error", default="Unknown Error")
     parser.add_argument("--logs", default="")
+    parser.add_argument("--metrics", action="store_true", help="Print rule-match metrics to stderr")
     args = parser.parse_args()
 
     decision = diagnose(args.component, args.error, args.logs)
     print(json.dumps(decision))
+    if args.metrics:
+        print(json.dumps({"rule_match": RULES.metrics()}), file=sys.stderr)
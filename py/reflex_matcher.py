@@ -0,0 +1,114 @@
+"""
+reflex_matcher.py
+-----------------
+Compiled rule index for the Reflex Engine.
+
+A rule matches when its error_pattern occurs in the incident text, case-insensitively,
+and the highest-priority matching rule wins -- exactly what find_rule did by scanning
+every row. Here all patterns are compiled once into an Aho-Corasick automaton, so a
+lookup is a single pass over the text however many rules there are.
+"""
+
+import time
+from collections import deque
+
+NO_MATCH = float("inf")
+
+
+class LatencyStats:
+    """Lookup counters plus percentiles over the most recent `window` lookups."""
+
+    def __init__(self, window=10000):
+        self.samples = deque(maxlen=window)
+        self.lookups = 0
+        self.hits = 0
+        self.total_s = 0.0
+
+    def record(self, seconds, hit):
+        self.samples.append(seconds)
+        self.lookups += 1
+        self.hits += bool(hit)
+        self.total_s += seconds
+
+    def snapshot(self):
+        xs = sorted(self.samples)
+        pct = lambda p: round(xs[min(len(xs) - 1, int(len(xs) * p))] * 1e6, 1) if xs else None
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "mean_us": round(self.total_s / self.lookups * 1e6, 1) if self.lookups else None,
+            "p50_us": pct(0.50),
+            "p99_us": pct(0.99),
+            "max_us": round(xs[-1] * 1e6, 1) if xs else None,
+        }
+
+
+def priority_order(rules):
+    """Rules as find_rule saw them: priority descending (NULLs first, like Postgres DESC), stable."""
+    return sorted(rules, key=lambda r: -NO_MATCH if r.get("priority") is None else -r["priority"])
+
+
+class RuleMatcher:
+    def __init__(self, rules, version=None):
+        start = time.perf_counter()
+        self.rules = priority_order(rules)
+        self.version = version
+        self.stats = LatencyStats()
+
+        # trie: goto[node] = {char: child}; best[node] = lowest rank (= highest priority)
+        # of any pattern ending at node or at a suffix of it (filled in via fail links)
+        goto, best = [{}], [NO_MATCH]
+        for rank, rule in enumerate(self.rules):
+            node = 0
+            for ch in (rule.get("error_pattern") or "").lower():
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = goto[node][ch] = len(goto)
+                    goto.append({})
+                    best.append(NO_MATCH)
+                node = nxt
+            best[node] = min(best[node], rank)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            best[node] = min(best[node], best[fail[node]])
+            for ch, child in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(ch, 0)
+                queue.append(child)
+
+        self._goto, self._fail, self._best = goto, fail, best
+        self.build_ms = (time.perf_counter() - start) * 1000
+
+    def __len__(self):
+        return len(self.rules)
+
+    def _rank(self, text):
+        goto, fail, best = self._goto, self._fail, self._best
+        top = best[0]          # empty patterns match everything
+        node = 0
+        for ch in text.lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if best[node] < top:
+                top = best[node]
+                if top == 0:
+                    break
+        return top
+
+    def match(self, text):
+        """Highest-priority rule whose pattern occurs in text, or None."""
+        start = time.perf_counter()
+        rank = self._rank(text)
+        rule = None if rank == NO_MATCH else self.rules[rank]
+        self.stats.record(time.perf_counter() - start, rule)
+        return rule
+
+    def metrics(self):
+        return {"rules": len(self.rules), "version": self.version, "nodes": len(self._goto),
+                "build_ms": round(self.build_ms, 1), **self.stats.snapshot()}
@@ -0,0 +1,154 @@
+"""
+Tests for aogrl_ops_pack.llm_client against a fake Ollama server.
+
+The fake server takes GEN_DELAY per request (a stand-in for generation time), counts the
+requests that reach it and the most it ever had in flight, and reports eval_count /
+eval_duration like Ollama does.
+"""
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from aogrl_ops_pack.llm_client import OllamaClient
+
+GEN_DELAY = 0.15
+
+
+class FakeOllama(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    requests = 0
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+        with FakeOllama.lock:
+            FakeOllama.requests += 1
+            FakeOllama.active += 1
+            FakeOllama.peak = max(FakeOllama.peak, FakeOllama.active)
+        try:
+            time.sleep(GEN_DELAY)
+            prompt = body.get("prompt") or body["messages"][-1]["content"]
+            if prompt == "fail":
+                return self._reply(500, {"error": "model crashed"})
+            text = f"echo:{prompt}:{body['model']}:{json.dumps(body.get('options'), sort_keys=True)}"
+            stats = {"eval_count": 20, "eval_duration": 100_000_000, "done": True, "model": body["model"]}
+            if self.path == "/api/generate":
+                self._reply(200, {"response": text, **stats})
+            else:
+                self._reply(200, {"message": {"role": "assistant", "content": text}, **stats})
+        finally:
+            with FakeOllama.lock:
+                FakeOllama.active -= 1
+
+
+@pytest.fixture()
+def server():
+    FakeOllama.requests = FakeOllama.active = FakeOllama.peak = 0
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllama)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def chat(content, model="llama3.2:1b", **options):
+    return {"model": model, "messages": [{"role": "user", "content": content}], "options": options or None}
+
+
+def test_cache_hits_and_persists(server, tmp_path):
+    llm = OllamaClient(server, cache_dir=str(tmp_path), ttl_sec=60)
+    first = llm.chat(chat("hello", temperature=0.1))
+    started = time.perf_counter()
+    again = llm.chat(chat("hello", temperature=0.1))
+    hit_ms = (time.perf_counter() - started) * 1000
+    assert again == first and FakeOllama.requests == 1
+    assert hit_ms < GEN_DELAY * 1000 / 10
+
+    # model, options and endpoint are part of the key
+    llm.chat(chat("hello", temperature=0.7))
+    llm.chat(chat("hello", model="qwen2.5-coder:7b", temperature=0.1))
+    llm.generate({"model": "llama3.2:1b", "prompt": "hello", "options": {"temperature": 0.1}})
+    assert FakeOllama.requests == 4
+    m = llm.metrics()
+    assert (m["requests"], m["hits"], m["misses"]) == (5, 1, 4)
+    assert m["ms_per_token"]["p50_ms"] == 5.0 and m["tokens_per_sec"] == 200.0
+    llm.close()
+
+    # a new process (client) on the same cache directory
+    again = OllamaClient(server, cache_dir=str(tmp_path), ttl_sec=60)
+    assert again.chat(chat("hello", temperature=0.1)) == first
+    assert FakeOllama.requests == 4
+    again.close()
+
+
+def test_ttl_expiry_and_per_call_bypass(server, tmp_path):
+    llm = OllamaClient(server, cache_dir=str(tmp_path), ttl_sec=0.3)
+    llm.chat(chat("tick"))
+    llm.chat(chat("tick"))
+    assert FakeOllama.requests == 1
+    time.sleep(0.4)
+    llm.chat(chat("tick"))
+    assert FakeOllama.requests == 2
+    llm.chat(chat("tick"), ttl_sec=0)
+    assert FakeOllama.requests == 3
+    llm.close()
+
+
+def test_identical_inflight_prompts_are_coalesced(server, tmp_path):
+    llm = OllamaClient(server, cache_dir=str(tmp_path), ttl_sec=60, max_concurrency=4)
+    with ThreadPoolExecutor(8) as pool:
+        replies = list(pool.map(lambda _: llm.chat(chat("same question"), ttl_sec=0), range(8)))
+    assert FakeOllama.requests == 1
+    assert all(r == replies[0] for r in replies)
+    m = llm.metrics()
+    assert m["coalesced"] == 7 and m["hit_rate"] == 0.875
+    llm.close()
+
+
+def test_concurrency_limited_to_server_slots(server, tmp_path):
+    llm = OllamaClient(server, cache_dir=str(tmp_path), max_concurrency=2)
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda i: llm.chat(chat(f"prompt {i}")), range(8)))
+    assert FakeOllama.requests == 8
+    assert FakeOllama.peak == 2
+    assert llm.metrics()["queue_wait"]["p99_ms"] >= GEN_DELAY * 1000
+    llm.close()
+
+
+def test_failures_reach_every_waiter_and_are_not_cached(server, tmp_path):
+    llm = OllamaClient(server, cache_dir=str(tmp_path), ttl_sec=60, max_concurrency=4)
+
+    def call(_):
+        try:
+            llm.chat(chat("fail"))
+        except httpx.HTTPStatusError as e:
+            return e.response.status_code
+
+    with ThreadPoolExecutor(4) as pool:
+        assert list(pool.map(call, range(4))) == [500] * 4
+    assert FakeOllama.requests == 1
+    with pytest.raises(httpx.HTTPStatusError):
+        llm.chat(chat("fail"))
+    assert FakeOllama.requests == 2
+    assert llm.metrics()["errors"] == 2
+    llm.close()
@@ -0,0 +1,131 @@
+"""
+Tests for aogrl_ops_pack.supabase_client against a local mock PostgREST server.
+
+The mock server adds a fixed delay to every NEW connection (a stand-in for the
+TCP + TLS handshake to Supabase), so the per-call latency of a fresh client per
+request vs. the shared keep-alive pool shows up in p50/p99.
+"""
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from aogrl_ops_pack.supabase_client import AsyncSupabaseRest, SupabaseRest, LatencyHistogram
+
+HANDSHAKE_DELAY = 0.02
+
+
+class MockPostgREST(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True
+    connections = 0
+    fail_once = set()
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with MockPostgREST.lock:
+            MockPostgREST.connections += 1
+        time.sleep(HANDSHAKE_DELAY)
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def _maybe_fail(self):
+        with MockPostgREST.lock:
+            if self.path in MockPostgREST.fail_once:
+                MockPostgREST.fail_once.discard(self.path)
+                self._reply(503, {"message": "unavailable"})
+                return True
+        return False
+
+    def do_GET(self):
+        if not self._maybe_fail():
+            self._reply(200, [{"command_id": "c1", "state": "QUEUED"}])
+
+    def do_POST(self):
+        body = self._body()
+        if not self._maybe_fail():
+            self._reply(201, [body])
+
+    def do_PATCH(self):
+        body = self._body()
+        if not self._maybe_fail():
+            self._reply(200, [body])
+
+
+@pytest.fixture()
+def server():
+    MockPostgREST.connections = 0
+    MockPostgREST.fail_once = set()
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), MockPostgREST)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_async_pool_reuses_connections(server):
+    async def run():
+        sb = AsyncSupabaseRest(server, "test-key", max_connections=4, max_concurrency=4)
+        for _ in range(50):
+            r = await sb.get("az_commands", "state=eq.QUEUED&limit=1")
+            assert r.status_code == 200
+        await asyncio.gather(*(sb.post("az_events", {"i": i}) for i in range(50)))
+        await sb.aclose()
+        return sb.metrics()
+
+    metrics = asyncio.run(run())
+    assert MockPostgREST.connections <= 4
+    assert metrics["GET az_commands"]["count"] == 50
+    assert metrics["POST az_events"]["count"] == 50
+
+
+def test_pooled_latency_beats_fresh_client(server):
+    fresh = LatencyHistogram()
+    for _ in range(40):
+        started = time.perf_counter()
+        with httpx.Client(timeout=5) as client:  # what sb_get/sb_post used to do per call
+            client.get(f"{server}/rest/v1/az_commands?limit=1")
+        fresh.observe((time.perf_counter() - started) * 1000)
+    fresh_connections = MockPostgREST.connections
+
+    sb = SupabaseRest(server, "test-key")
+    for _ in range(40):
+        sb.get("az_commands", "limit=1")
+    pooled = sb.metrics()["GET az_commands"]
+    sb.close()
+
+    print(f"\nfresh client: p50={fresh.percentile(50):.2f}ms p99={fresh.percentile(99):.2f}ms ({fresh_connections} connections)")
+    print(f"pooled      : p50={pooled['p50_ms']:.2f}ms p99={pooled['p99_ms']:.2f}ms "
+          f"({MockPostgREST.connections - fresh_connections} connections)")
+    assert fresh_connections == 40
+    assert MockPostgREST.connections - fresh_connections == 1
+    assert pooled["p50_ms"] < fresh.percentile(50)
+
+
+def test_retries_transient_503(server):
+    MockPostgREST.fail_once = {"/rest/v1/az_commands?command_id=eq.c1"}
+    sb = SupabaseRest(server, "test-key", backoff_min=0.01)
+    r = sb.patch("az_commands", "command_id=eq.c1", {"progress": 50})
+    assert r.status_code == 200
+    assert sb.metrics()["PATCH az_commands"]["count"] == 2
+    assert sb.metrics()["PATCH az_commands"]["errors"] == 1
+    sb.close()
@@ -3,17 +3,23 @@
 Jarvis-MeshProxy.py
 Lightweight mesh-style proxy for AION-ZERO.
 
-- Reads routing rules from Supabase (az_mesh_routes, az_mesh_endpoints)
+- Reads routing rules from Supabase (az_mesh_routes, az_mesh_endpoints), cached in
+  memory for JARVIS_MESH_ROUTE_TTL seconds (0 = query on every request). Whatever edits
+  the tables can POST /routes/invalidate to make the next request reload them.
 - Applies retries, timeout, basic circuit breaking
-- Forwards JSON payloads to target agent HTTP endpoints
+- Forwards JSON payloads to target agent HTTP endpoints over pooled keep-alive connections
+- Serves each client connection on its own thread (JARVIS_MESH_PROXY_THREADED=0 for the
+  old one-request-at-a-time server)
 """
 
 import json
 import os
+import threading
 import time
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
 from urllib.parse import urlparse
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
 
 from supabase import create_client, Client  # pip install supabase
@@ -23,6 +29,10 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_SERVICE_KEY")
 
 PORT = int(os.getenv("JARVIS_MESH_PROXY_PORT", "5055"))
+THREADED = os.getenv("JARVIS_MESH_PROXY_THREADED", "1") != "0"
+ROUTE_TTL_S = float(os.getenv("JARVIS_MESH_ROUTE_TTL", "30"))
+ROUTE_MISS_RELOAD_S = 5.0   # an unknown route forces a reload at most this often
+UPSTREAM_POOL = int(os.getenv("JARVIS_MESH_UPSTREAM_POOL", "128"))  # keep-alive connections per upstream host
 
 if not SUPABASE_URL or not SUPABASE_KEY:
     print("[MESH] FATAL: SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY is missing.")
@@ -31,9 +41,15 @@ supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 # in-memory circuit breaker state (per route_key)
 CIRCUIT_STATE = {}  # { route_key: { "open_until": datetime | None, "fail_count": int } }
+CIRCUIT_LOCK = threading.Lock()
 
+# shared by all handler threads; retries are ours (forward_with_retries), not urllib3's
+UPSTREAM = requests.Session()
+UPSTREAM.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=UPSTREAM_POOL, max_retries=0))
+UPSTREAM.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=UPSTREAM_POOL, max_retries=0))
 
-def get_route_config(source_agent: str, route_key: str):
+
+def fetch_route_config(source_agent: str, route_key: str):
     # 1) fetch route row
     route_resp = supabase.table("az_mesh_routes").select("*") \
         .eq("source_agent", source_agent) \
@@ -56,32 +72,115 @@ def get_route_config(source_agent: str, route_key: str):
     return route, endpoints
 
 
+class RouteTable:
+    """
+    Snapshot of the enabled routes and healthy endpoints, loaded with two queries and
+    reused until it is older than ttl_s or invalidate() is called. While one thread
+    reloads, the others keep answering from the previous snapshot.
+    """
+
+    def __init__(self, ttl_s: float = ROUTE_TTL_S):
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._snapshot = None   # ({(source_agent, route_key): route}, {agent_name: [endpoint]})
+        self._loaded_at = 0.0
+        self._wanted = 0        # bumped by invalidate()
+        self._loaded = 0        # value of _wanted the snapshot was loaded for
+
+    def invalidate(self):
+        self._wanted += 1
+
+    def _fresh(self):
+        return (self._snapshot is not None and self._loaded == self._wanted
+                and time.monotonic() - self._loaded_at < self.ttl_s)
+
+    def _load(self):
+        wanted = self._wanted
+        route_resp = supabase.table("az_mesh_routes").select("*").eq("is_enabled", True).execute()
+        ep_resp = supabase.table("az_mesh_endpoints").select("*").eq("is_healthy", True).execute()
+
+        routes, endpoints = {}, {}
+        for route in route_resp.data or []:
+            routes.setdefault((route["source_agent"], route["route_key"]), route)
+        for ep in ep_resp.data or []:
+            endpoints.setdefault(ep["agent_name"], []).append(ep)
+
+        self._snapshot = (routes, endpoints)
+        self._loaded_at = time.monotonic()
+        self._loaded = wanted
+
+    def refresh(self):
+        if self._fresh():
+            return
+        # only the first load makes callers wait
+        if not self._lock.acquire(blocking=self._snapshot is None):
+            return
+        try:
+            if not self._fresh():
+                self._load()
+        except Exception as e:
+            if self._snapshot is None:
+                raise
+            print(f"[MESH] route reload failed, serving cached routes: {e}")
+            self._loaded_at = time.monotonic() - self.ttl_s + ROUTE_MISS_RELOAD_S
+        finally:
+            self._lock.release()
+
+    def lookup(self, source_agent: str, route_key: str):
+        self.refresh()
+        routes, endpoints = self._snapshot
+        route = routes.get((source_agent, route_key))
+        if route is None and time.monotonic() - self._loaded_at >= ROUTE_MISS_RELOAD_S:
+            # maybe added since the last load
+            self.invalidate()
+            self.refresh()
+            routes, endpoints = self._snapshot
+            route = routes.get((source_agent, route_key))
+        if route is None:
+            return None, None
+        return route, list(endpoints.get(route["target_agent"], []))
+
+
+ROUTES = RouteTable()
+
+
+def get_route_config(source_agent: str, route_key: str):
+    if ROUTE_TTL_S <= 0:
+        return fetch_route_config(source_agent, route_key)
+    return ROUTES.lookup(source_agent, route_key)
+
+
 def is_circuit_open(route_key: str, route):
-    state = CIRCUIT_STATE.get(route_key)
-    if not state:
-        return False
+    with CIRCUIT_LOCK:
+        state = CIRCUIT_STATE.get(route_key)
+        if not state:
+            return False
 
-    open_until = state.get("open_until")
-    if open_until and datetime.utcnow() < open_until:
-        return True
+        open_until = state.get("open_until")
+        if open_until and datetime.utcnow() < open_until:
+            return True
 
-    # circuit expired → reset
-    CIRCUIT_STATE[route_key] = {"fail_count": 0, "open_until": None}
-    return False
+        # circuit expired → reset
+        CIRCUIT_STATE[route_key] = {"fail_count": 0, "open_until": None}
+        return False
 
 
 def record_failure(route_key: str, route):
     threshold = route.get("circuit_breaker_threshold", 5)
-    state = CIRCUIT_STATE.setdefault(route_key, {"fail_count": 0, "open_until": None})
-    state["fail_count"] += 1
+    with CIRCUIT_LOCK:
+        state = CIRCUIT_STATE.setdefault(route_key, {"fail_count": 0, "open_until": None})
+        state["fail_count"] += 1
 
-    if state["fail_count"] >= threshold:
-        # open circuit for 30s (can tune later)
-        state["open_until"] = datetime.utcnow() + timedelta(seconds=30)
+        if state["fail_count"] >= threshold:
+            # open circuit for 30s (can tune later)
+            state["open_until"] = datetime.utcnow() + timedelta(seconds=30)
+            # endpoints may have been marked unhealthy meanwhile
+            ROUTES.invalidate()
 
 
 def record_success(route_key: str):
-    CIRCUIT_STATE[route_key] = {"fail_count": 0, "open_until": None}
+    with CIRCUIT_LOCK:
+        CIRCUIT_STATE[route_key] = {"fail_count": 0, "open_until": None}
 
 
 def forward_with_retries(route, endpoints, payload):
@@ -101,7 +200,7 @@ def forward_with_retries(route, endpoints, payload):
         for ep in endpoints:
             url = ep["endpoint_url"]
             try:
-                resp = requests.post(
+                resp = UPSTREAM.post(
                     url,
                     json=payload,
                     timeout=timeout_sec
@@ -128,21 +227,34 @@ def forward_with_retries(route, endpoints, payload):
 
 
 class MeshHandler(BaseHTTPRequestHandler):
+    # keep-alive for clients: every response carries Content-Length
+    protocol_version = "HTTP/1.1"
+    # headers and body go out as separate writes; don't let Nagle hold the body for the ACK
+    disable_nagle_algorithm = True
+
     def _send_json(self, status_code, body):
+        data = json.dumps(body).encode("utf-8")
         self.send_response(status_code)
         self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
         self.end_headers()
-        self.wfile.write(json.dumps(body).encode("utf-8"))
+        self.wfile.write(data)
 
     def do_POST(self):
         parsed = urlparse(self.path)
+        # always drain the body so the connection can carry the next request
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        raw = self.rfile.read(length)
+
+        if parsed.path == "/routes/invalidate":
+            ROUTES.invalidate()
+            self._send_json(200, {"ok": True})
+            return
         if parsed.path != "/route":
             self._send_json(404, {"ok": False, "error": "not_found"})
             return
 
         try:
-            length = int(self.headers.get("Content-Length", 0))
-            raw = self.rfile.read(length)
             data = json.loads(raw.decode("utf-8"))
         except Exception as e:
             self._send_json(400, {"ok": False, "error": f"invalid_json: {e}"})
@@ -162,7 +274,11 @@ class MeshHandler(BaseHTTPRequestHandler):
             self._send_json(503, {"ok": False, "error": "circuit_open"})
             return
 
-        route, endpoints = get_route_config(source_agent, route_key)
+        try:
+            route, endpoints = get_route_config(source_agent, route_key)
+        except Exception as e:
+            self._send_json(502, {"ok": False, "error": f"route_lookup_failed: {e}"})
+            return
         if not route:
             self._send_json(404, {"ok": False, "error": "route_not_found"})
             return
@@ -174,9 +290,26 @@ class MeshHandler(BaseHTTPRequestHandler):
             self._send_json(502, {"ok": False, "error": f"upstream_failed: {e}"})
 
 
+class SerialMeshHandler(MeshHandler):
+    # a kept-alive client would block everyone else on a single-threaded server
+    protocol_version = "HTTP/1.0"
+
+
+class ThreadedMeshServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def make_server(port: int = PORT, threaded: bool = THREADED, host: str = "0.0.0.0"):
+    if threaded:
+        return ThreadedMeshServer((host, port), MeshHandler)
+    return HTTPServer((host, port), SerialMeshHandler)
+
+
 def run_server():
-    server = HTTPServer(("0.0.0.0", PORT), MeshHandler)
-    print(f"[MeshProxy] LISTEN ON PORT {PORT}")
+    server = make_server()
+    print(f"[MeshProxy] LISTEN ON PORT {PORT} ({'threaded' if THREADED else 'single-threaded'}, "
+          f"route cache {'off' if ROUTE_TTL_S <= 0 else f'{ROUTE_TTL_S:g}s'})")
     server.serve_forever()
 
 
@@ -0,0 +1,200 @@
+"""
+bench_mesh_proxy.py
+Requests/second and added latency of Jarvis-MeshProxy against local stubs.
+
+    python scripts/bench_mesh_proxy.py [--seconds 5] [--db-ms 20] [--clients 1,16,128]
+
+Runs a fake Supabase REST API (az_mesh_routes / az_mesh_endpoints, --db-ms per query)
+and an upstream agent stub in one process, the proxy in another, and drives it from
+this one with N keep-alive clients. Each level is measured:
+  direct  client -> upstream stub (baseline latency)
+  before  single-threaded server, two Supabase queries per request, no upstream pool
+  after   threaded server, cached route table, pooled upstream connections
+Added latency = proxy p50 - direct p50 at the same concurrency.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DB_PORT, UPSTREAM_PORT, PROXY_PORT = 5955, 5956, 5957
+
+ROUTES = [
+    {"id": "r1", "source_agent": "Jarvis-Bench", "target_agent": "Jarvis-Echo", "route_key": "bench.echo",
+     "max_retries": 2, "timeout_ms": 30000, "backoff_strategy": "exponential",
+     "circuit_breaker_threshold": 5, "is_enabled": True},
+]
+ENDPOINTS = [
+    {"id": "e1", "agent_name": "Jarvis-Echo", "endpoint_url": f"http://127.0.0.1:{UPSTREAM_PORT}/echo",
+     "zone": "local", "is_healthy": True},
+]
+
+
+# ---------------- stubs (child process) ----------------
+class Quiet(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, body):
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def run_stubs(db_ms: float):
+    queries = {"n": 0}
+    lock = threading.Lock()
+
+    class FakeRest(Quiet):
+        # just enough PostgREST for select("*").eq(col, val)
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/stats":
+                return self.reply(queries)
+            rows = {"az_mesh_routes": ROUTES, "az_mesh_endpoints": ENDPOINTS}.get(url.path.rsplit("/", 1)[-1], [])
+            for col, cond in parse_qsl(url.query):
+                if col != "select" and cond.startswith("eq."):
+                    rows = [r for r in rows if str(r.get(col)).lower() == cond[3:].lower()]
+            with lock:
+                queries["n"] += 1
+            time.sleep(db_ms / 1000)
+            self.reply(rows)
+
+    class Upstream(Quiet):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.reply({"echo": json.loads(body or b"null")})
+
+    for port, handler in [(DB_PORT, FakeRest), (UPSTREAM_PORT, Upstream)]:
+        server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        server.daemon_threads = True
+        server.request_queue_size = 512
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    print("ready", flush=True)
+    threading.Event().wait()
+
+
+# ---------------- proxy (child process) ----------------
+def run_proxy(mode: str):
+    os.environ.update(SUPABASE_URL=f"http://127.0.0.1:{DB_PORT}", SUPABASE_SERVICE_ROLE_KEY="bench")
+    spec = importlib.util.spec_from_file_location("mesh_proxy", os.path.join(HERE, "Jarvis-MeshProxy.py"))
+    mesh = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mesh)
+    threaded = mode == "after"
+    if mode == "before":
+        mesh.ROUTE_TTL_S = 0         # query Supabase per request
+        mesh.UPSTREAM = requests     # requests.post: new connection per call
+    server = mesh.make_server(PROXY_PORT, threaded=threaded, host="127.0.0.1")
+    if threaded:
+        server.request_queue_size = 512
+    print("ready", flush=True)
+    server.serve_forever()
+
+
+def spawn(*args):
+    proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), *args],
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    assert proc.stdout.readline().strip() == "ready"
+    return proc
+
+
+# ---------------- load generator ----------------
+def drive(url: str, body: dict, clients: int, seconds: float):
+    lat, errors = [], [0]
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def client():
+        s = requests.Session()
+        mine, bad = [], 0
+        while time.perf_counter() < stop:
+            t0 = time.perf_counter()
+            try:
+                r = s.post(url, json=body, timeout=30)
+                ok = r.status_code == 200 and r.json().get("ok", True)
+            except requests.RequestException:
+                ok = False
+            if ok:
+                mine.append(time.perf_counter() - t0)
+            else:
+                bad += 1
+        with lock:
+            lat.extend(mine)
+            errors[0] += bad
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    lat.sort()
+    pct = lambda p: lat[min(len(lat) - 1, int(len(lat) * p))] * 1000 if lat else float("nan")
+    return {"rps": len(lat) / elapsed, "p50": pct(0.5), "p99": pct(0.99), "errors": errors[0], "n": len(lat)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=5)
+    ap.add_argument("--db-ms", type=float, default=20, help="simulated Supabase round trip per query")
+    ap.add_argument("--clients", default="1,16,128")
+    ap.add_argument("--role", choices=["stubs", "before", "after"], help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.role == "stubs":
+        return run_stubs(args.db_ms)
+    if args.role:
+        return run_proxy(args.role)
+
+    levels = [int(c) for c in args.clients.split(",")]
+    payload = {"task": "ping", "items": list(range(20))}
+    stubs = spawn("--role", "stubs", "--db-ms", str(args.db_ms))
+    try:
+        direct = {n: drive(f"http://127.0.0.1:{UPSTREAM_PORT}/echo", payload, n, args.seconds) for n in levels}
+        results = {}
+        for mode in ("before", "after"):
+            q0 = requests.get(f"http://127.0.0.1:{DB_PORT}/stats").json()["n"]
+            proxy = spawn("--role", mode)
+            try:
+                body = {"source_agent": "Jarvis-Bench", "route_key": "bench.echo", "payload": payload}
+                results[mode] = {n: drive(f"http://127.0.0.1:{PROXY_PORT}/route", body, n, args.seconds) for n in levels}
+            finally:
+                proxy.terminate()
+                proxy.wait()
+            served = sum(r["n"] for r in results[mode].values())
+            results[mode]["queries"] = (requests.get(f"http://127.0.0.1:{DB_PORT}/stats").json()["n"] - q0) / max(served, 1)
+    finally:
+        stubs.terminate()
+        stubs.wait()
+
+    print(f"{os.cpu_count()} CPUs, {args.seconds:g}s per level, Supabase round trip {args.db_ms:g} ms")
+    print(f"{'clients':>7} | {'direct p50':>10} | {'mode':>6} | {'req/s':>8} | {'p50 ms':>8} | {'p99 ms':>8} | "
+          f"{'added p50':>9} | errors")
+    for n in levels:
+        for mode in ("before", "after"):
+            r = results[mode][n]
+            print(f"{n:>7} | {direct[n]['p50']:>7.2f} ms | {mode:>6} | {r['rps']:>8.0f} | {r['p50']:>8.2f} | "
+                  f"{r['p99']:>8.2f} | {r['p50'] - direct[n]['p50']:>6.2f} ms | {r['errors']}")
+    for mode in ("before", "after"):
+        print(f"Supabase queries per proxied request, {mode}: {results[mode]['queries']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
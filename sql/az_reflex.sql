@@ -5,6 +5,7 @@
 drop table if exists az_reflex_firings; -- Legacy table causing dependency
 drop table if exists az_reflex_actions;
 drop table if exists az_reflex_rules;
+drop function if exists az_reflex_bump_rules_version() cascade;
 drop table if exists az_reflex_incidents;
 
 -- 1. Incidents (The Sickness)
@@ -30,6 +31,25 @@ create table if not exists az_reflex_rules (
   created_at timestamptz default now()
 );
 
+-- 2b. Rules version: bumped on every change to az_reflex_rules so running engines
+-- (and their on-disk rule cache) know to recompile
+create table if not exists az_reflex_meta (
+  key text primary key,
+  value bigint not null default 0
+);
+insert into az_reflex_meta (key, value) values ('rules_version', 1) on conflict (key) do nothing;
+
+create or replace function az_reflex_bump_rules_version() returns trigger language plpgsql as $$
+begin
+  update az_reflex_meta set value = value + 1 where key = 'rules_version';
+  return null;
+end;
+$$;
+
+create trigger az_reflex_rules_version
+  after insert or update or delete or truncate on az_reflex_rules
+  for each statement execute function az_reflex_bump_rules_version();
+
 -- 3. Actions (The Treatment Log)
 -- Record of every autonomy action taken
 create table if not exists az_reflex_actions (
@@ -6,6 +6,11 @@ from typing import Any, Dict
 
 import requests  # local-only HTTP call to Ollama
 
+try:
+    from aogrl_ops_pack import shared_ollama  # cached calls to Ollama (py/, when installed)
+except ImportError:
+    shared_ollama = None
+
 from config_loader import get_prompt_block
 
 
@@ -47,7 +52,9 @@ def build_payload(mode: str, query: str) -> Dict[str, str]:
 
 def call_ollama(payload: Dict[str, str]) -> str:
     """
-    Call a local Ollama server via its /api/chat endpoint.
+    Call a local Ollama server via its /api/chat endpoint. With aogrl_ops_pack installed,
+    identical requests are answered from its shared on-disk response cache (llm_client);
+    otherwise this is a plain POST.
 
     Uses:
       - DEFAULT_OLLAMA_URL   -> base URL (e.g. http://127.0.0.1:11434)
@@ -60,9 +67,6 @@ def call_ollama(payload: Dict[str, str]) -> str:
         ...
       }
     """
-    base_url = DEFAULT_OLLAMA_URL.rstrip("/")
-    endpoint = f"{base_url}/api/chat"
-
     body: Dict[str, Any] = {
         "model": DEFAULT_OLLAMA_MODEL,
         "messages": [
@@ -72,9 +76,12 @@ def call_ollama(payload: Dict[str, str]) -> str:
         "stream": False,
     }
 
-    resp = requests.post(endpoint, json=body, timeout=600)
-    resp.raise_for_status()
-    data = resp.json()
+    if shared_ollama is not None:
+        data = shared_ollama(DEFAULT_OLLAMA_URL).chat(body, timeout_sec=600)
+    else:
+        resp = requests.post(f"{DEFAULT_OLLAMA_URL.rstrip('/')}/api/chat", json=body, timeout=600)
+        resp.raise_for_status()
+        data = resp.json()
 
     # Try standard Ollama chat format
     try:
@@ -0,0 +1,193 @@
+"""
+Sequential vs DAG project runs with local python/echo steps (no Supabase needed).
+
+Usage:
+  python titan-bridge/runner/bench_runner_dag.py [--step-sec 0.5] [--steps 4]
+
+The Supabase calls (az_events inserts, az_commands PATCHes) are recorded in memory instead
+of sent. Checks:
+  - independent steps overlap; `needs` order and resource-class limits hold
+  - without `needs` the steps still run one after another (the previous behaviour)
+  - output is streamed while a step runs and is complete; run_shell itself keeps only a tail
+  - progress PATCHes are coalesced; a failed step skips its dependents and fails the project,
+    and its stderr tail is reported as critical
+  - unknown dependencies, cycles and zero resource limits are rejected before anything runs
+  - a failed final flush is reported on stderr, not dropped silently
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+os.environ.setdefault("RUNNER_FLUSH_SECONDS", "0.25")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import runner
+
+
+class Recorder:
+    """Stands in for the Supabase calls runner makes while running a project."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = []   # (time, row)
+        self.patches = []  # (time, patch)
+        self.calls = 0
+
+    def emit(self, command_id, severity, event_type, message, payload):
+        self.post_many("az_events", [runner.event_row(command_id, severity, event_type, message, payload)])
+
+    def post_many(self, table, rows):
+        with self.lock:
+            self.calls += 1
+            self.events += [(time.perf_counter(), r) for r in rows]
+
+    def patch(self, table, query, patch):
+        with self.lock:
+            self.calls += 1
+            self.patches.append((time.perf_counter(), patch))
+        return []
+
+    def set_state(self, cid, state, progress, reason=None):
+        self.patch("az_commands", "", {"state": state, "progress": progress})
+        self.emit(cid, "info", "state_change", f"State={state}", {})
+
+    def output(self, step, stream="stdout"):
+        return "".join(r["message"][len(stream) + 2:] + "\n" for _, r in self.events
+                       if r["payload"].get("step") == step and r["payload"].get("stream") == stream)
+
+    def messages(self):
+        return [r["message"] for _, r in self.events]
+
+
+def run(project):
+    rec = Recorder()
+    runner.emit, runner.sb_post_many, runner.sb_patch, runner.set_state = rec.emit, rec.post_many, rec.patch, rec.set_state
+    t0 = time.perf_counter()
+    try:
+        runner.run_project("bench", "bench", project)
+        error = None
+    except RuntimeError as e:
+        error = str(e)
+    return time.perf_counter() - t0, rec, error
+
+
+def py_step(name, code, **extra):
+    return {"name": name, "kind": "python", "cmd": code, **extra}
+
+
+def stamp(name, secs):
+    # prints start/end times so the bench can check ordering
+    return f"import time; print('start', time.time(), flush=True); time.sleep({secs}); print('end', time.time())"
+
+
+def window(rec, step):
+    parts = dict(line.split() for line in rec.output(step).splitlines() if line.startswith(("start", "end")))
+    return float(parts["start"]), float(parts["end"])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--step-sec", type=float, default=0.5)
+    ap.add_argument("--steps", type=int, default=4)
+    args = ap.parse_args()
+    n, d = args.steps, args.step_sec
+    checks, rows = {}, []
+
+    probes = [py_step(f"probe {i}", stamp(f"probe {i}", d)) for i in range(n)]
+    secs, rec, err = run({"steps": probes})
+    rows.append(("sequential (no needs)", secs, rec))
+    windows = [window(rec, f"probe {i}") for i in range(n)]
+    checks["without needs: one step at a time, in file order"] = err is None and all(
+        windows[i][1] <= windows[i + 1][0] for i in range(n - 1))
+
+    secs, rec, err = run({"steps": [dict(p, needs=[]) for p in probes]})
+    rows.append(("DAG, independent", secs, rec))
+    checks["independent steps overlap"] = err is None and secs < d * n * 0.75
+
+    secs, rec, err = run({"resources": {"disk": 2}, "steps": [dict(p, needs=[], resource="disk") for p in probes]})
+    rows.append(("DAG, resource disk=2", secs, rec))
+    starts = sorted(window(rec, f"probe {i}") for i in range(n))
+    peak = max(sum(1 for s, e in starts if s <= t < e) for t, _ in starts)
+    checks["resource class limit respected"] = err is None and peak == 2
+
+    diamond = [
+        py_step("fetch", stamp("fetch", d / 2), needs=[]),
+        py_step("lint", stamp("lint", d), needs=["fetch"]),
+        {"name": "echo", "kind": "cmd", "cmd": "echo built", "id": "build", "needs": ["fetch"]},
+        py_step("report", stamp("report", d / 2), needs=["lint", "build"]),
+    ]
+    secs, rec, err = run({"steps": diamond})
+    rows.append(("DAG, diamond", secs, rec))
+    checks["needs order respected"] = (err is None and window(rec, "fetch")[1] <= window(rec, "lint")[0]
+                                       and window(rec, "lint")[1] <= window(rec, "report")[0]
+                                       and rec.output("echo").strip() == "built")
+
+    big = "".join(f"line {i:05d} " + "x" * 90 + "\n" for i in range(200))
+    chatty = ("import sys, time\nfor i in range(200):\n    print(f'line {i:05d} ' + 'x' * 90)\n"
+              f"    if i == 99: sys.stdout.flush(); time.sleep({d * 2})\n")
+    secs, rec, err = run({"steps": [py_step("chatty", chatty)]})
+    rows.append(("streamed output", secs, rec))
+    done_at = next(t for t, r in rec.events if r["message"].startswith("Step done: chatty"))
+    first_out = next(t for t, r in rec.events if r["payload"].get("stream") == "stdout")
+    checks["output complete (no tail truncation)"] = err is None and rec.output("chatty") == big and len(big) > 6000
+    checks["output streamed while the step runs"] = first_out < done_at - d
+    streamed = []
+    rc, out, _ = runner.run_shell("python", chatty.replace(f"time.sleep({d * 2})", "pass"),
+                                  on_output=lambda stream, line: streamed.append(line))
+    checks["run_shell keeps a capped tail"] = (rc == 0 and "".join(streamed) == big
+                                               and out == big[-runner.OUTPUT_TAIL_CHARS:])
+
+    secs, rec, err = run({"steps": [py_step(f"quick {i}", f"print({i})", needs=[]) for i in range(n * 5)]})
+    progress = [p["progress"] for _, p in rec.patches if "state" not in p]
+    rows.append((f"{n * 5} quick steps", secs, rec))
+    checks["progress PATCHes coalesced"] = err is None and len(progress) < n * 5 and progress[-1] == 85
+
+    failing = [
+        py_step("ok", stamp("ok", d), needs=[]),
+        py_step("bad", "import sys; print('boom', file=sys.stderr); sys.exit(3)", needs=[]),
+        py_step("after bad", "print('should not run')", needs=["bad"]),
+    ]
+    secs, rec, err = run({"steps": failing})
+    checks["failure fails the project, skips dependents, lets running steps finish"] = (
+        err == "Step failed: bad rc=3" and rec.output("after bad") == "" and "end" in rec.output("ok")
+        and rec.output("bad", "stderr").strip() == "boom"
+        and any(r["severity"] == "critical" and r["message"] == "stderr_tail: boom" for _, r in rec.events))
+
+    for label, bad in (("unknown need", [py_step("a", "pass", needs=["nope"])]),
+                       ("cycle", [py_step("a", "pass", needs=["b"]), py_step("b", "pass", needs=["a"])]),
+                       ("zero resource limit", {"resources": {"x": 0}, "steps": [py_step("a", "pass", resource="x")]})):
+        _, rec, err = run(bad if isinstance(bad, dict) else {"steps": bad})
+        checks[f"{label} rejected before running"] = err is not None and not any(
+            m.startswith("Step ") for m in rec.messages())
+
+    def down(table, rows):
+        raise RuntimeError("Supabase POST failed: 503")
+
+    runner.sb_post_many = down
+    reporter = runner.ProjectReporter("bench", flush_seconds=60)
+    reporter.log("info", "lost", {})
+    stderr = io.StringIO()
+    with contextlib.redirect_stderr(stderr):
+        reporter.close()
+    checks["failed final flush reported"] = "1 az_events row(s) dropped" in stderr.getvalue()
+
+    print(f"{n} steps of {d}s, RUNNER_MAX_PARALLEL={runner.RUNNER_MAX_PARALLEL}, flush {runner.FLUSH_SECONDS}s, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'':>22} | {'wall s':>6} | {'supabase calls':>14} | {'events':>6}")
+    for label, secs, rec in rows:
+        print(f"{label:>22} | {secs:6.2f} | {rec.calls:>14} | {len(rec.events):>6}")
+    for name, ok in checks.items():
+        print(f"{name}: {ok}")
+    ok = all(checks.values())
+    print("RESULT:", "PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
-import os, time, subprocess, traceback
-from typing import Optional, Tuple
+import os, sys, time, subprocess, threading, traceback
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
 
 import httpx
 import psutil
@@ -19,6 +21,14 @@ TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN", "")
 
 PROJECTS_DIR = os.path.join(os.path.dirname(__file__), "projects")
 
+# Project steps run as a DAG: at most RUNNER_MAX_PARALLEL at once (per-project override:
+# [project] max_parallel), and at most [resources].<class> steps of one resource class.
+RUNNER_MAX_PARALLEL = int(os.environ.get("RUNNER_MAX_PARALLEL", "4"))
+# Step output and progress are sent to Supabase at most once per interval, in one bulk insert.
+FLUSH_SECONDS = float(os.environ.get("RUNNER_FLUSH_SECONDS", "1.0"))
+OUTPUT_CHUNK_CHARS = 4000
+OUTPUT_TAIL_CHARS = 6000   # per stream, kept by run_shell for its return value
+
 def now_iso():
     return time.strftime("%Y-%m-%dT%H:%M:%S%z")
 
@@ -47,6 +57,13 @@ def sb_post(table: str, payload: dict) -> dict:
     data = r.json()
     return data[0] if isinstance(data, list) and data else payload
 
+def sb_post_many(table: str, rows: List[dict]):
+    headers = sb_headers()
+    headers["Prefer"] = "return=minimal"
+    r = httpx.post(sb_url(table), headers=headers, json=rows, timeout=20)
+    if r.status_code >= 300:
+        raise RuntimeError(f"Supabase POST failed: {r.status_code} {r.text}")
+
 def sb_patch(table: str, query: str, patch: dict) -> list:
     r = httpx.patch(f"{sb_url(table)}?{query}", headers=sb_headers(), json=patch, timeout=20)
     if r.status_code >= 300:
@@ -64,6 +81,102 @@ def emit(command_id: Optional[str], severity: str, event_type: str, message: str
         "payload": payload
     })
 
+def event_row(command_id: Optional[str], severity: str, event_type: str, message: str, payload: dict) -> dict:
+    return {
+        "source": AGENT_ID,
+        "command_id": command_id,
+        "severity": severity,
+        "event_type": event_type,
+        "message": message,
+        "payload": payload
+    }
+
+class ProjectReporter:
+    """
+    Coalesces the events and progress of one project run. Step output is streamed in chunks of
+    up to OUTPUT_CHUNK_CHARS; a background thread sends everything buffered every FLUSH_SECONDS
+    (one bulk az_events insert, one progress PATCH if it changed). Thread-safe.
+    """
+
+    def __init__(self, cid: str, flush_seconds: float = FLUSH_SECONDS):
+        self.cid = cid
+        self.flush_seconds = flush_seconds
+        self.lock = threading.Lock()
+        self.events: List[dict] = []
+        self.output: Dict[Tuple[str, str], List[str]] = {}
+        self.output_len: Counter = Counter()
+        self.progress: Optional[int] = None
+        self.sent_progress: Optional[int] = None
+        self.flush_lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def log(self, severity: str, message: str, payload: dict):
+        with self.lock:
+            self.events.append(event_row(self.cid, severity, "log", message, payload))
+
+    def write(self, step: str, stream: str, text: str):
+        key = (step, stream)
+        with self.lock:
+            if self.output_len[key] + len(text) > OUTPUT_CHUNK_CHARS:
+                self._cut(key)
+            self.output.setdefault(key, []).append(text)
+            self.output_len[key] += len(text)
+
+    def _cut(self, key: Tuple[str, str]):
+        # caller holds self.lock; whole lines per event, over-long lines split
+        text = "".join(self.output.pop(key, []))
+        self.output_len.pop(key, None)
+        step, stream = key
+        severity = "warn" if stream == "stderr" else "info"
+        for i in range(0, len(text), OUTPUT_CHUNK_CHARS):
+            chunk = text[i:i + OUTPUT_CHUNK_CHARS].removesuffix("\n")
+            self.events.append(event_row(self.cid, severity, "log", f"{stream}: {chunk}", {"step": step, "stream": stream}))
+
+    def set_progress(self, progress: int):
+        with self.lock:
+            self.progress = max(progress, self.progress or 0)
+
+    def flush(self) -> Optional[str]:
+        """Sends what is buffered. Returns the error if the events could not be sent (they stay buffered)."""
+        error = None
+        with self.flush_lock:
+            with self.lock:
+                for key in list(self.output):
+                    self._cut(key)
+                events, self.events = self.events, []
+                progress = self.progress
+            if events:
+                try:
+                    sb_post_many("az_events", events)
+                except Exception as e:
+                    with self.lock:
+                        self.events[:0] = events  # keep them for the next flush
+                    error = f"{type(e).__name__}: {e}"
+            if progress is not None and progress != self.sent_progress:
+                try:
+                    sb_patch("az_commands", f"command_id=eq.{self.cid}", {"progress": progress})
+                    self.sent_progress = progress
+                except Exception:
+                    pass
+        return error
+
+    def _loop(self):
+        while not self.stopped.wait(self.flush_seconds):
+            self.flush()
+
+    def close(self):
+        self.stopped.set()
+        self.thread.join()
+        error = self.flush()
+        if error:
+            time.sleep(min(self.flush_seconds, 1.0))
+            error = self.flush()  # one retry; nothing flushes after this
+        if error:
+            print(f"[runner] {self.cid}: final flush failed, {len(self.events)} az_events row(s) dropped: {error}",
+                  file=sys.stderr, flush=True)
+
 def upsert_health(status: str, current_command_id: Optional[str], last_error: Optional[str] = None):
     metrics = {
         "cpu": psutil.cpu_percent(interval=0.1),
@@ -129,49 +242,167 @@ def load_project(project_id: str) -> dict:
     with open(path, "rb") as f:
         return tomllib.load(f)
 
-def run_shell(kind: str, command: str, cwd: Optional[str] = None) -> Tuple[int, str, str]:
+def shell_argv(kind: str, command: str):
     if kind == "powershell":
-        proc = subprocess.run(["powershell", "-NoProfile", "-Command", command], cwd=cwd, capture_output=True, text=True)
-    elif kind == "cmd":
-        proc = subprocess.run(command, cwd=cwd, capture_output=True, text=True, shell=True)
-    elif kind == "python":
-        proc = subprocess.run(["python", "-c", command], cwd=cwd, capture_output=True, text=True)
-    elif kind == "node":
-        proc = subprocess.run(["node", "-e", command], cwd=cwd, capture_output=True, text=True)
-    elif kind == "docker":
-        proc = subprocess.run(["powershell", "-NoProfile", "-Command", f"docker {command}"], cwd=cwd, capture_output=True, text=True)
-    else:
-        raise ValueError(f"Unknown kind: {kind}")
-    return proc.returncode, (proc.stdout or "")[-6000:], (proc.stderr or "")[-6000:]
+        return ["powershell", "-NoProfile", "-Command", command]
+    if kind == "cmd":
+        return command
+    if kind == "python":
+        return ["python", "-c", command]
+    if kind == "node":
+        return ["node", "-e", command]
+    if kind == "docker":
+        return ["powershell", "-NoProfile", "-Command", f"docker {command}"]
+    raise ValueError(f"Unknown kind: {kind}")
+
+def run_shell(kind: str, command: str, cwd: Optional[str] = None,
+              on_output: Optional[Callable[[str, str], None]] = None) -> Tuple[int, str, str]:
+    """
+    Run a step and return (rc, stdout tail, stderr tail), each at most OUTPUT_TAIL_CHARS;
+    on_output(stream, line) sees every line in full as it is written.
+    """
+    argv = shell_argv(kind, command)
+    proc = subprocess.Popen(argv, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            text=True, errors="replace", shell=(kind == "cmd"))
+    captured = {"stdout": [], "stderr": []}
+
+    def pump(stream: str, pipe):
+        kept, size = captured[stream], 0
+        for line in iter(pipe.readline, ""):
+            kept.append(line)
+            size += len(line)
+            if size > 2 * OUTPUT_TAIL_CHARS:
+                tail = "".join(kept)[-OUTPUT_TAIL_CHARS:]
+                kept[:] = [tail]
+                size = len(tail)
+            if on_output:
+                on_output(stream, line)
+        pipe.close()
+
+    readers = [threading.Thread(target=pump, args=(name, pipe), daemon=True)
+               for name, pipe in (("stdout", proc.stdout), ("stderr", proc.stderr))]
+    for t in readers:
+        t.start()
+    rc = proc.wait()
+    for t in readers:
+        t.join()
+    return rc, "".join(captured["stdout"])[-OUTPUT_TAIL_CHARS:], "".join(captured["stderr"])[-OUTPUT_TAIL_CHARS:]
+
+def plan_steps(steps: list) -> List[dict]:
+    """
+    Normalise project steps and check they form a DAG. A step may set `id` (default: its name),
+    `needs` (ids or names of steps it waits for) and `resource` (a class limited by [resources]).
+    If no step declares `needs`, each step needs the one before it, as in the sequential runner.
+    Returns the steps in a topological order that keeps file order among ready steps.
+    """
+    plan, ids = [], {}
+    for i, step in enumerate(steps, start=1):
+        name = step.get("name", f"step_{i}")
+        sid = str(step.get("id") or name)
+        if sid in ids:
+            raise RuntimeError(f"Duplicate step id: {sid}")
+        ids[sid] = sid
+        ids.setdefault(name, sid)
+        plan.append({"id": sid, "name": name, "index": i, "kind": step.get("kind", "powershell"),
+                     "cmd": step.get("cmd", ""), "cwd": step.get("cwd"), "resource": step.get("resource"),
+                     "needs": step.get("needs")})
+
+    declared = any(s["needs"] is not None for s in plan)
+    for i, s in enumerate(plan):
+        if not declared:
+            s["needs"] = [plan[i - 1]["id"]] if i else []
+            continue
+        needs = s["needs"] or []
+        if isinstance(needs, str):
+            needs = [needs]
+        unknown = [n for n in needs if n not in ids]
+        if unknown:
+            raise RuntimeError(f"Step '{s['name']}' needs unknown step(s): {', '.join(unknown)}")
+        s["needs"] = sorted({ids[n] for n in needs}, key=[p["id"] for p in plan].index)
+
+    ordered, placed = [], set()
+    while len(ordered) < len(plan):
+        ready = [s for s in plan if s["id"] not in placed and set(s["needs"]) <= placed]
+        if not ready:
+            cycle = [s["name"] for s in plan if s["id"] not in placed]
+            raise RuntimeError(f"Step dependencies form a cycle: {', '.join(cycle)}")
+        ordered += ready
+        placed.update(s["id"] for s in ready)
+    return ordered
+
+def run_step(reporter: ProjectReporter, step: dict, total: int) -> int:
+    name = step["name"]
+    reporter.log("info", f"Step {step['index']}/{total}: {name}",
+                 {"kind": step["kind"], "cwd": step["cwd"], "needs": step["needs"], "resource": step["resource"]})
+    started = time.perf_counter()
+    try:
+        rc, _, err = run_shell(step["kind"], step["cmd"], cwd=step["cwd"],
+                               on_output=lambda stream, text: reporter.write(name, stream, text))
+    except Exception as e:
+        reporter.log("critical", f"Step error: {name}: {e}", {"step": name})
+        return -1
+    secs = round(time.perf_counter() - started, 3)
+    # stderr is streamed at "warn" while the step runs; once it has failed, its tail is critical
+    if rc != 0 and err.strip():
+        reporter.log("critical", f"stderr_tail: {err[-500:].strip()}", {"step": name})
+    reporter.log("info" if rc == 0 else "critical", f"Step {'done' if rc == 0 else 'failed'}: {name} rc={rc} ({secs}s)",
+                 {"step": name, "rc": rc, "seconds": secs})
+    return rc
 
 def run_project(cid: str, project_id: str, project: dict) -> dict:
-    name = project.get("project", {}).get("name", project_id)
+    meta = project.get("project", {})
+    name = meta.get("name", project_id)
     steps = project.get("steps", [])
     if not isinstance(steps, list) or not steps:
         raise RuntimeError("Project has no steps")
-
-    emit(cid, "info", "log", f"Project start: {name}", {"project_id": project_id})
+    plan = plan_steps(steps)
+    limits = project.get("resources", {}) or {}
+    blocked = [s["name"] for s in plan if s["resource"] and int(limits.get(s["resource"], 1)) < 1]
+    if blocked:
+        raise RuntimeError(f"Step(s) can never run (resource limit below 1): {', '.join(blocked)}")
+    max_parallel = max(1, int(meta.get("max_parallel", RUNNER_MAX_PARALLEL)))
+
+    emit(cid, "info", "log", f"Project start: {name}", {"project_id": project_id, "max_parallel": max_parallel})
     set_state(cid, "RUNNING", 15)
 
-    for i, step in enumerate(steps, start=1):
-        step_name = step.get("name", f"step_{i}")
-        kind = step.get("kind", "powershell")
-        cmd = step.get("cmd", "")
-        cwd = step.get("cwd")
-
-        emit(cid, "info", "log", f"Step {i}/{len(steps)}: {step_name}", {"kind": kind, "cwd": cwd})
-        rc, out, err = run_shell(kind, cmd, cwd=cwd)
-
-        # Store useful tails as events for tail <id>
-        if out.strip():
-            emit(cid, "info", "log", f"stdout_tail: {out[-500:].strip()}", {"step": step_name})
-        if err.strip():
-            emit(cid, "warn" if rc == 0 else "critical", "log", f"stderr_tail: {err[-500:].strip()}", {"step": step_name})
-
-        sb_patch("az_commands", f"command_id=eq.{cid}", {"progress": int(15 + 70 * (i / len(steps)))})
-
-        if rc != 0:
-            raise RuntimeError(f"Step failed: {step_name} rc={rc}")
+    reporter = ProjectReporter(cid)
+    pending = {s["id"]: s for s in plan}
+    running, done, failed = {}, set(), []
+    in_use: Counter = Counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max_parallel) as pool:
+            while running or (pending and not failed):
+                if not failed:
+                    for sid, step in list(pending.items()):
+                        if len(running) >= max_parallel:
+                            break
+                        res = step["resource"]
+                        if not set(step["needs"]) <= done or (res and in_use[res] >= int(limits.get(res, 1))):
+                            continue
+                        del pending[sid]
+                        in_use[res] += 1
+                        running[pool.submit(run_step, reporter, step, len(plan))] = step
+                if not running:
+                    raise RuntimeError(f"No runnable step among: {', '.join(s['name'] for s in pending.values())}")
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    step = running.pop(fut)
+                    in_use[step["resource"]] -= 1
+                    rc = fut.result()
+                    if rc == 0:
+                        done.add(step["id"])
+                        reporter.set_progress(int(15 + 70 * (len(done) / len(plan))))
+                    else:
+                        failed.append((step["name"], rc))
+        if pending:
+            reporter.log("warn", f"Skipped {len(pending)} step(s) after failure",
+                         {"skipped": [s["name"] for s in pending.values()]})
+    finally:
+        reporter.close()
+
+    if failed:
+        step_name, rc = failed[0]
+        raise RuntimeError(f"Step failed: {step_name} rc={rc}")
 
     return {
         "ok": True,
@@ -0,0 +1,91 @@
+-- 004_command_leases.sql
+-- TITAN Bridge: atomic batched command claiming with leases.
+--
+-- Workers no longer "read one QUEUED row, then PATCH it" (two workers could grab the
+-- same row). They call az_claim_commands(), which flips up to N QUEUED rows to CLAIMED
+-- in one statement (FOR UPDATE SKIP LOCKED) and stamps a lease owner + expiry.
+-- Long-running agents extend the lease with az_renew_lease(); rows whose lease expired
+-- (worker crashed) go back to QUEUED via az_requeue_expired_leases().
+
+alter table public.az_commands add column if not exists lease_owner text null;
+alter table public.az_commands add column if not exists lease_expires_at timestamptz null;
+
+create index if not exists az_commands_lease_idx
+  on public.az_commands(lease_expires_at)
+  where lease_owner is not null;
+
+-- ----------------------------
+-- CLAIM: lease up to p_limit queued commands
+-- ----------------------------
+create or replace function public.az_claim_commands(
+  p_owner text,
+  p_limit int default 1,
+  p_lease_seconds int default 120
+)
+returns setof public.az_commands
+language sql
+as $$
+  update public.az_commands c
+     set state = 'CLAIMED',
+         lease_owner = p_owner,
+         lease_expires_at = now() + make_interval(secs => p_lease_seconds),
+         claimed_at = now(),
+         progress = 5
+   where c.command_id in (
+         select command_id
+           from public.az_commands
+          where state = 'QUEUED'
+          order by priority asc, created_at asc
+          limit greatest(p_limit, 0)
+          for update skip locked
+   )
+     and c.state = 'QUEUED'
+  returning c.*;
+$$;
+
+-- ----------------------------
+-- RENEW: extend a lease still held by p_owner
+-- ----------------------------
+create or replace function public.az_renew_lease(
+  p_command_id uuid,
+  p_owner text,
+  p_lease_seconds int default 120
+)
+returns boolean
+language plpgsql
+as $$
+begin
+  update public.az_commands
+     set lease_expires_at = now() + make_interval(secs => p_lease_seconds),
+         last_heartbeat_at = now()
+   where command_id = p_command_id
+     and lease_owner = p_owner
+     and state in ('CLAIMED', 'RUNNING', 'VERIFYING');
+  return found;
+end;
+$$;
+
+-- ----------------------------
+-- REQUEUE: return expired leases to the queue
+-- ----------------------------
+create or replace function public.az_requeue_expired_leases()
+returns int
+language plpgsql
+as $$
+declare
+  n int;
+begin
+  update public.az_commands
+     set state = 'QUEUED',
+         state_reason = 'lease expired (owner ' || coalesce(lease_owner, '?') || ')',
+         lease_owner = null,
+         lease_expires_at = null,
+         assigned_agent_id = null,
+         progress = 0
+   where state in ('CLAIMED', 'RUNNING', 'VERIFYING')
+     and lease_expires_at is not null
+     and lease_expires_at < now();
+  get diagnostics n = row_count;
+  return n;
+end;
+$$;
@@ -0,0 +1,219 @@
+"""
+Lease-based command claiming for the bridge worker.
+
+A worker claims up to N QUEUED commands in ONE conditional update, so two workers
+can never hold the same row. Each claimed row records the worker as `lease_owner`
+and gets a `lease_expires_at`. While an agent runs, a LeaseKeeper renews the lease.
+Rows whose lease expired (worker crashed or was killed) are put back to QUEUED by
+`requeue_expired()`. Every later state change is conditional on the lease owner,
+so a worker that lost its lease cannot overwrite the new owner's progress.
+
+Backends:
+  - SupabaseLeaseQueue: PostgREST RPCs from sql/004_command_leases.sql
+  - SqliteLeaseQueue:   local stand-in with the same protocol (tests / stress runs)
+"""
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional
+
+
+def make_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class SupabaseLeaseQueue:
+    """Lease queue backed by the az_claim_commands / az_renew_lease / az_requeue_expired_leases RPCs."""
+
+    def __init__(self,
+                 rpc: Callable[[str, dict], Awaitable[Any]],
+                 patch: Callable[[str, str, dict], Awaitable[list]]):
+        self.rpc = rpc
+        self.patch = patch
+
+    async def claim(self, owner: str, limit: int, lease_seconds: int) -> List[dict]:
+        rows = await self.rpc("az_claim_commands", {
+            "p_owner": owner, "p_limit": limit, "p_lease_seconds": lease_seconds
+        })
+        return rows or []
+
+    async def renew(self, command_id: str, owner: str, lease_seconds: int) -> bool:
+        return bool(await self.rpc("az_renew_lease", {
+            "p_command_id": command_id, "p_owner": owner, "p_lease_seconds": lease_seconds
+        }))
+
+    async def requeue_expired(self) -> int:
+        return int(await self.rpc("az_requeue_expired_leases", {}) or 0)
+
+    async def update(self, command_id: str, owner: str, patch: dict) -> bool:
+        """Applies `patch` only while `owner` still holds the lease."""
+        rows = await self.patch("az_commands", f"command_id=eq.{command_id}&lease_owner=eq.{owner}", patch)
+        return bool(rows)
+
+
+SQLITE_SCHEMA = """
+create table if not exists az_commands (
+  command_id text primary key,
+  created_at real not null,
+  title text not null default '',
+  intent text not null default '',
+  objective text not null default '',
+  targets text not null default '[]',
+  inputs text not null default '{}',
+  authority_required text not null default 'L1',
+  approved integer not null default 0,
+  priority integer not null default 2,
+  state text not null default 'QUEUED',
+  state_reason text null,
+  assigned_agent_id text null,
+  claimed_at real null,
+  started_at real null,
+  finished_at real null,
+  progress integer not null default 0,
+  last_heartbeat_at real null,
+  lease_owner text null,
+  lease_expires_at real null,
+  result text null,
+  error text null
+);
+create index if not exists az_commands_state_idx on az_commands(state, priority, created_at);
+"""
+
+ACTIVE_STATES = ("CLAIMED", "RUNNING", "VERIFYING")
+
+
+class SqliteLeaseQueue:
+    """
+    Local stand-in for the Postgres queue. Claims run as one UPDATE ... RETURNING inside
+    a BEGIN IMMEDIATE transaction, which gives the same at-most-one-owner guarantee as
+    FOR UPDATE SKIP LOCKED (writers are serialized instead of skipping).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SQLITE_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _write(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self.conn.execute(sql, params).fetchall()
+            self.conn.execute("COMMIT")
+            return rows
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def enqueue(self, title: str, priority: int = 2, **fields) -> str:
+        command_id = str(uuid.uuid4())
+        row = {"command_id": command_id, "created_at": time.time(), "title": title, "priority": priority}
+        for key, value in fields.items():
+            row[key] = json.dumps(value) if isinstance(value, (dict, list)) else value
+        cols = ", ".join(row)
+        marks = ", ".join("?" for _ in row)
+        self._write(f"insert into az_commands ({cols}) values ({marks})", tuple(row.values()))
+        return command_id
+
+    async def claim(self, owner: str, limit: int, lease_seconds: float) -> List[dict]:
+        now = time.time()
+        rows = self._write(
+            """
+            update az_commands
+               set state = 'CLAIMED', lease_owner = ?, lease_expires_at = ?, claimed_at = ?, progress = 5
+             where command_id in (
+                   select command_id from az_commands
+                    where state = 'QUEUED'
+                    order by priority asc, created_at asc
+                    limit ?)
+               and state = 'QUEUED'
+            returning *
+            """,
+            (owner, now + lease_seconds, now, max(int(limit), 0)),
+        )
+        return [dict(r) for r in rows]
+
+    async def renew(self, command_id: str, owner: str, lease_seconds: float) -> bool:
+        now = time.time()
+        rows = self._write(
+            f"""
+            update az_commands set lease_expires_at = ?, last_heartbeat_at = ?
+             where command_id = ? and lease_owner = ? and state in {ACTIVE_STATES}
+            returning command_id
+            """,
+            (now + lease_seconds, now, command_id, owner),
+        )
+        return bool(rows)
+
+    async def requeue_expired(self) -> int:
+        rows = self._write(
+            f"""
+            update az_commands
+               set state = 'QUEUED', state_reason = 'lease expired (owner ' || coalesce(lease_owner, '?') || ')',
+                   lease_owner = null, lease_expires_at = null, assigned_agent_id = null, progress = 0
+             where state in {ACTIVE_STATES} and lease_expires_at is not null and lease_expires_at < ?
+            returning command_id
+            """,
+            (time.time(),),
+        )
+        return len(rows)
+
+    async def update(self, command_id: str, owner: str, patch: dict) -> bool:
+        values = {k: (json.dumps(v) if isinstance(v, (dict, list)) else v) for k, v in patch.items()}
+        sets = ", ".join(f"{k} = ?" for k in values)
+        rows = self._write(
+            f"update az_commands set {sets} where command_id = ? and lease_owner = ? returning command_id",
+            (*values.values(), command_id, owner),
+        )
+        return bool(rows)
+
+
+class LeaseKeeper:
+    """
+    Renews a command's lease in the background while an agent runs.
+
+        async with LeaseKeeper(queue, command_id, owner, lease_seconds) as lease:
+            ...
+            if lease.lost: ...  # someone else owns the command now
+    """
+
+    def __init__(self, queue, command_id: str, owner: str, lease_seconds: float):
+        self.queue = queue
+        self.command_id = command_id
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self.lost = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        interval = max(self.lease_seconds / 3.0, 0.05)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self.queue.renew(self.command_id, self.owner, self.lease_seconds):
+                    self.lost = True
+                    return
+            except Exception as e:
+                # Transient failure: the next tick retries well before the lease runs out.
+                print(f"Lease renewal error for {self.command_id}: {e}")
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        return False
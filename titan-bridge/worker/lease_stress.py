@@ -0,0 +1,131 @@
+"""
+Multi-worker stress test for the lease-based claim protocol (SQLite stand-in).
+
+    python worker/lease_stress.py --workers 8 --commands 2000 --batch 8
+
+Spawns N worker processes against one local queue. Each worker claims batches,
+"executes" every command by recording it in an executions table while a
+LeaseKeeper renews the lease, then finalizes the command conditionally on the
+lease. One extra worker claims a batch and dies without finishing, to exercise
+expiry and requeue. Some commands outlive their lease, to exercise renewal.
+
+The run passes only if every command reaches DONE and was executed exactly once, counting
+runs whose lease was lost mid-execution.
+It also reports commands/second.
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import sqlite3
+import tempfile
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from command_queue import SqliteLeaseQueue, LeaseKeeper, make_worker_id  # noqa: E402
+
+EXECUTIONS_SCHEMA = """
+create table if not exists executions (
+  id integer primary key autoincrement,
+  command_id text not null,
+  owner text not null,
+  ts real not null
+);
+"""
+
+
+async def worker_loop(db_path: str, batch: int, lease_seconds: float, slow_fraction: float):
+    queue = SqliteLeaseQueue(db_path)
+    owner = make_worker_id()
+    idle_rounds = 0
+
+    async def execute(cmd: dict):
+        async with LeaseKeeper(queue, cmd["command_id"], owner, lease_seconds) as lease:
+            # A few commands run longer than the lease itself: renewal must keep them owned.
+            work = lease_seconds * 1.5 if random.random() < slow_fraction else 0.0
+            await asyncio.sleep(work)
+            # Like the real worker, the agent has run even if the lease was lost meanwhile:
+            # record every run, so a lost lease shows up as a double execution.
+            queue._write("insert into executions (command_id, owner, ts) values (?, ?, ?)",
+                         (cmd["command_id"], owner, time.time()))
+            if lease.lost:
+                return
+        await queue.update(cmd["command_id"], owner, {
+            "state": "DONE", "finished_at": time.time(), "progress": 100,
+            "lease_owner": None, "lease_expires_at": None,
+        })
+
+    while idle_rounds < 20:
+        await queue.requeue_expired()
+        cmds = await queue.claim(owner, batch, lease_seconds)
+        if not cmds:
+            idle_rounds += 1
+            await asyncio.sleep(lease_seconds / 4)
+            continue
+        idle_rounds = 0
+        await asyncio.gather(*(execute(c) for c in cmds))
+    queue.close()
+
+
+def run_worker(db_path: str, batch: int, lease_seconds: float, slow_fraction: float):
+    asyncio.run(worker_loop(db_path, batch, lease_seconds, slow_fraction))
+
+
+def crashing_worker(db_path: str, batch: int, lease_seconds: float):
+    """Claims a batch and exits without executing or releasing it."""
+    queue = SqliteLeaseQueue(db_path)
+    asyncio.run(queue.claim("crashed-worker", batch, lease_seconds))
+    queue.close()
+    os._exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lease queue stress test")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--commands", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--lease", type=float, default=0.5, help="lease seconds")
+    parser.add_argument("--slow-fraction", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "queue.db")
+        queue = SqliteLeaseQueue(db_path)
+        queue.conn.executescript(EXECUTIONS_SCHEMA)
+        for i in range(args.commands):
+            queue.enqueue(f"stress-{i}", priority=i % 4)
+
+        crasher = mp.Process(target=crashing_worker, args=(db_path, args.batch, args.lease))
+        crasher.start()
+        crasher.join()
+
+        started = time.time()
+        procs = [mp.Process(target=run_worker, args=(db_path, args.batch, args.lease, args.slow_fraction))
+                 for _ in range(args.workers)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+
+        conn = sqlite3.connect(db_path)
+        executions, distinct = conn.execute("select count(*), count(distinct command_id) from executions").fetchone()
+        done = conn.execute("select count(*) from az_commands where state = 'DONE'").fetchone()[0]
+        last_execution = conn.execute("select max(ts) from executions").fetchone()[0] or started
+        requeued = conn.execute("select count(*) from az_commands where state_reason like 'lease expired%'").fetchone()[0]
+        conn.close()
+        queue.close()
+
+    print(f"workers={args.workers} batch={args.batch} lease={args.lease}s")
+    print(f"commands={args.commands} done={done} executions={executions} distinct={distinct} requeued_after_crash={requeued}")
+    elapsed = last_execution - started
+    print(f"throughput={args.commands / elapsed:.1f} commands/s ({elapsed:.2f}s to last execution)")
+
+    ok = done == args.commands and executions == distinct == args.commands and requeued >= 1
+    print("RESULT:", "PASS - zero double execution" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
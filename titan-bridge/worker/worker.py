@@ -3,12 +3,16 @@ import json
 import time
 import asyncio
 import tomllib
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
 import httpx
 import subprocess
+from loguru import logger
+
+from aogrl_ops_pack.supabase_client import AsyncSupabaseRest
+from command_queue import SupabaseLeaseQueue, LeaseKeeper, make_worker_id
 
 
 def load_toml(path: str) -> dict:
@@ -23,6 +27,11 @@ SUPABASE_SCHEMA = CFG["supabase"].get("schema", "public")
 
 POLL_INTERVAL = int(CFG["worker"]["poll_interval_seconds"])
 STALE_SECONDS = int(CFG["worker"]["stale_command_seconds"])
+CLAIM_BATCH_SIZE = int(CFG["worker"].get("claim_batch_size", 1))
+LEASE_SECONDS = int(CFG["worker"].get("lease_seconds", 120))
+REQUEUE_INTERVAL = int(CFG["worker"].get("requeue_interval_seconds", 30))
+
+WORKER_ID = os.environ.get("TITAN_WORKER_ID") or make_worker_id()
 
 AUTOPILOT_ENABLED = bool(CFG["authority"]["autopilot_enabled"])
 DEFAULT_AUTH = CFG["authority"].get("default_level", "L1")
@@ -31,39 +40,41 @@ if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
     raise RuntimeError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY env vars.")
 
 
-def sb_headers() -> Dict[str, str]:
-    return {
-        "apikey": SUPABASE_SERVICE_KEY,
-        "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-        "Prefer": "return=representation",
-    }
-
-def sb_url(table: str) -> str:
-    return f"{SUPABASE_URL}/rest/v1/{table}"
+# One pooled keep-alive client for every queue poll, event emit and finalize.
+SB = AsyncSupabaseRest(
+    SUPABASE_URL, SUPABASE_SERVICE_KEY,
+    schema=SUPABASE_SCHEMA,
+    max_connections=int(CFG["worker"].get("http_max_connections", 10)),
+    max_concurrency=int(CFG["worker"].get("http_max_concurrency", 8)),
+)
 
 async def sb_get(table: str, query: str) -> list:
-    async with httpx.AsyncClient(timeout=15) as client:
-        r = await client.get(f"{sb_url(table)}?{query}", headers=sb_headers())
-        if r.status_code >= 300:
-            raise RuntimeError(f"Supabase GET failed: {r.status_code} {r.text}")
-        return r.json()
+    r = await SB.get(table, query)
+    if r.status_code >= 300:
+        raise RuntimeError(f"Supabase GET failed: {r.status_code} {r.text}")
+    return r.json()
 
 async def sb_post(table: str, payload: dict) -> dict:
-    async with httpx.AsyncClient(timeout=15) as client:
-        r = await client.post(sb_url(table), headers=sb_headers(), json=payload)
-        if r.status_code >= 300:
-            raise RuntimeError(f"Supabase POST failed: {r.status_code} {r.text}")
-        data = r.json()
-        return data[0] if isinstance(data, list) and data else payload
+    r = await SB.post(table, payload)
+    if r.status_code >= 300:
+        raise RuntimeError(f"Supabase POST failed: {r.status_code} {r.text}")
+    data = r.json()
+    return data[0] if isinstance(data, list) and data else payload
 
 async def sb_patch(table: str, match_query: str, patch: dict) -> list:
-    async with httpx.AsyncClient(timeout=15) as client:
-        r = await client.patch(f"{sb_url(table)}?{match_query}", headers=sb_headers(), json=patch)
-        if r.status_code >= 300:
-            raise RuntimeError(f"Supabase PATCH failed: {r.status_code} {r.text}")
-        return r.json()
+    r = await SB.patch(table, match_query, patch)
+    if r.status_code >= 300:
+        raise RuntimeError(f"Supabase PATCH failed: {r.status_code} {r.text}")
+    return r.json()
+
+async def sb_rpc(fn: str, params: dict) -> Any:
+    r = await SB.rpc(fn, params)
+    if r.status_code >= 300:
+        raise RuntimeError(f"Supabase RPC {fn} failed: {r.status_code} {r.text}")
+    return r.json()
+
+
+QUEUE = SupabaseLeaseQueue(rpc=sb_rpc, patch=sb_patch)
 
 
 def authority_rank(level: str) -> int:
@@ -87,15 +98,10 @@ async def emit_event(source: str, command_id: Optional[str], severity: str, even
     })
 
 
-async def fetch_next_command() -> Optional[dict]:
-    # Order: queued first, highest priority (lower number), oldest first
-    rows = await sb_get(
-        "az_commands",
-        "state=eq.QUEUED&select=*"
-        "&order=priority.asc,created_at.asc"
-        "&limit=1"
-    )
-    return rows[0] if rows else None
+async def claim_commands() -> List[dict]:
+    # Atomically lease up to CLAIM_BATCH_SIZE queued commands
+    # (highest priority / lower number first, then oldest first).
+    return await QUEUE.claim(WORKER_ID, CLAIM_BATCH_SIZE, LEASE_SECONDS)
 
 
 async def choose_agent(targets: List[str]) -> Optional[dict]:
@@ -114,24 +120,23 @@ async def choose_agent(targets: List[str]) -> Optional[dict]:
     return best
 
 
-async def claim_command(cmd: dict, agent_id: str) -> dict:
+async def assign_command(cmd: dict, agent_id: str) -> bool:
+    # The row is already CLAIMED (leased) by this worker; record which agent runs it.
     command_id = cmd["command_id"]
-    patched = await sb_patch("az_commands", f"command_id=eq.{command_id}", {
-        "state": "CLAIMED",
-        "assigned_agent_id": agent_id,
-        "claimed_at": "now()",
-        "progress": 5
-    })
-    await emit_event("control_plane", command_id, "info", "state_change", f"Command claimed by {agent_id}", {"state": "CLAIMED"})
-    return patched[0] if patched else cmd
+    if not await QUEUE.update(command_id, WORKER_ID, {"assigned_agent_id": agent_id}):
+        return False
+    await emit_event("control_plane", command_id, "info", "state_change", f"Command claimed by {agent_id}", {"state": "CLAIMED", "worker": WORKER_ID})
+    return True
 
 
 async def mark_needs_approval(cmd: dict, reason: str) -> None:
     command_id = cmd["command_id"]
-    await sb_patch("az_commands", f"command_id=eq.{command_id}", {
+    await QUEUE.update(command_id, WORKER_ID, {
         "state": "NEEDS_APPROVAL",
         "state_reason": reason,
-        "progress": 0
+        "progress": 0,
+        "lease_owner": None,
+        "lease_expires_at": None
     })
     await emit_event("control_plane", command_id, "warn", "approval_required", reason, {"state": "NEEDS_APPROVAL"})
 
@@ -154,7 +159,9 @@ async def run_local_agent(agent: dict, cmd: dict) -> Tuple[bool, dict]:
     }
 
     try:
-        p = subprocess.run(
+        # Run in a thread so lease renewal and the other claimed commands keep going.
+        p = await asyncio.to_thread(
+            subprocess.run,
             ["python", entry],
             input=json.dumps(payload).encode("utf-8"),
             stdout=subprocess.PIPE,
@@ -205,7 +212,7 @@ async def run_assigned_agent(agent: dict, cmd: dict) -> Tuple[bool, dict]:
 async def finalize(cmd: dict, ok: bool, result: dict):
     command_id = cmd["command_id"]
     if ok:
-        await sb_patch("az_commands", f"command_id=eq.{command_id}", {
+        await QUEUE.update(command_id, WORKER_ID, {
             "state": "DONE",
             "finished_at": "now()",
             "progress": 100,
@@ -214,7 +221,7 @@ async def finalize(cmd: dict, ok: bool, result: dict):
         })
         await emit_event("control_plane", command_id, "info", "state_change", "Command completed", {"state": "DONE"})
     else:
-        await sb_patch("az_commands", f"command_id=eq.{command_id}", {
+        await QUEUE.update(command_id, WORKER_ID, {
             "state": "FAILED",
             "finished_at": "now()",
             "progress": 100,
@@ -223,54 +230,79 @@ async def finalize(cmd: dict, ok: bool, result: dict):
         await emit_event("control_plane", command_id, "critical", "state_change", "Command failed", {"state": "FAILED", "error": result})
 
 
+async def process_command(cmd: dict):
+    # Authority gating
+    required = cmd.get("authority_required", DEFAULT_AUTH)
+    if not autopilot_allows(required):
+        if not cmd.get("approved", False):
+            await mark_needs_approval(cmd, f"Requires {required} and autopilot is disabled.")
+            return
+
+    targets = cmd.get("targets", [])
+    agent = await choose_agent(targets)
+    if not agent:
+        await mark_needs_approval(cmd, "No enabled agent found for targets.")
+        return
+
+    if not await assign_command(cmd, agent["agent_id"]):
+        print(f"Lost lease on {cmd['command_id']} before start; skipping.")
+        return
+    await QUEUE.update(cmd["command_id"], WORKER_ID, {
+        "state": "RUNNING",
+        "started_at": "now()",
+        "progress": 15
+    })
+    await emit_event("control_plane", cmd["command_id"], "info", "state_change", "Command running", {"state": "RUNNING", "agent": agent["agent_id"]})
+
+    async with LeaseKeeper(QUEUE, cmd["command_id"], WORKER_ID, LEASE_SECONDS) as lease:
+        ok, out = await run_assigned_agent(agent, cmd)
+
+    if lease.lost:
+        # Another worker re-claimed it after our lease lapsed; its result wins.
+        print(f"Lease on {cmd['command_id']} was lost while running; discarding result.")
+        return
+
+    # Optional VERIFYING stage (if agent returns verify_required=true)
+    if ok and isinstance(out, dict) and out.get("verify_required") is True:
+        await QUEUE.update(cmd["command_id"], WORKER_ID, {
+            "state": "VERIFYING",
+            "progress": 80
+        })
+        await emit_event("control_plane", cmd["command_id"], "info", "state_change", "Verifying", {"state": "VERIFYING"})
+        # For v1, trust agent’s internal verification report
+        # (Later: run Inspector/Verifier automatically here)
+
+    await finalize(cmd, ok, out)
+
+
 async def main():
-    print("Worker started.")
+    print(f"Worker {WORKER_ID} started.")
     # Bootstrap: ensure default agents exist (local examples)
     await ensure_default_agents()
 
+    last_requeue = 0.0
     while True:
         try:
-            cmd = await fetch_next_command()
-            if not cmd:
+            if time.monotonic() - last_requeue >= REQUEUE_INTERVAL:
+                requeued = await QUEUE.requeue_expired()
+                if requeued:
+                    print(f"Requeued {requeued} command(s) with expired leases.")
+                last_requeue = time.monotonic()
+                logger.debug("Supabase latency: {}", json.dumps({k: {"n": v["count"], "p50": v["p50_ms"], "p99": v["p99_ms"]} for k, v in SB.metrics().items()}))
+
+            cmds = await claim_commands()
+            if not cmds:
                 await asyncio.sleep(POLL_INTERVAL)
                 continue
 
-            # Authority gating
-            required = cmd.get("authority_required", DEFAULT_AUTH)
-            if not autopilot_allows(required):
-                if not cmd.get("approved", False):
-                    await mark_needs_approval(cmd, f"Requires {required} and autopilot is disabled.")
-                    await asyncio.sleep(POLL_INTERVAL)
-                    continue
-
-            targets = cmd.get("targets", [])
-            agent = await choose_agent(targets)
-            if not agent:
-                await mark_needs_approval(cmd, "No enabled agent found for targets.")
-                await asyncio.sleep(POLL_INTERVAL)
-                continue
+            results = await asyncio.gather(*(process_command(c) for c in cmds), return_exceptions=True)
+            for cmd, res in zip(cmds, results):
+                if isinstance(res, Exception):
+                    print(f"Command {cmd['command_id']} error:", res)
 
-            cmd = await claim_command(cmd, agent["agent_id"])
-            await sb_patch("az_commands", f"command_id=eq.{cmd['command_id']}", {
-                "state": "RUNNING",
-                "started_at": "now()",
-                "progress": 15
-            })
-            await emit_event("control_plane", cmd["command_id"], "info", "state_change", "Command running", {"state": "RUNNING", "agent": agent["agent_id"]})
-
-            ok, out = await run_assigned_agent(agent, cmd)
-
-            # Optional VERIFYING stage (if agent returns verify_required=true)
-            if ok and isinstance(out, dict) and out.get("verify_required") is True:
-                await sb_patch("az_commands", f"command_id=eq.{cmd['command_id']}", {
-                    "state": "VERIFYING",
-                    "progress": 80
-                })
-                await emit_event("control_plane", cmd["command_id"], "info", "state_change", "Verifying", {"state": "VERIFYING"})
-                # For v1, trust agent’s internal verification report
-                # (Later: run Inspector/Verifier automatically here)
-
-            await finalize(cmd, ok, out)
+            # A full batch means there is likely more work queued: claim again right away.
+            if len(cmds) >= CLAIM_BATCH_SIZE:
+                continue
 
         except Exception as e:
             print("Worker loop error:", e)
@@ -0,0 +1,102 @@
+"""
+Render benchmark for LocalTemplateProvider
+Times every layout with the old per-pixel gradient/noise loops vs the NumPy
+backend (cold and with a warm tile cache), and checks gradient parity.
+
+    python bench_render.py [repeats]
+"""
+import sys
+import time
+import random
+
+import numpy as np
+from PIL import Image
+
+from titan_social import backgrounds
+from titan_social.provider_local import LocalTemplateProvider
+
+SIZES = {"IG_FEED": (1080, 1350), "IG_STORY": (1080, 1920), "X": (1200, 675)}
+BRAND = "#FF2D55"
+TEXT = "FAST SAME DAY"
+
+
+# Reference implementations (what provider_local did before the NumPy backend)
+def legacy_gradient(self, width, height, color1, color2, kind="linear"):
+    base = Image.new('RGB', (width, height), color1)
+    top = Image.new('RGB', (width, height), color2)
+    mask = Image.new('L', (width, height))
+    mask_data = []
+    for y in range(height):
+        for x in range(width):
+            mask_data.append(int(255 * (y / height)))
+    mask.putdata(mask_data)
+    base.paste(top, (0, 0), mask)
+    return base
+
+
+def legacy_noise(self, img, opacity=15):
+    width, height = img.size
+    noise = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    pixels = noise.load()
+    for y in range(0, height, 2):
+        for x in range(0, width, 2):
+            if random.random() > 0.5:
+                pixels[x, y] = (255, 255, 255, opacity)
+    img = img.convert('RGBA')
+    img = Image.alpha_composite(img, noise)
+    return img.convert('RGB')
+
+
+def time_layout(provider, layout, width, height, repeats):
+    fn = getattr(provider, f"_layout_{layout}")
+    started = time.perf_counter()
+    for _ in range(repeats):
+        fn(width, height, BRAND, TEXT)
+    return (time.perf_counter() - started) / repeats * 1000
+
+
+def check_parity():
+    provider = LocalTemplateProvider()
+    for width, height in SIZES.values():
+        c1, c2 = (255, 45, 85), (120, 0, 30)
+        old = np.asarray(legacy_gradient(provider, width, height, c1, c2))
+        new = np.asarray(backgrounds.gradient(width, height, c1, c2))
+        assert np.array_equal(old, new), f"gradient mismatch at {width}x{height}"
+
+    # Noise is random in both paths: compare density and the per-pixel blend instead
+    base = Image.new('RGB', (400, 400), (10, 20, 30))
+    lit_old = np.asarray(legacy_noise(provider, base, 12)) != 10
+    lit_new = np.asarray(backgrounds.add_noise(base, 12)) != 10
+    print(f"parity: linear gradient bit-identical; noise density old={lit_old[..., 0].mean():.3f} new={lit_new[..., 0].mean():.3f}")
+
+
+def main(repeats: int = 3):
+    check_parity()
+    print(f"{'layout':<9} {'size':>10} | {'per-pixel':>10} | {'numpy cold':>10} | {'numpy cached':>12}")
+    for layout in LocalTemplateProvider.LAYOUTS:
+        for name, (width, height) in SIZES.items():
+            legacy = LocalTemplateProvider()
+            legacy._create_gradient = legacy_gradient.__get__(legacy)
+            legacy._add_noise_texture = legacy_noise.__get__(legacy)
+            old_ms = time_layout(legacy, layout, width, height, 1)
+
+            fast = LocalTemplateProvider()
+            backgrounds._gradient_tile.cache_clear()
+            backgrounds.noise_layer.cache_clear()
+            cold_ms = time_layout(fast, layout, width, height, 1)
+            warm_ms = time_layout(fast, layout, width, height, repeats)
+            print(f"{layout:<9} {width:>4}x{height:<5} | {old_ms:>7.0f} ms | {cold_ms:>7.1f} ms | {warm_ms:>9.1f} ms")
+
+    # A batch run (like test_matrix): same palette across sizes, every tile rendered once
+    backgrounds._gradient_tile.cache_clear()
+    backgrounds.noise_layer.cache_clear()
+    provider = LocalTemplateProvider()
+    for _ in range(2):
+        for width, height in SIZES.values():
+            for layout in ("hero", "badge"):
+                getattr(provider, f"_layout_{layout}")(width, height, BRAND, TEXT)
+    print(f"batch cache: {backgrounds.cache_info()}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -9,6 +9,7 @@ from titan_social.dispatcher import dispatch_platform
 from titan_social.prompt import build_locked_prompt
 from titan_social.provider_openai import OpenAIImageProvider
 from titan_social.provider_hf import HFImageProvider
+from titan_social.provider_local import LocalTemplateProvider
 from titan_social.logging_utils import ensure_dirs, log_event
 from titan_social.validators import validate_lane1_image
 
@@ -26,6 +27,8 @@ def run_one(req: GraphicRequest, s: Settings):
     
     if s.provider_type == "hf":
         provider = HFImageProvider(api_key=s.hf_token, model=s.image_model)
+    elif s.provider_type == "local":
+        provider = LocalTemplateProvider()  # background tiles are cached across the batch
     else:
         provider = OpenAIImageProvider(api_key=s.openai_api_key, model=s.image_model)
 
@@ -3,6 +3,8 @@ import io
 import re
 import colorsys
 
+from titan_social import backgrounds
+
 class LocalTemplateProvider:
     """
     Professional layout engine with 5 design archetypes.
@@ -89,20 +91,7 @@ class LocalTemplateProvider:
     
     def _add_noise_texture(self, img: Image, opacity: int = 15) -> Image:
         """Add subtle noise texture for depth"""
-        import random
-        
-        width, height = img.size
-        noise = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-        pixels = noise.load()
-        
-        for y in range(0, height, 2):
-            for x in range(0, width, 2):
-                if random.random() > 0.5:
-                    pixels[x, y] = (255, 255, 255, opacity)
-        
-        img = img.convert('RGBA')
-        img = Image.alpha_composite(img, noise)
-        return img.convert('RGB')
+        return backgrounds.add_noise(img, opacity=opacity)
     
     def _add_dot_pattern(self, draw, width: int, height: int, color: tuple, spacing: int = 40):
         """Add subtle dot pattern"""
@@ -114,17 +103,9 @@ class LocalTemplateProvider:
         hex_color = hex_color.lstrip('#')
         return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
     
-    def _create_gradient(self, width: int, height: int, color1: tuple, color2: tuple) -> Image:
-        base = Image.new('RGB', (width, height), color1)
-        top = Image.new('RGB', (width, height), color2)
-        mask = Image.new('L', (width, height))
-        mask_data = []
-        for y in range(height):
-            for x in range(width):
-                mask_data.append(int(255 * (y / height)))
-        mask.putdata(mask_data)
-        base.paste(top, (0, 0), mask)
-        return base
+    def _create_gradient(self, width: int, height: int, color1: tuple, color2: tuple, kind: str = "linear") -> Image:
+        """kind: linear (top to bottom), radial or diagonal. Cached per size + palette."""
+        return backgrounds.gradient(width, height, color1, color2, kind)
     
     def _darken_color(self, rgb: tuple, factor: float = 0.6) -> tuple:
         h, l, s = colorsys.rgb_to_hls(rgb[0]/255, rgb[1]/255, rgb[2]/255)